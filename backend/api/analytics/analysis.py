@@ -0,0 +1,167 @@
+import pandas as pd
+
+from .rollups import TimeRollups
+
+# Column-name keywords that pick the columns each specialised analysis works on; shared
+# with the aggregate-based analysis in incremental.py
+SALES_KEYWORDS = ['sales', 'revenue', 'total', 'amount']
+QUANTITY_KEYWORDS = ['quantity', 'qty', 'sold']
+PRODUCT_KEYWORDS = ['product', 'item', 'category']
+REVENUE_KEYWORDS = ['revenue', 'sales', 'income']
+PROFIT_KEYWORDS = ['profit', 'margin', 'net']
+COST_KEYWORDS = ['cost', 'expense', 'cogs', 'opex']
+ENGAGEMENT_KEYWORDS = ['likes', 'shares', 'comments', 'views', 'engagement']
+
+ANALYSIS_LABELS = {
+    'sales': {'business_focus': 'sales_performance', 'analysis_type': 'Sales Performance Analysis'},
+    'financial': {'business_focus': 'financial_performance', 'analysis_type': 'Financial Performance Analysis'},
+    'social_media': {'business_focus': 'social_media_performance', 'analysis_type': 'Social Media Performance Analysis'},
+    'general': {'business_focus': 'general_analysis', 'analysis_type': 'General Data Analysis'},
+}
+
+
+def find_columns(columns, keywords):
+    return [col for col in columns if any(keyword in col.lower() for keyword in keywords)]
+
+
+def analyze_sales_data(df):
+    """Specialized analysis for sales data"""
+    specialized_metrics = {}
+
+    # Try to identify key sales columns
+    sales_cols = find_columns(df.columns, SALES_KEYWORDS)
+    quantity_cols = find_columns(df.columns, QUANTITY_KEYWORDS)
+    product_cols = find_columns(df.columns, PRODUCT_KEYWORDS)
+
+    if sales_cols:
+        sales_col = sales_cols[0]
+        specialized_metrics['total_sales'] = float(df[sales_col].sum())
+        specialized_metrics['average_transaction'] = float(df[sales_col].mean())
+        specialized_metrics['sales_std'] = float(df[sales_col].std())
+
+    if quantity_cols:
+        qty_col = quantity_cols[0]
+        specialized_metrics['total_quantity_sold'] = float(df[qty_col].sum())
+        specialized_metrics['average_quantity'] = float(df[qty_col].mean())
+
+    if product_cols:
+        product_col = product_cols[0] 
+        specialized_metrics['unique_products'] = int(df[product_col].nunique())
+        specialized_metrics['top_products'] = df[product_col].value_counts().head().to_dict()
+
+    return {
+        'specialized_metrics': specialized_metrics,
+        **ANALYSIS_LABELS['sales'],
+    }
+
+
+def analyze_financial_data(df):
+    """Specialized analysis for financial data"""
+    specialized_metrics = {}
+
+    # Try to identify key financial columns
+    revenue_cols = find_columns(df.columns, REVENUE_KEYWORDS)
+    profit_cols = find_columns(df.columns, PROFIT_KEYWORDS)
+    cost_cols = find_columns(df.columns, COST_KEYWORDS)
+
+    revenue_col = revenue_cols[0] if revenue_cols else None
+    profit_col = profit_cols[0] if profit_cols else None
+    cost_col = cost_cols[0] if cost_cols else None
+
+    if profit_col and revenue_col:
+        specialized_metrics['profit_margin'] = float(df[profit_col].mean() / df[revenue_col].mean() * 100)
+    else:
+        specialized_metrics['profit_margin'] = 0
+    if cost_col:
+        specialized_metrics['total_costs'] = float(df[cost_col].sum())
+        specialized_metrics['cost_ratio'] = float(df[cost_col].mean() / df[revenue_col].mean() * 100) if revenue_col else 0
+    else:
+        specialized_metrics['total_costs'] = 0
+        specialized_metrics['cost_ratio'] = 0
+
+    return {
+        'specialized_metrics': specialized_metrics,
+        **ANALYSIS_LABELS['financial'],
+    }
+
+
+def analyze_social_media_data(df):
+    """Specialized analysis for social media data"""
+    specialized_metrics = {}
+
+    # Try to identify key social media columns
+    engagement_cols = find_columns(df.columns, ENGAGEMENT_KEYWORDS)
+    platform_cols = [col for col in df.columns if 'platform' in col.lower()]
+    content_cols = [col for col in df.columns if 'content' in col.lower()]
+
+    # engagement_cols is a list of potentially mixed-type columns
+    engagement_numeric_cols = [col for col in engagement_cols if pd.api.types.is_numeric_dtype(df[col])]
+
+    platform_col = platform_cols[0] if platform_cols else None
+
+    if platform_col and engagement_numeric_cols:
+        platform_means = df.groupby(platform_col)[engagement_numeric_cols].mean()
+        best = {col: platform_means[col].idxmax() for col in engagement_numeric_cols}
+        specialized_metrics['best_performing_platform_per_metric'] = best
+
+    if engagement_cols:
+        for col in engagement_cols:
+            if col.lower() in ['likes', 'shares', 'comments', 'views']:
+                specialized_metrics[f'total_{col.lower()}'] = float(df[col].sum())
+                specialized_metrics[f'average_{col.lower()}'] = float(df[col].mean())
+
+    if content_cols:
+        content_col = content_cols[0]
+        if engagement_numeric_cols:
+            by_content = df.groupby(content_col)[engagement_numeric_cols].mean()
+            best = {col: by_content[col].idxmax() for col in engagement_numeric_cols}
+            specialized_metrics['best_content_type_per_metric'] = best
+        # Distribution should still use all as before:
+        specialized_metrics['content_type_distribution'] = df[content_col].value_counts().to_dict()
+
+
+    # Calculate engagement rate if possible
+    if 'Views' in df.columns and 'Likes' in df.columns:
+        specialized_metrics['average_engagement_rate'] = float((df['Likes'] / df['Views'] * 100).mean())
+
+    return {
+        'specialized_metrics': specialized_metrics,
+        **ANALYSIS_LABELS['social_media'],
+    }
+
+
+def analyze_general_data(df):
+    """General analysis for unspecified data types"""
+    return {
+        'specialized_metrics': {},
+        **ANALYSIS_LABELS['general'],
+    }
+
+
+def calculate_growth_rate(df, column, rollups=None):
+    """
+    Growth (%) of a column from its first to its last period total, by month, week or day
+    depending on the span of the date column (rollups.TimeRollups); 0.0 without dates
+    """
+    try:
+        rollups = rollups if rollups is not None else TimeRollups.from_frame(df)
+        if rollups is None or not rollups.has(column):
+            return 0.0
+        _, values = rollups.get(rollups.auto_freq()).series(column)
+        if len(values) > 1 and values[0] != 0:
+            return float((values[-1] - values[0]) / abs(values[0]) * 100)
+        return 0.0
+    except Exception:
+        return 0.0
+
+
+# Specialised analysis per detected data type (see profiling.detect_data_type)
+ANALYZERS = {
+    'sales': analyze_sales_data,
+    'financial': analyze_financial_data,
+    'social_media': analyze_social_media_data,
+}
+
+
+def analyze_by_type(df, data_type):
+    return ANALYZERS.get(data_type, analyze_general_data)(df)
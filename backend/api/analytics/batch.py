@@ -0,0 +1,242 @@
+"""
+Batch analysis: run AnalysisEngine over many BusinessData files in a process pool.
+
+Progress is journalled to a JSONL file (one header line describing the batch, then one
+line per finished file) so a crashed or interrupted batch can be resumed: files already
+journalled as "ok" are skipped. Workers only run the engine; the parent process owns the
+database and writes the ProcessedReport rows.
+
+Django models are imported inside the parent-side functions so worker processes can
+unpickle `_analyse` without setting up Django.
+"""
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from ..utils import metrics
+from .clients import GeminiClient, SupabaseStorage
+from .engine import AnalysisEngine
+from .tracing import Tracer, span
+
+STAGES = ('download', 'clean', 'upload', 'cleaning_report', 'rollups', 'analyze', 'pdf', 'ppt', 'save')
+
+# Per-process engine, built once by the pool initializer and reused for every file
+# that process handles (one Gemini model and one Supabase client per worker)
+_engine = None
+
+
+def _init_worker(llm_options, storage_options):
+    global _engine
+    import matplotlib
+    matplotlib.use('Agg')
+    _engine = AnalysisEngine(llm=GeminiClient(**llm_options), storage=SupabaseStorage(**storage_options))
+
+
+def _analyse(job):
+    """Worker: download and analyse one file; never raises so one bad file can't stop the batch"""
+    tracer = Tracer()
+    try:
+        with tracer.activate():
+            with span('download'):
+                content = _engine.storage.download(job['file_url'])
+            result = _engine.run(content, job['filename'])
+        result['processed_data']['timings'] = tracer.as_dict()
+        return {'status': 'ok', 'result': result, 'stages': tracer.stage_seconds()}
+    except Exception as e:
+        return {'status': 'failed', 'error': str(e), 'stages': tracer.stage_seconds()}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def select_files(file_ids=None, uploader=None, created_after=None, created_before=None, unprocessed=False):
+    """BusinessData queryset for explicit ids and/or a filter, oldest first"""
+    from ..models import BusinessData
+
+    files = BusinessData.objects.exclude(file_url__isnull=True).exclude(file_url='')
+    if file_ids:
+        files = files.filter(id__in=file_ids)
+    if uploader:
+        files = files.filter(uploader_id=uploader)
+    if created_after:
+        files = files.filter(created_at__gte=created_after)
+    if created_before:
+        files = files.filter(created_at__lt=created_before)
+    if unprocessed:
+        files = files.filter(processedreport__isnull=True)
+    return files.order_by('created_at')
+
+
+def journal_path(batch_id, directory=None):
+    from django.conf import settings
+    return os.path.join(directory or settings.ANALYSIS_BATCH_DIR, f"{batch_id}.jsonl")
+
+
+def create_batch(file_ids, analysis_type='full_analysis', directory=None):
+    """Write the journal header for a new batch and return its id"""
+    batch_id = uuid.uuid4().hex
+    path = journal_path(batch_id, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as journal:
+        journal.write(json.dumps({
+            'type': 'batch',
+            'batch_id': batch_id,
+            'analysis_type': analysis_type,
+            'file_ids': [str(file_id) for file_id in file_ids],
+            'created_at': time.time(),
+        }) + "\n")
+    return batch_id
+
+
+def read_journal(path):
+    """(header, file records) from a batch journal; a torn last line from a crash is ignored"""
+    header, records = None, []
+    with open(path) as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('type') == 'batch':
+                header = entry
+            else:
+                records.append(entry)
+    if header is None:
+        raise ValueError(f"{path} is not a batch journal")
+    return header, records
+
+
+def summarise(header, records):
+    """Progress plus files/min and p50/p95 seconds per stage for the journalled files"""
+    latest = {record['id']: record for record in records}
+    ok = [record for record in latest.values() if record['status'] == 'ok']
+    summary = {
+        'batch_id': header['batch_id'],
+        'total': len(header['file_ids']),
+        'ok': len(ok),
+        'failed': sum(1 for record in latest.values() if record['status'] == 'failed'),
+        'pending': len(set(header['file_ids']) - {i for i, r in latest.items() if r['status'] == 'ok'}),
+        'files_per_min': None,
+        'stages': {},
+    }
+    if records:
+        # Only time actually spent running: resumed batches don't count the gap between runs
+        elapsed = sum(run['finished'] - run['started'] for run in _runs(records))
+        summary['files_per_min'] = round(len(records) / elapsed * 60, 2) if elapsed else None
+    for stage in STAGES + ('total',):
+        samples = [record['stages'][stage] for record in records if stage in record.get('stages', {})]
+        if samples:
+            summary['stages'][stage] = {
+                'count': len(samples),
+                'p50': round(percentile(samples, 50), 3),
+                'p95': round(percentile(samples, 95), 3),
+            }
+    return summary
+
+
+def _runs(records):
+    """Group records by the run that produced them, as {'started', 'finished'} spans"""
+    spans = {}
+    for record in records:
+        span = spans.setdefault(record.get('run'), {'started': record['run_started'], 'finished': 0})
+        span['finished'] = max(span['finished'], record['finished_at'])
+    return spans.values()
+
+
+def run_batch(batch_id, workers=None, directory=None, log=print):
+    """
+    Run (or resume) a batch created with create_batch and return its summary.
+
+    At most `workers` files are in flight at once, so memory stays bounded no matter
+    how many files the batch holds.
+    """
+    from django.conf import settings
+    from ..models import BusinessData, ProcessedReport
+
+    path = journal_path(batch_id, directory)
+    header, records = read_journal(path)
+    done = {record['id'] for record in records if record['status'] == 'ok'}
+    pending = list(
+        BusinessData.objects.filter(id__in=[i for i in header['file_ids'] if i not in done])
+        .values('id', 'fileName', 'file_url')
+    )
+    workers = workers or settings.ANALYSIS_BATCH_WORKERS
+    log(f"batch {batch_id}: {len(pending)} to analyse, {len(done)} already done, {workers} workers")
+
+    run_id, run_started = uuid.uuid4().hex, time.time()
+    llm_options = {'api_key': settings.GEMINI_API_KEY}
+    storage_options = {'url': settings.SUPABASE_URL, 'key': settings.SUPABASE_KEY}
+    # spawn: children must not inherit the parent's DB sockets or (in the API) its threads
+    context = multiprocessing.get_context('spawn')
+
+    with open(path, 'a') as journal, ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=_init_worker, initargs=(llm_options, storage_options),
+    ) as pool:
+        queue = iter(pending)
+        in_flight = {}
+
+        def submit_next():
+            file = next(queue, None)
+            if file is not None:
+                job = {'id': str(file['id']), 'filename': file['fileName'], 'file_url': file['file_url']}
+                in_flight[pool.submit(_analyse, job)] = (job, time.perf_counter())
+                metrics.ANALYSIS_JOBS.labels('batch').inc()
+
+        try:
+            for _ in range(workers):
+                submit_next()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job, submitted = in_flight.pop(future)
+                    metrics.ANALYSIS_JOBS.labels('batch').dec()
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool as e:
+                        # A worker died (e.g. OOM); stop here and let a resume pick up the rest
+                        outcome = {'status': 'failed', 'error': f"worker crashed: {e}", 'stages': {}}
+                        queue = iter(())
+
+                    record = {
+                        'id': job['id'], 'status': outcome['status'], 'error': outcome.get('error'),
+                        'report_id': None, 'stages': outcome['stages'], 'run': run_id, 'run_started': run_started,
+                    }
+                    if outcome['status'] == 'ok':
+                        try:
+                            saving = time.perf_counter()
+                            result = outcome['result']
+                            report = ProcessedReport.objects.create(
+                                original_file_id=job['id'],
+                                analysis_type=header['analysis_type'],
+                                processed_data=result['processed_data'],
+                                pdf_url=result['pdf_url'],
+                                ppt_url=result['ppt_url'],
+                            )
+                            record['stages']['save'] = time.perf_counter() - saving
+                            record['report_id'] = report.id
+                        except Exception as e:
+                            record.update(status='failed', error=f"save failed: {e}")
+                    record['stages']['total'] = time.perf_counter() - submitted
+                    record['finished_at'] = time.time()
+
+                    journal.write(json.dumps(record) + "\n")
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                    records.append(record)
+                    log(f"  {record['status']:6} {job['filename']} ({record['stages']['total']:.1f}s)"
+                        + (f": {record['error']}" if record['error'] else ""))
+                    submit_next()
+        except KeyboardInterrupt:
+            log("interrupted; completed files are journalled, re-run with the batch id to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return summarise(header, records)
@@ -0,0 +1,355 @@
+"""
+Reproducible benchmarks for the analysis, feedback and report pipelines.
+
+Synthetic datasets are generated from a seed, Gemini and Supabase are replaced by the
+local fakes below, and every stage is measured for wall time and peak traced memory.
+Used by `manage.py bench_analytics`.
+"""
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .analysis import analyze_by_type
+from .charts import create_specialized_visualizations
+from .cleaning import clean_and_preprocess_data, clean_feedback_data, read_table
+from .dedup import collapse_feedback
+from .feedback import (
+    analyze_columns_with_gemini, comprehensive_feedback_analysis, create_ai_driven_visualizations,
+    fallback_column_analysis, feedback_columns_of, generate_executive_summary,
+)
+from .insights import get_specialized_gemini_insights
+from .profiling import data_overview, detect_data_type, statistical_summary
+from .sentiment import SentimentScorer, feedback_texts, label_scores, polarity
+from .topics import cluster_feedback, name_topics
+
+DATASETS = ('sales', 'financial', 'social_media', 'feedback')
+
+
+class FakeLLM:
+    """
+    Stand-in for GeminiClient: answers from canned responses, counts calls and prompt size.
+
+    `rules` is a list of (substring, response); the first rule whose substring occurs in the
+    prompt wins (a callable response is called with the prompt), otherwise `default` is returned. `latency` (seconds) simulates the network.
+    """
+
+    api_key = 'fake'
+
+    def __init__(self, rules=None, default="## Key Insights\n- Stable performance.\n## Recommendations\n- Keep going.",
+                 latency=0.0):
+        self.rules = list(rules or [])
+        self.default = default
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        for marker, response in self.rules:
+            if marker in prompt:
+                return response(prompt) if callable(response) else response
+        return self.default
+
+
+class FakeStorage:
+    """Stand-in for SupabaseStorage that keeps uploads in memory"""
+
+    def __init__(self, bucket="business_files"):
+        self.bucket = bucket
+        self.files = {}
+        self.bytes_uploaded = 0
+
+    def upload(self, path, content, content_type):
+        self.files[path] = content
+        self.bytes_uploaded += len(content)
+        return f"memory://{self.bucket}/{path}"
+
+    def download(self, file_url, timeout=30):
+        return self.files[file_url.split(f"memory://{self.bucket}/", 1)[-1]]
+
+
+# Sentiment and categories are measured, so only the recommendations are asked for
+FEEDBACK_ANALYSIS_RESPONSE = json.dumps({
+    "recommendations": [
+        {"area": "Operations", "action": "Add a second counter", "priority": "high",
+         "impact": "Shorter queues", "timeline": "short-term"},
+    ],
+})
+
+POSITIVE_PHRASES = ["Great taste", "Friendly staff", "Love the noodles", "Excellent value", "Quick service"]
+NEGATIVE_PHRASES = ["Too slow", "Too expensive", "Food was cold", "Rude cashier", "Dirty tables"]
+NEUTRAL_PHRASES = ["It was okay", "Average experience", "Nothing special"]
+
+
+def synthetic_dataset(kind, rows, seed=0):
+    """Deterministic DataFrame shaped like a real upload of `kind`, with a few gaps and duplicates"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+
+    if kind == 'sales':
+        quantity = rng.integers(1, 20, rows)
+        unit_price = rng.choice([3.5, 4.0, 5.5, 6.0, 8.5], rows)
+        df = pd.DataFrame({
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Transaction_ID': np.arange(rows),
+            'Product': rng.choice(['Hokkien Mee', 'Char Kway Teow', 'Laksa', 'Satay', 'Chendol'], rows),
+            'Category': rng.choice(['Noodles', 'Grill', 'Dessert'], rows),
+            'Store': rng.choice(['Bedok', 'Tampines', 'Jurong', 'Yishun'], rows),
+            'Payment_Method': rng.choice(['Cash', 'Card', 'PayNow'], rows),
+            'Quantity_Sold': quantity,
+            'Unit_Price': unit_price,
+            'Total_Sales': quantity * unit_price,
+        })
+    elif kind == 'financial':
+        revenue = rng.normal(20000, 4000, rows).round(2)
+        cogs = (revenue * rng.uniform(0.3, 0.5, rows)).round(2)
+        opex = (revenue * rng.uniform(0.2, 0.3, rows)).round(2)
+        df = pd.DataFrame({
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Total_Revenue': revenue,
+            'COGS': cogs,
+            'Gross_Profit': revenue - cogs,
+            'Operating_Expenses': opex,
+            'Net_Profit': revenue - cogs - opex,
+            'Profit_Margin': ((revenue - cogs - opex) / revenue).round(4),
+            'Ingredients': (cogs * 0.7).round(2),
+            'Packaging': (cogs * 0.3).round(2),
+            'Labor': (opex * 0.6).round(2),
+            'Utilities': (opex * 0.4).round(2),
+        })
+    elif kind == 'social_media':
+        views = rng.integers(100, 50000, rows)
+        df = pd.DataFrame({
+            'Post_Date': dates.strftime('%Y-%m-%d'),
+            'Platform': rng.choice(['Instagram', 'TikTok', 'Facebook'], rows),
+            'Content_Type': rng.choice(['Video', 'Photo', 'Story', 'Reel'], rows),
+            'Views': views,
+            'Likes': (views * rng.uniform(0.01, 0.1, rows)).astype(int),
+            'Shares': (views * rng.uniform(0.001, 0.01, rows)).astype(int),
+            'Comments': (views * rng.uniform(0.001, 0.02, rows)).astype(int),
+            'Followers_Gained': rng.integers(0, 200, rows),
+        })
+    elif kind == 'feedback':
+        rating = rng.integers(1, 6, rows)
+        phrases = np.where(rating >= 4, rng.choice(POSITIVE_PHRASES, rows),
+                           np.where(rating <= 2, rng.choice(NEGATIVE_PHRASES, rows), rng.choice(NEUTRAL_PHRASES, rows)))
+        df = pd.DataFrame({
+            'Response_ID': np.arange(rows),
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Customer_Name': rng.choice(['Alice', 'Ben', 'Chen', 'Devi', 'Ethan'], rows),
+            'Outlet': rng.choice(['Bedok', 'Tampines', 'Jurong'], rows),
+            'Rating': rating,
+            'Feedback': phrases,
+        })
+    else:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+
+    # Something for the cleaning stage to do: ~1% gaps in the last column, ~0.5% duplicate rows
+    gaps = rng.random(rows) < 0.01
+    df.loc[gaps, df.columns[-1]] = None
+    duplicates = df.sample(frac=0.005, random_state=seed)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+
+COMMENT_OPENERS = ["", "Honestly, ", "Visited on a weekday. ", "Second time here. ", "My family thinks "]
+COMMENT_SUBJECTS = ["the noodles", "the staff", "the queue", "the prices", "the outlet", "the portion", "the app"]
+COMMENT_VERDICTS = ["were great", "were really friendly", "was not good", "was too slow", "was okay",
+                    "was terrible", "were excellent value", "could be better", "was very clean", "were cold"]
+
+
+def synthetic_comments(rows, seed=0):
+    """Deterministic free-text comments with many distinct strings, like a large survey export"""
+    rng = np.random.default_rng(seed)
+    openers = rng.choice(COMMENT_OPENERS, rows)
+    subjects = rng.choice(COMMENT_SUBJECTS, rows)
+    verdicts = rng.choice(COMMENT_VERDICTS, rows)
+    outlets = rng.choice(['Bedok', 'Tampines', 'Jurong', 'Yishun'], rows)
+    visits = rng.integers(1, 500, rows).astype(str)
+    return pd.Series(openers) + subjects + ' ' + verdicts + ' at ' + outlets + ' (order ' + visits + ')'
+
+
+def textblob_polarity_loop(texts):
+    """The pre-vectorisation fallback: one TextBlob per comment"""
+    from textblob import TextBlob
+    return [TextBlob(str(text)).sentiment.polarity for text in texts.dropna()]
+
+
+def run_sentiment_benchmark(sizes, workers=1, seed=0, log=print):
+    """
+    {"sentiment/<rows>/<scorer>": {seconds, peak_mb, ...}} for the TextBlob loop (when
+    textblob is installed), the vectorised scorer in-process and across `workers` processes.
+    'agreement' is the share of comments both give the same positive/negative/neutral label.
+    """
+    results = {}
+    for rows in sizes:
+        texts = synthetic_comments(rows, seed)
+        runs = [('vectorised', lambda: polarity(texts))]
+        if workers > 1:
+            runs.append((f'vectorised_{workers}proc', lambda: polarity(texts, workers=workers)))
+        try:
+            import textblob  # noqa: F401
+            runs.insert(0, ('textblob_loop', lambda: textblob_polarity_loop(texts)))
+        except ImportError:
+            log("  textblob not installed; skipping the loop baseline")
+
+        baseline = None
+        for name, fn in runs:
+            scores, seconds, _ = measure(fn, trace_memory=False)
+            key = f"sentiment/{rows}/{name}"
+            results[key] = {'seconds': round(seconds, 4), 'peak_mb': 0.0, 'llm_calls': 0, 'uploaded_bytes': 0}
+            if name == 'textblob_loop':
+                # TextBlob's own cut-offs, as basic_feedback_analysis used them
+                scores = np.asarray(scores)
+                baseline = np.where(scores > 0.1, 'positive', np.where(scores < -0.1, 'negative', 'neutral'))
+            elif baseline is not None:
+                results[key]['agreement'] = round(float((label_scores(scores.to_numpy()) == baseline).mean()), 4)
+            log(f"  {key:32} {seconds:9.3f} s")
+    return results
+
+
+def measure(fn, trace_memory=True):
+    """(result, seconds, peak traced MB) for one call"""
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+        if trace_memory:
+            tracemalloc.stop()
+    return result, seconds, peak / (1024 * 1024)
+
+
+def business_stages(df, filename, llm, storage):
+    """Stages of AnalysisEngine.run on an in-memory upload, as (name, callable) pairs"""
+    from ..utils.report_generators import PDFGenerator, PPTGenerator
+
+    content = df.to_csv(index=False).encode()
+    state = {}
+
+    def read():
+        state['df'] = read_table(content, filename)
+
+    def clean():
+        state['df'], state['cleaning_log'] = clean_and_preprocess_data(state['df'], llm)
+        state['data_type'] = detect_data_type(state['df'], filename)
+
+    def analyze():
+        results = {
+            'data_type': state['data_type'],
+            'statistical_summary': statistical_summary(state['df']),
+            'data_overview': data_overview(state['df']),
+            'key_insights': [],
+            'business_recommendations': [],
+        }
+        results.update(analyze_by_type(state['df'], state['data_type']))
+        state['results'] = results
+
+    def charts():
+        state['results']['visualizations'] = create_specialized_visualizations(
+            state['df'], filename, state['data_type'], storage
+        )
+
+    def insights():
+        state['results'].update(get_specialized_gemini_insights(state['df'], state['results'], state['data_type'], llm))
+
+    def pdf():
+        PDFGenerator().create_analysis_report_with_charts(state['results'], state['df'], filename, state['data_type'])
+
+    def ppt():
+        PPTGenerator().create_specialized_analysis_presentation(
+            state['results'], filename, state['df'], state['data_type']
+        )
+
+    return [('read', read), ('clean', clean), ('analyze', analyze), ('charts', charts),
+            ('insights', insights), ('pdf', pdf), ('ppt', ppt)]
+
+
+def feedback_stages(df, filename, llm, storage):
+    """Stages of FeedbackEngine.run on an in-memory upload, as (name, callable) pairs"""
+    from ..utils.report_generators import PDFGenerator
+
+    content = df.to_csv(index=False).encode()
+    llm.rules = [
+        ("classify each column's purpose", json.dumps(fallback_column_analysis(df, filename))),
+        ("Customer Experience (CX) Analyst", FEEDBACK_ANALYSIS_RESPONSE),
+        ("Classify the sentiment of each customer comment", lambda prompt: json.dumps(['neutral'] * prompt.count('"id"'))),
+        ("Name each customer feedback topic", '{}'),
+    ]
+    state = {}
+
+    def read():
+        state['df'] = read_table(content, filename)
+
+    def clean():
+        state['df'], state['cleaning_log'] = clean_feedback_data(state['df'])
+
+    def columns():
+        state['columns'] = analyze_columns_with_gemini(state['df'], filename, llm)
+
+    def dedup():
+        state['texts'] = feedback_texts(state['df'], feedback_columns_of(state['columns']))
+        state['groups'] = collapse_feedback(state['texts'])
+
+    def sentiment():
+        state['sentiment'] = SentimentScorer(llm).score(state['texts'], state['groups'])
+
+    def topics():
+        state['topics'] = name_topics(cluster_feedback(state['sentiment']), llm)
+
+    def insights():
+        state['analysis'] = comprehensive_feedback_analysis(
+            state['df'], state['columns'], llm, state['sentiment'], state['topics']
+        )
+
+    def charts():
+        state['charts'] = create_ai_driven_visualizations(state['df'], state['columns'], state['analysis'], llm, storage)
+
+    def summary():
+        state['summary'] = generate_executive_summary(state['analysis'], state['charts'], llm)
+
+    def pdf():
+        PDFGenerator().create_feedback_report(
+            state['df'], state['columns'], state['analysis'], state['charts'], state['summary'], filename
+        )
+
+    return [('read', read), ('clean', clean), ('columns', columns), ('dedup', dedup), ('sentiment', sentiment),
+            ('topics', topics), ('insights', insights), ('charts', charts), ('summary', summary), ('pdf', pdf)]
+
+
+def run_benchmark(kinds, sizes, seed=0, trace_memory=True, log=print):
+    """
+    {"<kind>/<rows>/<stage>": {seconds, peak_mb, llm_calls, uploaded_bytes}} for every
+    dataset/size/stage combination. Stages run in pipeline order on the same data.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    results = {}
+    for kind in kinds:
+        for rows in sizes:
+            df = synthetic_dataset(kind, rows, seed)
+            filename = f"bench_{kind}.csv"
+            llm, storage = FakeLLM(), FakeStorage()
+            build = feedback_stages if kind == 'feedback' else business_stages
+            for stage, fn in build(df, filename, llm, storage):
+                calls, uploaded = llm.calls, storage.bytes_uploaded
+                _, seconds, peak_mb = measure(fn, trace_memory)
+                key = f"{kind}/{rows}/{stage}"
+                results[key] = {
+                    'seconds': round(seconds, 4),
+                    'peak_mb': round(peak_mb, 2),
+                    'llm_calls': llm.calls - calls,
+                    'uploaded_bytes': storage.bytes_uploaded - uploaded,
+                }
+                log(f"  {key:32} {seconds:9.3f} s  {peak_mb:9.1f} MB")
+    return results
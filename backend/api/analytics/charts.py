@@ -0,0 +1,561 @@
+import uuid
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from .profiling import analyze_column_types
+from .rollups import TimeRollups, rollups_for
+from .tracing import span
+
+PERIOD_LABELS = {'M': 'Month', 'W': 'Week', 'D': 'Date'}
+
+
+def render_chart(plt_figure, dpi=300):
+    """Render the current matplotlib figure to PNG bytes"""
+    with span('chart.render'):
+        img_buffer = BytesIO()
+        plt_figure.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return img_buffer.getvalue()
+
+
+def save_chart(storage, plt_figure, chart_path, dpi=300):
+    """Render the current matplotlib figure to PNG and upload it; returns the public URL"""
+    return storage.upload(chart_path, render_chart(plt_figure, dpi), "image/png")
+
+
+def create_specialized_visualizations(df, filename, data_type, storage, rollups=None):
+    """Create visualizations based on data type; trend charts read `rollups` (built from df if None)"""
+    charts = []
+
+    if data_type == 'sales':
+        charts.extend(create_sales_charts(df, filename, storage, rollups))
+    elif data_type == 'financial':
+        charts.extend(create_financial_charts(df, filename, storage, rollups))
+    elif data_type == 'social_media':
+        charts.extend(create_social_media_charts(df, filename, storage))
+    else:
+        charts.extend(create_general_charts(df, filename, storage))
+
+    return charts
+
+
+def create_sales_charts(df, filename, storage, rollups=None):
+    """Create sales-specific charts"""
+    charts = []
+
+    # Sales by product chart
+    product_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['product', 'item', 'category'])]
+    sales_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['sales', 'revenue', 'total', 'amount'])]
+
+    if product_cols and sales_cols:
+        plt.figure(figsize=(14, 8))
+        sales_by_product = df.groupby(product_cols[0])[sales_cols[0]].sum().sort_values(ascending=False).head(10)
+
+        colors = plt.cm.Set3(np.linspace(0, 1, len(sales_by_product)))
+        bars = plt.bar(range(len(sales_by_product)), sales_by_product.values, color=colors)
+
+        # Add value labels on bars
+        for bar, value in zip(bars, sales_by_product.values):
+            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(sales_by_product.values)*0.01,
+                    f'${value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+        plt.title(f'Top 10 Products by Sales Revenue', fontsize=16, fontweight='bold', pad=20)
+        plt.xlabel('Products', fontsize=12)
+        plt.ylabel('Sales Revenue ($)', fontsize=12)
+        plt.xticks(range(len(sales_by_product)), sales_by_product.index, rotation=45, ha='right')
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_sales_by_product.png")
+        charts.append({
+            'type': 'bar_chart',
+            'title': 'Sales Performance by Product',
+            'url': chart_url,
+            'description': f'Top performing product: {sales_by_product.index} with ${sales_by_product.iloc[0]:,.0f} in sales'
+        })
+        plt.close()
+
+    # Sales trend over time if date column exists
+    rollups = rollups if rollups is not None else TimeRollups.from_frame(df)
+    trend_cols = [col for col in sales_cols if rollups is not None and rollups.has(col)]
+    if trend_cols:
+        plt.figure(figsize=(14, 8))
+        daily = rollups.get('D')
+        days = pd.to_datetime(daily.labels())
+
+        for col in trend_cols:
+            plt.plot(days, daily.values(col), marker='o', linewidth=3, markersize=6, color='#2E86AB')
+        plt.title(f'Daily Sales Trend', fontsize=16, fontweight='bold', pad=20)
+        plt.xlabel('Date', fontsize=12)
+        plt.ylabel('Sales ($)', fontsize=12)
+        plt.xticks(rotation=45)
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_sales_trend.png")
+        charts.append({
+            'type': 'line_chart',
+            'title': 'Sales Trend Over Time',
+            'url': chart_url,
+            'description': f'Sales trend showing daily performance from {days[0].date()} to {days[-1].date()}'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_financial_charts(df, filename, storage, rollups=None):
+    """Create financial-specific charts"""
+    charts = []
+    rollups = rollups if rollups is not None else TimeRollups.from_frame(df)
+    daily = rollups.get('D') if rollups is not None else None
+
+    # Revenue vs Profit chart
+    revenue_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['revenue', 'sales'])]
+    profit_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['profit', 'net'])]
+
+    if revenue_cols and profit_cols:
+        plt.figure(figsize=(14, 8))
+
+        # Create dual axis chart
+        fig, ax1 = plt.subplots(figsize=(14, 8))
+
+        # Daily totals when there is a date column, otherwise the rows in file order
+        if daily is not None and daily.has(revenue_cols[0]) and daily.has(profit_cols[0]):
+            dates = daily.labels()
+            revenue, profit = daily.values(revenue_cols[0]), daily.values(profit_cols[0])
+        else:
+            dates = range(len(df))
+            revenue, profit = df[revenue_cols[0]], df[profit_cols[0]]
+
+        color1 = 'tab:blue'
+        ax1.set_xlabel('Period')
+        ax1.set_ylabel('Revenue ($)', color=color1)
+        line1 = ax1.plot(dates, revenue, color=color1, linewidth=3, marker='o', markersize=6, label='Revenue')
+        ax1.tick_params(axis='y', labelcolor=color1)
+
+        ax2 = ax1.twinx()
+        color2 = 'tab:red'
+        ax2.set_ylabel('Profit ($)', color=color2)
+        line2 = ax2.plot(dates, profit, color=color2, linewidth=3, marker='s', markersize=6, label='Profit')
+        ax2.tick_params(axis='y', labelcolor=color2)
+
+        plt.title('Revenue vs Profit Analysis', fontsize=16, fontweight='bold', pad=20)
+        plt.xticks(rotation=45)
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_revenue_profit.png")
+        charts.append({
+            'type': 'line_chart',
+            'title': 'Revenue vs Profit Comparison',
+            'url': chart_url,
+            'description': f'Financial performance showing revenue and profit correlation over time'
+        })
+        plt.close()
+
+    # Profit margin chart
+    if 'Profit_Margin' in df.columns:
+        plt.figure(figsize=(12, 8))
+
+        # Average margin per day when there is a date column, otherwise the rows in file order
+        if daily is not None and daily.has('Profit_Margin'):
+            dates, margin = daily.labels(), daily.values('Profit_Margin', how='mean')
+        else:
+            dates, margin = range(len(df)), df['Profit_Margin']
+
+        plt.plot(dates, margin * 100, marker='o', linewidth=3, markersize=6, color='green')
+        plt.axhline(y=df['Profit_Margin'].mean() * 100, color='red', linestyle='--', alpha=0.7, label=f'Average: {df["Profit_Margin"].mean()*100:.1f}%')
+
+        plt.title('Profit Margin Trend', fontsize=16, fontweight='bold', pad=20)
+        plt.xlabel('Period', fontsize=12)
+        plt.ylabel('Profit Margin (%)', fontsize=12)
+        plt.xticks(rotation=45)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_profit_margin.png")
+        charts.append({
+            'type': 'line_chart',
+            'title': 'Profit Margin Analysis',
+            'url': chart_url,
+            'description': f'Profit margin trend with average of {df["Profit_Margin"].mean()*100:.1f}%'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_social_media_charts(df, filename, storage):
+    """Create social media-specific charts"""
+    charts = []
+
+    # Platform performance chart
+    if 'Platform' in df.columns:
+        engagement_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['likes', 'views', 'shares', 'comments'])]
+
+        if engagement_cols:
+            plt.figure(figsize=(12, 8))
+            platform_performance = df.groupby('Platform')[engagement_cols[0]].mean().sort_values(ascending=False)
+
+            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+            bars = plt.bar(platform_performance.index, platform_performance.values, color=colors[:len(platform_performance)])
+
+            # Add value labels
+            for bar, value in zip(bars, platform_performance.values):
+                plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(platform_performance.values)*0.01,
+                        f'{value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+            plt.title(f'Average {engagement_cols[0]} by Platform', fontsize=16, fontweight='bold', pad=20)
+            plt.xlabel('Platform', fontsize=12)
+            plt.ylabel(f'Average {engagement_cols}', fontsize=12)
+            plt.xticks(rotation=45)
+            plt.grid(True, alpha=0.3)
+            plt.tight_layout()
+
+            chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_platform_performance.png")
+            charts.append({
+                'type': 'bar_chart',
+                'title': f'Platform Performance - {engagement_cols[0]}',
+                'url': chart_url,
+                'description': f'Best performing platform: {platform_performance.index[0]} with avg {platform_performance.iloc[0]:,.0f} {", ".join(engagement_cols).lower()}'
+            })
+            plt.close()
+
+    # Content type performance
+    if 'Content_Type' in df.columns:
+        plt.figure(figsize=(10, 10))
+        content_performance = df['Content_Type'].value_counts()
+
+        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F']
+        wedges, texts, autotexts = plt.pie(content_performance.values, labels=content_performance.index,
+                                          autopct='%1.1f%%', colors=colors, startangle=90,
+                                          textprops={'fontsize': 11})
+
+        plt.title('Content Type Distribution', fontsize=16, fontweight='bold', pad=20)
+
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_content_distribution.png")
+        charts.append({
+            'type': 'pie_chart',
+            'title': 'Content Type Distribution',
+            'url': chart_url,
+            'description': f'Most common content type: {content_performance.index[0]} ({content_performance.iloc[0]:,.0f} posts)'
+        })
+        plt.close()
+
+    # Engagement correlation heatmap
+    engagement_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['likes', 'views', 'shares', 'comments'])]
+    if len(engagement_cols) >= 2:
+        plt.figure(figsize=(10, 8))
+        correlation_matrix = df[engagement_cols].corr()
+
+        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+                   square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
+        plt.title('Engagement Metrics Correlation', fontsize=16, fontweight='bold', pad=20)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_engagement_correlation.png")
+        charts.append({
+            'type': 'heatmap',
+            'title': 'Engagement Metrics Correlation',
+            'url': chart_url,
+            'description': 'Correlation analysis between different engagement metrics'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_general_charts(df, filename, storage):
+    """Create general charts for unspecified data types"""
+    charts = []
+
+    # Generic correlation heatmap for numeric columns
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) >= 2:
+        plt.figure(figsize=(12, 8))
+        correlation_matrix = df[numeric_cols].corr()
+
+        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+                   square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
+        plt.title('Correlation Matrix', fontsize=16, fontweight='bold', pad=20)
+        plt.tight_layout()
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_correlation_matrix.png")
+        charts.append({
+            'type': 'heatmap',
+            'title': 'Data Correlation Analysis',
+            'url': chart_url,
+            'description': 'Correlation analysis between numeric variables'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_intelligent_visualizations(df, filename, business_context, storage, rollups=None):
+    """AI-powered chart selection based on data content analysis"""
+
+    charts_created = []
+    sns.set_style("whitegrid")
+
+    # AI-POWERED DATA TYPE DETECTION
+    column_analysis = analyze_column_types(df)
+
+    # RULE 1: LINE GRAPH for Date + Money Analysis
+    date_cols = column_analysis['date_columns']
+    money_cols = column_analysis['money_columns']
+
+    if date_cols and money_cols:
+        charts_created.extend(create_time_money_line_graphs(df, date_cols, money_cols, storage, rollups))
+
+    # RULE 2: BAR CHART for Category Performance
+    category_cols = column_analysis['category_columns']
+    if category_cols and money_cols:
+        charts_created.extend(create_category_bar_charts(df, category_cols, money_cols, storage))
+
+    # RULE 3: PIE CHART for Category Distribution
+    if category_cols:
+        charts_created.extend(create_category_pie_charts(df, category_cols, storage))
+
+    return charts_created
+
+
+def create_time_money_line_graphs(df, date_cols, money_cols, storage, rollups=None):
+    """Create line graphs for date vs money analysis showing full data range"""
+    charts = []
+
+    for date_col in date_cols[:1]:  # Use first date column
+        date_rollups = rollups_for(df, date_col, rollups)
+        for money_col in money_cols[:1]:  # Use first money column
+            if date_rollups is None or not date_rollups.has(money_col):
+                continue
+
+            # Aggregate by day/week/month based on data span
+            freq = date_rollups.auto_freq()
+            period_label = PERIOD_LABELS[freq]
+
+            # Money per period WITHOUT filtering out any periods
+            periods, totals = date_rollups.get(freq).series(money_col)
+
+            # *** IMPORTANT: Ensure NO slicing or filtering here ***
+            # For example, DO NOT do something like: totals = totals[-3:]
+
+            # Create line graph using full aggregated data
+            plt.figure(figsize=(14, 8))
+            plt.plot(range(len(totals)), totals,
+                    marker='o', linewidth=3, markersize=8, color='#2E86AB')
+
+            # Add trend line
+            z = np.polyfit(range(len(totals)), totals, 1)
+            p = np.poly1d(z)
+            trend_direction = "Growing" if z[0] > 0 else "Declining" if z[0] < 0 else "Stable"
+            plt.plot(range(len(totals)), p(range(len(totals))),
+                    "--", alpha=0.8, linewidth=2, color='red')
+
+            plt.title(f'Revenue Trend: {money_col} by {period_label}',
+                    fontsize=16, fontweight='bold', pad=20)
+            plt.xlabel(f'Time Period ({period_label})', fontsize=12)
+            plt.ylabel(f'{money_col} ($)', fontsize=12)
+            plt.xticks(range(len(totals)), [label[:10] for label in periods], rotation=45)
+            plt.grid(True, alpha=0.3)
+            plt.tight_layout()
+
+            chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_revenue_trend.png")
+
+            charts.append({
+                'type': 'line_graph',
+                'title': f'Revenue Performance: {trend_direction} Trend by {period_label}',
+                'url': chart_url,
+                'description': f'Shows {trend_direction.lower()} revenue trend over time. Total revenue: ${totals.sum():,.2f} across {len(totals)} {period_label.lower()}s.'
+            })
+            plt.close()
+
+    return charts
+
+
+def create_category_bar_charts(df, category_cols, money_cols, storage):
+    """Create bar charts for category performance"""
+    charts = []
+
+    for cat_col in category_cols[:1]:  # Use first category column
+        for money_col in money_cols[:1]:  # Use first money column
+
+            # Aggregate revenue by category
+            category_revenue = df.groupby(cat_col)[money_col].sum().sort_values(ascending=False).head(10)
+
+            plt.figure(figsize=(12, 8))
+            colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
+                    '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+            bars = plt.bar(range(len(category_revenue)), category_revenue.values,
+                        color=colors[:len(category_revenue)], alpha=0.8)
+
+            # Add value labels on bars
+            for bar, value in zip(bars, category_revenue.values):
+                plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(category_revenue.values)*0.01,
+                        f'${value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+            plt.title(f'Revenue by {cat_col}', fontsize=16, fontweight='bold', pad=20)
+            plt.xlabel(f'{cat_col} Categories', fontsize=12)
+            plt.ylabel(f'Total Revenue ($)', fontsize=12)
+            plt.xticks(range(len(category_revenue)), category_revenue.index, rotation=45, ha='right')
+            plt.tight_layout()
+
+            chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_category_revenue.png")
+
+            # Business insights
+            top_performer = category_revenue.index[0]
+            top_value = category_revenue.iloc[0]
+            total_value = category_revenue.sum()
+            top_percentage = (top_value / total_value) * 100
+
+            charts.append({
+                'type': 'bar_chart',
+                'title': f'Revenue Leaders: Top Performing {cat_col}',
+                'url': chart_url,
+                'description': f'{top_performer} leads with ${top_value:,.0f} ({top_percentage:.1f}% of total). Shows clear revenue concentration and market opportunities.'
+            })
+            plt.close()
+
+    return charts
+
+
+def create_category_pie_charts(df, category_cols, storage):
+    """Create pie charts for category distribution"""
+    charts = []
+
+    for cat_col in category_cols[:1]:  # Use first category column
+
+        # Get category distribution
+        category_counts = df[cat_col].value_counts().head(8)
+
+        plt.figure(figsize=(10, 10))
+        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F']
+
+        wedges, texts, autotexts = plt.pie(category_counts.values, labels=category_counts.index, 
+                                        autopct='%1.1f%%', colors=colors, startangle=90,
+                                        textprops={'fontsize': 11})
+
+        plt.title(f'Market Share: {cat_col} Distribution', fontsize=16, fontweight='bold', pad=20)
+
+        # Enhance appearance
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+        chart_url = save_chart(storage, plt, f"visualizations/{uuid.uuid4()}_market_share.png")
+
+        # Business insights
+        largest_segment = category_counts.index[0]
+        largest_percentage = (category_counts.iloc[0] / category_counts.sum()) * 100
+
+        charts.append({
+            'type': 'pie_chart',
+            'title': f'Market Distribution: {cat_col} Share Analysis',
+            'url': chart_url,
+            'description': f'{largest_segment} dominates with {largest_percentage:.1f}% market share. Critical for understanding customer preferences and strategic positioning.'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_correlation_heatmap(df, numeric_cols, storage):
+    """Create correlation heatmap visualization"""
+
+    plt.figure(figsize=(12, 8))
+    correlation_matrix = df[numeric_cols].corr()
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
+    plt.title('Correlation Matrix')
+
+    chart_path = f"visualizations/{uuid.uuid4()}_correlation_heatmap.png"
+    chart_url = save_chart(storage, plt, chart_path)
+    plt.close()
+
+    return {
+        'type': 'heatmap',
+        'title': 'Correlation Matrix',
+        'url': chart_url,
+        'description': 'Shows correlations between numeric variables'
+    }
+
+
+def create_distribution_analysis(df, numeric_cols, storage):
+    """Create distribution analysis for key metrics"""
+
+    charts = []
+    for col in numeric_cols:
+        plt.figure(figsize=(10, 6))
+        plt.hist(df[col].dropna(), bins=30, alpha=0.7, color='skyblue')
+        plt.title(f'Distribution of {col}')
+        plt.xlabel(col)
+        plt.ylabel('Frequency')
+
+        chart_path = f"visualizations/{uuid.uuid4()}_{col}_distribution.png"
+        chart_url = save_chart(storage, plt, chart_path)
+        charts.append({
+            'type': 'histogram',
+            'title': f'Distribution of {col}',
+            'url': chart_url,
+            'description': f'Shows the frequency distribution of {col} values'
+        })
+        plt.close()
+
+    return charts
+
+
+def create_time_series_analysis(df, storage):
+    """Create time series analysis if time data exists"""
+
+    charts = []
+    date_cols = []
+
+    # Find date columns
+    for col in df.columns:
+        if 'date' in col.lower() or 'time' in col.lower():
+            try:
+                pd.to_datetime(df[col])
+                date_cols.append(col)
+            except:
+                pass
+
+    if date_cols:
+        date_col = date_cols[0]
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+
+        if len(numeric_cols) > 0:
+            df_sorted = df.sort_values(date_col)
+
+            plt.figure(figsize=(12, 6))
+            plt.plot(pd.to_datetime(df_sorted[date_col]), df_sorted[numeric_cols[0]], 
+                    marker='o', linewidth=2, markersize=4)
+            plt.title(f'{numeric_cols[0]} Over Time')
+            plt.xlabel('Date')
+            plt.ylabel(numeric_cols[0])
+            plt.xticks(rotation=45)
+            plt.grid(True, alpha=0.3)
+            plt.tight_layout()
+
+            chart_path = f"visualizations/{uuid.uuid4()}_time_series.png"
+            chart_url = save_chart(storage, plt, chart_path)
+            charts.append({
+                'type': 'time_series',
+                'title': f'{numeric_cols[0]} Time Series',
+                'url': chart_url,
+                'description': f'Shows how {numeric_cols[0]} changes over time'
+            })
+            plt.close()
+
+    return charts
@@ -0,0 +1,208 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from ..utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def read_table(file_content, filename):
+    """Load an uploaded CSV/Excel file into a DataFrame"""
+    if filename.endswith('.csv'):
+        return pd.read_csv(BytesIO(file_content))
+    elif filename.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(BytesIO(file_content))
+    else:
+        raise ValueError("Unsupported file format. Only CSV and Excel files are supported.")
+
+
+def clean_and_preprocess_data(df, llm=None, reference=None):
+    """
+    Step 1: Clean and preprocess data using Gemini AI guidance
+
+    `reference` ({'fill': {col: value}, 'bounds': {col: (low, high)}}) supplies the fill
+    values and outlier bounds instead of computing them from `df`, so rows appended to a
+    dataset are cleaned like the rows before them (see incremental.py).
+    """
+    fill_values = reference['fill'] if reference else {}
+    outlier_bounds = reference['bounds'] if reference else {}
+
+    # Initialize cleaning log
+    cleaning_log = {
+        'original_shape': df.shape,
+        'issues_found': [],
+        'actions_taken': [],
+        'final_shape': None,
+        'columns_processed': [],
+        'summary': {}
+    }
+
+    # Get AI guidance for cleaning
+    cleaning_instructions = get_gemini_cleaning_guidance(df, llm) if llm is not None else None
+
+    # Apply cleaning steps
+    df_cleaned = df.copy()
+
+    log.debug("cleaning started", shape=df.shape)
+
+    # 1. Handle missing values
+    missing_info = df.isnull().sum()
+    for col in df.columns:
+        if missing_info[col] > 0:
+            cleaning_log['issues_found'].append(f"Column '{col}': {missing_info[col]} missing values")
+
+            if df[col].dtype in ['int64', 'float64']:
+                # Replace with mean for numeric columns
+                mean_val = fill_values.get(col, df[col].mean())
+                df_cleaned[col] = df_cleaned[col].fillna(mean_val)
+                cleaning_log['actions_taken'].append(f"Column '{col}': Filled {missing_info[col]} missing values with mean ({mean_val:.2f})")
+            else:
+                # Replace with mode for categorical columns
+                if col in fill_values:
+                    mode_val = fill_values[col]
+                else:
+                    mode_val = df[col].mode().iloc[0] if not df[col].mode().empty else 'Unknown'
+                df_cleaned[col] = df_cleaned[col].fillna(mode_val)
+                cleaning_log['actions_taken'].append(f"Column '{col}': Filled {missing_info[col]} missing values with mode ('{mode_val}')")
+
+    # 2. Handle data type issues
+    for col in df_cleaned.columns:
+        original_dtype = str(df_cleaned[col].dtype)
+
+        # Check for date columns with wrong data types
+        if 'date' in col.lower() or 'time' in col.lower():
+            try:
+                df_cleaned[col] = pd.to_datetime(df_cleaned[col], errors='coerce')
+                invalid_dates = df_cleaned[col].isnull().sum() - missing_info[col]
+                if invalid_dates > 0:
+                    cleaning_log['issues_found'].append(f"Column '{col}': {invalid_dates} invalid date values")
+                    cleaning_log['actions_taken'].append(f"Column '{col}': Converted to datetime, {invalid_dates} invalid entries set to NaT")
+            except:
+                pass
+
+        # Check for numeric columns with string values
+        elif col.lower() in ['price', 'cost', 'amount', 'value', 'quantity', 'qty']:
+            try:
+                # Remove currency symbols and convert to numeric
+                df_cleaned[col] = pd.to_numeric(df_cleaned[col].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce')
+                invalid_numeric = df_cleaned[col].isnull().sum() - missing_info[col]
+                if invalid_numeric > 0:
+                    cleaning_log['issues_found'].append(f"Column '{col}': {invalid_numeric} non-numeric values in numeric column")
+                    # Fill with mean
+                    mean_val = fill_values.get(col, df_cleaned[col].mean())
+                    df_cleaned[col] = df_cleaned[col].fillna(mean_val)
+                    cleaning_log['actions_taken'].append(f"Column '{col}': Converted to numeric, replaced {invalid_numeric} invalid values with mean ({mean_val:.2f})")
+            except:
+                pass
+
+    # 3. Remove duplicate rows
+    duplicate_count = df_cleaned.duplicated().sum()
+    if duplicate_count > 0:
+        df_cleaned.drop_duplicates(inplace=True)
+        cleaning_log['issues_found'].append(f"Found {duplicate_count} duplicate rows")
+        cleaning_log['actions_taken'].append(f"Removed {duplicate_count} duplicate rows")
+
+    # 4. Handle outliers in numeric columns
+    numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
+    for col in numeric_cols:
+        if col in outlier_bounds:
+            lower_bound, upper_bound = outlier_bounds[col]
+        else:
+            Q1 = df_cleaned[col].quantile(0.25)
+            Q3 = df_cleaned[col].quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+
+        outliers = ((df_cleaned[col] < lower_bound) | (df_cleaned[col] > upper_bound)).sum()
+        if outliers > 0:
+            cleaning_log['issues_found'].append(f"Column '{col}': {outliers} outlier values detected")
+            # Cap outliers instead of removing
+            df_cleaned[col] = df_cleaned[col].clip(lower=lower_bound, upper=upper_bound)
+            cleaning_log['actions_taken'].append(f"Column '{col}': Capped {outliers} outliers to acceptable range [{lower_bound:.2f}, {upper_bound:.2f}]")
+
+    log.debug("cleaning finished", shape_before=df.shape, shape_after=df_cleaned.shape,
+              issues=len(cleaning_log['issues_found']))
+
+    # Update final statistics
+    cleaning_log['final_shape'] = df_cleaned.shape
+    cleaning_log['columns_processed'] = list(df_cleaned.columns)
+    cleaning_log['summary'] = {
+        'rows_removed': len(df) - len(df_cleaned),  # Alternative syntax
+        'columns_cleaned': len([col for col in df.columns if col in cleaning_log['columns_processed']]),
+        'total_issues_found': len(cleaning_log['issues_found']),
+        'total_actions_taken': len(cleaning_log['actions_taken'])
+    }
+
+    return df_cleaned, cleaning_log
+
+
+def get_gemini_cleaning_guidance(df, llm):
+    """Get AI guidance for data cleaning approach"""
+
+    # Prepare data summary for AI analysis
+    data_summary = {
+        'shape': df.shape,
+        'columns': df.columns.tolist(),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.to_dict().items()},
+        'missing_values': df.isnull().sum().to_dict(),
+        'sample_data': df.head(3).to_dict()
+    }
+
+    prompt = f"""
+    Analyze this dataset and provide data cleaning recommendations:
+
+    Dataset Info: {data_summary}
+
+    Please suggest:
+    1. How to handle missing values for each column
+    2. Potential data type corrections needed
+    3. Columns that might have logic issues
+    4. Outlier detection strategies
+
+    Respond with specific, actionable cleaning steps.
+    """
+
+    try:
+        return llm.generate(prompt)
+    except:
+        return "Basic cleaning approach: handle missing values, check data types, remove duplicates"
+
+
+def clean_feedback_data(df):
+    """Clean and preprocess feedback data"""
+    cleaning_log = {
+        'original_shape': df.shape,
+        'issues_found': [],
+        'actions_taken': [],
+        'final_shape': None
+    }
+
+    df_cleaned = df.copy()
+
+    # Handle missing values in text columns
+    text_columns = df_cleaned.select_dtypes(include=['object']).columns
+    for col in text_columns:
+        missing_count = df_cleaned[col].isnull().sum()
+        if missing_count > 0:
+            df_cleaned[col] = df_cleaned[col].fillna('No feedback provided')
+            cleaning_log['actions_taken'].append(
+                f"Column '{col}': Filled {missing_count} missing values with 'No feedback provided'"
+            )
+
+    # Clean text data
+    for col in text_columns:
+        df_cleaned[col] = df_cleaned[col].astype(str).str.strip()
+
+        # Remove empty feedback entries
+        empty_feedback = df_cleaned[col].str.len() == 0
+        if empty_feedback.sum() > 0:
+            df_cleaned.loc[empty_feedback, col] = 'No substantive feedback'
+            cleaning_log['actions_taken'].append(
+                f"Column '{col}': Replaced {empty_feedback.sum()} empty entries"
+            )
+
+    cleaning_log['final_shape'] = df_cleaned.shape
+    return df_cleaned, cleaning_log
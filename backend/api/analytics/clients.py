@@ -0,0 +1,75 @@
+import os
+
+import requests
+
+from ..utils import metrics
+from .tracing import span
+
+
+class GeminiClient:
+    """
+    Thin wrapper around google.generativeai.
+
+    One instance is meant to be shared by every stage of a run (and by every file in a
+    batch), so the model object is created once instead of per prompt.
+    """
+
+    def __init__(self, api_key=None, model_name='gemini-1.5-flash'):
+        self.api_key = api_key if api_key is not None else os.getenv('GEMINI_API_KEY')
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            if not self.api_key:
+                raise Exception("GEMINI_API_KEY not found in environment variables")
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt):
+        """Response text for `prompt`; errors propagate so callers can apply their own fallback"""
+        with span('gemini.generate', model=self.model_name) as s, metrics.track_gemini_call():
+            text = self.model.generate_content(prompt).text
+            s.bytes = len(prompt) + len(text or '')
+        return text
+
+
+class SupabaseStorage:
+    """Uploads to and downloads from a Supabase storage bucket with one shared client"""
+
+    def __init__(self, url=None, key=None, bucket="business_files"):
+        self.url = url if url is not None else os.getenv('SUPABASE_URL')
+        self.key = key if key is not None else os.getenv('SUPABASE_KEY')
+        self.bucket = bucket
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from supabase import create_client
+            self._client = create_client(self.url, self.key)
+        return self._client
+
+    def upload(self, path, content, content_type):
+        """Upload bytes to `path` and return the public URL"""
+        with span('supabase.upload', content_type=content_type) as s, metrics.STORAGE_LATENCY.time('upload'):
+            bucket = self.client.storage.from_(self.bucket)
+            bucket.upload(path=path, file=content, file_options={"content-type": content_type})
+            s.bytes = len(content)
+            metrics.STORAGE_BYTES.labels('upload').inc(len(content))
+            return bucket.get_public_url(path)
+
+    def download(self, file_url, timeout=30):
+        """Download file content from a (public) Supabase Storage URL"""
+        try:
+            with span('supabase.download') as s, metrics.STORAGE_LATENCY.time('download'):
+                response = requests.get(file_url, timeout=timeout)
+                response.raise_for_status()
+                s.bytes = len(response.content)
+                metrics.STORAGE_BYTES.labels('download').inc(len(response.content))
+            return response.content
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to download file from Supabase: {str(e)}")
@@ -0,0 +1,193 @@
+"""
+Collapse duplicate and near-duplicate feedback before it is scored or sent to Gemini.
+
+Survey exports repeat themselves: "Good service", "good service!!" and "Good service."
+are one opinion written three times. Texts are normalised (case, punctuation, spacing)
+and grouped by hash; the remaining distinct texts are grouped again when their
+character-shingle MinHash signatures collide in an LSH band and agree on at least
+NEAR_SIMILARITY of the hashes. Each group keeps its row count as a weight, so
+statistics computed per group and weighted stay exact per row:
+
+    groups = collapse_feedback(feedback_texts(df, columns))
+    groups.texts           # one representative text per group
+    groups.weights         # rows per group
+    groups.expand(values)  # per-group values back to one per row
+
+Near duplicates are only merged when they use the same sentiment words in the same
+order, so "good" and "not good" (or "great" and "cold") never end up in one group,
+and every member of a group is similar to its representative, not just to a chain of
+other members.
+"""
+import numpy as np
+import pandas as pd
+
+from ..utils.log import get_logger
+from .sentiment import BOOSTERS, LEXICON, NEGATORS, TOKEN_PATTERN
+
+log = get_logger(__name__)
+
+# MinHash signature length = LSH_BANDS * LSH_ROWS; candidates share all rows of a band
+LSH_BANDS = 16
+LSH_ROWS = 4
+SHINGLE_CHARS = 3
+# Share of equal MinHash values (an estimate of shingle Jaccard similarity) to merge
+NEAR_SIMILARITY = 0.8
+
+_OPINION_WORDS = frozenset(LEXICON) | NEGATORS | frozenset(BOOSTERS)
+
+
+def normalise(texts):
+    """Lower-case, punctuation (and apostrophes) dropped, whitespace collapsed"""
+    return (texts.astype(str).str.lower()
+            .str.replace("'", '', regex=False)
+            .str.replace(r'[^\w]+', ' ', regex=True)
+            .str.strip())
+
+
+class FeedbackGroups:
+    """Group `codes` per row (-1: no text), a representative text and row weight per group"""
+
+    def __init__(self, index, codes, texts, weights, stats):
+        self.index = index
+        self.codes = codes
+        self.texts = texts
+        self.weights = weights
+        self.stats = stats
+
+    def __len__(self):
+        return len(self.texts)
+
+    def expand(self, values):
+        """Per-group values as a Series aligned with the original rows (NaN where no text)"""
+        values = np.asarray(values, dtype=object)
+        expanded = np.full(len(self.codes), np.nan, dtype=object)
+        present = self.codes >= 0
+        expanded[present] = values[self.codes[present]]
+        return pd.Series(expanded, index=self.index)
+
+
+def minhash_signatures(texts, seed=0):
+    """
+    (signatures, has_shingles): (len(texts), LSH_BANDS * LSH_ROWS) uint64 MinHash of each
+    text's character shingles, and whether it has any (shorter texts only group exactly)
+    """
+    # All texts in one code-point array, NUL-separated (normalise() leaves no NULs); a
+    # shingle is SHINGLE_CHARS code points packed into one integer, within one text
+    chars = np.frombuffer('\x00'.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    separator = chars == 0
+    owners = np.cumsum(separator)
+    width = len(chars) - SHINGLE_CHARS + 1
+    shingles = np.zeros(max(width, 0), dtype=np.uint64)
+    for k in range(SHINGLE_CHARS):
+        shingles = (shingles << np.uint64(21)) | chars[k:k + width]
+    valid = (owners[:width] == owners[SHINGLE_CHARS - 1:]) & ~separator[:width]
+    shingles, owners = shingles[valid], owners[:width][valid]
+
+    has_shingles = np.zeros(len(texts), dtype=bool)
+    has_shingles[owners] = True
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]]) if len(owners) else np.array([], dtype=np.int64)
+
+    # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits
+    rng = np.random.default_rng(seed)
+    permutations = LSH_BANDS * LSH_ROWS
+    a = rng.integers(1, 2 ** 63, permutations, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)
+    signatures = np.full((len(texts), permutations), np.iinfo(np.uint64).max, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for i in range(permutations):
+            permuted = (a[i] * shingles + b[i]) >> np.uint64(32)
+            signatures[has_shingles, i] = np.minimum.reduceat(permuted, starts) if len(starts) else []
+    return signatures, has_shingles
+
+
+def opinion_keys(texts):
+    """uint64 hash per text of its sentiment, negation and booster words, in order"""
+    tokens = texts.str.findall(TOKEN_PATTERN).explode().dropna()
+    words = tokens[tokens.isin(_OPINION_WORDS)]
+    keys = np.zeros(len(texts), dtype=np.uint64)
+    if len(words):
+        # Position-weighted sum of word hashes, so the order of the words matters too
+        positions = words.groupby(level=0).cumcount().to_numpy()
+        weights = np.random.default_rng(2).integers(1, 2 ** 63, positions.max() + 1, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            np.add.at(keys, words.index.to_numpy(), pd.util.hash_array(words.to_numpy(dtype=object)) * weights[positions])
+    return keys
+
+
+def near_duplicate_labels(texts, opinions):
+    """
+    Group label per text (the index of its representative). LSH candidates that share
+    `opinions` keys and are similar enough join the earliest candidate that is not itself
+    joined to another, so groups never grow by chaining.
+    """
+    signatures, has_shingles = minhash_signatures(texts)
+    rows = np.arange(len(texts))
+    rng = np.random.default_rng(1)
+    left, right = [], []
+    for band in range(LSH_BANDS):
+        block = signatures[:, band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        # Mix the band into one bucket key (overflow wraps, which is fine for hashing)
+        with np.errstate(over='ignore'):
+            keys = block @ rng.integers(1, 2 ** 63, LSH_ROWS, dtype=np.uint64)
+        keys = (keys ^ opinions)[has_shingles]
+        members = rows[has_shingles]
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        # Link every bucket member to the bucket's first member (a star, not all pairs)
+        leaders = members[first[inverse]]
+        candidate = leaders != members
+        left.append(members[candidate])
+        right.append(leaders[candidate])
+    left = np.concatenate(left) if left else np.array([], dtype=np.int64)
+    right = np.concatenate(right) if right else np.array([], dtype=np.int64)
+    if len(left):
+        pairs = np.unique(np.stack([left, right], axis=1), axis=0)
+        left, right = pairs[:, 0], pairs[:, 1]
+        similar = (signatures[left] == signatures[right]).mean(axis=1) >= NEAR_SIMILARITY
+        left, right = left[similar], right[similar]
+
+    # Texts that never need to join another one represent their group; everybody else
+    # joins the earliest representative they are similar to, or represents themselves
+    labels = rows.copy()
+    joins = ~np.isin(right, left)
+    if joins.any():
+        earliest = np.full(len(texts), len(texts), dtype=np.int64)
+        np.minimum.at(earliest, left[joins], right[joins])
+        labels = np.where(earliest < len(texts), earliest, rows)
+    return labels
+
+
+def collapse_feedback(texts, near=True):
+    """FeedbackGroups of a text Series: exact duplicates after normalise(), then near duplicates"""
+    present = texts.notna().to_numpy()
+    originals = texts[present].astype(str)
+    normalised = normalise(originals)
+
+    exact_codes, exact_keys = pd.factorize(pd.util.hash_array(normalised.to_numpy(dtype=object)))
+    exact_rows = np.bincount(exact_codes, minlength=len(exact_keys))
+    # First row of each exact group stands for it
+    first_row = np.full(len(exact_keys), len(exact_codes), dtype=np.int64)
+    np.minimum.at(first_row, exact_codes, np.arange(len(exact_codes)))
+
+    if near and len(exact_keys) > 1:
+        distinct = normalised.iloc[first_row].reset_index(drop=True)
+        group_of_exact, _ = pd.factorize(near_duplicate_labels(distinct, opinion_keys(distinct)))
+    else:
+        group_of_exact = np.arange(len(exact_keys))
+
+    groups = int(group_of_exact.max()) + 1 if len(group_of_exact) else 0
+    weights = np.bincount(group_of_exact, weights=exact_rows, minlength=groups).astype(np.int64)
+    # Representative: the most frequent exact spelling in each group
+    order = np.lexsort((-exact_rows, group_of_exact))
+    best_exact = order[np.r_[True, group_of_exact[order][1:] != group_of_exact[order][:-1]]] if groups else order
+    representatives = pd.Series(originals.iloc[first_row[best_exact]].to_numpy(), dtype=object)
+
+    codes = np.full(len(texts), -1, dtype=np.int64)
+    codes[present] = group_of_exact[exact_codes]
+    stats = {
+        'rows_with_text': int(present.sum()),
+        'exact_groups': int(len(exact_keys)),
+        'groups': groups,
+        'reduction': round(float(1 - groups / present.sum()), 4) if present.any() else 0.0,
+    }
+    log.info("feedback collapsed", **stats)
+    return FeedbackGroups(texts.index, codes, representatives, weights, stats)
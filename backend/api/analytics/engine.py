@@ -0,0 +1,236 @@
+from ..utils.log import get_logger, lazy
+from .analysis import analyze_by_type
+from .charts import create_intelligent_visualizations, create_specialized_visualizations
+from .cleaning import clean_and_preprocess_data, clean_feedback_data, read_table
+from .dedup import collapse_feedback
+from .clients import GeminiClient, SupabaseStorage
+from .feedback import (
+    analyze_columns_with_gemini, comprehensive_feedback_analysis, create_ai_driven_visualizations,
+    feedback_columns_of, generate_executive_summary,
+)
+from .incremental import DatasetState, analyze_state, clean_appended, fingerprint_table, prefix_digest
+from .insights import get_enhanced_gemini_insights, get_specialized_gemini_insights
+from .profiling import data_overview, detect_business_context, detect_data_type, statistical_summary
+from .reporting import (
+    generate_cleaning_report, generate_feedback_report, generate_specialized_pdf, generate_specialized_ppt,
+    upload_cleaned_excel,
+)
+from .rollups import TimeRollups
+from .sentiment import SentimentScorer, feedback_texts
+from .topics import cluster_feedback, name_topics
+from .tracing import span
+
+log = get_logger(__name__)
+
+
+class AnalysisEngine:
+    """
+    Business data pipeline behind `process-file/`: clean, profile, analyse, chart, report.
+
+    Has no Django/DRF dependencies and returns plain dicts, so it can run inside a view,
+    a worker process, a management command or a benchmark. The LLM and storage clients
+    are injected so one pair can be shared across many files (or replaced with fakes).
+    """
+
+    def __init__(self, llm=None, storage=None):
+        self.llm = llm or GeminiClient()
+        self.storage = storage or SupabaseStorage()
+
+    def run(self, file_content, filename, lineages=None):
+        """
+        Full pipeline for one uploaded file; returns the ProcessedReport fields.
+
+        Each stage is a tracing span, recorded when the caller has activated a Tracer.
+        With a `lineages` store (lineage.LineageStore) a file that extends an earlier
+        upload only has its new rows cleaned, its statistics come from the merged
+        aggregates, and result['lineage'] carries the state for `lineages.save()`.
+        """
+        # Step 1: Data Cleaning
+        state, previous = None, None
+        with span('clean'):
+            df = read_table(file_content, filename)
+            if lineages is not None:
+                fingerprint = fingerprint_table(df)
+                previous = lineages.find(fingerprint)
+            if previous is not None and previous['frame'] is not None:
+                cleaned_data, cleaning_log, state = clean_appended(df, previous)
+            else:
+                cleaned_data, cleaning_log = clean_and_preprocess_data(df, self.llm)
+                if lineages is not None:
+                    state = DatasetState.from_frame(cleaned_data)
+        appended = 'incremental' in cleaning_log
+        if appended:
+            log.info("appended rows only", filename=filename, **cleaning_log['incremental'])
+
+        log.debug("cleaned data", filename=filename, shape=cleaned_data.shape,
+                  columns=lazy(cleaned_data.columns.tolist))
+
+        # Step 2: Upload cleaned Excel
+        with span('upload'):
+            cleaned_excel_url = upload_cleaned_excel(cleaned_data, filename, self.storage)
+
+        # Step 3: Detect the data type
+        data_type = detect_data_type(cleaned_data, filename)
+        log.info("detected data type", filename=filename, data_type=data_type)
+
+        # Step 4: Generate cleaning report
+        with span('cleaning_report'):
+            cleaning_pdf_url = generate_cleaning_report(cleaning_log, filename, self.storage)
+
+        # Daily/weekly/monthly totals shared by every trend chart and growth figure
+        with span('rollups'):
+            rollups = state.rollups if state is not None else TimeRollups.from_frame(cleaned_data)
+
+        # Step 5: Data analysis based on data type
+        with span('analyze'):
+            analysis_results = self.analyze(cleaned_data, filename, data_type, state if appended else None, rollups)
+
+        # Step 6: Generate specialized reports WITH CHARTS
+        with span('pdf'):
+            pdf_url = generate_specialized_pdf(analysis_results, filename, cleaned_data, data_type, self.storage,
+                                               rollups)
+        with span('ppt'):
+            ppt_url = generate_specialized_ppt(analysis_results, filename, cleaned_data, data_type, self.storage,
+                                               rollups)
+
+        result = {
+            'processed_data': {
+                'data_type': data_type,
+                'cleaning_log': cleaning_log,
+                'analysis_results': analysis_results,
+                'cleaned_excel_url': cleaned_excel_url,
+                'cleaning_pdf_url': cleaning_pdf_url
+            },
+            'pdf_url': pdf_url,
+            'ppt_url': ppt_url,
+        }
+        if lineages is not None:
+            result['lineage'] = {
+                'id': previous['id'] if previous else None,
+                'columns_digest': fingerprint['columns'],
+                'rows': len(df),
+                'prefix_digest': prefix_digest(fingerprint['hashes']),
+                'state': state,
+                'frame': cleaned_data,
+            }
+        return result
+
+    def analyze(self, df_cleaned, filename, data_type, state=None, rollups=None):
+        """
+        Step 5: statistics, type-specific metrics, charts and AI insights
+
+        With a DatasetState the statistics, overview and metrics are read from its merged
+        aggregates rather than recomputed over every row; trend charts read `rollups`
+        (rollups.TimeRollups) when given.
+        """
+        analysis_results = {
+            'data_type': data_type,
+            'statistical_summary': state.statistical_summary() if state else statistical_summary(df_cleaned),
+            'key_insights': [],
+            'business_recommendations': [],
+            'data_overview': state.data_overview() if state else data_overview(df_cleaned),
+            'visualizations': [],
+            'specialized_metrics': {}
+        }
+
+        # Data type specific analysis
+        analysis_results.update(analyze_state(state, data_type) if state else analyze_by_type(df_cleaned, data_type))
+
+        # Create specialized visualizations
+        with span('charts'):
+            analysis_results['visualizations'] = create_specialized_visualizations(
+                df_cleaned, filename, data_type, self.storage, rollups
+            )
+
+        # Get AI insights
+        with span('insights'):
+            analysis_results.update(
+                get_specialized_gemini_insights(df_cleaned, analysis_results, data_type, self.llm)
+            )
+        return analysis_results
+
+    def analyze_and_visualize(self, df_cleaned, filename):
+        """Context-driven variant (business context instead of data type) with trend per column"""
+        rollups = TimeRollups.from_frame(df_cleaned)
+        analysis_results = {
+            'statistical_summary': statistical_summary(df_cleaned, include_trend=True, rollups=rollups),
+            'key_insights': [],
+            'business_recommendations': [],
+            'data_overview': data_overview(df_cleaned),
+            'visualizations': [],
+            'business_context': detect_business_context(df_cleaned, filename)
+        }
+
+        analysis_results['visualizations'] = create_intelligent_visualizations(
+            df_cleaned, filename, analysis_results['business_context'], self.storage, rollups
+        )
+        analysis_results.update(get_enhanced_gemini_insights(df_cleaned, analysis_results, self.llm))
+        return analysis_results
+
+
+class FeedbackEngine:
+    """Customer feedback pipeline behind `analyse-comment/`; see AnalysisEngine for the contract"""
+
+    def __init__(self, llm=None, storage=None):
+        self.llm = llm or GeminiClient()
+        self.storage = storage or SupabaseStorage()
+
+    def run(self, file_content, filename):
+        """Full pipeline for one uploaded file; returns the CommentReport content and PDF URL"""
+        # Step 1: Read and clean feedback data
+        with span('clean'):
+            cleaned_data, cleaning_log = clean_feedback_data(read_table(file_content, filename))
+
+        # Step 2: AI analysis of column meanings
+        with span('columns'):
+            column_analysis = analyze_columns_with_gemini(cleaned_data, filename, self.llm)
+        log.debug("column analysis done", filename=filename,
+                  feedback_column=column_analysis.get('primary_feedback_column'))
+
+        # Step 3: Collapse duplicate and near-duplicate comments, label every row, then
+        # comprehensive feedback analysis with Gemini
+        feedback_columns = feedback_columns_of(column_analysis)
+        sentiment, groups = None, None
+        if feedback_columns:
+            with span('dedup'):
+                texts = feedback_texts(cleaned_data, feedback_columns)
+                groups = collapse_feedback(texts)
+        topics = None
+        with span('sentiment'):
+            if groups is not None:
+                sentiment = SentimentScorer(self.llm).score(texts, groups)
+        if sentiment is not None:
+            # Step 3b: Measured positive/negative categories; Gemini only names them
+            with span('topics'):
+                topics = name_topics(cluster_feedback(sentiment), self.llm)
+        with span('insights'):
+            feedback_analysis = comprehensive_feedback_analysis(
+                cleaned_data, column_analysis, self.llm, sentiment, topics
+            )
+            if groups is not None:
+                feedback_analysis['deduplication'] = groups.stats
+
+        # Step 4: Generate visualizations based on AI analysis
+        with span('charts'):
+            visualizations = create_ai_driven_visualizations(
+                cleaned_data, column_analysis, feedback_analysis, self.llm, self.storage
+            )
+
+        # Step 5: Generate AI-powered report with descriptions
+        with span('summary'):
+            executive_summary = generate_executive_summary(feedback_analysis, visualizations, self.llm)
+        with span('pdf'):
+            pdf_url = generate_feedback_report(
+                cleaned_data, column_analysis, feedback_analysis, visualizations, executive_summary,
+                filename, self.storage
+            )
+
+        return {
+            'file_content': {
+                'cleaning_log': cleaning_log,
+                'column_analysis': column_analysis,
+                'feedback_analysis': feedback_analysis,
+                'visualizations': [v['url'] for v in visualizations]
+            },
+            'pdf_url': pdf_url,
+        }
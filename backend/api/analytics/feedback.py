@@ -0,0 +1,832 @@
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from ..utils.log import get_logger, lazy
+from .charts import plt, render_chart
+from .sentiment import PLACEHOLDERS, label_scores, polarity
+from .topics import as_categories
+
+log = get_logger(__name__)
+
+PLACEHOLDER_CHART_URL = "https://example.com/placeholder.png"
+
+
+def analyze_columns_with_gemini(df, filename, llm):
+    """Use Gemini AI to understand column meanings and purposes"""
+    try:
+        # Check if API key is available
+        if not llm.api_key:
+            raise Exception("GEMINI_API_KEY not found in environment variables")
+
+        # Prepare a simplified version of column information
+        column_info = []
+        for col in df.columns:
+            # Get a small sample of data
+            samples = df[col].dropna().head(3).tolist()
+            # Convert to string representation
+            sample_str = ", ".join([str(x) for x in samples[:3]])
+
+            column_info.append({
+                "name": col,
+                "type": str(df[col].dtype),
+                "sample_values": sample_str,
+                "unique_count": int(df[col].nunique()),
+                "missing_count": int(df[col].isnull().sum())
+            })
+
+        # Create a simpler prompt
+        prompt = f"""
+        Analyze this dataset and classify each column's purpose.
+
+        FILENAME: {filename}
+        ROWS: {len(df)}
+        COLUMNS: {len(df.columns)}
+
+        COLUMN INFORMATION:
+        {json.dumps(column_info, indent=2)}
+
+        For each column, classify it as one of these types:
+        - feedback_text: Contains customer comments, reviews, or feedback text
+        - numeric_rating: Contains numerical ratings (1-5, 1-10 scores)
+        - timestamp: Date/time when feedback was provided  
+        - categorical: Product categories, user types, locations, etc.
+        - demographic: Customer name, email, age, etc.
+        - irrelevant: IDs, indexes, system data (should be excluded from analysis)
+        - other: Doesn't fit above categories but might be useful
+
+        Return ONLY a JSON object with this structure:
+        {{
+        "columns_analysis": [
+            {{
+            "column_name": "string",
+            "detected_type": "string",
+            "confidence": "high|medium|low",
+            "reasoning": "brief explanation",
+            "include_in_analysis": true|false
+            }}
+        ],
+        "primary_feedback_column": "column_name_or_null",
+        "primary_rating_column": "column_name_or_null",
+        "notes": "any_important_observations"
+        }}
+
+        Focus on identifying columns that contain feedback text or ratings.
+        """
+
+        log.debug("requesting column analysis", filename=filename, prompt_chars=len(prompt))
+
+        response_text = llm.generate(prompt).strip()
+
+        # Remove markdown code blocks if they exist
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]  # Remove ```json
+        elif response_text.startswith('```'):
+            response_text = response_text[3:]   # Remove ```
+
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]  # Remove trailing ```
+
+        response_text = response_text.strip()
+
+        # Check if response is valid before trying to parse it as JSON
+        try:
+
+            result = json.loads(response_text)
+
+            # Validate the structure
+            if isinstance(result, dict) and 'columns_analysis' in result:
+                log.debug("column analysis parsed", columns=len(result.get('columns_analysis', [])))
+                return result
+            else:
+                log.warning("column analysis missing expected structure", filename=filename)
+
+        except json.JSONDecodeError as json_error:
+            log.warning("column analysis is not valid JSON; using fallback", error=json_error,
+                        response=lazy(lambda: response_text[:500]))
+            return fallback_column_analysis(df, filename)
+
+    except Exception as e:
+        error_msg = f"Gemini column analysis failed: {str(e)}"
+        log.exception("column analysis failed", filename=filename)
+        raise Exception(error_msg)
+
+
+def fallback_column_analysis(df, filename):
+    """Fallback column analysis when Gemini fails"""
+    analysis = {
+        "columns_analysis": [], 
+        "primary_feedback_column": None,
+        "primary_rating_column": None,
+        "notes": "Basic feedback data analysis (fallback)"
+    }
+
+    for col in df.columns:
+        col_lower = col.lower()
+        col_info = {
+            "column_name": col,
+            "detected_type": "other",
+            "confidence": "low",
+            "reasoning": "Fallback analysis based on column name",
+            "include_in_analysis": True
+        }
+
+        # Basic pattern matching for common feedback columns
+        if any(keyword in col_lower for keyword in ['rating', 'score', 'rate']):
+            col_info["detected_type"] = "numeric_rating"
+            col_info["confidence"] = "medium"
+            col_info["reasoning"] = "Column name suggests rating data"
+            if not analysis["primary_rating_column"]:
+                analysis["primary_rating_column"] = col
+
+        elif any(keyword in col_lower for keyword in ['comment', 'feedback', 'review', 'suggestion']):
+            col_info["detected_type"] = "feedback_text"
+            col_info["confidence"] = "medium"
+            col_info["reasoning"] = "Column name suggests feedback text"
+            if not analysis["primary_feedback_column"]:
+                analysis["primary_feedback_column"] = col
+
+        elif any(keyword in col_lower for keyword in ['date', 'time', 'timestamp']):
+            col_info["detected_type"] = "timestamp"
+            col_info["confidence"] = "medium"
+            col_info["reasoning"] = "Column name suggests timestamp data"
+
+        elif any(keyword in col_lower for keyword in ['name', 'user', 'customer', 'email']):
+            col_info["detected_type"] = "demographic"
+            col_info["confidence"] = "medium"
+            col_info["reasoning"] = "Column name suggests demographic data"
+
+        elif any(keyword in col_lower for keyword in ['id', 'index', 'key']):
+            col_info["detected_type"] = "irrelevant"
+            col_info["include_in_analysis"] = False
+            col_info["reasoning"] = "Column name suggests ID/index data"
+
+        analysis["columns_analysis"].append(col_info)
+
+    return analysis
+
+
+def feedback_columns_of(column_analysis):
+    """Feedback text columns picked by analyze_columns_with_gemini"""
+    return [col_info['column_name'] for col_info in column_analysis.get('columns_analysis', [])
+            if col_info.get('include_in_analysis', True) and col_info.get('detected_type') == 'feedback_text']
+
+
+def comprehensive_feedback_analysis(df, column_analysis, llm, sentiment=None, topics=None):
+    """
+    Comprehensive feedback analysis using Gemini AI
+
+    With `sentiment` (sentiment.SentimentResult over every row) the sentiment summary is
+    the exact label distribution, and Gemini sees that distribution plus the clearest
+    positive and negative comments instead of guessing it from the first 10 rows. With
+    `topics` (topics.cluster_feedback, named) the positive and negative categories are
+    the measured topics. Gemini is only asked for the fields that were not measured, so
+    with both it writes just the recommendations.
+    """
+
+    # Default structure to return if AI analysis fails
+    default_analysis = {
+        "sentiment_summary": {
+            "positive_percentage": 0.0,
+            "negative_percentage": 0.0,
+            "neutral_percentage": 0.0,
+            "overall_sentiment": "neutral"
+        },
+        "positive_feedback_analysis": {
+            "categories": []
+        },
+        "negative_feedback_analysis": {
+            "categories": []
+        },
+        "recommendations": [],
+        "analysis_status": "fallback_used",
+        "error_message": None
+    }
+    if sentiment is not None:
+        default_analysis["sentiment_summary"] = sentiment.summary()
+    if topics is not None:
+        default_analysis["positive_feedback_analysis"]["categories"] = as_categories(topics, 'positive')
+        default_analysis["negative_feedback_analysis"]["categories"] = as_categories(topics, 'negative')
+
+    try:
+        # Check if API key is available
+        if not llm.api_key:
+            raise Exception("GEMINI_API_KEY not found in environment variables")
+
+        # Identify relevant columns for analysis
+        feedback_columns = []
+        rating_columns = []
+
+        for col_info in column_analysis.get('columns_analysis', []):
+            if col_info.get('include_in_analysis', True):
+                if col_info.get('detected_type') == 'feedback_text':
+                    feedback_columns.append(col_info['column_name'])
+                elif col_info.get('detected_type') == 'numeric_rating':
+                    rating_columns.append(col_info['column_name'])
+
+        # If no feedback columns found, return default with message
+        if not feedback_columns:
+            default_analysis["analysis_status"] = "no_feedback_columns"
+            default_analysis["error_message"] = "No feedback text columns identified for analysis"
+            log.info("no feedback columns found")
+            return default_analysis
+
+        # Prepare sample data for analysis with JSON-serializable types
+        sample_data = []
+        max_samples = 50
+
+        if sentiment is not None:
+            # Clearest comments of each label rather than whatever happens to come first,
+            # with how many responses each one stands for
+            sample_data = [
+                {'sentiment': label, 'rows': sentiment.counts()[label], 'samples': sentiment.examples(label)}
+                for label in ('positive', 'negative', 'neutral')
+            ]
+        else:
+            for col in feedback_columns:
+                if col in df.columns:
+                    samples = df[col].dropna().head(max_samples)
+                    # Convert to native Python types
+                    sample_list = []
+                    for sample in samples:
+                        if hasattr(sample, 'item'):
+                            sample_list.append(sample.item())
+                        else:
+                            sample_list.append(str(sample))
+
+                    sample_data.append({
+                        'column': col,
+                        'samples': sample_list[:10]  # First 10 samples per column
+                    })
+
+        # Get rating distribution if available - convert to native types
+        rating_info = {}
+        for col in rating_columns:
+            if col in df.columns:
+                # Convert numpy types to native Python types
+                avg_val = float(df[col].mean()) if not pd.isna(df[col].mean()) else 0.0
+
+                dist = df[col].value_counts()
+                dist_dict = {}
+                for key, value in dist.items():
+                    if hasattr(key, 'item'):
+                        dist_dict[key.item()] = int(value)
+                    else:
+                        dist_dict[key] = int(value)
+
+                rating_info[col] = {
+                    'average': avg_val,
+                    'distribution': dist_dict
+                }
+
+        # Ask Gemini only for what was not measured; with sentiment and topics that is
+        # just the recommendations
+        requested = {}
+        if sentiment is None:
+            requested['sentiment_summary'] = """            "sentiment_summary": {
+                "positive_percentage": float,
+                "negative_percentage": float,
+                "neutral_percentage": float,
+                "overall_sentiment": "positive/negative/neutral"
+            }"""
+        if topics is None:
+            requested['positive_feedback_analysis'] = """            "positive_feedback_analysis": {
+                "categories": [
+                    {
+                        "category": "string",
+                        "percentage": float,
+                        "examples": ["string"],
+                        "key_themes": ["string"]
+                    }
+                ]
+            }"""
+            requested['negative_feedback_analysis'] = """            "negative_feedback_analysis": {
+                "categories": [
+                    {
+                        "category": "string",
+                        "percentage": float,
+                        "examples": ["string"],
+                        "key_issues": ["string"]
+                    }
+                ]
+            }"""
+        requested['recommendations'] = """            "recommendations": [
+                {
+                    "area": "string",
+                    "action": "string",
+                    "priority": "high/medium/low",
+                    "impact": "string",
+                    "timeline": "short/medium/long-term"
+                }
+            ]"""
+        structure = ",\n".join(requested.values())
+        if len(requested) == 1:
+            focus = "Providing actionable recommendations that address the measured categories above"
+        else:
+            focus = """1. Identifying key themes in positive feedback
+        2. Categorizing and quantifying negative feedback
+        3. Providing actionable recommendations
+        4. Calculating sentiment distribution"""
+
+        prompt = f"""
+        ACT as a Customer Experience (CX) Analyst with expertise in feedback analysis.
+
+        DATASET OVERVIEW:
+        - Total records: {int(len(df))}
+        - Feedback columns: {feedback_columns}
+        - Rating columns: {rating_columns}
+        - Rating statistics: {json.dumps(rating_info, indent=2, default=str)}
+        - Sentiment distribution (every row scored): {json.dumps(sentiment.summary() if sentiment is not None else 'not computed')}
+        - Measured feedback categories (every row assigned; keep these names and percentages): {json.dumps({label: as_categories(topics, label) for label in ('positive', 'negative')} if topics is not None else 'not computed', default=str)}
+
+        SAMPLE FEEDBACK DATA:
+        {json.dumps(sample_data, indent=2, default=str)}
+        {"Each sample's 'rows' is how many responses say the same thing; weight category percentages by it." if sentiment is not None else ''}
+
+        YOUR COMPREHENSIVE ANALYSIS TASK:
+        Perform a detailed analysis of the customer feedback and provide insights in the following JSON structure:
+
+        {{
+{structure}
+        }}
+
+        Focus on:
+        {focus}
+
+        Return ONLY valid JSON, no markdown or explanation.
+        """
+
+        log.debug("requesting feedback analysis", prompt_chars=len(prompt))
+        response_text = llm.generate(prompt).strip()
+
+        # Remove markdown code blocks if they exist
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]  # Remove ```json
+        elif response_text.startswith('```'):
+            response_text = response_text[3:]   # Remove ```
+
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]  # Remove trailing ```
+
+        response_text = response_text.strip()
+
+        # Check if response is valid before trying to parse it as JSON
+        if response_text:
+            try:
+                result = json.loads(response_text)
+
+                # Validate required structure
+                required_keys = list(requested)
+                if all(key in result for key in required_keys):
+                    result = {**default_analysis, **result, "analysis_status": "success"}
+                    if sentiment is not None:
+                        result['sentiment_summary'] = sentiment.summary()
+                        result['sentiment_scoring'] = sentiment.stats
+                    if topics is not None:
+                        result['positive_feedback_analysis']['categories'] = as_categories(topics, 'positive')
+                        result['negative_feedback_analysis']['categories'] = as_categories(topics, 'negative')
+                    log.debug("feedback analysis parsed")
+                    return result
+                else:
+                    log.warning("feedback analysis missing keys", missing=[k for k in required_keys if k not in result])
+                    default_analysis["analysis_status"] = "invalid_structure"
+                    default_analysis["error_message"] = "AI response missing required fields"
+                    return default_analysis
+
+            except json.JSONDecodeError as e:
+                log.warning("feedback analysis is not valid JSON", error=e, response=lazy(lambda: response_text[:500]))
+                default_analysis["analysis_status"] = "json_parse_error"
+                default_analysis["error_message"] = f"JSON parsing failed: {str(e)}"
+                return default_analysis
+        else:
+            log.warning("empty feedback analysis response")
+            default_analysis["analysis_status"] = "empty_response"
+            default_analysis["error_message"] = "Empty response from AI service"
+            return default_analysis
+
+    except Exception as e:
+        error_msg = f"Gemini feedback analysis failed: {str(e)}"
+        log.exception("feedback analysis failed")
+        raise Exception(error_msg)  # Re-raise the exception to stop execution
+
+
+def create_ai_driven_visualizations(df, column_analysis, feedback_analysis, llm, storage):
+    """Create visualizations based on AI analysis with AI-generated descriptions"""
+    visualizations = []
+    try:
+        # Add validation to ensure we have the required data
+        if not feedback_analysis:
+            raise Exception("No feedback analysis data provided for visualizations")
+
+        if not isinstance(feedback_analysis, dict):
+            raise Exception(f"Invalid feedback analysis data type: {type(feedback_analysis)}")
+
+        # Get relevant columns for visualization
+        relevant_columns = []
+        if isinstance(column_analysis, dict):
+            for col_info in column_analysis.get('columns_analysis', []):
+                if col_info.get('include_in_analysis', True) and col_info['column_name'] in df.columns:
+                    relevant_columns.append(col_info['column_name'])
+
+        # 1. Sentiment Distribution Chart
+        sentiment_data = feedback_analysis.get('sentiment_summary', {})
+        if sentiment_data and any(sentiment_data.get(key, 0) > 0 for key in ['positive_percentage', 'negative_percentage', 'neutral_percentage']):
+            try:
+                plt.figure(figsize=(10, 8))
+                labels = ['Positive', 'Negative', 'Neutral']
+                sizes = [
+                    sentiment_data.get('positive_percentage', 0),
+                    sentiment_data.get('negative_percentage', 0),
+                    sentiment_data.get('neutral_percentage', 0)
+                ]
+                colors = ['#4CAF50', '#F44336', '#FFC107']
+
+                # Only create pie chart if we have non-zero values
+                if sum(sizes) > 0:
+                    plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
+                    plt.title('Feedback Sentiment Distribution')
+                    plt.axis('equal')
+
+                    chart_url, chart_image = save_chart_or_placeholder(storage, plt, f"feedback_visualizations/{uuid.uuid4()}_sentiment_pie.png")
+
+                    # Generate AI description for this chart
+                    chart_description = generate_chart_description(
+                        'sentiment_pie',
+                        sentiment_data,
+                        feedback_analysis,
+                        llm
+                    )
+
+                    visualizations.append({
+                        'type': 'pie_chart',
+                        'title': 'Feedback Sentiment Analysis',
+                        'url': chart_url,
+                        'image': chart_image,
+                        'description': chart_description
+                    })
+                plt.close()
+            except Exception as e:
+                log.warning("sentiment chart failed", error=e)
+                plt.close()
+
+        # 2. Combined Positive/Negative Category Distribution
+        positive_cats = feedback_analysis.get('positive_feedback_analysis', {}).get('categories', [])
+        negative_cats = feedback_analysis.get('negative_feedback_analysis', {}).get('categories', [])
+
+        # Create combined chart if we have both positive and negative categories
+        if positive_cats and negative_cats:
+            # Get top categories from both (limit to 5 each for readability)
+            top_positive = sorted(positive_cats, key=lambda x: x['percentage'], reverse=True)[:5]
+            top_negative = sorted(negative_cats, key=lambda x: x['percentage'], reverse=True)[:5]
+
+            # Get all unique category names
+            all_categories = set()
+            for cat in top_positive:
+                all_categories.add(cat['category'])
+            for cat in top_negative:
+                all_categories.add(cat['category'])
+
+            # Create data for the chart
+            categories = list(all_categories)
+            positive_values = []
+            negative_values = []
+
+            for category in categories:
+                # Find matching positive category
+                pos_match = next((cat for cat in top_positive if cat['category'] == category), None)
+                positive_values.append(pos_match['percentage'] if pos_match else 0)
+
+                # Find matching negative category
+                neg_match = next((cat for cat in top_negative if cat['category'] == category), None)
+                negative_values.append(neg_match['percentage'] if neg_match else 0)
+
+            # Create the combined bar chart
+            plt.figure(figsize=(14, 8))
+
+            x = np.arange(len(categories))
+            width = 0.35
+
+            plt.bar(x - width/2, positive_values, width, label='Positive', color='#4CAF50', alpha=0.8)
+            plt.bar(x + width/2, negative_values, width, label='Negative', color='#F44336', alpha=0.8)
+
+            plt.xlabel('Feedback Categories')
+            plt.ylabel('Percentage')
+            plt.title('Positive vs Negative Feedback by Category')
+            plt.xticks(x, categories, rotation=45, ha='right')
+            plt.legend()
+            plt.tight_layout()
+
+            chart_url, chart_image = save_chart_or_placeholder(storage, plt, f"feedback_visualizations/{uuid.uuid4()}_combined_categories.png")
+
+            # Prepare data for description
+            chart_data = {
+                'categories': categories,
+                'positive_values': positive_values,
+                'negative_values': negative_values
+            }
+
+            chart_description = generate_chart_description('combined_categories', chart_data, feedback_analysis, llm)
+
+            visualizations.append({
+                'type': 'bar_chart',
+                'title': 'Positive vs Negative Feedback by Category',
+                'url': chart_url,
+                'image': chart_image,
+                'description': chart_description
+            })
+            plt.close()
+
+        # 3. Individual category charts (optional - you can keep these or remove them)
+        if positive_cats:
+            plt.figure(figsize=(12, 6))
+            categories = [cat['category'] for cat in positive_cats[:5]]  # Limit to top 5
+            percentages = [cat['percentage'] for cat in positive_cats[:5]]
+
+            plt.barh(categories, percentages, color='green', alpha=0.7)
+            plt.title('Top Positive Feedback Categories')
+            plt.xlabel('Percentage')
+            plt.tight_layout()
+
+            chart_url, chart_image = save_chart_or_placeholder(storage, plt, f"feedback_visualizations/{uuid.uuid4()}_positive_categories.png")
+            chart_description = generate_chart_description('positive_categories', positive_cats[:5], feedback_analysis, llm)
+
+            visualizations.append({
+                'type': 'bar_chart',
+                'title': 'Top Positive Feedback Categories',
+                'url': chart_url,
+                'image': chart_image,
+                'description': chart_description
+            })
+            plt.close()
+
+        if negative_cats:
+            plt.figure(figsize=(12, 6))
+            categories = [cat['category'] for cat in negative_cats[:5]]  # Limit to top 5
+            percentages = [cat['percentage'] for cat in negative_cats[:5]]
+
+            plt.barh(categories, percentages, color='red', alpha=0.7)
+            plt.title('Top Negative Feedback Categories')
+            plt.xlabel('Percentage')
+            plt.tight_layout()
+
+            chart_url, chart_image = save_chart_or_placeholder(storage, plt, f"feedback_visualizations/{uuid.uuid4()}_negative_categories.png")
+            chart_description = generate_chart_description('negative_categories', negative_cats[:5], feedback_analysis, llm)
+
+            visualizations.append({
+                'type': 'bar_chart',
+                'title': 'Top Negative Feedback Categories',
+                'url': chart_url,
+                'image': chart_image,
+                'description': chart_description
+            })
+            plt.close()
+
+        # 4. Rating distribution charts (if available)
+        rating_columns = []
+        for col_info in column_analysis.get('columns_analysis', []):
+            if (col_info.get('detected_type') == 'numeric_rating' and 
+                col_info.get('include_in_analysis', True) and 
+                col_info['column_name'] in df.columns):
+                rating_columns.append(col_info['column_name'])
+
+        for rating_col in rating_columns[:2]:  # Limit to first 2 rating columns
+            if df[rating_col].dtype in ['int64', 'float64']:
+                plt.figure(figsize=(10, 6))
+
+                # Convert to native Python list for plotting
+                rating_data = [float(x) for x in df[rating_col].dropna() if not pd.isna(x)]
+
+                plt.hist(rating_data, bins=10, alpha=0.7, color='skyblue', edgecolor='black')
+                plt.title(f'Distribution of {rating_col} Ratings')
+                plt.xlabel('Rating Value')
+                plt.ylabel('Frequency')
+                plt.grid(True, alpha=0.3)
+
+                chart_url, chart_image = save_chart_or_placeholder(storage, plt, f"feedback_visualizations/{uuid.uuid4()}_{rating_col}_distribution.png")
+
+                # Convert describe() to native Python types for JSON serialization
+                desc = df[rating_col].describe()
+                desc_dict = {}
+                for key, value in desc.items():
+                    if hasattr(value, 'item'):
+                        desc_dict[key] = value.item()
+                    else:
+                        desc_dict[key] = value
+
+                chart_description = generate_chart_description('rating_distribution', {
+                    'column': rating_col,
+                    'data': desc_dict
+                }, feedback_analysis, llm)
+
+                visualizations.append({
+                    'type': 'histogram',
+                    'title': f'{rating_col} Distribution',
+                    'url': chart_url,
+                    'image': chart_image,
+                    'description': chart_description
+                })
+                plt.close()
+
+        return visualizations
+    except Exception as e:
+        error_msg = f"Visualization creation failed: {str(e)}"
+        log.exception("visualization creation failed")
+        raise Exception(error_msg)  # Re-raise the exception to stop execution
+
+
+def generate_chart_description(chart_type, chart_data, feedback_analysis, llm):
+    """Use Gemini AI to generate descriptive analysis for charts"""
+    try:
+        # Ensure chart_data is JSON serializable
+        serializable_data = convert_to_serializable(chart_data)
+
+        prompt = f"""
+        You are a data visualization expert. Analyze this chart data and provide a concise, insightful description.
+
+        CHART TYPE: {chart_type}
+        CHART DATA: {json.dumps(serializable_data, indent=2, default=str)}
+        FEEDBACK ANALYSIS CONTEXT: {json.dumps(convert_to_serializable(feedback_analysis), indent=2, default=str)[:1000]}...
+
+        Provide a 2-3 sentence description that:
+        1. Explains what the chart shows
+        2. Highlights key insights or patterns
+        3. Relates it to the overall feedback analysis
+        4. Uses clear, professional language
+
+        Output only the description text, no markdown or formatting.
+        """
+
+        return llm.generate(prompt).strip()
+    except Exception as e:
+        log.warning("chart description failed", chart_type=chart_type, error=e)
+        return f"Chart showing {chart_type} data from feedback analysis."
+
+
+def convert_to_serializable(obj):
+    """Recursively convert numpy/pandas types to native Python types"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    elif isinstance(obj, dict):
+        return {k: convert_to_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_to_serializable(item) for item in obj]
+    elif isinstance(obj, (np.integer, np.int64)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64)):
+        return float(obj)
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
+    elif pd.isna(obj):
+        return None
+    else:
+        return obj
+
+
+def generate_executive_summary(feedback_analysis, visualizations, llm):
+    """Generate structured executive summary using Gemini AI"""
+    try:
+        # Check if API key is available
+        if not llm.api_key:
+            return("GEMINI_API_KEY not found in environment variables")
+
+        # Create a simplified version of the data for the prompt
+        simplified_analysis = {
+            'sentiment_summary': feedback_analysis.get('sentiment_summary', {}),
+            'positive_categories': [cat.get('category', '') for cat in 
+                                feedback_analysis.get('positive_feedback_analysis', {}).get('categories', [])[:3]],
+            'negative_categories': [cat.get('category', '') for cat in 
+                                feedback_analysis.get('negative_feedback_analysis', {}).get('categories', [])[:3]],
+            'recommendations': [rec.get('action', '') for rec in 
+                            feedback_analysis.get('recommendations', [])[:3]]
+        }
+
+        prompt = f"""
+        As a senior business analyst, create a structured executive summary based on this feedback analysis.
+
+        FEEDBACK ANALYSIS RESULTS:
+        {json.dumps(convert_to_serializable(feedback_analysis), indent=2, default=str)}
+
+        VISUALIZATIONS GENERATED:
+        {json.dumps([v['title'] for v in visualizations], indent=2, default=str)}
+
+        Create a comprehensive executive summary with the following structure:
+
+        # Executive Summary: Customer Feedback Analysis
+
+        KEY FINDINGS:
+        - Overall sentiment: {simplified_analysis['sentiment_summary'].get('overall_sentiment', 'N/A')}
+        - Positive: {simplified_analysis['sentiment_summary'].get('positive_percentage', 0)}%
+        - Negative: {simplified_analysis['sentiment_summary'].get('negative_percentage', 0)}%
+        - Neutral: {simplified_analysis['sentiment_summary'].get('neutral_percentage', 0)}%
+
+        TOP POSITIVE CATEGORIES: {', '.join(simplified_analysis['positive_categories'])}
+        TOP NEGATIVE CATEGORIES: {', '.join(simplified_analysis['negative_categories'])}
+        KEY RECOMMENDATIONS: {', '.join(simplified_analysis['recommendations'])}
+
+        Create a comprehensive executive summary with the following structure:
+
+        # Executive Summary: Customer Feedback Analysis
+
+        ## 📊 Overall Sentiment Distribution
+        [Provide sentiment percentages in a bullet point format]
+
+        ## 👍 Positive Feedback Highlights
+        [Key positive themes in bullet points]
+
+        ## ⚠️ Areas Needing Improvement  
+        [Key negative themes in bullet points]
+
+        ## 🎯 Recommended Actions
+        [Priority recommendations in bullet points with priority levels]
+
+        ## 📈 Expected Outcomes
+        [Potential benefits of implementing recommendations]
+
+        ## 🔜 Next Steps
+        [Actionable next steps in numbered list]
+
+        Write in professional business language suitable for executives.
+        Focus on actionable insights and strategic implications.
+        Use concise bullet points and sections as shown above.
+        Keep the response under 500 words.
+        """
+
+        log.debug("requesting executive summary", prompt_chars=len(prompt))
+
+        summary = llm.generate(prompt)
+
+        if summary and summary.strip():
+            log.debug("executive summary received", chars=len(summary), preview=lazy(lambda: summary[:100]))
+            return summary
+        else:
+            return("Empty response from Gemini for executive summary")
+
+    except Exception as e:
+        log.exception("executive summary failed")
+        return (f"Executive summary generation failed: {str(e)}")
+
+
+def basic_feedback_analysis(df, text_columns, workers=1):
+    """Basic sentiment analysis fallback with proper structure (lexicon scores, see sentiment.polarity)"""
+    cells = pd.concat([df[col] for col in text_columns], ignore_index=True) if text_columns else pd.Series(dtype='object')
+    cells = cells[cells.notna() & (cells.astype(str) != '') & ~cells.isin(PLACEHOLDERS)]
+    labels = label_scores(polarity(cells, workers=workers).to_numpy())
+
+    total = len(labels) if len(labels) else 1
+    positive = int((labels == 'positive').sum())
+    negative = int((labels == 'negative').sum())
+    neutral = total - positive - negative
+
+    # Return properly structured data that matches the expected format
+    return {
+        "sentiment_summary": {
+            "positive_percentage": (positive / total) * 100,
+            "negative_percentage": (negative / total) * 100,
+            "neutral_percentage": (neutral / total) * 100,
+            "overall_sentiment": "positive" if positive > negative else "negative" if negative > positive else "neutral"
+        },
+        "positive_feedback_analysis": {
+            "categories": [
+                {
+                    "category": "General Positive Feedback",
+                    "percentage": (positive / total) * 100,
+                    "examples": ["Satisfied customers", "Positive experiences"],
+                    "key_themes": ["satisfaction", "quality"]
+                }
+            ]
+        },
+        "negative_feedback_analysis": {
+            "categories": [
+                {
+                    "category": "General Concerns",
+                    "percentage": (negative / total) * 100,
+                    "examples": ["Areas for improvement", "Customer concerns"],
+                    "key_issues": ["service", "quality"]
+                }
+            ]
+        },
+        "recommendations": [
+            {
+                "area": "General Improvement",
+                "action": "Address customer concerns",
+                "priority": "Medium",
+                "impact": "Improved customer satisfaction",
+                "timeline": "Short-term"
+            }
+        ]
+    }
+
+
+def save_chart_or_placeholder(storage, plt_figure, chart_path):
+    """
+    (url, png bytes) of a rendered and uploaded chart. A failed upload falls back to a
+    placeholder URL so it doesn't sink the report; the PDF still embeds the bytes.
+    """
+    image = render_chart(plt_figure)
+    try:
+        return storage.upload(chart_path, image, "image/png"), image
+    except Exception as e:
+        log.warning("chart upload failed; using placeholder", path=chart_path, error=e)
+        return PLACEHOLDER_CHART_URL, image
@@ -0,0 +1,578 @@
+"""
+Incremental re-analysis for datasets that grow by appending rows.
+
+Most uploads are "last month's file plus new rows". A lineage (models.DatasetLineage)
+remembers how many raw rows it has seen and a digest of their row hashes; a new file
+whose first N rows hash to the same digest is an append, so only rows N.. are cleaned
+and folded into the stored aggregates:
+
+    fingerprint = fingerprint_table(raw)          # column digest + one uint64 per row
+    previous = lineages.find(fingerprint)         # LineageStore, api/analytics/lineage.py
+    cleaned, cleaning_log, state = clean_appended(raw, previous)
+
+DatasetState holds only mergeable aggregates (counts, sums, Welford moments, min/max,
+a relative-error quantile sketch, per-category counts and sums, daily rollups), so
+`state.merge(DatasetState.from_frame(new_rows))` equals the state of the whole dataset
+up to the sketch error. Statistics, overview and type-specific metrics of an appended
+run are read from the merged state instead of rescanning every row.
+"""
+import hashlib
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from .analysis import (
+    ANALYSIS_LABELS, COST_KEYWORDS, ENGAGEMENT_KEYWORDS, PRODUCT_KEYWORDS, PROFIT_KEYWORDS, QUANTITY_KEYWORDS,
+    REVENUE_KEYWORDS, SALES_KEYWORDS, find_columns,
+)
+from .cleaning import clean_and_preprocess_data
+from .rollups import TimeRollups
+
+STATE_VERSION = 2
+
+# Relative accuracy of quantile estimates (1% of the value) and the magnitude below which
+# a value counts as zero
+SKETCH_ALPHA = 0.01
+SKETCH_MIN_VALUE = 1e-12
+
+# Distinct values kept per categorical column; beyond this only the most frequent are
+# counted exactly and the rest are lumped into `other`
+MAX_CATEGORIES = 500
+
+
+# ---------------------------
+# Lineage fingerprints
+# ---------------------------
+def row_hashes(df):
+    """One uint64 per row, stable across re-reads of the same rows"""
+    # Numbers are hashed as float64 so an int column that gains a blank in later rows (and
+    # is read back as float) still hashes its old rows the same
+    normalised = pd.DataFrame({
+        i: df.iloc[:, i].astype('float64') if _is_numeric(df.iloc[:, i]) else df.iloc[:, i].astype(str)
+        for i in range(df.shape[1])
+    })
+    return pd.util.hash_pandas_object(normalised, index=False).to_numpy()
+
+
+def prefix_digest(hashes, rows=None):
+    """Digest of the first `rows` row hashes (all rows by default)"""
+    prefix = hashes if rows is None else hashes[:rows]
+    return hashlib.sha256(np.ascontiguousarray(prefix, dtype='<u8').tobytes()).hexdigest()
+
+
+def fingerprint_table(df):
+    return {
+        'columns': hashlib.sha256(json.dumps([str(col) for col in df.columns]).encode()).hexdigest(),
+        'hashes': row_hashes(df),
+    }
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+# ---------------------------
+# Mergeable aggregates
+# ---------------------------
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (as in DDSketch): each value lands in bucket
+    ceil(log_gamma |x|), so any quantile is within `alpha` relative error and two
+    sketches merge by adding bucket counts.
+    """
+
+    def __init__(self, alpha=SKETCH_ALPHA, positive=None, negative=None, zeros=0):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = positive or {}
+        self.negative = negative or {}
+        self.zeros = zeros
+
+    @property
+    def count(self):
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zeros
+
+    def add(self, values):
+        """Add a float array without NaNs"""
+        positive = values[values > SKETCH_MIN_VALUE]
+        negative = -values[values < -SKETCH_MIN_VALUE]
+        self.zeros += int(len(values) - len(positive) - len(negative))
+        for buckets, magnitudes in ((self.positive, positive), (self.negative, negative)):
+            if len(magnitudes):
+                keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge quantile sketches with different accuracy")
+        merged = QuantileSketch(self.alpha, dict(self.positive), dict(self.negative), self.zeros + other.zeros)
+        for mine, theirs in ((merged.positive, other.positive), (merged.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        return merged
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        # Ascending order: most negative first, then zeros, then positives
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive)) if self.positive else 0.0
+
+    def to_dict(self):
+        return {
+            'alpha': self.alpha,
+            'zeros': self.zeros,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['alpha'],
+            {int(key): count for key, count in data['positive'].items()},
+            {int(key): count for key, count in data['negative'].items()},
+            data['zeros'],
+        )
+
+
+class NumericAggregate:
+    """Count, sum, mean/M2 (Welford, merged with Chan's formula), min, max and a quantile sketch"""
+
+    def __init__(self, count=0, total=0.0, mean=0.0, m2=0.0, minimum=None, maximum=None, sketch=None):
+        self.count = count
+        self.total = total
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.sketch = sketch or QuantileSketch()
+
+    @classmethod
+    def from_series(cls, series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        values = values[~np.isnan(values)]
+        aggregate = cls()
+        if len(values):
+            aggregate.count = int(len(values))
+            aggregate.total = float(values.sum())
+            aggregate.mean = float(values.mean())
+            aggregate.m2 = float(((values - aggregate.mean) ** 2).sum())
+            aggregate.min = float(values.min())
+            aggregate.max = float(values.max())
+            aggregate.sketch.add(values)
+        return aggregate
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return NumericAggregate(
+            count,
+            self.total + other.total,
+            self.mean + delta * other.count / count,
+            self.m2 + other.m2 + delta * delta * self.count * other.count / count,
+            min(self.min, other.min),
+            max(self.max, other.max),
+            self.sketch.merge(other.sketch),
+        )
+
+    @property
+    def std(self):
+        """Sample standard deviation, like pandas"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+    def quantile(self, q):
+        estimate = self.sketch.quantile(q)
+        # Bucket midpoints can fall just outside the observed range
+        return None if estimate is None else min(max(estimate, self.min), self.max)
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.total, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max, 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['sum'], data['mean'], data['m2'], data['min'], data['max'],
+                   QuantileSketch.from_dict(data['sketch']))
+
+
+class CategoryAggregate:
+    """
+    Row count per value of a categorical column, plus per-value sums and non-null counts
+    of the numeric columns (`by`) while the column has at most MAX_CATEGORIES values
+    """
+
+    def __init__(self, counts=None, other=0, by=None):
+        self.counts = counts or {}
+        self.other = other
+        self.by = by
+
+    @classmethod
+    def from_series(cls, series, numeric):
+        counts = series.value_counts()
+        aggregate = cls({str(value): int(count) for value, count in counts.items()})
+        if len(counts) <= MAX_CATEGORIES and numeric.shape[1]:
+            grouped = numeric.groupby(series.astype(str).where(series.notna()))
+            sums, nonnull = grouped.sum(), grouped.count()
+            aggregate.by = {
+                str(value): {
+                    'sums': {str(col): float(sums.at[value, col]) for col in numeric.columns},
+                    'counts': {str(col): int(nonnull.at[value, col]) for col in numeric.columns},
+                }
+                for value in sums.index
+            }
+        aggregate._truncate()
+        return aggregate
+
+    def merge(self, other):
+        counts = dict(self.counts)
+        for value, count in other.counts.items():
+            counts[value] = counts.get(value, 0) + count
+        by = None
+        if self.by is not None and other.by is not None:
+            by = {value: {'sums': dict(stats['sums']), 'counts': dict(stats['counts'])}
+                  for value, stats in self.by.items()}
+            for value, stats in other.by.items():
+                mine = by.setdefault(value, {'sums': {}, 'counts': {}})
+                for col, total in stats['sums'].items():
+                    mine['sums'][col] = mine['sums'].get(col, 0.0) + total
+                for col, count in stats['counts'].items():
+                    mine['counts'][col] = mine['counts'].get(col, 0) + count
+        merged = CategoryAggregate(counts, self.other + other.other, by)
+        merged._truncate()
+        return merged
+
+    def _truncate(self):
+        if len(self.counts) > MAX_CATEGORIES:
+            ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+            self.counts = dict(ranked[:MAX_CATEGORIES])
+            self.other += sum(count for _, count in ranked[MAX_CATEGORIES:])
+            self.by = None
+
+    @property
+    def truncated(self):
+        return self.other > 0
+
+    def top(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return dict(ranked if n is None else ranked[:n])
+
+    def group_means(self, col):
+        """{value: mean of numeric column `col` within the value} (like groupby().mean())"""
+        if self.by is None:
+            return {}
+        return {value: stats['sums'][col] / stats['counts'][col]
+                for value, stats in sorted(self.by.items()) if stats['counts'].get(col)}
+
+    def to_dict(self):
+        return {'counts': self.counts, 'other': self.other, 'by': self.by}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['counts'], data['other'], data['by'])
+
+
+class DatasetState:
+    """Mergeable aggregates of a cleaned dataset; see the module docstring"""
+
+    def __init__(self):
+        self.rows = 0
+        self.kinds = {}        # column -> numeric | datetime | categorical | other, in column order
+        self.nulls = {}
+        self.numeric = {}
+        self.categorical = {}
+        self.dates = {}        # column -> {'min': iso, 'max': iso}
+        self.rollups = None    # rollups.TimeRollups over the first date column
+        self.derived = {}      # per-row ratios that cannot be rebuilt from column sums
+
+    @classmethod
+    def from_frame(cls, df):
+        state = cls()
+        state.rows = int(len(df))
+        numeric_cols = [col for col in df.columns if _is_numeric(df[col])]
+        numeric = df[numeric_cols]
+
+        for col in df.columns:
+            series = df[col]
+            name = str(col)
+            state.nulls[name] = int(series.isna().sum())
+            if col in numeric_cols:
+                state.kinds[name] = 'numeric'
+                state.numeric[name] = NumericAggregate.from_series(series)
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                state.kinds[name] = 'datetime'
+                present = series.dropna()
+                state.dates[name] = ({'min': present.min().isoformat(), 'max': present.max().isoformat()}
+                                     if len(present) else None)
+            elif pd.api.types.is_string_dtype(series.dtype):
+                state.kinds[name] = 'categorical'
+                state.categorical[name] = CategoryAggregate.from_series(series, numeric)
+            else:
+                state.kinds[name] = 'other'
+
+        state.rollups = TimeRollups.from_frame(df)
+
+        if 'Views' in df.columns and 'Likes' in df.columns:
+            state.derived['engagement_rate'] = NumericAggregate.from_series(df['Likes'] / df['Views'] * 100)
+        return state
+
+    def merge(self, other):
+        """State of both datasets together (self's rows first)"""
+        merged = DatasetState()
+        merged.rows = self.rows + other.rows
+        merged.kinds = dict(self.kinds)
+        for col, kind in other.kinds.items():
+            merged.kinds.setdefault(col, kind)
+        merged.nulls = {col: self.nulls.get(col, 0) + other.nulls.get(col, 0) for col in merged.kinds}
+
+        for attr in ('numeric', 'categorical', 'derived'):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            setattr(merged, attr, {
+                col: mine[col].merge(theirs[col]) if col in mine and col in theirs else mine.get(col) or theirs[col]
+                for col in list(mine) + [col for col in theirs if col not in mine]
+            })
+
+        for col in set(self.dates) | set(other.dates):
+            ranges = [r for r in (self.dates.get(col), other.dates.get(col)) if r]
+            merged.dates[col] = ({'min': min(r['min'] for r in ranges), 'max': max(r['max'] for r in ranges)}
+                                 if ranges else None)
+
+        if self.rollups and other.rollups:
+            merged.rollups = self.rollups.merge(other.rollups)
+        else:
+            merged.rollups = self.rollups or other.rollups
+        return merged
+
+    def to_dict(self):
+        return {
+            'version': STATE_VERSION,
+            'rows': self.rows,
+            'kinds': self.kinds,
+            'nulls': self.nulls,
+            'numeric': {col: agg.to_dict() for col, agg in self.numeric.items()},
+            'categorical': {col: agg.to_dict() for col, agg in self.categorical.items()},
+            'dates': self.dates,
+            'rollups': self.rollups.to_dict() if self.rollups else None,
+            'derived': {name: agg.to_dict() for name, agg in self.derived.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported lineage state version {data.get('version')}")
+        state = cls()
+        state.rows = data['rows']
+        state.kinds = data['kinds']
+        state.nulls = data['nulls']
+        state.numeric = {col: NumericAggregate.from_dict(agg) for col, agg in data['numeric'].items()}
+        state.categorical = {col: CategoryAggregate.from_dict(agg) for col, agg in data['categorical'].items()}
+        state.dates = data['dates']
+        state.rollups = TimeRollups.from_dict(data['rollups']) if data['rollups'] else None
+        state.derived = {name: NumericAggregate.from_dict(agg) for name, agg in data['derived'].items()}
+        return state
+
+    # --- views matching profiling.py / analysis.py on the full frame ---
+    def statistical_summary(self):
+        summary = {}
+        for col, agg in self.numeric.items():
+            if not agg.count:
+                continue
+            summary[col] = {
+                'mean': agg.mean,
+                'median': agg.quantile(0.5),
+                'std': agg.std,
+                'min': agg.min,
+                'max': agg.max,
+                'cv': agg.std / agg.mean * 100 if agg.mean != 0 else 0,
+            }
+        return summary
+
+    def data_overview(self):
+        columns = len(self.kinds)
+        cells = self.rows * columns
+        return {
+            'total_rows': self.rows,
+            'total_columns': columns,
+            'numeric_columns': len(self.numeric),
+            'categorical_columns': len(self.categorical),
+            'data_completeness': float((1 - sum(self.nulls.values()) / cells) * 100) if cells else 0.0,
+            'time_period': self.time_period(),
+            'data_size_category': 'Large' if self.rows > 10000 else 'Medium' if self.rows > 1000 else 'Small',
+        }
+
+    def time_period(self):
+        for col, span in self.dates.items():
+            if 'date' in col.lower() or 'time' in col.lower():
+                if not span:
+                    return None
+                start, end = pd.Timestamp(span['min']), pd.Timestamp(span['max'])
+                return {'start_date': str(start.date()), 'end_date': str(end.date()),
+                        'duration_days': (end - start).days}
+        return None
+
+    def cleaning_reference(self):
+        """Fill values and outlier bounds for clean_and_preprocess_data(reference=...)"""
+        fill, bounds = {}, {}
+        for col, agg in self.numeric.items():
+            if agg.count:
+                fill[col] = agg.mean
+                q1, q3 = agg.quantile(0.25), agg.quantile(0.75)
+                bounds[col] = (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+        for col, agg in self.categorical.items():
+            if agg.counts:
+                fill[col] = next(iter(agg.top(1)))
+        return {'fill': fill, 'bounds': bounds}
+
+
+# ---------------------------
+# Aggregate-based analysis
+# ---------------------------
+def analyze_state(state, data_type):
+    """analysis.analyze_by_type computed from a DatasetState instead of the rows"""
+    analyzer = STATE_ANALYZERS.get(data_type)
+    return {
+        'specialized_metrics': analyzer(state) if analyzer else {},
+        **ANALYSIS_LABELS[data_type if analyzer else 'general'],
+    }
+
+
+def _sales_metrics(state):
+    metrics = {}
+    columns = list(state.kinds)
+    sales_cols = find_columns(columns, SALES_KEYWORDS)
+    quantity_cols = find_columns(columns, QUANTITY_KEYWORDS)
+    product_cols = find_columns(columns, PRODUCT_KEYWORDS)
+
+    if sales_cols and sales_cols[0] in state.numeric:
+        agg = state.numeric[sales_cols[0]]
+        metrics['total_sales'] = agg.total
+        metrics['average_transaction'] = agg.mean
+        metrics['sales_std'] = agg.std
+    if quantity_cols and quantity_cols[0] in state.numeric:
+        agg = state.numeric[quantity_cols[0]]
+        metrics['total_quantity_sold'] = agg.total
+        metrics['average_quantity'] = agg.mean
+    if product_cols and product_cols[0] in state.categorical:
+        agg = state.categorical[product_cols[0]]
+        # A lower bound once the column has more than MAX_CATEGORIES products
+        metrics['unique_products'] = len(agg.counts)
+        metrics['top_products'] = agg.top(5)
+    return metrics
+
+
+def _financial_metrics(state):
+    metrics = {}
+    columns = list(state.kinds)
+    revenue_cols = find_columns(columns, REVENUE_KEYWORDS)
+    profit_cols = find_columns(columns, PROFIT_KEYWORDS)
+    cost_cols = find_columns(columns, COST_KEYWORDS)
+    revenue = state.numeric.get(revenue_cols[0]) if revenue_cols else None
+    profit = state.numeric.get(profit_cols[0]) if profit_cols else None
+    cost = state.numeric.get(cost_cols[0]) if cost_cols else None
+
+    metrics['profit_margin'] = profit.mean / revenue.mean * 100 if profit and revenue else 0
+    if cost:
+        metrics['total_costs'] = cost.total
+        metrics['cost_ratio'] = cost.mean / revenue.mean * 100 if revenue else 0
+    else:
+        metrics['total_costs'] = 0
+        metrics['cost_ratio'] = 0
+    return metrics
+
+
+def _social_media_metrics(state):
+    metrics = {}
+    columns = list(state.kinds)
+    engagement_cols = find_columns(columns, ENGAGEMENT_KEYWORDS)
+    engagement_numeric = [col for col in engagement_cols if col in state.numeric]
+    platform_cols = [col for col in columns if 'platform' in col.lower()]
+    content_cols = [col for col in columns if 'content' in col.lower()]
+
+    def best_per_metric(category_col):
+        agg = state.categorical.get(category_col)
+        best = {}
+        for col in engagement_numeric:
+            means = agg.group_means(col) if agg else {}
+            if means:
+                best[col] = max(means, key=means.get)
+        return best
+
+    if platform_cols and engagement_numeric:
+        metrics['best_performing_platform_per_metric'] = best_per_metric(platform_cols[0])
+    for col in engagement_numeric:
+        if col.lower() in ['likes', 'shares', 'comments', 'views']:
+            metrics[f'total_{col.lower()}'] = state.numeric[col].total
+            metrics[f'average_{col.lower()}'] = state.numeric[col].mean
+    if content_cols:
+        if engagement_numeric:
+            metrics['best_content_type_per_metric'] = best_per_metric(content_cols[0])
+        if content_cols[0] in state.categorical:
+            metrics['content_type_distribution'] = state.categorical[content_cols[0]].top()
+    if 'engagement_rate' in state.derived:
+        metrics['average_engagement_rate'] = state.derived['engagement_rate'].mean
+    return metrics
+
+
+STATE_ANALYZERS = {
+    'sales': _sales_metrics,
+    'financial': _financial_metrics,
+    'social_media': _social_media_metrics,
+}
+
+
+# ---------------------------
+# Appended rows
+# ---------------------------
+def clean_appended(raw, previous):
+    """
+    Clean only the rows appended since `previous` (a LineageStore.find() snapshot) and
+    merge them into its cleaned frame and state.
+
+    Returns (cleaned full frame, cleaning_log of the appended rows, merged state). New
+    rows are filled and outlier-capped with the statistics of the rows already seen, and
+    rows that duplicate an earlier row are dropped, as a full clean would do.
+    """
+    state, base = previous['state'], previous['frame']
+    appended = raw.iloc[previous['rows']:].reset_index(drop=True)
+    cleaned_new, cleaning_log = clean_and_preprocess_data(appended, reference=state.cleaning_reference())
+
+    combined = pd.concat([base, cleaned_new], ignore_index=True)
+    duplicates = pd.Series(row_hashes(combined)).duplicated().to_numpy()[len(base):]
+    if duplicates.any():
+        cleaned_new = cleaned_new.loc[~duplicates]
+        combined = pd.concat([base, cleaned_new], ignore_index=True)
+        cleaning_log['issues_found'].append(f"Found {int(duplicates.sum())} appended rows already in the dataset")
+        cleaning_log['actions_taken'].append(f"Removed {int(duplicates.sum())} previously seen rows")
+        cleaning_log['final_shape'] = cleaned_new.shape
+
+    cleaning_log['incremental'] = {
+        'lineage_id': previous['id'],
+        'previous_rows': previous['rows'],
+        'appended_rows': len(appended),
+    }
+    return combined, cleaning_log, state.merge(DatasetState.from_frame(cleaned_new))
@@ -0,0 +1,110 @@
+"""
+Persistence for incremental re-analysis (incremental.py): DatasetLineage rows hold the
+fingerprint and merged aggregates of each growing dataset, and the cleaned rows seen so
+far are pickled next to them so appended uploads only clean their new rows.
+
+Django models are imported inside the methods, like batch.py, so the engine module can
+be imported without setting up Django.
+"""
+import os
+
+import pandas as pd
+
+from ..utils.log import get_logger
+from .incremental import DatasetState, prefix_digest
+
+log = get_logger(__name__)
+
+
+class LineageStore:
+    """Lineages of one uploader; passed to AnalysisEngine.run(lineages=...)"""
+
+    def __init__(self, uploader_id, directory=None):
+        from django.conf import settings
+        self.uploader_id = uploader_id
+        self.directory = directory or settings.ANALYSIS_LINEAGE_DIR
+        self.keep = settings.ANALYSIS_LINEAGE_KEEP
+
+    def frame_path(self, lineage_id):
+        return os.path.join(self.directory, f"{lineage_id}.pkl")
+
+    def find(self, fingerprint):
+        """
+        Snapshot {'id', 'rows', 'state', 'frame'} of the longest lineage whose rows are a
+        prefix of the fingerprinted table, or None. `frame` is None when the cleaned rows
+        are not on this machine, which makes the engine fall back to a full run.
+        """
+        from ..models import DatasetLineage
+
+        hashes = fingerprint['hashes']
+        candidates = (
+            DatasetLineage.objects
+            .filter(uploader_id=self.uploader_id, columns_digest=fingerprint['columns'], rows__lte=len(hashes))
+            .order_by('-rows')
+            .only('id', 'rows', 'prefix_digest')
+        )
+        for candidate in candidates:
+            if prefix_digest(hashes, candidate.rows) != candidate.prefix_digest:
+                continue
+            lineage = DatasetLineage.objects.get(pk=candidate.pk)
+            try:
+                state = DatasetState.from_dict(lineage.state)
+            except (KeyError, ValueError):
+                log.warning("lineage state unreadable, running full analysis", lineage_id=lineage.pk)
+                return {'id': lineage.pk, 'rows': lineage.rows, 'state': None, 'frame': None}
+            try:
+                frame = pd.read_pickle(self.frame_path(lineage.pk))
+            except FileNotFoundError:
+                frame = None
+            return {'id': lineage.pk, 'rows': lineage.rows, 'state': state, 'frame': frame}
+        return None
+
+    def save(self, lineage, business_data, report):
+        """Create or advance the lineage from a run's result['lineage']; returns its id"""
+        from django.utils import timezone
+
+        from ..models import DatasetLineage
+
+        fields = {
+            'uploader_id': self.uploader_id,
+            'columns_digest': lineage['columns_digest'],
+            'rows': lineage['rows'],
+            'prefix_digest': lineage['prefix_digest'],
+            'state': lineage['state'].to_dict(),
+            'latest_file': business_data,
+            'latest_report': report,
+            'updated_at': timezone.now(),   # update() skips auto_now; prune() keeps the most recent
+        }
+        # The lineage may have been pruned by another upload since find()
+        if lineage['id'] is not None and DatasetLineage.objects.filter(pk=lineage['id']).update(**fields):
+            lineage_id = lineage['id']
+        else:
+            lineage_id = DatasetLineage.objects.create(**fields).pk
+
+        # Write then rename, so a crash never leaves a truncated frame behind
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.frame_path(lineage_id)
+        lineage['frame'].to_pickle(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self.prune()
+        return lineage_id
+
+    def prune(self):
+        """Drop all but the uploader's `keep` most recently analysed lineages, with their frames"""
+        from ..models import DatasetLineage
+
+        stale = list(
+            DatasetLineage.objects
+            .filter(uploader_id=self.uploader_id)
+            .order_by('-updated_at', '-id')
+            .values_list('id', flat=True)[self.keep:]
+        )
+        if not stale:
+            return
+        DatasetLineage.objects.filter(pk__in=stale).delete()
+        for lineage_id in stale:
+            try:
+                os.remove(self.frame_path(lineage_id))
+            except FileNotFoundError:
+                pass
+        log.info("pruned lineages", uploader_id=self.uploader_id, removed=len(stale))
@@ -0,0 +1,217 @@
+import pandas as pd
+import numpy as np
+
+from .rollups import TimeRollups
+
+
+def detect_data_type(df, filename):
+    """Step 3: Detect data type based on column names and content patterns"""
+    columns_lower = [col.lower() for col in df.columns]
+    column_text = ' '.join(columns_lower + [filename.lower()])
+
+    # Define data type indicators
+    data_type_indicators = {
+        'sales': {
+            'keywords': ['product', 'quantity', 'sold', 'price', 'customer', 'store', 'payment', 'category', 'unit_price', 'total_sales'],
+            'score': 0
+        },
+        'financial': {
+            'keywords': ['revenue', 'profit', 'expense', 'cost', 'margin', 'gross', 'net', 'operating', 'cogs', 'opex'],
+            'score': 0
+        },
+        'social_media': {
+            'keywords': ['views', 'likes', 'shares', 'comments', 'engagement', 'platform', 'post', 'content_type', 'followers'],
+            'score': 0
+        }
+    }
+
+    # Calculate scores for each data type
+    for data_type, info in data_type_indicators.items():
+        for keyword in info['keywords']:
+            if keyword in column_text:
+                info['score'] += 1
+
+    # Additional pattern-based detection
+    if any('date' in col and ('sales' in col or 'revenue' in col) for col in columns_lower):
+        data_type_indicators['financial']['score'] += 2
+
+    if any('post_' in col for col in columns_lower):
+        data_type_indicators['social_media']['score'] += 2
+
+    if 'quantity_sold' in columns_lower or 'total_sales' in columns_lower:
+        data_type_indicators['sales']['score'] += 2
+
+    # Determine the data type with highest score
+    best_type = max(data_type_indicators.items(), key=lambda x: x[1]['score'])
+    if best_type[1]['score'] > 0:
+        return best_type[0]
+    else:
+        return 'general'
+
+
+def detect_business_context(df, filename):
+    """Detect business context from column names and filename"""
+
+    # Analyze column names for business context
+    columns_lower = [col.lower() for col in df.columns]
+
+    contexts = {
+        'sales': ['sales', 'revenue', 'price', 'quantity', 'product', 'customer', 'order'],
+        'finance': ['profit', 'loss', 'expense', 'cost', 'budget', 'income', 'balance'],
+        'marketing': ['campaign', 'clicks', 'impressions', 'conversion', 'ctr', 'roi'],
+        'hr': ['employee', 'salary', 'department', 'performance', 'attendance'],
+        'operations': ['production', 'inventory', 'supply', 'demand', 'efficiency'],
+        'customer': ['customer', 'satisfaction', 'feedback', 'rating', 'churn']
+    }
+
+    detected_contexts = []
+    for context, keywords in contexts.items():
+        if any(keyword in ' '.join(columns_lower + [filename.lower()]) for keyword in keywords):
+            detected_contexts.append(context)
+
+    return detected_contexts[0] if detected_contexts else 'general'
+
+
+def detect_trend(df, column, rollups=None):
+    """
+    Detect trend in numeric data
+
+    With `rollups` (rollups.TimeRollups) covering the column, the trend is fitted to its
+    totals per day/week/month instead of to the rows in file order.
+    """
+    if rollups is not None and rollups.has(column):
+        _, y = rollups.get(rollups.auto_freq()).series(column)
+    else:
+        y = df[column].values
+    if len(y) < 3:
+        return 'insufficient_data'
+
+    # Simple trend detection using linear regression slope
+    x = np.arange(len(y))
+
+    # Remove NaN values
+    mask = ~np.isnan(y)
+    if mask.sum() < 3:
+        return 'insufficient_data'
+
+    slope = np.polyfit(x[mask], y[mask], 1)[0]
+
+    if abs(slope) < 0.01:
+        return 'stable'
+    elif slope > 0:
+        return 'increasing'
+    else:
+        return 'decreasing'
+
+
+def detect_time_period(df):
+    """Detect time period in data"""
+    date_cols = []
+    for col in df.columns:
+        if 'date' in col.lower() or 'time' in col.lower():
+            try:
+                pd.to_datetime(df[col])
+                date_cols.append(col)
+            except:
+                pass
+
+    if date_cols:
+        date_col = date_cols[0]
+        dates = pd.to_datetime(df[date_col], errors='coerce').dropna()
+        if len(dates) > 0:
+            return {
+                'start_date': str(dates.min().date()),
+                'end_date': str(dates.max().date()),
+                'duration_days': (dates.max() - dates.min()).days
+            }
+
+    return None
+
+
+def analyze_column_types(df):
+    """AI analysis to detect column purposes from content"""
+
+    analysis = {
+        'date_columns': [],
+        'money_columns': [],
+        'category_columns': []
+    }
+
+    for col in df.columns:
+        col_lower = col.lower()
+        sample_values = df[col].dropna().astype(str).head(10).tolist()
+
+        # DETECT DATE COLUMNS
+        is_date = False
+        if any(keyword in col_lower for keyword in ['date', 'time', 'month', 'year']):
+            try:
+                pd.to_datetime(df[col].head(5))
+                is_date = True
+                analysis['date_columns'].append(col)
+            except:
+                # Try to detect date patterns in string format
+                if any('/' in str(val) or '-' in str(val) for val in sample_values):
+                    is_date = True
+                    analysis['date_columns'].append(col)
+
+        # DETECT MONEY COLUMNS
+        if not is_date:
+            is_money = False
+            if any(keyword in col_lower for keyword in ['money', 'price', 'cost', 'amount', 'revenue', 'sales', 'value']):
+                is_money = True
+            elif df[col].dtype in ['int64', 'float64'] and df[col].min() >= 0:
+                # Positive numeric values likely represent money
+                is_money = True
+
+            if is_money:
+                analysis['money_columns'].append(col)
+
+        # DETECT CATEGORY COLUMNS
+        if not is_date and not is_money:
+            unique_count = df[col].nunique()
+            total_count = len(df[col])
+
+            # If less than 50% unique values, likely categorical
+            if unique_count / total_count < 0.5 and unique_count > 1 and unique_count <= 20:
+                analysis['category_columns'].append(col)
+
+            # Special keywords for categories
+            elif any(keyword in col_lower for keyword in ['type', 'category', 'name', 'kind', 'status']):
+                analysis['category_columns'].append(col)
+
+    return analysis
+
+
+def data_overview(df):
+    """Row/column counts, completeness and covered time period of a cleaned dataset"""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    categorical_cols = df.select_dtypes(include=['object']).columns
+
+    return {
+        'total_rows': int(df.shape[0]),
+        'total_columns': int(df.shape[1]),
+        'numeric_columns': len(numeric_cols),
+        'categorical_columns': len(categorical_cols),
+        'data_completeness': float((1 - df.isnull().sum().sum() / (df.shape[0] * df.shape[1])) * 100),
+        'time_period': detect_time_period(df),
+        'data_size_category': 'Large' if df.shape[0] > 10000 else 'Medium' if df.shape[0] > 1000 else 'Small'
+    }
+
+
+def statistical_summary(df, include_trend=False, rollups=None):
+    """Per numeric column mean/median/std/min/max and coefficient of variation (optionally trend)"""
+    summary = {}
+    if include_trend and rollups is None:
+        rollups = TimeRollups.from_frame(df)
+    for col in df.select_dtypes(include=[np.number]).columns:
+        summary[col] = {
+            'mean': float(df[col].mean()),
+            'median': float(df[col].median()),
+            'std': float(df[col].std()),
+            'min': float(df[col].min()),
+            'max': float(df[col].max()),
+            'cv': float(df[col].std() / df[col].mean() * 100) if df[col].mean() != 0 else 0  # Coefficient of variation
+        }
+        if include_trend:
+            summary[col]['trend'] = detect_trend(df, col, rollups)
+    return summary
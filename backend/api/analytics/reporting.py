@@ -0,0 +1,125 @@
+import os
+import re
+import uuid
+from io import BytesIO
+
+from ..utils.log import get_logger
+
+log = get_logger(__name__)
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+PDF_CONTENT_TYPE = "application/pdf"
+
+
+def upload_cleaned_excel(df_cleaned, original_filename, storage):
+    """Upload cleaned data as Excel file to Supabase"""
+
+    # Create Excel file in memory
+    excel_buffer = BytesIO()
+    df_cleaned.to_excel(excel_buffer, index=False, engine='openpyxl')
+
+    filename_without_ext = os.path.splitext(original_filename)[0]
+    excel_filename = f"cleaned_data/{uuid.uuid4()}_{filename_without_ext}_cleaned.xlsx"
+    return storage.upload(excel_filename, excel_buffer.getvalue(), XLSX_CONTENT_TYPE)
+
+
+def generate_cleaning_report(cleaning_log, filename, storage):
+    """Generate PDF report of cleaning process"""
+    from ..utils.report_generators import CleaningReportGenerator
+    pdf_content = CleaningReportGenerator().create_cleaning_report(cleaning_log, filename)
+
+    pdf_filename = f"reports/{uuid.uuid4()}_cleaning_report.pdf"
+    return storage.upload(pdf_filename, pdf_content, PDF_CONTENT_TYPE)
+
+
+def generate_specialized_pdf(analysis_results, filename, df_cleaned, data_type, storage, rollups=None):
+    """Generate PDF report specialized for the detected data type"""
+    try:
+        from ..utils.report_generators import PDFGenerator
+
+        # Remove any invalid characters for filename
+        data_type_str = re.sub(r'[^a-zA-Z0-9_-]', '_', str(data_type))
+
+        # Pass data type for specialized formatting
+        pdf_content = PDFGenerator(rollups=rollups).create_specialized_analysis_report(
+            analysis_results, filename, df_cleaned, data_type
+        )
+
+        pdf_filename = f"reports/{uuid.uuid4()}_{data_type_str}_analysis_report.pdf"
+        return storage.upload(pdf_filename, pdf_content, PDF_CONTENT_TYPE)
+
+    except Exception as e:
+        log.exception("pdf generation failed", filename=filename)
+        raise Exception(f"Failed to generate specialized PDF: {str(e)}")
+
+
+def generate_specialized_ppt(analysis_results, filename, df_cleaned, data_type, storage, rollups=None):
+    """Generate PowerPoint presentation specialized for the detected data type"""
+    try:
+        from ..utils.report_generators import PPTGenerator
+
+        # Pass data type for specialized formatting
+        ppt_content = PPTGenerator(rollups=rollups).create_specialized_analysis_presentation(
+            analysis_results, filename, df_cleaned, data_type
+        )
+
+        # Sanitize data_type for filename
+        data_type_str = str(data_type).replace(' ', '_')
+        ppt_filename = f"reports/{uuid.uuid4()}_{data_type_str}_analysis_presentation.pptx"
+        return storage.upload(ppt_filename, ppt_content, PPTX_CONTENT_TYPE)
+
+    except Exception as e:
+        log.exception("ppt generation failed", filename=filename)
+        raise Exception(f"Failed to generate specialized PPT: {str(e)}")
+
+
+def generate_analysis_pdf(analysis_results, filename, df_cleaned, storage):
+    """Generate comprehensive PDF analysis report WITH VISUAL CHARTS"""
+    try:
+        from ..utils.report_generators import PDFGenerator
+
+        # Pass the DataFrame to enable chart generation
+        pdf_content = PDFGenerator().create_analysis_report(analysis_results, filename, df_cleaned)
+
+        pdf_filename = f"reports/{uuid.uuid4()}_analysis_report_with_charts.pdf"
+        return storage.upload(pdf_filename, pdf_content, PDF_CONTENT_TYPE)
+
+    except Exception as e:
+        log.exception("pdf generation failed", filename=filename)
+        raise Exception(f"Failed to generate PDF with charts: {str(e)}")
+
+
+def generate_analysis_ppt(analysis_results, filename, df_cleaned, storage):
+    """Generate PowerPoint presentation WITH VISUAL CHARTS"""
+    try:
+        from ..utils.report_generators import PPTGenerator
+
+        # Pass the DataFrame to enable chart generation
+        ppt_content = PPTGenerator().create_analysis_presentation(analysis_results, filename, df_cleaned)
+
+        ppt_filename = f"reports/{uuid.uuid4()}_analysis_presentation_with_charts.pptx"
+        return storage.upload(ppt_filename, ppt_content, PPTX_CONTENT_TYPE)
+
+    except Exception as e:
+        log.exception("ppt generation failed", filename=filename)
+        raise Exception(f"Failed to generate PPT with charts: {str(e)}")
+
+
+def generate_feedback_report(df, column_analysis, feedback_analysis, visualizations, executive_summary,
+                             filename, storage):
+    """Generate comprehensive PDF report with AI-enhanced insights"""
+    try:
+        from ..utils.report_generators import PDFGenerator
+
+        pdf_content = PDFGenerator().create_feedback_report(
+            df, column_analysis, feedback_analysis, visualizations,
+            executive_summary, filename
+        )
+
+        pdf_filename = f"commentsreport/{uuid.uuid4()}_ai_feedback_analysis_report.pdf"
+        return storage.upload(pdf_filename, pdf_content, PDF_CONTENT_TYPE)
+
+    except Exception as e:
+        log.exception("feedback pdf generation failed", filename=filename)
+        raise Exception(f"Failed to generate AI-enhanced PDF: {str(e)}")
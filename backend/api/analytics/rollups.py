@@ -0,0 +1,211 @@
+"""
+Daily / weekly / monthly rollups of a dataset's numeric columns.
+
+Trend charts, growth rates and trend detection all need "sum of column X per period".
+Instead of each of them reparsing the date column and regrouping every row, the dates
+are parsed once and reduced to per-day totals; weeks and months are regrouped from the
+(small) daily arrays on first use:
+
+    rollups = TimeRollups.from_frame(df)          # None without a usable date column
+    monthly = rollups.get('M')
+    labels, revenue = monthly.series('Revenue')
+
+Each Rollup is a handful of numpy arrays (period start days, per-column sums and
+non-null counts, row counts), so it is cheap to keep with the dataset: DatasetState
+stores and merges it for incremental re-analysis (incremental.py).
+"""
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = ('D', 'W', 'M')
+
+# Data spanning more than this many days is charted by month, then by week, else by day
+MONTHLY_AFTER_DAYS = 90
+WEEKLY_AFTER_DAYS = 30
+
+
+def _period_starts(days, freq):
+    """First day (days since 1970-01-01) of the period each day falls in"""
+    if freq == 'D':
+        return days
+    if freq == 'W':
+        # Weeks start on Monday, like pandas' 'W' periods; 1970-01-01 was a Thursday
+        return days - (days + 3) % 7
+    if freq == 'M':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    raise ValueError(f"Unknown rollup frequency {freq!r}")
+
+
+def _group(starts, sums, counts, rows):
+    """Add up rows of the arrays that share a period start"""
+    unique, inverse = np.unique(starts, return_inverse=True)
+    grouped_sums = np.zeros((len(unique), sums.shape[1]))
+    grouped_counts = np.zeros((len(unique), counts.shape[1]), dtype=np.int64)
+    np.add.at(grouped_sums, inverse, sums)
+    np.add.at(grouped_counts, inverse, counts)
+    return unique, grouped_sums, grouped_counts, np.bincount(inverse, weights=rows, minlength=len(unique)).astype(np.int64)
+
+
+class Rollup:
+    """
+    Totals per period at one frequency: `starts` (int64 days since epoch, ascending),
+    `sums` and `counts` (periods x columns, non-null values only) and `rows` per period
+    """
+
+    __slots__ = ('freq', 'starts', 'columns', 'sums', 'counts', 'rows')
+
+    def __init__(self, freq, starts, columns, sums, counts, rows):
+        self.freq = freq
+        self.starts = starts
+        self.columns = list(columns)
+        self.sums = sums
+        self.counts = counts
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.starts)
+
+    def regroup(self, freq):
+        starts, sums, counts, rows = _group(_period_starts(self.starts, freq), self.sums, self.counts, self.rows)
+        return Rollup(freq, starts, self.columns, sums, counts, rows)
+
+    def labels(self):
+        """Period labels as pandas prints Periods: '2024-03-01', '2024-02-26/2024-03-03', '2024-03'"""
+        dates = self.starts.astype('datetime64[D]')
+        if self.freq == 'M':
+            return [str(d) for d in dates.astype('datetime64[M]')]
+        if self.freq == 'W':
+            return [f"{d}/{d + np.timedelta64(6, 'D')}" for d in dates]
+        return [str(d) for d in dates]
+
+    def values(self, column, how='sum'):
+        """Per-period sum (or mean) of `column`, aligned with labels(); NaN where it has no data"""
+        i = self.columns.index(str(column))
+        counts = self.counts[:, i]
+        totals = self.sums[:, i] if how == 'sum' else self.sums[:, i] / np.maximum(counts, 1)
+        return np.where(counts > 0, totals, np.nan)
+
+    def series(self, column, how='sum'):
+        """(labels, values) of only the periods where `column` has data"""
+        values = self.values(column, how)
+        present = ~np.isnan(values)
+        return [label for label, keep in zip(self.labels(), present) if keep], values[present]
+
+    def has(self, column):
+        return str(column) in self.columns
+
+
+class TimeRollups:
+    """Rollups of every numeric column over one date column; weekly/monthly built from daily on demand"""
+
+    def __init__(self, date_column, daily):
+        self.date_column = date_column
+        self._rollups = {'D': daily}
+
+    @classmethod
+    def from_frame(cls, df, date_column=None):
+        """Rollups over `date_column` (default: the first date/time column that parses), or None"""
+        candidates = [date_column] if date_column else [c for c in df.columns
+                                                       if 'date' in str(c).lower() or 'time' in str(c).lower()]
+        for col in candidates:
+            dates = df[col]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates, errors='coerce')
+            if getattr(dates.dt, 'tz', None) is not None:
+                dates = dates.dt.tz_localize(None)
+            days = dates.to_numpy().astype('datetime64[D]')
+            valid = ~np.isnat(days)
+            if valid.any():
+                return cls(str(col), cls._daily(df, days[valid].astype(np.int64), valid))
+        return None
+
+    @staticmethod
+    def _daily(df, days, valid):
+        numeric = [c for c in df.columns
+                   if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        unique, inverse = np.unique(days, return_inverse=True)
+        sums = np.zeros((len(unique), len(numeric)))
+        counts = np.zeros((len(unique), len(numeric)), dtype=np.int64)
+        for j, col in enumerate(numeric):
+            values = df[col].to_numpy(dtype='float64', na_value=np.nan)[valid]
+            present = ~np.isnan(values)
+            sums[:, j] = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=len(unique))
+            counts[:, j] = np.bincount(inverse, weights=present, minlength=len(unique))
+        rows = np.bincount(inverse, minlength=len(unique)).astype(np.int64)
+        return Rollup('D', unique, [str(c) for c in numeric], sums, counts, rows)
+
+    @property
+    def columns(self):
+        return self._rollups['D'].columns
+
+    def has(self, column):
+        return str(column) in self.columns
+
+    def get(self, freq):
+        if freq not in self._rollups:
+            self._rollups[freq] = self._rollups['D'].regroup(freq)
+        return self._rollups[freq]
+
+    @property
+    def span_days(self):
+        starts = self._rollups['D'].starts
+        return int(starts[-1] - starts[0]) if len(starts) else 0
+
+    def auto_freq(self):
+        """Month, week or day depending on how much time the data covers"""
+        if self.span_days > MONTHLY_AFTER_DAYS:
+            return 'M'
+        if self.span_days > WEEKLY_AFTER_DAYS:
+            return 'W'
+        return 'D'
+
+    def merge(self, other):
+        """Rollups of both datasets together (same date column; columns are unioned)"""
+        if other.date_column != self.date_column:
+            return self
+        mine, theirs = self._rollups['D'], other._rollups['D']
+        columns = mine.columns + [c for c in theirs.columns if c not in mine.columns]
+
+        def widen(rollup):
+            sums = np.zeros((len(rollup), len(columns)))
+            counts = np.zeros((len(rollup), len(columns)), dtype=np.int64)
+            for j, col in enumerate(rollup.columns):
+                sums[:, columns.index(col)] = rollup.sums[:, j]
+                counts[:, columns.index(col)] = rollup.counts[:, j]
+            return sums, counts
+
+        (sums_a, counts_a), (sums_b, counts_b) = widen(mine), widen(theirs)
+        starts, sums, counts, rows = _group(
+            np.concatenate([mine.starts, theirs.starts]), np.vstack([sums_a, sums_b]),
+            np.vstack([counts_a, counts_b]), np.concatenate([mine.rows, theirs.rows]),
+        )
+        return TimeRollups(self.date_column, Rollup('D', starts, columns, sums, counts, rows))
+
+    def to_dict(self):
+        daily = self._rollups['D']
+        return {
+            'date_column': self.date_column,
+            'columns': daily.columns,
+            'starts': daily.starts.tolist(),
+            'sums': daily.sums.tolist(),
+            'counts': daily.counts.tolist(),
+            'rows': daily.rows.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        columns, starts = data['columns'], np.asarray(data['starts'], dtype=np.int64)
+        shape = (len(starts), len(columns))
+        return cls(data['date_column'], Rollup(
+            'D', starts, columns,
+            np.asarray(data['sums'], dtype=np.float64).reshape(shape),
+            np.asarray(data['counts'], dtype=np.int64).reshape(shape),
+            np.asarray(data['rows'], dtype=np.int64),
+        ))
+
+
+def rollups_for(df, date_column, rollups=None):
+    """`rollups` when they are over `date_column`, otherwise rollups built from `df` for it"""
+    if rollups is not None and rollups.date_column == str(date_column):
+        return rollups
+    return TimeRollups.from_frame(df, date_column)
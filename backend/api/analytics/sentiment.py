@@ -0,0 +1,350 @@
+"""
+Sentiment of every feedback row, not just a sample.
+
+A lexicon scorer labels the whole column with pandas string/explode operations (no
+per-row Python loop), after collapsing duplicate comments. Only the rows it cannot call
+- mixed praise and complaints, or longer comments with no sentiment words at all - go
+to the LLM, many comments per prompt, several prompts at once, and only until the
+latency budget runs out; whatever the LLM did not get to keeps its lexicon label:
+
+    result = SentimentScorer(llm).score(feedback_texts(df, ['Comment']))
+    result.labels          # 'positive' / 'negative' / 'neutral' per row (NaN: no feedback)
+    result.summary()       # exact percentages, shaped like sentiment_summary
+"""
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from ..utils.log import get_logger
+from .tracing import propagate, span
+
+log = get_logger(__name__)
+
+LABELS = ('positive', 'negative', 'neutral')
+
+# Fill values written by clean_feedback_data; rows holding only these have no feedback
+PLACEHOLDERS = ('No feedback provided', 'No substantive feedback')
+
+# Word polarity on a -3..3 scale
+LEXICON = {
+    **dict.fromkeys([
+        'amazing', 'awesome', 'excellent', 'exceptional', 'fantastic', 'flawless', 'incredible',
+        'love', 'loved', 'loves', 'outstanding', 'perfect', 'superb', 'wonderful', 'brilliant',
+    ], 3.0),
+    **dict.fromkeys([
+        'beautiful', 'best', 'delicious', 'delighted', 'enjoy', 'enjoyed', 'friendly', 'great',
+        'happy', 'impressed', 'impressive', 'liked', 'lovely', 'pleasant', 'pleased',
+        'recommend', 'recommended', 'satisfied', 'thank', 'thanks', 'glad', 'reliable', 'smooth',
+        'tasty', 'fresh', 'fast', 'quick', 'quickly', 'efficient', 'professional', 'courteous',
+        'polite', 'clean', 'comfortable', 'convenient', 'worth', 'affordable', 'easy', 'intuitive',
+    ], 2.0),
+    **dict.fromkeys([
+        'good', 'nice', 'fine', 'helpful', 'better', 'improved', 'decent', 'ok', 'okay', 'fair',
+        'reasonable', 'responsive', 'useful', 'well', 'prompt', 'works', 'worked', 'fixed',
+        'resolved', 'patient', 'kind', 'attentive', 'accurate', 'value',
+    ], 1.0),
+    **dict.fromkeys([
+        'awful', 'horrible', 'terrible', 'worst', 'disgusting', 'hate', 'hated', 'useless',
+        'scam', 'pathetic', 'unacceptable', 'appalling', 'atrocious', 'furious',
+    ], -3.0),
+    **dict.fromkeys([
+        'bad', 'poor', 'rude', 'disappointed', 'disappointing', 'broken', 'dirty', 'slow', 'late',
+        'expensive', 'overpriced', 'angry', 'annoyed', 'annoying', 'frustrated', 'frustrating',
+        'fail', 'failed', 'fails', 'failure', 'waste', 'wasted', 'wrong', 'damaged', 'defective',
+        'unhelpful', 'unprofessional', 'refund', 'cold', 'stale', 'bland', 'unfriendly', 'ignored',
+        'complaint', 'complain', 'complained', 'crash', 'crashed', 'crashes', 'bug', 'buggy',
+        'error', 'errors', 'missing', 'lost', 'cancelled', 'canceled', 'delay', 'delayed',
+    ], -2.0),
+    **dict.fromkeys([
+        'mediocre', 'average', 'confusing', 'confused', 'difficult', 'hard', 'issue', 'issues',
+        'problem', 'problems', 'worse', 'lacking', 'noisy', 'crowded', 'small', 'wait', 'waiting',
+        'unclear', 'inconsistent', 'meh', 'lacks', 'pricey', 'long',
+    ], -1.0),
+}
+
+# Flip (and damp, as VADER does) a sentiment word within NEGATION_WINDOW tokens after these
+NEGATORS = frozenset([
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'neither', 'nor', 'without', 'hardly',
+    "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "weren't", "won't", "wouldn't",
+    "can't", "cannot", "couldn't", "shouldn't", "haven't", "hasn't", "hadn't",
+    'dont', 'doesnt', 'didnt', 'isnt', 'wasnt', 'arent', 'werent', 'wont', 'wouldnt', 'cant',
+    'couldnt', 'shouldnt', 'havent', 'hasnt', 'hadnt',
+])
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.74
+
+# Scale a sentiment word directly after these
+BOOSTERS = {
+    **dict.fromkeys(['very', 'really', 'extremely', 'so', 'super', 'incredibly', 'absolutely',
+                     'totally', 'completely', 'highly', 'truly', 'too'], 1.3),
+    **dict.fromkeys(['slightly', 'somewhat', 'bit', 'kinda', 'fairly', 'rather', 'barely'], 0.7),
+}
+
+# Compound score = total / sqrt(total^2 + ALPHA), in (-1, 1); labels at +-THRESHOLD
+ALPHA = 15.0
+THRESHOLD = 0.05
+
+# Rows the lexicon cannot call: mixed positive and negative words with a compound score
+# below AMBIGUOUS_BELOW, or at least MIN_UNSCORED_WORDS words without any sentiment word
+AMBIGUOUS_BELOW = 0.5
+MIN_UNSCORED_WORDS = 4
+
+# LLM second pass: comments per prompt, prompts in flight, characters kept per comment,
+# and the wall-clock budget (seconds) for the whole scoring run
+LLM_BATCH_SIZE = int(os.getenv('SENTIMENT_LLM_BATCH_SIZE', '50'))
+LLM_WORKERS = int(os.getenv('SENTIMENT_LLM_WORKERS', '4'))
+LLM_MAX_CHARS = 300
+LLM_BUDGET_SECONDS = float(os.getenv('SENTIMENT_LLM_BUDGET_SECONDS', '30'))
+
+# polarity(): rows per chunk, and the smallest input worth starting worker processes for
+CHUNK_ROWS = 100_000
+PARALLEL_MIN_ROWS = 200_000
+
+# A word, as every feedback stage (and api/similar.py) splits lower-cased text
+TOKEN_PATTERN = r"[a-z]+(?:'[a-z]+)?"
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+
+def tokenize(text):
+    """Lower-cased words of one text"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def feedback_texts(df, columns):
+    """One text per row: the row's feedback cells joined, placeholders dropped; NaN when it has none"""
+    joined = None
+    for col in columns:
+        if col not in df.columns:
+            continue
+        cell = df[col].astype('string').str.strip()
+        cell = cell.mask(cell.isin(PLACEHOLDERS) | (cell == ''))
+        joined = cell if joined is None else (joined + '. ' + cell).fillna(joined).fillna(cell)
+    if joined is None:
+        return pd.Series(np.nan, index=df.index, dtype='object')
+    return joined.astype('object').where(joined.notna(), np.nan)
+
+
+def lexicon_scores(texts):
+    """
+    Lexicon scores of unique texts: DataFrame (indexed like `texts`) with the compound
+    `score`, the number of `positive` and `negative` words and the `words` per text
+    """
+    tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    rows = tokens.index
+    grouped = tokens.groupby(level=0, sort=False)
+
+    polarity = tokens.map(LEXICON).fillna(0.0).to_numpy()
+    # Booster directly before the word, negator within the window before it
+    previous = grouped.shift(1)
+    polarity = polarity * previous.map(BOOSTERS).fillna(1.0).to_numpy()
+    negated = np.zeros(len(tokens), dtype=bool)
+    for k in range(1, NEGATION_WINDOW + 1):
+        negated |= grouped.shift(k).isin(NEGATORS).to_numpy()
+    polarity = np.where(negated, polarity * NEGATION_FACTOR, polarity)
+
+    frame = pd.DataFrame({'polarity': polarity, 'positive': polarity > 0, 'negative': polarity < 0}, index=rows)
+    per_text = frame.groupby(level=0, sort=False).sum()
+    words = grouped.size()
+
+    result = pd.DataFrame(index=texts.index)
+    total = per_text['polarity'].reindex(texts.index, fill_value=0.0)
+    result['score'] = total / np.sqrt(total * total + ALPHA)
+    result['positive'] = per_text['positive'].reindex(texts.index, fill_value=0).astype(int)
+    result['negative'] = per_text['negative'].reindex(texts.index, fill_value=0).astype(int)
+    result['words'] = words.reindex(texts.index, fill_value=0).astype(int)
+    return result
+
+
+def _chunk_polarity(texts):
+    """Compound score per text of one chunk, scoring each distinct text once"""
+    codes, uniques = pd.factorize(texts)
+    return lexicon_scores(pd.Series(uniques, dtype='object'))['score'].to_numpy()[codes]
+
+
+def polarity(texts, workers=1, chunk_rows=CHUNK_ROWS):
+    """
+    Compound lexicon score (-1..1) for every entry of a text Series, NaN where missing.
+
+    The Series is scored in chunks of `chunk_rows`; with `workers` > 1 and at least
+    PARALLEL_MIN_ROWS texts the chunks are spread over that many processes.
+    """
+    present = texts.notna().to_numpy()
+    values = texts[present].astype(str)
+    chunks = [values.iloc[i:i + chunk_rows] for i in range(0, len(values), chunk_rows)]
+    if workers > 1 and len(chunks) > 1 and len(values) >= PARALLEL_MIN_ROWS:
+        # spawn, like batch.py: don't fork a Django process with its sockets and threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parts = list(pool.map(_chunk_polarity, chunks))
+    else:
+        parts = [_chunk_polarity(chunk) for chunk in chunks]
+
+    scores = np.full(len(texts), np.nan)
+    scores[present] = np.concatenate(parts) if parts else []
+    return pd.Series(scores, index=texts.index)
+
+
+def label_scores(score):
+    """'positive' / 'negative' / 'neutral' for compound scores"""
+    return np.where(score >= THRESHOLD, 'positive', np.where(score <= -THRESHOLD, 'negative', 'neutral'))
+
+
+def is_ambiguous(scores):
+    """Boolean mask of lexicon_scores rows worth a second opinion from the LLM"""
+    mixed = (scores['positive'] > 0) & (scores['negative'] > 0) & (scores['score'].abs() < AMBIGUOUS_BELOW)
+    unscored = (scores['positive'] + scores['negative'] == 0) & (scores['words'] >= MIN_UNSCORED_WORDS)
+    return mixed | unscored
+
+
+class SentimentResult:
+    """
+    Per-row `labels` (aligned with the scored Series) plus run `stats`, and `groups`: one
+    row per distinct text with its `text`, compound `score`, `label` and `rows` (weight)
+    """
+
+    def __init__(self, labels, groups, stats):
+        self.labels = labels
+        self.groups = groups
+        self.stats = stats
+
+    def counts(self):
+        """Rows per label (group labels weighted by their row counts)"""
+        rows = self.groups.groupby('label')['rows'].sum()
+        return {label: int(rows.get(label, 0)) for label in LABELS}
+
+    def summary(self):
+        """Exact label percentages over rows with feedback, shaped like sentiment_summary"""
+        counts = self.counts()
+        total = sum(counts.values()) or 1
+        positive, negative = counts['positive'], counts['negative']
+        return {
+            'positive_percentage': round(positive / total * 100, 2),
+            'negative_percentage': round(negative / total * 100, 2),
+            'neutral_percentage': round(counts['neutral'] / total * 100, 2),
+            'overall_sentiment': 'positive' if positive > negative else 'negative' if negative > positive else 'neutral',
+            'counts': counts,
+            'rows_scored': sum(counts.values()),
+        }
+
+    def examples(self, label, n=10):
+        """Up to n {'text', 'rows'} with the given label, strongest first, then most frequent"""
+        matching = self.groups[self.groups['label'] == label]
+        strongest = matching.assign(strength=matching['score'].abs()).sort_values(
+            ['strength', 'rows'], ascending=False, kind='stable')
+        return [{'text': text, 'rows': int(rows)} for text, rows in zip(strongest['text'].head(n), strongest['rows'].head(n))]
+
+
+class SentimentScorer:
+    """
+    Labels every row of a text Series. The lexicon pass runs over distinct texts; the LLM
+    (optional, see module docstring) relabels the ambiguous ones within `budget` seconds.
+    """
+
+    def __init__(self, llm=None, batch_size=LLM_BATCH_SIZE, workers=LLM_WORKERS, budget=LLM_BUDGET_SECONDS):
+        self.llm = llm
+        self.batch_size = batch_size
+        self.workers = workers
+        self.budget = budget
+
+    def score(self, texts, groups=None):
+        """
+        SentimentResult for `texts`. With `groups` (dedup.FeedbackGroups of the same texts)
+        one representative per group is scored and its label applies to the whole group;
+        otherwise only texts equal up to case and spacing are scored once.
+        """
+        started = time.monotonic()
+        present = texts.notna().to_numpy()
+        with span('sentiment.lexicon', rows=int(present.sum())):
+            if groups is not None:
+                codes, distinct, weights = groups.codes[present], groups.texts, groups.weights
+            else:
+                values = texts[present].astype(str)
+                codes, uniques = pd.factorize(values.str.strip().str.lower().str.replace(r'\s+', ' ', regex=True))
+                # Score one original spelling per normalised text
+                firsts = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+                distinct = pd.Series(values.iloc[firsts].to_numpy(), dtype='object')
+                weights = np.bincount(codes, minlength=len(uniques))
+            scores = lexicon_scores(distinct.reset_index(drop=True))
+            scores['text'] = distinct.to_numpy()
+            scores['label'] = label_scores(scores['score'].to_numpy())
+            scores['rows'] = weights
+
+        stats = {
+            'rows': int(len(texts)),
+            'rows_with_feedback': int(present.sum()),
+            'unique_texts': int(len(scores)),
+            'ambiguous': 0,
+            'llm_labelled': 0,
+            'llm_batches': 0,
+            'budget_exhausted': False,
+        }
+        if len(scores):
+            ambiguous = scores.index[is_ambiguous(scores)]
+            stats['ambiguous'] = int(len(ambiguous))
+            if len(ambiguous) and self.llm is not None and getattr(self.llm, 'api_key', None):
+                # Most frequent comments first, so an exhausted budget costs the fewest rows
+                ambiguous = scores.loc[ambiguous, 'rows'].sort_values(ascending=False, kind='stable').index
+                relabelled = self._llm_labels(scores.loc[ambiguous, 'text'], started, stats)
+                if relabelled:
+                    scores.loc[list(relabelled), 'label'] = list(relabelled.values())
+                    stats['llm_labelled'] = len(relabelled)
+
+        labels = np.full(len(texts), np.nan, dtype=object)
+        labels[present] = scores['label'].to_numpy()[codes]
+        stats['seconds'] = round(time.monotonic() - started, 3)
+        log.info("sentiment scored", **stats)
+        return SentimentResult(pd.Series(labels, index=texts.index), scores, stats)
+
+    def _llm_labels(self, texts, started, stats):
+        """{unique-text index: label} from batched prompts, stopping at the budget"""
+        deadline = started + self.budget
+        batches = [texts.iloc[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        labels = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            classify = propagate(self._classify)
+            pending = {executor.submit(classify, batch): batch for batch in batches}
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    stats['budget_exhausted'] = True
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    stats['llm_batches'] += 1
+                    try:
+                        labels.update(zip(batch.index, future.result()))
+                    except Exception as e:
+                        log.warning("sentiment batch failed; keeping lexicon labels", size=len(batch), error=e)
+        finally:
+            # Don't wait for prompts still in flight once the budget is spent
+            executor.shutdown(wait=False, cancel_futures=True)
+        return labels
+
+    def _classify(self, batch):
+        comments = [{'id': i, 'text': text[:LLM_MAX_CHARS]} for i, text in enumerate(batch)]
+        prompt = f"""
+        Classify the sentiment of each customer comment as "positive", "negative" or "neutral".
+
+        COMMENTS:
+        {json.dumps(comments, ensure_ascii=False)}
+
+        Return ONLY a JSON array with one label per comment, in the same order, e.g. ["positive", "neutral"].
+        """
+        response_text = self.llm.generate(prompt).strip()
+        if response_text.startswith('```'):
+            response_text = response_text.split('\n', 1)[-1].rsplit('```', 1)[0]
+        labels = json.loads(response_text)
+        if not isinstance(labels, list) or len(labels) != len(batch):
+            raise ValueError(f"expected {len(batch)} labels, got {len(labels) if isinstance(labels, list) else labels!r}")
+        labels = [str(label).strip().lower() for label in labels]
+        if any(label not in LABELS for label in labels):
+            raise ValueError(f"unexpected labels {sorted(set(labels) - set(LABELS))}")
+        return labels
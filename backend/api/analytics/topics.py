@@ -0,0 +1,284 @@
+"""
+Measured feedback categories: every positive and every negative comment is assigned to
+a topic, so category percentages are counts rather than Gemini's reading of a sample.
+
+Distinct comments (dedup.py groups, weighted by their row counts) become sparse TF-IDF
+vectors and are clustered with weighted spherical mini-batch k-means, all in numpy, so
+the cost grows linearly with the number of distinct comments. Gemini is then asked only
+to name each topic from its top terms and closest examples - one prompt, however many
+rows there are:
+
+    topics = cluster_feedback(sentiment)          # sentiment.SentimentResult
+    name_topics(topics, llm)
+    topics['negative'][0]   # {'category', 'rows', 'percentage', 'terms', 'examples', ...}
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from ..utils.log import get_logger
+from .sentiment import TOKEN_PATTERN
+from .tracing import span
+
+log = get_logger(__name__)
+
+# Topics per sentiment, vocabulary size, and rows a term must appear in to count
+MAX_TOPICS = 5
+MAX_FEATURES = 2000
+MIN_ROWS_PER_TERM = 2
+
+# Mini-batch k-means: distinct comments per batch, number of batches, and the sample
+# k-means++ picks the initial centres from
+BATCH_SIZE = 1024
+MAX_BATCHES = 100
+SEED_SAMPLE = 2048
+EXAMPLES_PER_TOPIC = 3
+TERMS_PER_TOPIC = 5
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not
+now of off on once only or other our ours out over own same she should so some such than that the
+their theirs them then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours really get got one even
+much many still thing things way lot
+""".split())
+
+
+class TfidfMatrix:
+    """Rows x terms sparse matrix in CSR form (rows sorted; `indptr` marks each row's entries)"""
+
+    def __init__(self, rows, terms, values, n_rows, vocabulary):
+        self.rows = rows
+        self.terms = terms
+        self.values = values
+        self.n_rows = n_rows
+        self.vocabulary = vocabulary
+        self.indptr = np.searchsorted(rows, np.arange(n_rows + 1))
+
+    def select(self, rows):
+        """(local row, term, value) entries of the given rows, local row = position in `rows`"""
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        local = np.repeat(np.arange(len(rows)), lengths)
+        positions = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths) + np.arange(lengths.sum())
+        return local, self.terms[positions], self.values[positions]
+
+    def similarities(self, centroids, rows=None):
+        """(len(rows), k) dot products of the (unit) rows with the centroids"""
+        rows = np.arange(self.n_rows) if rows is None else rows
+        local, terms, values = self.select(rows)
+        contributions = values[:, None] * centroids[:, terms].T
+        return np.stack([np.bincount(local, weights=contributions[:, j], minlength=len(rows))
+                         for j in range(len(centroids))], axis=1)
+
+
+def tfidf(texts, weights):
+    """L2-normalised TF-IDF of texts; document frequencies count rows (`weights`), not texts"""
+    tokens = texts.reset_index(drop=True).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens[(tokens.str.len() > 2) & ~tokens.isin(STOPWORDS)]
+    counts = pd.DataFrame({'row': tokens.index.to_numpy(), 'term': tokens.to_numpy()}).value_counts(sort=False)
+    rows = counts.index.get_level_values('row').to_numpy()
+    terms = counts.index.get_level_values('term').to_numpy()
+
+    row_frequency = pd.Series(weights[rows], index=terms).groupby(level=0).sum()
+    vocabulary = (row_frequency[row_frequency >= MIN_ROWS_PER_TERM]
+                  .sort_values(ascending=False, kind='stable').head(MAX_FEATURES))
+    term_ids = pd.Series(np.arange(len(vocabulary)), index=vocabulary.index)
+    keep = pd.Index(vocabulary.index).get_indexer(terms) >= 0
+    rows, terms, tf = rows[keep], term_ids.loc[terms[keep]].to_numpy(), counts.to_numpy()[keep].astype(float)
+
+    idf = np.log((1 + weights.sum()) / (1 + vocabulary.to_numpy())) + 1
+    values = tf * idf[terms]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+    values = values / norms[rows]
+    order = np.argsort(rows, kind='stable')
+    return TfidfMatrix(rows[order], terms[order], values[order], len(texts), list(vocabulary.index))
+
+
+def _normalise_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def _dense(matrix, rows):
+    local, terms, values = matrix.select(rows)
+    dense = np.zeros((len(rows), len(matrix.vocabulary)))
+    dense[local, terms] = values
+    return dense
+
+
+def spherical_kmeans(matrix, weights, k, seed=0):
+    """
+    (assignments, centroids): weighted spherical mini-batch k-means (Sculley 2010) over the
+    non-empty rows of `matrix`; rows sharing no term with any centre are assigned -1
+    """
+    rng = np.random.default_rng(seed)
+    candidates = np.flatnonzero(np.diff(matrix.indptr) > 0)
+    assignments = np.full(matrix.n_rows, -1)
+    if not len(candidates) or not k:
+        return assignments, np.zeros((0, len(matrix.vocabulary)))
+    k = min(k, len(candidates))
+    probabilities = weights[candidates] / weights[candidates].sum()
+
+    # k-means++ seeding on a weighted sample
+    sample = rng.choice(candidates, size=min(len(candidates), SEED_SAMPLE), replace=False, p=probabilities)
+    points = _dense(matrix, sample)
+    centroids = [points[rng.choice(len(sample), p=weights[sample] / weights[sample].sum())]]
+    for _ in range(1, k):
+        distance = 1 - np.max(points @ np.array(centroids).T, axis=1)
+        scores = np.clip(distance, 0, None) * weights[sample]
+        if scores.sum() <= 0:
+            break
+        centroids.append(points[rng.choice(len(sample), p=scores / scores.sum())])
+    centroids = np.array(centroids)
+
+    full_batch = len(candidates) <= BATCH_SIZE
+    totals = np.zeros(len(centroids))
+    previous = None
+    for _ in range(MAX_BATCHES):
+        batch = candidates if full_batch else rng.choice(candidates, size=BATCH_SIZE, replace=False, p=probabilities)
+        similarity = matrix.similarities(centroids, batch)
+        nearest = np.where(similarity.max(axis=1) > 0, np.argmax(similarity, axis=1), -1)
+        local, terms, values = matrix.select(batch)
+        counted = nearest[local] >= 0
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, (nearest[local][counted], terms[counted]), (values * weights[batch][local])[counted])
+        batch_weights = np.bincount(nearest[nearest >= 0], weights=weights[batch][nearest >= 0], minlength=len(centroids))
+        if full_batch:
+            updated = np.where(batch_weights[:, None] > 0, sums, centroids)
+        else:
+            totals += batch_weights
+            rate = np.divide(batch_weights, totals, out=np.zeros_like(totals), where=totals > 0)[:, None]
+            updated = (1 - rate) * centroids + rate * (sums / np.maximum(batch_weights, 1e-12)[:, None])
+        centroids = _normalise_rows(updated)
+        if full_batch:
+            if previous is not None and np.array_equal(nearest, previous):
+                break
+            previous = nearest
+
+    similarity = matrix.similarities(centroids, candidates)
+    # Rows sharing no term with any centre are left unassigned rather than forced in
+    assignments[candidates] = np.where(similarity.max(axis=1) > 0, np.argmax(similarity, axis=1), -1)
+    return assignments, centroids
+
+
+def cluster_texts(texts, weights, k=MAX_TOPICS, seed=0):
+    """
+    Topics of weighted texts, largest first: dicts with 'rows', 'percentage' (of all
+    rows), 'terms', 'examples' (closest to the centre) and 'members' (text positions).
+    Texts sharing no term with any topic form a final 'other' topic.
+    """
+    texts = texts.reset_index(drop=True)
+    weights = np.asarray(weights, dtype=float)
+    matrix = tfidf(texts, weights)
+    assignments, centroids = spherical_kmeans(matrix, weights, k, seed)
+    total = weights.sum() or 1
+
+    topics = []
+    similarity = matrix.similarities(centroids) if len(centroids) else np.zeros((len(texts), 0))
+    for cluster in range(len(centroids)):
+        members = np.flatnonzero(assignments == cluster)
+        if not len(members):
+            continue
+        closest = members[np.argsort(-similarity[members, cluster], kind='stable')]
+        topics.append({
+            'rows': int(weights[members].sum()),
+            'percentage': round(float(weights[members].sum() / total * 100), 2),
+            'terms': [matrix.vocabulary[t] for t in np.argsort(-centroids[cluster])[:TERMS_PER_TOPIC]
+                      if centroids[cluster, t] > 0],
+            'examples': texts.iloc[closest[:EXAMPLES_PER_TOPIC]].tolist(),
+            'members': members,
+        })
+    unassigned = np.flatnonzero(assignments < 0)
+    topics.sort(key=lambda topic: -topic['rows'])
+    if len(unassigned):
+        topics.append({
+            'rows': int(weights[unassigned].sum()),
+            'percentage': round(float(weights[unassigned].sum() / total * 100), 2),
+            'terms': [],
+            'examples': texts.iloc[unassigned[np.argsort(-weights[unassigned], kind='stable')][:EXAMPLES_PER_TOPIC]].tolist(),
+            'members': unassigned,
+            'other': True,
+        })
+    return topics
+
+
+def cluster_feedback(sentiment, labels=('positive', 'negative'), k=MAX_TOPICS):
+    """{label: topics} over the distinct texts of a SentimentResult; percentages are of that label's rows"""
+    topics = {}
+    for label in labels:
+        texts = sentiment.groups[sentiment.groups['label'] == label]
+        with span('topics.cluster', label=label, texts=len(texts)):
+            topics[label] = cluster_texts(texts['text'], texts['rows'].to_numpy(), k) if len(texts) else []
+        for topic in topics[label]:
+            # Positions in the SentimentResult groups, for per-row assignments
+            topic['members'] = texts.index.to_numpy()[topic['members']]
+    log.info("feedback topics", **{label: len(found) for label, found in topics.items()})
+    return topics
+
+
+def fallback_name(topic):
+    if topic.get('other'):
+        return 'Other'
+    return ' / '.join(term.title() for term in topic['terms'][:3]) or 'General'
+
+
+def name_topics(topics, llm):
+    """Ask Gemini once for a category name and themes per topic; falls back to top terms"""
+    listing = [
+        {'id': f"{label}-{i}", 'sentiment': label, 'top_terms': topic['terms'], 'examples': topic['examples']}
+        for label, found in topics.items() for i, topic in enumerate(found) if not topic.get('other')
+    ]
+    names = {}
+    if listing and getattr(llm, 'api_key', None):
+        prompt = f"""
+        Name each customer feedback topic below. Topics were found by clustering every comment;
+        you see each topic's most characteristic words and comments.
+
+        TOPICS:
+        {json.dumps(listing, indent=2, ensure_ascii=False)}
+
+        Return ONLY a JSON object mapping each topic id to
+        {{"category": "2-4 word name", "themes": ["string", "string"]}}
+        """
+        try:
+            response_text = llm.generate(prompt).strip()
+            if response_text.startswith('```'):
+                response_text = response_text.split('\n', 1)[-1].rsplit('```', 1)[0]
+            names = json.loads(response_text)
+        except Exception as e:
+            log.warning("topic naming failed; using top terms", error=e)
+            names = {}
+
+    for label, found in topics.items():
+        for i, topic in enumerate(found):
+            named = names.get(f"{label}-{i}") if isinstance(names, dict) else None
+            named = named if isinstance(named, dict) else {}
+            topic['category'] = str(named.get('category') or fallback_name(topic))
+            themes = named.get('themes')
+            topic['themes'] = [str(theme) for theme in themes] if isinstance(themes, list) else topic['terms'][:3]
+    return topics
+
+
+def as_categories(topics, label):
+    """Topics in the {positive,negative}_feedback_analysis.categories shape (plus 'rows')"""
+    themes_key = 'key_themes' if label == 'positive' else 'key_issues'
+    return [{
+        'category': topic.get('category') or fallback_name(topic),
+        'percentage': topic['percentage'],
+        'rows': topic['rows'],
+        'examples': topic['examples'],
+        themes_key: topic.get('themes', topic['terms'][:3]),
+    } for topic in topics.get(label, [])]
+
+
+def row_topics(topics, sentiment, groups):
+    """Category name per row, from the SentimentResult scored over dedup `groups`"""
+    names = np.full(len(sentiment.groups), np.nan, dtype=object)
+    for found in topics.values():
+        for topic in found:
+            names[topic['members']] = topic.get('category') or fallback_name(topic)
+    return groups.expand(names)
@@ -0,0 +1,199 @@
+"""
+Lightweight tracing for the analysis pipelines.
+
+A Tracer collects spans (wall time, CPU time, RSS delta, bytes transferred) for one run.
+Activate it around the run and wrap stages with `span(name)`; the clients and chart helpers
+open their own nested spans, and everything is a no-op when no tracer is active.
+Work handed to a thread pool goes through `propagate(fn)` so its spans nest under the caller's.
+
+`Tracer.as_dict()` is what gets stored with a report (processed_data['timings']), and
+`chrome_trace()` turns that back into a Chrome/Perfetto trace file for offline analysis.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('analytics_tracer', default=None)
+# Open spans, innermost last; a tuple so a copied context can't change the caller's
+_open = contextvars.ContextVar('analytics_open_spans', default=())
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """Current resident set size; falls back to the peak where /proc isn't available"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+class Span:
+    __slots__ = ('name', 'depth', 'start', 'wall', 'cpu', 'rss_delta', 'bytes', 'attrs')
+
+    def __init__(self, name, depth=0, attrs=None):
+        self.name = name
+        self.depth = depth
+        self.start = self.wall = self.cpu = 0.0
+        self.rss_delta = 0
+        self.bytes = 0
+        self.attrs = attrs or {}
+
+    def as_dict(self):
+        data = {
+            'name': self.name,
+            'depth': self.depth,
+            'start_ms': round(self.start * 1000, 3),
+            'wall_ms': round(self.wall * 1000, 3),
+            'cpu_ms': round(self.cpu * 1000, 3),
+            'rss_delta_kb': self.rss_delta // 1024,
+            'bytes': self.bytes,
+        }
+        if self.attrs:
+            data['attrs'] = self.attrs
+        return data
+
+
+class Tracer:
+    """Spans for one pipeline run, in the order they started"""
+
+    def __init__(self, name='analysis'):
+        self.name = name
+        self.spans = []
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = _open.get()
+        span = Span(name, depth=len(stack), attrs=attrs)
+        with self._lock:
+            self.spans.append(span)
+        token = _open.set(stack + (span,))
+        rss, cpu, start = rss_bytes(), time.thread_time(), time.perf_counter()
+        span.start = start - self._origin
+        try:
+            yield span
+        finally:
+            span.wall = time.perf_counter() - start
+            span.cpu = time.thread_time() - cpu
+            span.rss_delta = rss_bytes() - rss
+            _open.reset(token)
+
+    @contextmanager
+    def activate(self):
+        """Make this the tracer `span()` records into for the current thread/context"""
+        token, spans = _current.set(self), _open.set(())
+        try:
+            yield self
+        finally:
+            _open.reset(spans)
+            _current.reset(token)
+
+    def stage_seconds(self):
+        """{stage: seconds} for the top-level spans, summed by name"""
+        stages = {}
+        for span in self.spans:
+            if span.depth == 0:
+                stages[span.name] = stages.get(span.name, 0.0) + span.wall
+        return stages
+
+    def as_dict(self):
+        """JSON-ready timings: per-stage totals plus the full span list"""
+        stages = {}
+        for span in self.spans:
+            if span.depth != 0:
+                continue
+            stage = stages.setdefault(span.name, {'wall_ms': 0.0, 'cpu_ms': 0.0, 'rss_delta_kb': 0, 'bytes': 0})
+            stage['wall_ms'] = round(stage['wall_ms'] + span.wall * 1000, 3)
+            stage['cpu_ms'] = round(stage['cpu_ms'] + span.cpu * 1000, 3)
+            stage['rss_delta_kb'] += span.rss_delta // 1024
+            # Bytes are recorded where they move (downloads, uploads, LLM calls), so roll them up
+            stage['bytes'] += span.bytes
+        for span, parent in self._top_level_ancestors():
+            stages[parent.name]['bytes'] += span.bytes
+        return {
+            'name': self.name,
+            'started_at': self.started_at,
+            'total_ms': round((time.perf_counter() - self._origin) * 1000, 3),
+            'stages': stages,
+            'spans': [span.as_dict() for span in self.spans],
+        }
+
+    def _top_level_ancestors(self):
+        """(nested span, its top-level span) pairs"""
+        parent = None
+        for span in self.spans:
+            if span.depth == 0:
+                parent = span
+            elif parent is not None:
+                yield span, parent
+
+
+def current():
+    return _current.get()
+
+
+def span(name, **attrs):
+    """Span on the active tracer, or a throwaway one when tracing is off"""
+    tracer = _current.get()
+    if tracer is None:
+        return _untraced(name, attrs)
+    return tracer.span(name, **attrs)
+
+
+def propagate(fn):
+    """
+    `fn` for a thread pool: each call runs in a copy of the caller's context, so its spans
+    land in the caller's tracer nested under the span that was open at the time.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so copy it per call
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+@contextmanager
+def _untraced(name, attrs):
+    yield Span(name, attrs=attrs)
+
+
+def chrome_trace(timings, pid=1, tid=1):
+    """Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev) from stored timings"""
+    origin_us = timings.get('started_at', 0) * 1_000_000
+    events = [{
+        'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+        'args': {'name': timings.get('name', 'analysis')},
+    }]
+    for span in timings.get('spans', []):
+        events.append({
+            'name': span['name'],
+            'cat': 'analytics',
+            'ph': 'X',
+            'ts': origin_us + span['start_ms'] * 1000,
+            'dur': span['wall_ms'] * 1000,
+            'pid': pid,
+            'tid': tid,
+            'args': {
+                'cpu_ms': span['cpu_ms'],
+                'rss_delta_kb': span['rss_delta_kb'],
+                'bytes': span['bytes'],
+                **span.get('attrs', {}),
+            },
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
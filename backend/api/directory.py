@@ -0,0 +1,140 @@
+import difflib
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Department, Employee
+
+DIRECTORY_CACHE_KEY = "directory:snapshot"
+DIRECTORY_VERSION_KEY = "directory:version"
+
+
+def normalise_name(name):
+    """Case/punctuation-insensitive form used for name matching ("Tan, Wei Ming " -> "tan wei ming")"""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(name or "")).casefold().split())
+
+
+class DirectorySnapshot:
+    """Immutable id <-> name lookups for employees and departments"""
+
+    def __init__(self, employees, departments, version):
+        # employees: {employee_id: employee_name}, departments: {department_id: department_name}
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.employees = {str(k): v for k, v in employees.items()}
+        self.departments = {str(k): v for k, v in departments.items()}
+        self._ids_by_name = {}
+        for employee_id, name in self.employees.items():
+            self._ids_by_name.setdefault(normalise_name(name), employee_id)
+        self._names = list(self._ids_by_name)
+
+    def employee_name(self, employee_id, default=None):
+        return self.employees.get(str(employee_id).strip(), default)
+
+    def department_name(self, department_id, default=None):
+        return self.departments.get(str(department_id).strip(), default)
+
+    def employee_names(self, ids):
+        """Names for a comma separated id string or iterable, skipping unknown ids"""
+        if isinstance(ids, str):
+            ids = ids.split(",")
+        return [name for name in (self.employee_name(i) for i in ids or [] if str(i).strip()) if name]
+
+    def department_names(self, ids):
+        if isinstance(ids, str):
+            ids = ids.split(",")
+        return [name for name in (self.department_name(i) for i in ids or [] if str(i).strip()) if name]
+
+    def match_employee(self, name, cutoff=None):
+        """
+        Resolve a free-text (e.g. Gemini-produced) name to an employee id, or None.
+
+        Tries an exact normalised match, then a unique match on all given name parts
+        ("Wei Ming" -> "Tan Wei Ming"), then the closest spelling above `cutoff`.
+        """
+        query = normalise_name(name)
+        if not query:
+            return None
+        if query in self._ids_by_name:
+            return int(self._ids_by_name[query])
+
+        tokens = set(query.split())
+        partial = [n for n in self._names if tokens <= set(n.split())]
+        if len(partial) == 1:
+            return int(self._ids_by_name[partial[0]])
+
+        if cutoff is None:
+            cutoff = getattr(settings, 'DIRECTORY_MATCH_CUTOFF', 0.8)
+        close = difflib.get_close_matches(query, self._names, n=1, cutoff=cutoff)
+        return int(self._ids_by_name[close[0]]) if close else None
+
+
+class EmployeeDirectory:
+    """
+    Process-wide employee/department directory, loaded once and rebuilt after writes.
+
+    api/signals.py calls invalidate() on Employee/Department saves and deletes. When
+    DIRECTORY_SHARED_CACHE is on (default when REDIS_URL is set) the snapshot and its
+    version also live in Django's cache, so one worker's write refreshes every worker
+    and a new worker starts without querying the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @property
+    def shared(self):
+        return getattr(settings, 'DIRECTORY_SHARED_CACHE', False)
+
+    def get(self):
+        """Current snapshot; take it once per request and reuse it for all lookups"""
+        snapshot = self._snapshot
+        if self.shared:
+            version = cache.get(DIRECTORY_VERSION_KEY)
+            if snapshot is not None and version == snapshot.version:
+                return snapshot
+            with self._lock:
+                snapshot = self._load_shared(version)
+                self._snapshot = snapshot
+            return snapshot
+
+        # Without a shared cache other workers' writes are only seen once the snapshot ages out
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > settings.REFERENCE_CACHE_TIMEOUT:
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._snapshot = self._load(uuid.uuid4().hex)
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+        if self.shared:
+            cache.delete_many([DIRECTORY_CACHE_KEY, DIRECTORY_VERSION_KEY])
+
+    def _load_shared(self, version):
+        cached = cache.get(DIRECTORY_CACHE_KEY)
+        if version is not None and cached is not None and cached["version"] == version:
+            return DirectorySnapshot(cached["employees"], cached["departments"], version)
+
+        snapshot = self._load(uuid.uuid4().hex)
+        timeout = settings.REFERENCE_CACHE_TIMEOUT
+        cache.set(DIRECTORY_CACHE_KEY, {
+            "version": snapshot.version,
+            "employees": snapshot.employees,
+            "departments": snapshot.departments,
+        }, timeout=timeout)
+        cache.set(DIRECTORY_VERSION_KEY, snapshot.version, timeout=timeout)
+        return snapshot
+
+    def _load(self, version):
+        employees = dict(Employee.objects.values_list('employee_id', 'employee_name'))
+        departments = dict(Department.objects.values_list('department_id', 'department_name'))
+        return DirectorySnapshot(employees, departments, version)
+
+
+directory = EmployeeDirectory()
@@ -0,0 +1,58 @@
+"""
+In-process background jobs for work too slow to run inside a request.
+
+Jobs run on process-wide thread pools, so at most a pool's size run at once however many
+are submitted: "default" (settings.BACKGROUND_JOB_WORKERS threads) for complaint intake,
+and "bulk" (settings.BULK_JOB_WORKERS) for long runs such as batch analysis and bulk
+re-summarisation, so those never hold up intake. A job is queued only when the submitting
+request's transaction commits, so it never looks for a row that isn't committed yet, and
+it closes its own database connection when it ends.
+
+Jobs live in memory. Work still queued or running when the process stops is lost; a new
+server process requeues interrupted complaint intake (transcript.recover_interrupted_intake);
+an interrupted analysis batch is resumed from its journal with `analyse_batch --resume`.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import metrics
+from .utils.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT = 'default'
+BULK = 'bulk'
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def _executor(pool):
+    with _pool_lock:
+        if pool not in _pools:
+            from django.conf import settings
+            workers = {DEFAULT: settings.BACKGROUND_JOB_WORKERS, BULK: settings.BULK_JOB_WORKERS}[pool]
+            _pools[pool] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'job-{pool}')
+        return _pools[pool]
+
+
+def _run(name, fn, args):
+    from django.db import connection
+    try:
+        fn(*args)
+    except Exception:
+        log.exception("background job failed", job=name)
+    finally:
+        metrics.BACKGROUND_JOBS.labels(name).dec()
+        connection.close()
+
+
+def submit(name, fn, *args, pool=DEFAULT):
+    """Run fn(*args) on `pool` once the current transaction (if any) commits"""
+    from django.db import transaction
+
+    def enqueue():
+        metrics.BACKGROUND_JOBS.labels(name).inc()
+        _executor(pool).submit(_run, name, fn, args)
+
+    transaction.on_commit(enqueue)
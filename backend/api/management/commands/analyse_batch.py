@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.analytics.batch import create_batch, run_batch, select_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the business data analysis over many BusinessData files in a process pool. "
+        "Select files by id and/or filter, or pass --resume BATCH_ID to continue an "
+        "interrupted batch from its journal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file_ids', nargs='*', help='BusinessData ids to analyse')
+        parser.add_argument('--uploader', type=int, help='Only files uploaded by this employee id')
+        parser.add_argument('--created-after', help='Only files uploaded on/after this date (YYYY-MM-DD)')
+        parser.add_argument('--created-before', help='Only files uploaded before this date (YYYY-MM-DD)')
+        parser.add_argument('--unprocessed', action='store_true', help='Skip files that already have a report')
+        parser.add_argument('--analysis-type', default='full_analysis')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Concurrent worker processes (defaults to ANALYSIS_BATCH_WORKERS)')
+        parser.add_argument('--resume', metavar='BATCH_ID', help='Continue a previous batch')
+        parser.add_argument('--dry-run', action='store_true', help='List the selected files and exit')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            batch_id = options['resume']
+        else:
+            if not (options['file_ids'] or options['uploader'] or options['created_after']
+                    or options['created_before'] or options['unprocessed']):
+                raise CommandError("Pass file ids, a filter (--uploader/--created-after/--created-before/"
+                                   "--unprocessed) or --resume BATCH_ID")
+            files = select_files(
+                file_ids=options['file_ids'], uploader=options['uploader'],
+                created_after=options['created_after'], created_before=options['created_before'],
+                unprocessed=options['unprocessed'],
+            )
+            file_ids = list(files.values_list('id', flat=True))
+            if options['dry_run']:
+                for name in files.values_list('fileName', flat=True):
+                    self.stdout.write(f"  {name}")
+                self.stdout.write(f"{len(file_ids)} files selected")
+                return
+            if not file_ids:
+                raise CommandError("No files match the selection")
+            batch_id = create_batch(file_ids, options['analysis_type'])
+            self.stdout.write(f"batch {batch_id} created; resume with --resume {batch_id}")
+
+        try:
+            summary = run_batch(batch_id, workers=options['workers'], log=self.stdout.write)
+        except FileNotFoundError:
+            raise CommandError(f"No journal for batch {batch_id}")
+
+        self.stdout.write(
+            f"\n{summary['ok']} ok, {summary['failed']} failed, {summary['pending']} pending "
+            f"of {summary['total']}  ({summary['files_per_min'] or 0:.1f} files/min)"
+        )
+        for stage, stats in summary['stages'].items():
+            self.stdout.write(f"  {stage:9} p50 {stats['p50']:8.2f} s  p95 {stats['p95']:8.2f} s  (n={stats['count']})")
+
+        style = self.style.SUCCESS if not summary['pending'] else self.style.WARNING
+        self.stdout.write(style("done" if not summary['pending'] else f"re-run with --resume {batch_id} to retry"))
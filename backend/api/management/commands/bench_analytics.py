@@ -0,0 +1,96 @@
+import json
+import platform
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.analytics.benchmark import DATASETS, run_benchmark, run_sentiment_benchmark
+
+
+def parse_size(value):
+    """'1k' -> 1000, '1m' -> 1000000"""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the analysis, feedback and report pipelines on synthetic sales, financial, "
+        "social-media and feedback datasets with Gemini and Supabase replaced by local fakes. "
+        "Reports seconds and peak traced memory per stage as JSON (--output) that can be "
+        "diffed between commits (--compare)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--datasets', default=','.join(DATASETS), help=f"Comma-separated subset of {DATASETS}")
+        parser.add_argument('--sizes', default='1k,100k,1m', help='Comma-separated row counts, e.g. 1k,100k,1m')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip tracemalloc (it slows allocation-heavy stages down considerably)')
+        parser.add_argument('--sentiment', metavar='SIZES',
+                            help='Instead: benchmark feedback sentiment scoring on this many synthetic comments, '
+                                 'e.g. 100k,1m (the TextBlob loop vs the vectorised scorer)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='With --sentiment: also time the vectorised scorer across this many processes')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--compare', help='Baseline JSON from a previous run to diff against')
+
+    def handle(self, *args, **options):
+        kinds = [kind.strip() for kind in options['datasets'].split(',') if kind.strip()]
+        unknown = set(kinds) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+        sizes = [parse_size(size) for size in options['sizes'].split(',') if size.strip()]
+
+        if options['sentiment']:
+            sizes = [parse_size(size) for size in options['sentiment'].split(',') if size.strip()]
+            results = run_sentiment_benchmark(sizes, workers=options['workers'], seed=options['seed'],
+                                              log=self.stdout.write)
+        else:
+            results = run_benchmark(kinds, sizes, seed=options['seed'], trace_memory=not options['no_memory'],
+                                    log=self.stdout.write)
+
+        report = {
+            'meta': {
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': options['seed'],
+                'tracemalloc': not options['no_memory'],
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(f"wrote {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            self.compare(baseline, report)
+
+    def compare(self, baseline, report):
+        self.stdout.write(f"\nvs {baseline['meta'].get('commit') or baseline['meta'].get('timestamp')}:")
+        for key, current in report['results'].items():
+            before = baseline['results'].get(key)
+            if not before:
+                continue
+            time_ratio = current['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+            memory_delta = current['peak_mb'] - before['peak_mb']
+            line = f"  {key:32} {time_ratio:6.2f}x time  {memory_delta:+9.1f} MB"
+            style = self.style.ERROR if time_ratio > 1.1 else self.style.SUCCESS if time_ratio < 0.9 else str
+            self.stdout.write(style(line))
@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.models import Department
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request DB latency with fresh connections (CONN_MAX_AGE=0) versus the "
+        "configured persistent connections. Point DB_HOST/DB_PORT/DB_POOL_MODE at a local "
+        "Postgres stand-in to benchmark without touching Supabase."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Simulated requests per configuration')
+        parser.add_argument('--queries', type=int, default=2, help='Queries issued per simulated request')
+        parser.add_argument('--conn-max-age', type=int, default=None,
+                            help='CONN_MAX_AGE for the "after" run (defaults to the configured value)')
+
+    def handle(self, *args, **options):
+        configured = dict(connection.settings_dict)
+        after_max_age = options['conn_max_age']
+        if after_max_age is None:
+            after_max_age = configured['CONN_MAX_AGE'] or 60
+
+        self.stdout.write(
+            f"Target {configured['HOST']}:{configured['PORT']} "
+            f"({options['requests']} requests x {options['queries']} queries)"
+        )
+        try:
+            before = self.run(options, conn_max_age=0, health_checks=False)
+            after = self.run(options, conn_max_age=after_max_age,
+                             health_checks=configured.get('CONN_HEALTH_CHECKS', False))
+        finally:
+            connection.close()
+            connection.settings_dict.update(
+                CONN_MAX_AGE=configured['CONN_MAX_AGE'],
+                CONN_HEALTH_CHECKS=configured.get('CONN_HEALTH_CHECKS', False),
+            )
+
+        self.report("before (CONN_MAX_AGE=0)", before)
+        self.report(f"after  (CONN_MAX_AGE={after_max_age})", after)
+        speedup = statistics.mean(before) / statistics.mean(after) if statistics.mean(after) else float('inf')
+        self.stdout.write(self.style.SUCCESS(f"mean per-request speedup: {speedup:.1f}x"))
+
+    def run(self, options, conn_max_age, health_checks):
+        connection.close()
+        connection.settings_dict.update(CONN_MAX_AGE=conn_max_age, CONN_HEALTH_CHECKS=health_checks)
+
+        samples = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            # Same lifecycle as a real request: close_old_connections runs on both signals
+            signals.request_started.send(sender=self.__class__)
+            for _ in range(options['queries']):
+                list(Department.objects.values_list('department_id', flat=True)[:1])
+            signals.request_finished.send(sender=self.__class__)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    def report(self, label, samples):
+        self.stdout.write(
+            f"{label}: mean {statistics.mean(samples):7.2f} ms  "
+            f"p50 {percentile(samples, 50):7.2f} ms  p95 {percentile(samples, 95):7.2f} ms"
+        )
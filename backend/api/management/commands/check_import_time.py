@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Must not be imported just by loading the URLconf; they belong to the analysis,
+# reporting and transcription paths and are loaded on first use there. (`requests` is
+# not listed: rest_framework.compat imports it whenever it is installed.)
+HEAVY_MODULES = (
+    'pandas', 'numpy', 'matplotlib', 'seaborn', 'google.generativeai', 'supabase',
+    'azure.cognitiveservices.speech', 'docx', 'reportlab', 'pptx',
+)
+
+# What a worker does at boot: set up Django and resolve every route
+BOOT_SCRIPT = "import django; django.setup(); import mysite.urls"
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from `python -X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [f.strip() for f in line[len("import time:"):].split("|")]
+        if not fields[0].isdigit():
+            continue  # header row
+        modules[fields[2]] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the URLconf in a fresh interpreter with -X importtime and fail if any of the "
+        "heavy analysis/SDK modules are loaded, or if boot takes longer than --max-ms"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-ms', type=float, default=None, help='Fail if total import time exceeds this')
+        parser.add_argument('--top', type=int, default=15, help='Show the N slowest modules (cumulative)')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'mysite.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Boot script failed:\n{result.stderr[-2000:]}")
+
+        modules = parse_importtime(result.stderr)
+        total_ms = sum(self_us for self_us, _ in modules.values()) / 1000
+
+        self.stdout.write(f"{len(modules)} modules imported in {total_ms:.1f} ms")
+        slowest = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)[:options['top']]
+        for name, (_, cumulative_us) in slowest:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        loaded = sorted(
+            name for name in HEAVY_MODULES
+            if any(m == name or m.startswith(name + '.') for m in modules)
+        )
+        failures = [f"heavy modules imported at boot: {', '.join(loaded)}"] if loaded else []
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            failures.append(f"import time {total_ms:.1f} ms exceeds {options['max_ms']:.1f} ms")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("ok: heavy modules are loaded lazily"))
@@ -0,0 +1,191 @@
+import json
+import tempfile
+import uuid
+from datetime import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api import transcript, urls as api_urls
+from api.analytics.batch import create_batch
+from api.directory import directory
+from api.models import (
+    Task, BusinessData, ProcessedReport, Meeting, Employee, Department, MeetingFile, Complaint, CommentReport
+)
+from api.query_budgets import QUERY_BUDGETS
+from api.resummarise import save_report
+from api.utils.query_counter import QueryCounter
+
+
+# Endpoints that call Gemini, Azure or Supabase, or write files under MEDIA_ROOT.
+# Their budgets are still enforced at runtime by QueryCountMiddleware. The meeting
+# transcript and approval run with Azure and Gemini replaced by canned results.
+SKIPPED = {
+    'process-file': 'calls Gemini and Supabase',
+    'process-file-batch': 'starts a background analysis batch',
+    'analyse-comment': 'calls Gemini and Supabase',
+    'complaint-upload': 'calls Azure speech and Gemini',
+    'complaint-ai-update': 'calls Gemini',
+    'complaint-resummarise': 'starts a background Gemini run',
+    'upload-meeting-files': 'writes audio files under MEDIA_ROOT',
+}
+
+
+TRANSCRIPT = "Budget Check 0 will send the report by Friday."
+MEETING_SUMMARY = {
+    "summary": ["Budget check meeting."],
+    "tasks": {"Budget Check 0": [{
+        "task_title": "Send the report", "task_content": "Budget check task",
+        "urgent_level": "medium", "deadline": None,
+    }]},
+}
+
+
+class Command(BaseCommand):
+    help = "Request every api/ URL against seeded data and fail if any exceeds its query budget"
+
+    def handle(self, *args, **options):
+        url_names = {p.name for p in api_urls.urlpatterns if p.name}
+        missing = sorted(url_names - set(QUERY_BUDGETS))
+        if missing:
+            raise CommandError(f"URLs without a query budget in api/query_budgets.py: {', '.join(missing)}")
+
+        failures = []
+        # Batch journals, run reports, transcripts and summary PDFs go to scratch directories
+        with transaction.atomic(), tempfile.TemporaryDirectory() as batch_dir, \
+                tempfile.TemporaryDirectory() as media_root, \
+                override_settings(ANALYSIS_BATCH_DIR=batch_dir, RESUMMARISE_REPORT_DIR=batch_dir,
+                                  MEDIA_ROOT=media_root), \
+                mock.patch.object(transcript, 'azure_transcribe', return_value=TRANSCRIPT), \
+                mock.patch.object(transcript, 'get_meeting_summary_and_tasks', return_value=MEETING_SUMMARY):
+            fixtures = self.seed()
+            client = Client()
+
+            for name, method, kwargs, data in self.requests(fixtures):
+                url = reverse(name, kwargs=kwargs)
+                with QueryCounter() as counter:
+                    if method == 'patch':
+                        response = client.patch(url, data=data, content_type='application/json')
+                    elif method == 'post':
+                        response = client.post(url, data=json.dumps(data or {}), content_type='application/json')
+                    else:
+                        response = client.get(url, data=data)
+
+                budget = QUERY_BUDGETS[name]
+                line = f"{name:28} {method.upper():5} {response.status_code} {counter.count:3d}/{budget} queries"
+                if response.status_code >= 400:
+                    failures.append(f"{name}: HTTP {response.status_code}")
+                    self.stdout.write(self.style.ERROR(f"FAIL {line}"))
+                elif counter.count > budget:
+                    failures.append(f"{name}: {counter.count} queries, budget {budget}")
+                    self.stdout.write(self.style.ERROR(f"FAIL {line}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok   {line}"))
+
+                for shape, n in counter.n_plus_one_candidates():
+                    self.stdout.write(f"       N+1 candidate {n}x {shape}")
+
+                if method == 'get' and response.has_header('ETag'):
+                    revalidated = client.get(url, data=data, HTTP_IF_NONE_MATCH=response['ETag'])
+                    if revalidated.status_code != 304:
+                        failures.append(f"{name}: revalidation returned HTTP {revalidated.status_code}, expected 304")
+                        self.stdout.write(self.style.ERROR(f"FAIL {name:28} If-None-Match -> {revalidated.status_code}"))
+
+            transaction.set_rollback(True)
+
+        for name, reason in sorted(SKIPPED.items()):
+            self.stdout.write(f"skip {name:28} ({reason})")
+
+        if failures:
+            raise CommandError("Query budgets exceeded:\n" + "\n".join(failures))
+
+    def requests(self, f):
+        return [
+            ('task-list-create', 'get', None, None),
+            ('task-detail', 'get', {'pk': f['task'].pk}, None),
+            ('business-data-list-create', 'get', None, None),
+            ('business-data-detail', 'get', {'pk': f['business_data'].pk}, None),
+            ('process-file-batch-status', 'get', {'batch_id': f['batch_id']}, None),
+            ('processed-reports-list', 'get', None, None),
+            ('processed-report-detail', 'get', {'pk': f['processed_report'].pk}, None),
+            ('meeting-list', 'get', None, None),
+            ('today-meeting-list', 'get', None, None),
+            ('future-meeting-list', 'get', None, None),
+            ('past-meeting-list', 'get', None, None),
+            ('meeting-detail', 'get', {'meeting_id': f['meeting'].pk}, None),
+            ('departments-list', 'get', None, None),
+            ('employee-list', 'get', None, None),
+            ('view-meeting-files', 'get', None, None),
+            ('complaint-list-create', 'get', None, None),
+            ('complaint-update', 'get', {'complaint_id': f['complaint'].pk}, None),
+            ('complaint-update', 'patch', {'complaint_id': f['complaint'].pk}, {'status': 'Resolved'}),
+            ('complaint-status', 'get', {'complaint_id': f['complaint'].pk}, None),
+            ('complaint-similar', 'get', {'complaint_id': f['complaint'].pk}, None),
+            ('complaint-similar-search', 'get', None, {'q': 'seed complaint'}),
+            ('complaint-resummarise-status', 'get', {'run_id': f['resummarise_run']}, None),
+            ('comment-report-list', 'get', None, None),
+            ('comment-report-detail', 'get', {'pk': f['comment_report'].pk}, None),
+            ('meeting-full', 'get', {'meeting_id': f['meeting'].pk}, None),
+            ('meeting_files_check', 'get', None, {'meeting_id': f['meeting'].pk}),
+            ('transcript', 'post', {'meeting_id': f['meeting'].pk}, None),
+            # Approves the summary the transcript request stored
+            ('approve-summary', 'post', {'meeting_id': f['meeting'].pk}, None),
+        ]
+
+    def seed(self, count=25):
+        """A handful of rows per table so list endpoints serialise more than one object"""
+        today = timezone.localdate()
+        departments = Department.objects.bulk_create([
+            Department(department_name=f"Budget check department {i}") for i in range(count)
+        ])
+        start_id = (Employee.objects.order_by('-employee_id').values_list('employee_id', flat=True).first() or 0) + 1
+        employees = Employee.objects.bulk_create([
+            Employee(
+                employee_id=start_id + i, employee_name=f"Budget Check {i}", department_id="1",
+                email=f"budget{i}@example.com", role="Staff",
+            )
+            for i in range(count)
+        ])
+        meetings = Meeting.objects.bulk_create([
+            Meeting(meeting_title=f"Budget check {i}", meeting_date=today, meeting_time=time(9, i % 60),
+                    meeting_location="Room", meeting_participant=str(employees[0].employee_id))
+            for i in range(count)
+        ])
+        MeetingFile.objects.bulk_create([
+            MeetingFile(meeting=m, meeting_org=f"budget_check_{m.pk}.wav") for m in meetings
+        ])
+        tasks = Task.objects.bulk_create([
+            Task(task_title=f"Budget check {i}", assignee_id=employees[i].employee_id) for i in range(count)
+        ])
+        business_data = BusinessData.objects.create(fileName="budget_check.csv", uploader=employees[0])
+        processed_report = ProcessedReport.objects.create(original_file=business_data, processed_data={})
+        comment_report = CommentReport.objects.create(
+            filename="Report - budget_check.csv", file_url=business_data, file_content={}
+        )
+        complaints = Complaint.objects.bulk_create([
+            Complaint(complaint_date=today, complaint_audio=f"complaints/budget_check_{i}.wav",
+                      complaint_transcript="seed", complaint_summary="seed", status="Pending",
+                      employee=employees[i])
+            for i in range(count)
+        ])
+        directory.invalidate()   # bulk_create sends no post_save
+        return {
+            'department': departments[0],
+            'meeting': meetings[0],
+            'task': tasks[0],
+            'business_data': business_data,
+            'processed_report': processed_report,
+            'comment_report': comment_report,
+            'complaint': complaints[0],
+            'batch_id': create_batch([business_data.pk]),
+            'resummarise_run': self.seed_resummarise_report(),
+        }
+
+    def seed_resummarise_report(self):
+        run_id = uuid.uuid4().hex
+        save_report({'run_id': run_id, 'status': 'done', 'total': 0})
+        return run_id
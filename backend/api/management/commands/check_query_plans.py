@@ -0,0 +1,98 @@
+import json
+import random
+from datetime import timedelta, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Meeting, Complaint, Task
+from api.views import TodayMeetingListView, FutureMeetingListView, PassMeetingListView, ComplaintListView
+
+
+# Tables whose hot queries must be answered from an index
+HOT_TABLES = {'meeting', 'Complaint', 'task'}
+
+
+def hot_queries():
+    """Querysets issued by the busiest endpoints, built the same way the views build them"""
+    return [
+        ('meetingsToday/', TodayMeetingListView().get_queryset()),
+        ('meetingsFuture/', FutureMeetingListView().get_queryset()),
+        ('meetingsPast/', PassMeetingListView().get_queryset()),
+        ('complaintList/', ComplaintListView().get_queryset()),
+        ('tasks/?assignee_id', Task.objects.filter(assignee_id=1)),
+    ]
+
+
+def seq_scans(plan_node):
+    """Walk an EXPLAIN (FORMAT JSON) plan and yield every sequential scan on a hot table"""
+    if plan_node.get('Node Type') == 'Seq Scan' and plan_node.get('Relation Name') in HOT_TABLES:
+        yield plan_node['Relation Name']
+    for child in plan_node.get('Plans', []):
+        yield from seq_scans(child)
+
+
+class Command(BaseCommand):
+    help = "Seed data in a rolled-back transaction and fail if a hot endpoint query plans a sequential scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows to seed per hot table')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plan checks need PostgreSQL (EXPLAIN output is planner specific)")
+
+        failures = []
+        with transaction.atomic():
+            self.seed(options['rows'])
+            with connection.cursor() as cursor:
+                for table in HOT_TABLES:
+                    cursor.execute(f'ANALYZE "{table}"')
+                # Tiny tables are cheaper to scan than to index; take that choice away
+                # from the planner so a missing index shows up as a Seq Scan.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for endpoint, queryset in hot_queries():
+                plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+                scanned = sorted(set(seq_scans(plan)))
+                if scanned:
+                    failures.append(f"{endpoint}: sequential scan on {', '.join(scanned)}")
+                    self.stdout.write(self.style.ERROR(f"FAIL {endpoint} -> Seq Scan on {', '.join(scanned)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok   {endpoint} -> {plan['Node Type']}"))
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Hot queries fell back to sequential scans:\n" + "\n".join(failures))
+
+    def seed(self, rows):
+        today = timezone.localdate()
+        rng = random.Random(26)
+
+        Meeting.objects.bulk_create([
+            Meeting(
+                meeting_title=f"Seed meeting {i}",
+                meeting_date=today + timedelta(days=rng.randint(-365, 365)),
+                meeting_time=time(rng.randint(8, 18), rng.choice([0, 15, 30, 45])),
+                meeting_location="Seed room",
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+        Complaint.objects.bulk_create([
+            Complaint(
+                complaint_date=today - timedelta(days=rng.randint(0, 365)),
+                complaint_audio=f"complaints/seed_{i}.wav",
+                complaint_transcript="seed",
+                complaint_summary="seed",
+                status="Pending",
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+        Task.objects.bulk_create([
+            Task(task_title=f"Seed task {i}", assignee_id=rng.randint(1, 200))
+            for i in range(rows)
+        ], batch_size=1000)
@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.analytics.tracing import chrome_trace
+from api.models import CommentReport, ProcessedReport
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the per-stage timings stored with a ProcessedReport (or, with --comment, a "
+        "CommentReport) and optionally export them as a Chrome trace file to open in "
+        "chrome://tracing or ui.perfetto.dev"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('report_id', type=int)
+        parser.add_argument('--comment', action='store_true', help='report_id is a CommentReport')
+        parser.add_argument('--output', help='Write the Chrome trace JSON to this file')
+
+    def handle(self, *args, **options):
+        model, field = (CommentReport, 'file_content') if options['comment'] else (ProcessedReport, 'processed_data')
+        try:
+            report = model.objects.only(field).get(pk=options['report_id'])
+        except model.DoesNotExist:
+            raise CommandError(f"{model.__name__} {options['report_id']} not found")
+
+        timings = (getattr(report, field) or {}).get('timings')
+        if not timings:
+            raise CommandError("No timings stored for this report (it predates tracing)")
+
+        self.stdout.write(f"{timings['name']}: {timings['total_ms'] / 1000:.2f} s total")
+        for stage, stats in timings['stages'].items():
+            self.stdout.write(
+                f"  {stage:16} {stats['wall_ms']:10.1f} ms wall  {stats['cpu_ms']:10.1f} ms cpu  "
+                f"{stats['rss_delta_kb'] / 1024:+8.1f} MB rss  {stats['bytes'] / 1024:10.1f} KB"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(chrome_trace(timings), f)
+            self.stdout.write(f"wrote {options['output']}")
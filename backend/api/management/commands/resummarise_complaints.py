@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.resummarise import resummarise, select_complaints
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run the AI summary and solution of many complaints, e.g. after the prompt "
+        "changed. Transcripts are packed several to a Gemini request, requests run "
+        "concurrently under a requests-per-minute limit and results are bulk-updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('complaint_ids', nargs='*', type=int, help='Complaint ids to re-summarise')
+        parser.add_argument('--status', action='append', dest='statuses',
+                            help='Only complaints with this status (repeatable)')
+        parser.add_argument('--employee', type=int, help='Only complaints handled by this employee id')
+        parser.add_argument('--created-after', help='Only complaints created on/after this date (YYYY-MM-DD)')
+        parser.add_argument('--created-before', help='Only complaints created before this date (YYYY-MM-DD)')
+        parser.add_argument('--missing-summary', action='store_true',
+                            help='Only complaints whose summary is empty or failed')
+        parser.add_argument('--all', action='store_true', help='Every complaint with a transcript')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Concurrent Gemini requests (defaults to RESUMMARISE_WORKERS)')
+        parser.add_argument('--rate', type=int, default=None,
+                            help='Gemini requests per minute, 0 for no limit (defaults to GEMINI_REQUESTS_PER_MINUTE)')
+        parser.add_argument('--dry-run', action='store_true', help='Count the selected complaints and exit')
+
+    def handle(self, *args, **options):
+        if not (options['complaint_ids'] or options['statuses'] or options['employee'] or options['created_after']
+                or options['created_before'] or options['missing_summary'] or options['all']):
+            raise CommandError("Pass complaint ids, a filter (--status/--employee/--created-after/"
+                               "--created-before/--missing-summary) or --all")
+        complaints = select_complaints(
+            complaint_ids=options['complaint_ids'], statuses=options['statuses'], employee=options['employee'],
+            created_after=options['created_after'], created_before=options['created_before'],
+            missing_summary=options['missing_summary'],
+        )
+        complaint_ids = list(complaints.values_list('complaint_id', flat=True))
+        if options['dry_run']:
+            self.stdout.write(f"{len(complaint_ids)} complaints selected")
+            return
+        if not complaint_ids:
+            raise CommandError("No complaints with a transcript match the selection")
+
+        report = resummarise(complaint_ids, workers=options['workers'], per_minute=options['rate'],
+                             progress=self.stdout.write)
+
+        self.stdout.write(
+            f"\n{report['updated']} updated, {report['failed']} failed of {report['total']} "
+            f"in {report['seconds']:.1f} s ({report['complaints_per_min'] or 0:.1f} complaints/min)"
+        )
+        self.stdout.write(
+            f"  {report['requests']} Gemini requests, {report['complaints_per_request'] or 0:.1f} complaints/request, "
+            f"p50 {report['request_p50'] or 0:.2f} s, p95 {report['request_p95'] or 0:.2f} s, "
+            f"{report['rate_limit_wait_seconds']:.1f} s waiting on the rate limit"
+        )
+        style = self.style.SUCCESS if not report['failed'] else self.style.WARNING
+        self.stdout.write(style("done" if not report['failed'] else "failed complaints keep their previous summary; re-run them by id to retry"))
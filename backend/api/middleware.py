@@ -0,0 +1,183 @@
+import cProfile
+import hmac
+import json
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+
+from .query_budgets import QUERY_BUDGETS
+from .utils import metrics
+from .utils.log import get_logger
+from .utils.profiler import StackSampler, profile_path, write_folded
+from .utils.query_counter import QueryCounter
+
+log = get_logger(__name__)
+
+
+class QueryCountMiddleware:
+    """
+    Count SQL queries and DB time per request and flag repeated query shapes (N+1 candidates).
+
+    Enabled with QUERY_COUNT_ENABLED (defaults to DEBUG). In DEBUG the numbers are
+    also returned as X-DB-Query-Count / X-DB-Time-Ms / X-DB-Duplicate-Queries headers.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_COUNT_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, 'QUERY_COUNT_REPEAT_THRESHOLD', 3)
+
+    def __call__(self, request):
+        with QueryCounter(repeat_threshold=self.repeat_threshold) as counter:
+            response = self.get_response(request)
+
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        repeated = counter.n_plus_one_candidates()
+
+        for shape, n in repeated:
+            log.warning("N+1 candidate", path=request.path, url_name=url_name, repeats=n, query=shape)
+
+        budget = QUERY_BUDGETS.get(url_name)
+        if budget is not None and counter.count > budget:
+            log.warning("query budget exceeded", path=request.path, url_name=url_name,
+                        queries=counter.count, budget=budget)
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(counter.count)
+            response['X-DB-Time-Ms'] = f"{counter.duration_ms:.1f}"
+            response['X-DB-Duplicate-Queries'] = str(len(repeated))
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record request latency per URL name and SQL queries per request for `/metrics`.
+
+    Sits first in MIDDLEWARE so the latency covers the whole stack. Enabled with
+    METRICS_ENABLED (on by default); query counting skips SQL normalisation to stay cheap.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with QueryCounter(track_shapes=False) as counter:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        # URL names keep label cardinality bounded; unmatched paths (404s, static) share one
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        url_name = url_name or 'unmatched'
+        metrics.REQUEST_LATENCY.labels(url_name, request.method, f"{response.status_code // 100}xx").observe(elapsed)
+        metrics.REQUEST_QUERIES.labels(url_name).observe(counter.count)
+        return response
+
+
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class SlowRequestProfilerMiddleware:
+    """
+    Capture a profile of slow requests, or of any request that asks for one.
+
+    - PROFILE_SLOW_REQUEST_MS: every request is stack-sampled (PROFILE_SAMPLE_INTERVAL_MS)
+      and the samples are kept when it takes longer than this.
+    - "X-Profile: sample" forces a sampled profile; "X-Profile: cprofile" runs the request
+      under cProfile. Needs PROFILE_HEADER_ENABLED and PROFILE_TOKEN, and the request's
+      "X-Profile-Token" must match the token.
+
+    Profiles go to PROFILE_DIR as <request id>.folded (flame-graph ready) or .prof (pstats),
+    each with a .json sidecar; the id is returned as X-Request-ID.
+    """
+
+    def __init__(self, get_response):
+        self.threshold_ms = getattr(settings, 'PROFILE_SLOW_REQUEST_MS', None)
+        self.header_enabled = getattr(settings, 'PROFILE_HEADER_ENABLED', False)
+        if self.threshold_ms is None and not self.header_enabled:
+            raise MiddlewareNotUsed()
+        self.token = getattr(settings, 'PROFILE_TOKEN', None)
+        if self.header_enabled and not self.token:
+            # Otherwise any client could make the server run cProfile on demand
+            raise ImproperlyConfigured("PROFILE_HEADER_ENABLED requires PROFILE_TOKEN")
+        self.get_response = get_response
+        self.directory = settings.PROFILE_DIR
+        self.sampler = StackSampler(interval=getattr(settings, 'PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000)
+        # cProfile hooks are process-wide on newer Pythons, so only one request at a time
+        self.cprofile_lock = threading.Lock()
+
+    def requested_mode(self, request):
+        mode = request.headers.get('X-Profile', '').lower()
+        if not self.header_enabled or mode not in ('sample', 'cprofile'):
+            return None
+        if not hmac.compare_digest(request.headers.get('X-Profile-Token', ''), self.token):
+            return None
+        return mode
+
+    def __call__(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not _REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        mode = self.requested_mode(request)
+
+        if mode == 'cprofile' and self.cprofile_lock.acquire(blocking=False):
+            try:
+                profiler = cProfile.Profile()
+                start = time.perf_counter()
+                response = profiler.runcall(self.get_response, request)
+                elapsed = time.perf_counter() - start
+            finally:
+                self.cprofile_lock.release()
+            path = profile_path(self.directory, request_id, 'prof')
+            profiler.dump_stats(path)
+            self.write_meta(request_id, request, response, elapsed, 'cprofile', path)
+            response['X-Profile-Id'] = request_id
+        elif mode or self.threshold_ms is not None:
+            ident = threading.get_ident()
+            self.sampler.start(ident)
+            start = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                samples = self.sampler.stop(ident)
+            elapsed = time.perf_counter() - start
+            slow = self.threshold_ms is not None and elapsed * 1000 >= self.threshold_ms
+            if (mode or slow) and samples:
+                path = profile_path(self.directory, request_id, 'folded')
+                write_folded(path, samples)
+                self.write_meta(request_id, request, response, elapsed, 'sample', path,
+                                samples=sum(samples.values()))
+                response['X-Profile-Id'] = request_id
+                if slow:
+                    log.warning("slow request", method=request.method, path=request.path,
+                                elapsed_ms=round(elapsed * 1000), profile=path)
+        else:
+            response = self.get_response(request)
+
+        response['X-Request-ID'] = request_id
+        return response
+
+    def write_meta(self, request_id, request, response, elapsed, mode, path, **extra):
+        meta = {
+            'request_id': request_id,
+            'method': request.method,
+            'path': request.path,
+            'url_name': request.resolver_match.url_name if request.resolver_match else None,
+            'status': response.status_code,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'mode': mode,
+            'profile': path,
+            'captured_at': time.time(),
+            **extra,
+        }
+        if mode == 'sample':
+            meta['interval_ms'] = self.sampler.interval * 1000
+        with open(profile_path(self.directory, request_id, 'json'), 'w') as f:
+            json.dump(meta, f, indent=2)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_task_task_assignee_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-19 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_commentreport_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetLineage',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('columns_digest', models.CharField(max_length=64)),
+                ('rows', models.IntegerField()),
+                ('prefix_digest', models.CharField(max_length=64)),
+                ('state', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('latest_file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.businessdata')),
+                ('latest_report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.processedreport')),
+                ('uploader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.employee')),
+            ],
+            options={
+                'db_table': 'dataset_lineages',
+                'indexes': [models.Index(fields=['uploader', 'columns_digest'], name='lineage_lookup_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_datasetlineage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingfile',
+            name='summarised_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingfile',
+            name='summary_data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingfile',
+            name='transcript_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_meetingfile_summary_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='intake_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -20,6 +20,10 @@ class Task(models.Model):
 
     class Meta:
         db_table = 'task'
+        indexes = [
+            # Task lists are filtered per employee
+            models.Index(fields=['assignee_id'], name='task_assignee_idx'),
+        ]
 
 
 class BusinessData(models.Model):
@@ -48,6 +52,29 @@ class ProcessedReport(models.Model):
     class Meta:
         db_table = 'processed_reports'
 
+class DatasetLineage(models.Model):
+    """
+    Successive uploads of one growing dataset (each file is the previous rows plus new
+    ones) with the merged aggregates of everything analysed so far; see
+    api/analytics/incremental.py
+    """
+    id = models.AutoField(primary_key=True)
+    uploader = models.ForeignKey('Employee', on_delete=models.CASCADE)
+    columns_digest = models.CharField(max_length=64)
+    rows = models.IntegerField()  # raw rows covered by prefix_digest
+    prefix_digest = models.CharField(max_length=64)
+    state = models.JSONField()
+    latest_file = models.ForeignKey('BusinessData', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    latest_report = models.ForeignKey('ProcessedReport', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dataset_lineages'
+        indexes = [
+            # New uploads are matched against the uploader's lineages with the same columns
+            models.Index(fields=['uploader', 'columns_digest'], name='lineage_lookup_idx'),
+        ]
+
 class Meeting(models.Model):
     meeting_id = models.AutoField(primary_key=True)  # Supabase uses integer ID
     meeting_title = models.CharField(max_length=255)
@@ -64,6 +91,10 @@ class Meeting(models.Model):
     
     class Meta:
         db_table = 'meeting'
+        indexes = [
+            # Today/future/past meeting lists filter on the date and sort by date, time
+            models.Index(fields=['meeting_date', 'meeting_time'], name='meeting_date_time_idx'),
+        ]
 
     def str(self):
         return self.meeting_title
@@ -105,6 +136,11 @@ class MeetingFile(models.Model):
     updated_date = models.DateField(null=True, blank=True)
     updated_time = models.TimeField(null=True, blank=True)
     meeting_transcripts = models.TextField(null=True, blank=True)
+    # Gemini summary of meeting_org's transcript ({'summary': [...], 'tasks': {...}}) and a
+    # hash of the transcript and meeting details it was made from; see transcript.meeting_summary
+    summary_data = models.JSONField(null=True, blank=True)
+    transcript_hash = models.CharField(max_length=64, null=True, blank=True)
+    summarised_at = models.DateTimeField(null=True, blank=True)
 
 
     def __str__(self):
@@ -120,6 +156,7 @@ class CommentReport(models.Model):
     file_content = models.JSONField()
     pdf_url = models.URLField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)  # reports are re-generated in place
     
     class Meta:
         db_table = 'userComment_data'
@@ -139,9 +176,15 @@ class Complaint(models.Model):
     solution = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=255)  # varchar in DB
     created_at = models.DateTimeField(auto_now_add=True)
+    # When background intake last claimed the complaint; see transcript.recover_interrupted_intake
+    intake_started_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "Complaint"
+        indexes = [
+            # Complaint list is always served newest first
+            models.Index(fields=['-created_at'], name='complaint_created_at_idx'),
+        ]
 
     def __str__(self):
         return f"Complaint {self.complaint_id} - {self.customer_name or 'Unknown'}"
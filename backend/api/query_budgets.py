@@ -0,0 +1,39 @@
+# Maximum number of SQL queries each URL name in api/urls.py may issue per request.
+# QueryCountMiddleware logs a warning when a request goes over its budget, and
+# `python manage.py check_query_budgets` fails CI when a seeded request does.
+QUERY_BUDGETS = {
+    'task-list-create': 2,
+    'task-detail': 2,
+    'business-data-list-create': 2,
+    'business-data-detail': 2,
+    'process-file': 3,
+    'process-file-batch': 1,
+    'process-file-batch-status': 0,
+    'processed-reports-list': 1,
+    'processed-report-detail': 2,
+    'transcript': 15,
+    'complaint-upload': 4,
+    'meeting-list': 2,
+    'today-meeting-list': 1,
+    'future-meeting-list': 1,
+    'past-meeting-list': 1,
+    'meeting-detail': 1,
+    'departments-list': 1,
+    'employee-list': 1,
+    'upload-meeting-files': 5,
+    'view-meeting-files': 1,
+    'complaint-list-create': 2,
+    'complaint-update': 2,
+    'complaint-ai-update': 2,
+    'complaint-status': 1,
+    'complaint-similar': 2,
+    'complaint-similar-search': 1,
+    'complaint-resummarise': 1,
+    'complaint-resummarise-status': 0,
+    'approve-summary': 20,
+    'comment-report-list': 1,
+    'comment-report-detail': 2,
+    'analyse-comment': 4,
+    'meeting-full': 2,
+    'meeting_files_check': 1,
+}
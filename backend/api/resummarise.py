@@ -0,0 +1,188 @@
+"""
+Bulk AI re-summarisation of complaints, e.g. after the summary prompt changes.
+
+Complaints with a transcript are selected by filter and handled WINDOW at a time. Each
+window's transcripts are packed several to a Gemini request (summaries.pack_complaints),
+the requests run on `workers` threads under one shared requests-per-minute limit, and
+the window's results are written back with a single bulk_update. The report returned at
+the end gives complaints/min, requests made, complaints per request and request latency.
+While the run is in progress it is rewritten after every window to a JSON file under
+RESUMMARISE_REPORT_DIR, so any server process can answer the API's progress requests.
+"""
+import json
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .summaries import RateLimitedLLM, pack_complaints, summarise_complaints
+from .utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Complaints loaded, summarised and written back per round
+WINDOW = 500
+
+
+def select_complaints(complaint_ids=None, statuses=None, employee=None, created_after=None,
+                      created_before=None, missing_summary=False):
+    """Complaint queryset with a transcript for explicit ids and/or a filter, oldest first"""
+    from django.db.models import Q
+    from .models import Complaint
+
+    complaints = Complaint.objects.exclude(complaint_transcript__isnull=True).exclude(complaint_transcript='')
+    if complaint_ids:
+        complaints = complaints.filter(complaint_id__in=complaint_ids)
+    if statuses:
+        complaints = complaints.filter(status__in=statuses)
+    if employee:
+        complaints = complaints.filter(employee_id=employee)
+    if created_after:
+        complaints = complaints.filter(created_at__gte=created_after)
+    if created_before:
+        complaints = complaints.filter(created_at__lt=created_before)
+    if missing_summary:
+        complaints = complaints.filter(
+            Q(complaint_summary='') | Q(complaint_summary__isnull=True)
+            | Q(complaint_summary__in=("Summary not available", "Summary not available.",
+                                       "Error generating summary.", "Parsing failed."))
+        )
+    return complaints.order_by('created_at')
+
+
+def report_path(run_id, directory=None):
+    from django.conf import settings
+    return os.path.join(directory or settings.RESUMMARISE_REPORT_DIR, f"{run_id}.json")
+
+
+def save_report(report, directory=None):
+    """Write then rename, so a reader never sees a half-written report"""
+    path = report_path(report['run_id'], directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(report, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def get_report(run_id, directory=None):
+    """The run's latest report, or None for an unknown run id"""
+    # Run ids are uuid4 hex; anything else would name a path outside the directory
+    if not re.fullmatch(r'[0-9a-f]{32}', run_id):
+        return None
+    try:
+        with open(report_path(run_id, directory)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _report(run_id, total, updated, failed, llm, started, running):
+    seconds = time.perf_counter() - started
+    return {
+        'run_id': run_id,
+        'status': 'running' if running else 'done',
+        'total': total,
+        'updated': updated,
+        'failed': failed,
+        'pending': total - updated - failed,
+        'requests': llm.calls,
+        'complaints_per_request': round((updated + failed) / llm.calls, 2) if llm.calls else None,
+        'seconds': round(seconds, 2),
+        'complaints_per_min': round((updated + failed) / seconds * 60, 1) if seconds else None,
+        'request_p50': round(_percentile(llm.latencies, 50), 3) if llm.latencies else None,
+        'request_p95': round(_percentile(llm.latencies, 95), 3) if llm.latencies else None,
+        'rate_limit_wait_seconds': round(llm.waited, 2),
+    }
+
+
+def resummarise(complaint_ids, workers=None, per_minute=None, run_id=None, llm=None, progress=None):
+    """
+    Re-summarise the given complaints (see module docstring) and return the throughput
+    report. `progress` is called with a line of text per window (default: log.info).
+    """
+    from django.conf import settings
+    from .analytics.clients import GeminiClient
+    from .models import Complaint
+    from .similar import complaint_index
+    from .transcript import COMPLAINT_FAILED, COMPLAINT_READY
+
+    run_id = run_id or uuid.uuid4().hex
+    workers = workers or settings.RESUMMARISE_WORKERS
+    per_minute = per_minute if per_minute is not None else settings.GEMINI_REQUESTS_PER_MINUTE
+    progress = progress or log.info
+    llm = RateLimitedLLM(llm or GeminiClient(), per_minute)
+    complaint_ids = list(complaint_ids)
+    total, updated, failed = len(complaint_ids), 0, 0
+    started = time.perf_counter()
+    progress(f"run {run_id}: {total} complaints, {workers} workers, {per_minute or 'unlimited'} requests/min")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset in range(0, total, WINDOW):
+            window = list(
+                Complaint.objects.filter(complaint_id__in=complaint_ids[offset:offset + WINDOW])
+                .only('complaint_id', 'complaint_transcript', 'customer_name', 'customer_contact',
+                      'employee_id', 'complaint_date')
+            )
+            items = [(c.complaint_id, {
+                "customer_name": c.customer_name,
+                "customer_contact": c.customer_contact,
+                "employee_name": c.employee_id,
+                "complaint_date": c.complaint_date,
+            }, c.complaint_transcript) for c in window]
+
+            results = {}
+            for batch_results in pool.map(lambda batch: summarise_complaints(batch, llm), pack_complaints(items)):
+                results.update(batch_results)
+
+            changed = []
+            for complaint in window:
+                result = results.get(complaint.complaint_id)
+                if result is None:
+                    continue
+                complaint.complaint_summary = result.get("complaint_summary") or "Summary not available"
+                complaint.solution = result.get("solution") or "Solution not available"
+                changed.append(complaint)
+            # Only the AI fields: the status may have been changed (e.g. Resolved) during the run
+            Complaint.objects.bulk_update(changed, ['complaint_summary', 'solution'], batch_size=200)
+            changed_ids = [complaint.complaint_id for complaint in changed]
+            Complaint.objects.filter(pk__in=changed_ids, status=COMPLAINT_FAILED).update(status=COMPLAINT_READY)
+            complaint_index.refresh(changed_ids)
+
+            # Ids that no longer exist count as failed too
+            updated += len(changed)
+            failed += min(WINDOW, total - offset) - len(changed)
+            report = _report(run_id, total, updated, failed, llm, started, running=True)
+            save_report(report)
+            progress(f"  {updated + failed}/{total} done ({updated} updated, {failed} failed), "
+                     f"{report['complaints_per_min'] or 0:.1f} complaints/min")
+
+    report = _report(run_id, total, updated, failed, llm, started, running=False)
+    save_report(report)
+    return report
+
+
+def start(complaint_ids, workers=None, per_minute=None):
+    """Queue a background re-summarisation run (api/jobs.py, bulk pool) and return its id"""
+    from . import jobs
+
+    run_id = uuid.uuid4().hex
+    save_report({'run_id': run_id, 'status': 'queued', 'total': len(complaint_ids)})
+    jobs.submit("complaint-resummarise", _run_in_background, list(complaint_ids), workers, per_minute, run_id,
+                pool=jobs.BULK)
+    return run_id
+
+
+def _run_in_background(complaint_ids, workers, per_minute, run_id):
+    try:
+        resummarise(complaint_ids, workers=workers, per_minute=per_minute, run_id=run_id)
+    except Exception as e:
+        report = get_report(run_id) or {'run_id': run_id}
+        report.update(status='failed', error=str(e))
+        save_report(report)
+        raise
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.utils import timezone
 from .models import Task, BusinessData, ProcessedReport, Meeting, Employee,Department, MeetingFile, Complaint, CommentReport
+from .utils.log import get_logger
+
+log = get_logger(__name__)
+
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -76,7 +80,7 @@ class ComplaintSubmitSerializer(serializers.ModelSerializer):
                 complaint.complaint_transcript = transcript_text
                 complaint.save()
             except Exception as e:
-                print(f"Transcription failed: {e}")
+                log.warning("transcription failed", complaint_id=complaint.pk, error=e)
 
         return complaint
 
@@ -92,6 +96,7 @@ class MeetingFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = MeetingFile
         fields = '__all__'
+        read_only_fields = ('summary_data', 'transcript_hash', 'summarised_at')
 
     def get_meeting_summary_url(self, obj):
         request = self.context.get('request')
@@ -0,0 +1,48 @@
+import sys
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .directory import directory
+from .models import Complaint, Department, Employee
+from .utils.http_cache import DEPARTMENTS_CACHE_KEY, EMPLOYEES_CACHE_KEY
+
+
+# Note: queryset.update() and bulk_create() do not send these signals; cached
+# reference lists and the employee directory then refresh when
+# REFERENCE_CACHE_TIMEOUT expires.
+
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_departments(sender, **kwargs):
+    cache.delete(DEPARTMENTS_CACHE_KEY)
+    directory.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_employees(sender, **kwargs):
+    cache.delete(EMPLOYEES_CACHE_KEY)
+    directory.invalidate()
+
+
+
+def _built_complaint_index():
+    """The similar-complaint index if this process has built it, else None (without importing it)"""
+    similar = sys.modules.get(f"{__package__}.similar")
+    return similar.complaint_index if similar is not None and similar.complaint_index.loaded else None
+
+
+@receiver(post_save, sender=Complaint)
+def index_complaint(sender, instance, **kwargs):
+    # api/similar.py pulls in numpy and the analytics package; a process that never
+    # queried the index has nothing to update
+    index = _built_complaint_index()
+    if index is not None:
+        index.update(instance)
+
+
+@receiver(post_delete, sender=Complaint)
+def unindex_complaint(sender, instance, **kwargs):
+    index = _built_complaint_index()
+    if index is not None:
+        index.remove(instance.pk)
@@ -0,0 +1,198 @@
+"""
+Similar-complaint index: find past complaints about the same issue and reuse their solutions.
+
+Each complaint's transcript and summary become a TF-IDF vector over hashed terms
+(HASH_BUCKETS buckets, so there is no vocabulary to rebuild when complaints are added).
+Adding, replacing or removing one complaint only touches its own terms and the document
+frequencies; IDF weights and norms are recomputed lazily by the next query, in one
+vectorised pass. A query scores every indexed complaint by cosine similarity:
+
+    complaint_index.similar(transcript, k=5)
+    # [{'complaint_id', 'score', 'summary', 'solution', 'status'}, ...]
+    complaint_index.similar(transcript, k=1, accepted_only=True)   # Resolved ones only
+
+The index lives in each process. It is built from the database on first use and kept
+current by api/signals.py once built; queryset updates send no signals, so their
+callers call refresh(). Like the employee directory, other workers' writes show up once the index
+is older than SIMILAR_INDEX_MAX_AGE and is rebuilt.
+"""
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from .analytics.sentiment import tokenize
+from .analytics.topics import STOPWORDS
+
+HASH_BUCKETS = 1 << 18
+
+# Solutions of complaints in these statuses were accepted and may be offered again
+ACCEPTED_STATUSES = ('Resolved',)
+
+# Texts the pipeline stores when it has no real summary or solution
+PLACEHOLDER_TEXTS = frozenset([
+    '', 'Summary not available', 'Summary not available.', 'Solution not available',
+    'Solution not available.', 'Error generating summary.', 'Parsing failed.', 'None',
+])
+
+def has_text(value):
+    return bool(value) and value.strip() not in PLACEHOLDER_TEXTS
+
+
+def term_counts(text):
+    """(hashed term ids, counts) of a text, stop words and words under 3 letters left out"""
+    tokens = Counter(t for t in tokenize(text) if len(t) > 2 and t not in STOPWORDS)
+    if not tokens:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    # crc32, unlike hash(), is the same in every process
+    hashed = np.fromiter((zlib.crc32(t.encode('utf-8')) for t in tokens), dtype=np.int64, count=len(tokens))
+    terms, inverse = np.unique(hashed % HASH_BUCKETS, return_inverse=True)
+    counts = np.bincount(inverse, weights=np.fromiter(tokens.values(), dtype=np.float64, count=len(tokens)))
+    return terms, counts
+
+
+def complaint_text(transcript, summary):
+    return f"{summary} {transcript or ''}" if has_text(summary) else (transcript or '')
+
+
+class ComplaintIndex:
+    """Process-wide TF-IDF index of complaints (see module docstring)"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._clear()
+
+    def _clear(self):
+        self._vectors = {}      # complaint_id -> (terms, counts)
+        self._info = {}         # complaint_id -> {'summary', 'solution', 'status'}
+        self._df = np.zeros(HASH_BUCKETS, dtype=np.int64)
+        self._flat = None       # query arrays, rebuilt after any change
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    # --- building ---
+
+    def _ensure_loaded(self):
+        from django.conf import settings
+
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.SIMILAR_INDEX_MAX_AGE:
+            with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > settings.SIMILAR_INDEX_MAX_AGE:
+                    self._load()
+
+    def _load(self):
+        from .models import Complaint
+
+        self._clear()
+        rows = (Complaint.objects.exclude(complaint_transcript__isnull=True).exclude(complaint_transcript='')
+                .values_list('complaint_id', 'complaint_transcript', 'complaint_summary', 'solution', 'status')
+                .iterator(chunk_size=2000))
+        for row in rows:
+            self._put(*row)
+        self._loaded_at = time.monotonic()
+
+    def _put(self, complaint_id, transcript, summary, solution, status):
+        self._drop(complaint_id)
+        terms, counts = term_counts(complaint_text(transcript, summary))
+        if not len(terms):
+            return
+        self._vectors[complaint_id] = (terms, counts)
+        self._info[complaint_id] = {'summary': summary, 'solution': solution, 'status': status}
+        self._df[terms] += 1
+        self._flat = None
+
+    def _drop(self, complaint_id):
+        vector = self._vectors.pop(complaint_id, None)
+        self._info.pop(complaint_id, None)
+        if vector is not None:
+            self._df[vector[0]] -= 1
+            self._flat = None
+
+    def update(self, complaint):
+        """(Re)index one saved Complaint; a no-op until the index is first used"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._put(complaint.complaint_id, complaint.complaint_transcript, complaint.complaint_summary,
+                      complaint.solution, complaint.status)
+
+    def remove(self, complaint_id):
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._drop(complaint_id)
+
+    def refresh(self, complaint_ids):
+        """Re-read these complaints from the database (after queryset update/bulk_update)"""
+        from .models import Complaint
+
+        if self._loaded_at is None:
+            return
+        complaint_ids = list(complaint_ids)
+        rows = (Complaint.objects.filter(complaint_id__in=complaint_ids)
+                .values_list('complaint_id', 'complaint_transcript', 'complaint_summary', 'solution', 'status'))
+        with self._lock:
+            for complaint_id in complaint_ids:
+                self._drop(complaint_id)
+            for row in rows:
+                self._put(*row)
+
+    # --- querying ---
+
+    def _arrays(self):
+        """(ids, rows, terms, tf-idf weights, norms, idf) over the current index, cached until it changes"""
+        flat = self._flat
+        if flat is not None:
+            return flat
+        with self._lock:
+            ids = np.fromiter(self._vectors, dtype=np.int64, count=len(self._vectors))
+            vectors = list(self._vectors.values())
+            lengths = np.fromiter((len(terms) for terms, _ in vectors), dtype=np.int64, count=len(vectors))
+            rows = np.repeat(np.arange(len(vectors)), lengths)
+            terms = np.concatenate([terms for terms, _ in vectors]) if vectors else np.empty(0, dtype=np.int64)
+            counts = np.concatenate([counts for _, counts in vectors]) if vectors else np.empty(0)
+            idf = np.log((1 + len(vectors)) / (1 + self._df)) + 1
+            weights = counts * idf[terms]
+            norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(vectors)))
+            self._flat = flat = (ids, rows, terms, weights, norms, idf)
+        return flat
+
+    def similar(self, text, k=5, exclude=None, accepted_only=False, min_score=0.0):
+        """Top `k` indexed complaints by cosine similarity to `text`, best first"""
+        self._ensure_loaded()
+        ids, rows, terms, weights, norms, idf = self._arrays()
+        query_terms, query_counts = term_counts(text)
+        if not len(ids) or not len(query_terms):
+            return []
+
+        query = np.zeros(HASH_BUCKETS)
+        query[query_terms] = query_counts * idf[query_terms]
+        scores = np.bincount(rows, weights=weights * query[terms], minlength=len(ids))
+        scores /= np.where(norms > 0, norms, 1) * np.linalg.norm(query)
+
+        candidates = np.flatnonzero(scores > min_score)
+        if exclude is not None:
+            candidates = candidates[ids[candidates] != exclude]
+        if accepted_only:
+            info = self._info
+            candidates = candidates[[
+                info.get(int(ids[c]), {}).get('status') in ACCEPTED_STATUSES
+                and has_text(info.get(int(ids[c]), {}).get('solution'))
+                for c in candidates
+            ]] if len(candidates) else candidates
+        best = candidates[np.argsort(-scores[candidates], kind='stable')[:k]]
+
+        results = []
+        for row in best:
+            complaint_id = int(ids[row])
+            info = self._info.get(complaint_id, {})
+            results.append({'complaint_id': complaint_id, 'score': round(float(scores[row]), 4), **info})
+        return results
+
+
+complaint_index = ComplaintIndex()
@@ -0,0 +1,522 @@
+"""
+Meeting and complaint summaries over the whole transcript, not its first 5000 characters.
+
+Transcripts that fit in one prompt (CHUNK_TOKENS) are summarised with a single Gemini
+call, as before. Longer ones are map-reduced: the transcript is split on sentence
+boundaries into token-bounded chunks, every chunk is summarised (and its tasks
+extracted) concurrently, and one merge prompt combines the partial results and
+de-duplicates tasks that were mentioned in more than one part:
+
+    result = summarise_meeting(meeting_data, transcript_text, transcript_files, GeminiClient())
+    result['summary']      # bullet points
+    result['tasks']        # {participant: [task, ...]}
+
+Latency is roughly two calls whatever the meeting length. If the merge call fails, the
+partial results are combined locally (tasks de-duplicated by title per participant),
+so no part of the transcript is dropped. For bulk runs (api/resummarise.py) short
+complaint transcripts are instead packed several to a prompt (pack_complaints,
+summarise_complaints). Nothing here touches Django; the LLM client is passed in.
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .analytics.tracing import propagate, span
+from .utils.log import get_logger, lazy
+
+log = get_logger(__name__)
+
+# Rough token estimate for English speech transcripts
+CHARS_PER_TOKEN = 4
+# Transcript tokens per prompt, and chunk prompts in flight at once
+CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '4000'))
+SUMMARY_WORKERS = int(os.getenv('SUMMARY_WORKERS', '4'))
+# Bulk re-summarisation: transcript tokens packed into one prompt, and complaints per prompt
+BATCH_TOKENS = int(os.getenv('SUMMARY_BATCH_TOKENS', '12000'))
+BATCH_MAX_COMPLAINTS = int(os.getenv('SUMMARY_BATCH_MAX_COMPLAINTS', '10'))
+
+URGENCY_RANK = {'high': 3, 'medium': 2, 'low': 1, 'pending': 0}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def split_transcript(text, max_tokens=CHUNK_TOKENS):
+    """Chunks of at most `max_tokens` (estimated), cut between sentences where possible"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    text = (text or '').strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks, current = [], ''
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        # A run-on "sentence" (transcripts often lack punctuation) is cut at word boundaries
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def parse_json_response(raw_text, array=False):
+    """JSON object (or array) in a Gemini response, also when wrapped in prose or a code fence"""
+    raw_text = (raw_text or '').strip()
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        match = re.search(r'\[.*\]' if array else r'\{.*\}', raw_text, re.DOTALL)
+        if match:
+            return json.loads(match.group(0))
+        raise
+
+
+def _generate_all(llm, prompts, workers):
+    """Parsed JSON response per prompt (None where the call or the parse failed)"""
+    def generate(indexed):
+        i, prompt = indexed
+        try:
+            with span('summary.chunk', part=i + 1):
+                return parse_json_response(llm.generate(prompt))
+        except Exception as e:
+            log.warning("summary chunk failed", part=i + 1, parts=len(prompts), error=e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(prompts)))) as pool:
+        return list(pool.map(propagate(generate), enumerate(prompts)))
+
+
+def _transcript_section(transcript, part=None, parts=None):
+    if part is None:
+        return f"Transcript:\n    {transcript}"
+    return (f"Transcript (part {part} of {parts}; the other parts are handled separately, "
+            f"so only cover what is said in this part):\n    {transcript}")
+
+
+# ---------------------------
+# Meetings
+# ---------------------------
+
+def meeting_prompt(meeting_data, transcript, transcript_files, part=None, parts=None):
+    participants = ", ".join(meeting_data.get("participants", []))
+    return f"""
+    You are an AI meeting assistant. Analyze the following meeting details and transcript.
+
+    Meeting Info:
+    Title: {meeting_data.get("title")}
+    Date: {meeting_data.get("date")}
+    Time: {meeting_data.get("time")}
+    Location: {meeting_data.get("location")}
+    Departments: {", ".join(meeting_data.get("departments", []))}
+    Participants: {participants}
+
+    {_transcript_section(transcript, part, parts)}
+
+    Transcript files (full content available if needed): {transcript_files}
+
+    Please provide ONLY:
+    1. A meeting summary in point form (bullet list).
+    2. Tasks grouped strictly by participant name.
+
+    ⚠️ Summary handling rules:
+    - The summary only include the important points of the meeting.
+    - No need mention the tasks again, because it is in the task assigned section
+
+    ⚠️ Important rules for task assignment:
+    - Only assign tasks to participants from this list: {participants}, no need mention for all employee, just assign the task for employee mentioned.
+    - Do NOT assign tasks to departments (e.g., HR, Sales, Marketing, Engineering) or anyone not in the participants list.
+    - Names in the output must exactly match the participant names provided.
+    - You must ONLY use names exactly from this participants list: {participants}.
+    - If a task is assigned to a name not in the list (e.g. misheard or typo), map it to the **closest matching name** in the list using fuzzy matching.
+    - Example: if "Aldis" is detected but not in participants, replace it with "Alice".
+
+    ⚠️ Deadline handling rules:
+    - All deadlines must be calculated relative to the meeting date ({meeting_data.get("date")}), not today’s date.
+    - Interpret relative words as follows:
+    * "tomorrow" = 1 day after meeting date
+    * "next week" = 7 days after meeting date
+    * "next month" = 1 month after meeting date
+    - If the deadline wasn't mentioned, set it as 7 days after the meeting date.
+    - Always output deadlines in strict ISO format (YYYY-MM-DD).
+
+    Each task must include:
+    - "task_title"
+    - "task_content"
+    - "urgent_level" (low, medium, high, pending)
+    - "deadline" (ISO format: YYYY-MM-DD or 'None')
+
+    If the urgent level wasn't mentioned, set it as "pending".
+    If the deadline wasn't mentioned, set it as 10 days after the meeting date.
+    For example, if the meeting date is 21 Aug 2025, the deadline is 31 Aug 2025.
+
+    Format your answer strictly as JSON, no explanations, no extra text. Example:
+
+    {{
+    "summary": [
+        "Point 1",
+        "Point 2",
+        "Point 3"
+    ],
+    "tasks": {{
+        "Alice": [
+        {{
+            "task_title": "Prepare Q3 Report",
+            "task_content": "Gather data from sales and marketing, prepare draft",
+            "urgent_level": "high",
+            "deadline": "2025-09-01"
+        }}
+        ],
+        "Bob": [
+        {{
+            "task_title": "Update Website",
+            "task_content": "Add Q3 product launches to homepage",
+            "urgent_level": "pending",
+            "deadline": "2025-08-30"
+        }}
+        ]
+    }}
+    }}
+    """
+
+
+def meeting_merge_prompt(meeting_data, partials):
+    participants = ", ".join(meeting_data.get("participants", []))
+    return f"""
+    You are an AI meeting assistant. A long meeting transcript was summarised in parts, in order.
+    Merge the partial results below into one result for the whole meeting.
+
+    Meeting Info:
+    Title: {meeting_data.get("title")}
+    Date: {meeting_data.get("date")}
+    Participants: {participants}
+
+    Partial results (JSON, one per part):
+    {json.dumps(partials, ensure_ascii=False, indent=2)}
+
+    ⚠️ Merge rules:
+    - Write one meeting summary in point form with only the important points; merge points that repeat across parts.
+    - Do not mention tasks in the summary.
+    - Tasks for the same participant that describe the same work are ONE task: keep the most specific content, the highest urgent_level and the deadline agreed last in the meeting.
+    - Keep participant names, urgent levels and ISO deadlines exactly as they appear in the partial results.
+    - Do not add tasks that are not in the partial results.
+
+    Format your answer strictly as JSON with the same shape as the partial results, no explanations, no extra text:
+    {{"summary": ["Point 1", "Point 2"], "tasks": {{"Alice": [{{"task_title": "...", "task_content": "...", "urgent_level": "high", "deadline": "2025-09-01"}}]}}}}
+    """
+
+
+def _task_key(task):
+    return " ".join(re.sub(r"[^\w\s]", " ", str(task.get('task_title', ''))).casefold().split())
+
+
+def merge_meeting_partials(partials):
+    """Local merge: summary points in order without repeats, tasks de-duplicated by title per participant"""
+    summary, seen_points, tasks = [], set(), {}
+    for partial in partials:
+        for point in partial.get('summary') or []:
+            key = " ".join(str(point).casefold().split())
+            if key not in seen_points:
+                seen_points.add(key)
+                summary.append(point)
+        for name, assigned in (partial.get('tasks') or {}).items():
+            merged = tasks.setdefault(name, {})
+            for task in assigned or []:
+                key = _task_key(task)
+                if key not in merged:
+                    merged[key] = dict(task)
+                    continue
+                kept = merged[key]
+                if len(str(task.get('task_content', ''))) > len(str(kept.get('task_content', ''))):
+                    kept['task_content'] = task.get('task_content')
+                if URGENCY_RANK.get(task.get('urgent_level'), 0) > URGENCY_RANK.get(kept.get('urgent_level'), 0):
+                    kept['urgent_level'] = task.get('urgent_level')
+                # Later parts of the meeting revise earlier deadlines
+                if task.get('deadline') not in (None, 'None', ''):
+                    kept['deadline'] = task.get('deadline')
+    return {'summary': summary, 'tasks': {name: list(merged.values()) for name, merged in tasks.items() if merged}}
+
+
+def _is_meeting_result(result):
+    return isinstance(result, dict) and isinstance(result.get('summary'), list) and isinstance(result.get('tasks'), dict)
+
+
+def summarise_meeting(meeting_data, transcript_text, transcript_files, llm,
+                      chunk_tokens=CHUNK_TOKENS, workers=SUMMARY_WORKERS):
+    """{'summary': [...], 'tasks': {participant: [...]}} for the whole transcript (see module docstring)"""
+    chunks = split_transcript(transcript_text, chunk_tokens) or ['']
+    with span('summary.meeting', parts=len(chunks)):
+        if len(chunks) == 1:
+            return parse_json_response(llm.generate(meeting_prompt(meeting_data, chunks[0], transcript_files)))
+
+        prompts = [meeting_prompt(meeting_data, chunk, transcript_files, i + 1, len(chunks))
+                   for i, chunk in enumerate(chunks)]
+        partials = [p for p in _generate_all(llm, prompts, workers) if _is_meeting_result(p)]
+        if not partials:
+            raise Exception(f"All {len(chunks)} transcript parts failed to summarise")
+        log.info("meeting summarised in parts", parts=len(chunks), ok=len(partials))
+        if len(partials) == 1:
+            return partials[0]
+
+        try:
+            with span('summary.merge', parts=len(partials)):
+                merged = parse_json_response(llm.generate(meeting_merge_prompt(meeting_data, partials)))
+            if _is_meeting_result(merged):
+                return merged
+            log.warning("meeting merge returned unexpected shape; merging locally", result=lazy(lambda: merged))
+        except Exception as e:
+            log.warning("meeting merge failed; merging locally", error=e)
+        return merge_meeting_partials(partials)
+
+
+# ---------------------------
+# Complaints
+# ---------------------------
+
+def _complaint_info(complaint_data):
+    return f"""Complaint Info:
+    Customer Name: {complaint_data.get("customer_name")}
+    Customer Contact: {complaint_data.get("customer_contact")}
+    Employee Handling: {complaint_data.get("employee_name")}
+    Complaint Date: {complaint_data.get("complaint_date")}"""
+
+
+def _fallback_solution_rule(known_solution=None):
+    if known_solution:
+        return ("If no solution is mentioned, use this solution, which resolved a very similar past "
+                f"complaint, adapted to this customer: {json.dumps(known_solution, ensure_ascii=False)}")
+    return "If no solution is mentioned, generate a suggested solution to resolve the complaint."
+
+
+def complaint_prompt(complaint_data, transcript, known_solution=None):
+    return f"""
+    You are an AI complaint assistant. Analyze the following complaint transcript and details.
+
+    {_complaint_info(complaint_data)}
+
+    {_transcript_section(transcript)}
+
+    ⚠️ Instructions:
+    1. Provide a concise complaint summary as a single paragraph (combine sentences, do not use a bullet list).
+    2. If the transcript explicitly mentions a proposed solution from the employee or customer, use that as the solution.
+    3. {_fallback_solution_rule(known_solution)}
+    4. Keep the summary factual, neutral, and relevant to the customer issue.
+    5. Return your answer strictly in JSON format like below:
+
+    {{
+        "complaint_summary": "Concise paragraph summarizing the complaint",
+        "solution": "Solution mentioned in transcript or newly suggested"
+    }}
+    """
+
+
+def complaint_part_prompt(complaint_data, transcript, part, parts):
+    return f"""
+    You are an AI complaint assistant. Analyze one part of a complaint transcript.
+
+    {_complaint_info(complaint_data)}
+
+    {_transcript_section(transcript, part, parts)}
+
+    ⚠️ Instructions:
+    1. Summarise the customer issue as discussed in this part, factually and neutrally, in a few sentences.
+    2. If this part explicitly mentions a proposed solution from the employee or customer, give it as "mentioned_solution"; otherwise use null. Do not suggest one yourself.
+    3. Return your answer strictly in JSON format like below:
+
+    {{
+        "part_summary": "What this part of the transcript says about the complaint",
+        "mentioned_solution": null
+    }}
+    """
+
+
+def complaint_merge_prompt(complaint_data, partials, known_solution=None):
+    return f"""
+    You are an AI complaint assistant. A long complaint transcript was summarised in parts, in order.
+
+    {_complaint_info(complaint_data)}
+
+    Partial results (JSON, one per part):
+    {json.dumps(partials, ensure_ascii=False, indent=2)}
+
+    ⚠️ Instructions:
+    1. Provide a concise complaint summary of the whole transcript as a single paragraph (combine sentences, do not use a bullet list), without repeating points made in several parts.
+    2. If any part mentions a solution, use it as the solution (the last one agreed on if they differ).
+    3. {_fallback_solution_rule(known_solution)}
+    4. Keep the summary factual, neutral, and relevant to the customer issue.
+    5. Return your answer strictly in JSON format like below:
+
+    {{
+        "complaint_summary": "Concise paragraph summarizing the complaint",
+        "solution": "Solution mentioned in transcript or newly suggested"
+    }}
+    """
+
+
+def summarise_complaint(complaint_data, transcript_text, llm, chunk_tokens=CHUNK_TOKENS, workers=SUMMARY_WORKERS,
+                        known_solution=None):
+    """
+    {'complaint_summary', 'solution'} for the whole transcript (see module docstring). A
+    `known_solution` (e.g. from a similar resolved complaint) replaces a newly invented one.
+    """
+    chunks = split_transcript(transcript_text, chunk_tokens) or ['']
+    with span('summary.complaint', parts=len(chunks)):
+        if len(chunks) == 1:
+            return parse_json_response(llm.generate(complaint_prompt(complaint_data, chunks[0], known_solution)))
+
+        prompts = [complaint_part_prompt(complaint_data, chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]
+        partials = [p for p in _generate_all(llm, prompts, workers) if isinstance(p, dict) and p.get('part_summary')]
+        if not partials:
+            raise Exception(f"All {len(chunks)} transcript parts failed to summarise")
+        log.info("complaint summarised in parts", parts=len(chunks), ok=len(partials))
+
+        try:
+            with span('summary.merge', parts=len(partials)):
+                merged = parse_json_response(llm.generate(complaint_merge_prompt(complaint_data, partials, known_solution)))
+            if isinstance(merged, dict) and merged.get('complaint_summary'):
+                return merged
+            log.warning("complaint merge returned unexpected shape; merging locally", result=lazy(lambda: merged))
+        except Exception as e:
+            log.warning("complaint merge failed; merging locally", error=e)
+        solutions = [p['mentioned_solution'] for p in partials if p.get('mentioned_solution')]
+        return {
+            'complaint_summary': " ".join(p['part_summary'] for p in partials),
+            'solution': solutions[-1] if solutions else known_solution or "Solution not available.",
+        }
+
+
+# ---------------------------
+# Many complaints at once (api/resummarise.py)
+# ---------------------------
+
+class RateLimitedLLM:
+    """
+    Wraps an LLM client so generate() starts at most `per_minute` calls a minute across
+    all threads, and records how long each call took (without the wait)
+    """
+
+    def __init__(self, llm, per_minute=None):
+        self.llm = llm
+        self.api_key = getattr(llm, 'api_key', None)
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self.calls = 0
+        self.waited = 0.0
+        self.latencies = []
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+            self.calls += 1
+            self.waited += start - now
+        if start > now:
+            time.sleep(start - now)
+        started = time.perf_counter()
+        try:
+            return self.llm.generate(prompt)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+
+
+def pack_complaints(items, max_tokens=BATCH_TOKENS, max_complaints=BATCH_MAX_COMPLAINTS):
+    """
+    Prompts' worth of (id, complaint_data, transcript) items: as many transcripts as fit
+    in `max_tokens`. Transcripts too long for one prompt of their own (CHUNK_TOKENS) get a
+    batch to themselves and are summarised in parts.
+    """
+    batches, current, used = [], [], 0
+    for item in items:
+        tokens = len(item[2] or '') // CHARS_PER_TOKEN + 1
+        if tokens > min(max_tokens, CHUNK_TOKENS):
+            batches.append([item])
+            continue
+        if current and (used + tokens > max_tokens or len(current) >= max_complaints):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def complaints_prompt(items):
+    complaints = [{
+        "id": str(complaint_id),
+        "customer_name": complaint_data.get("customer_name"),
+        "employee_handling": complaint_data.get("employee_name"),
+        "complaint_date": complaint_data.get("complaint_date"),
+        "transcript": transcript,
+    } for complaint_id, complaint_data, transcript in items]
+    return f"""
+    You are an AI complaint assistant. Analyze each of the following customer complaints on its own.
+
+    Complaints (JSON):
+    {json.dumps(complaints, ensure_ascii=False, indent=2, default=str)}
+
+    ⚠️ Instructions, for every complaint:
+    1. Provide a concise complaint summary as a single paragraph (combine sentences, do not use a bullet list).
+    2. If the transcript explicitly mentions a proposed solution from the employee or customer, use that as the solution.
+    3. If no solution is mentioned, generate a suggested solution to resolve the complaint.
+    4. Keep the summary factual, neutral, and relevant to the customer issue.
+    5. Return your answer strictly as a JSON array with one object per complaint, using its id, like below:
+
+    [
+        {{
+            "id": "12",
+            "complaint_summary": "Concise paragraph summarizing the complaint",
+            "solution": "Solution mentioned in transcript or newly suggested"
+        }}
+    ]
+    """
+
+
+def summarise_complaints(items, llm):
+    """
+    {id: {'complaint_summary', 'solution'}} for one batch from pack_complaints. Complaints
+    missing from a packed answer are summarised one by one; ones that still fail are left out.
+    """
+    results = {}
+    if len(items) > 1:
+        try:
+            with span('summary.complaints', complaints=len(items)):
+                answers = parse_json_response(llm.generate(complaints_prompt(items)), array=True)
+            by_id = {str(a.get('id')): a for a in answers if isinstance(a, dict)}
+            for complaint_id, _, _ in items:
+                answer = by_id.get(str(complaint_id))
+                if answer and answer.get('complaint_summary'):
+                    results[complaint_id] = {
+                        'complaint_summary': answer['complaint_summary'],
+                        'solution': answer.get('solution') or "Solution not available.",
+                    }
+        except Exception as e:
+            log.warning("packed complaint prompt failed; summarising one by one", complaints=len(items), error=e)
+
+    for complaint_id, complaint_data, transcript in items:
+        if complaint_id in results:
+            continue
+        try:
+            result = summarise_complaint(complaint_data, transcript, llm)
+            if result.get('complaint_summary'):
+                results[complaint_id] = result
+        except Exception as e:
+            log.warning("complaint summary failed", complaint_id=complaint_id, error=e)
+    return results
@@ -0,0 +1,138 @@
+import warnings
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.analytics.benchmark import FakeLLM, FakeStorage, feedback_stages, synthetic_dataset
+from api.analytics.cleaning import clean_and_preprocess_data
+from api.analytics.engine import AnalysisEngine, FeedbackEngine
+
+matplotlib.use('Agg')
+
+ROWS = 400
+
+
+class AnalysisEngineTests(SimpleTestCase):
+    """AnalysisEngine.run on the benchmark's synthetic uploads, with Gemini and Supabase faked"""
+
+    def run_engine(self, kind):
+        df = synthetic_dataset(kind, ROWS, seed=1)
+        storage = FakeStorage()
+        result = AnalysisEngine(FakeLLM(), storage).run(df.to_csv(index=False).encode(), f"bench_{kind}.csv")
+        return df, storage, result
+
+    def assert_reports_uploaded(self, storage, result):
+        data = result['processed_data']
+        for url in (result['pdf_url'], result['ppt_url'], data['cleaned_excel_url'], data['cleaning_pdf_url']):
+            self.assertTrue(url.startswith('memory://'), url)
+        for chart in data['analysis_results']['visualizations']:
+            self.assertIn(chart['url'].split('memory://business_files/', 1)[-1], storage.files)
+
+    def test_sales(self):
+        df, storage, result = self.run_engine('sales')
+        data = result['processed_data']
+        self.assertEqual(data['data_type'], 'sales')
+
+        # synthetic_dataset appends 0.5% duplicate rows; cleaning removes exactly those
+        log = data['cleaning_log']
+        self.assertEqual(list(log['original_shape']), [len(df), df.shape[1]])
+        self.assertEqual(list(log['final_shape']), [ROWS, df.shape[1]])
+        self.assertEqual(log['summary']['rows_removed'], len(df) - ROWS)
+
+        metrics = data['analysis_results']['specialized_metrics']
+        unique = df.drop_duplicates()
+        self.assertEqual(metrics['unique_products'], unique['Product'].nunique())
+        self.assertEqual(metrics['total_quantity_sold'], unique['Quantity_Sold'].sum())
+        self.assertEqual(metrics['top_products'], unique['Product'].value_counts().to_dict())
+        self.assertTrue(data['analysis_results']['visualizations'])
+        self.assert_reports_uploaded(storage, result)
+
+    def test_financial(self):
+        df, storage, result = self.run_engine('financial')
+        data = result['processed_data']
+        self.assertEqual(data['data_type'], 'financial')
+        metrics = data['analysis_results']['specialized_metrics']
+        self.assertGreater(metrics['profit_margin'], 0)
+        self.assertLess(metrics['profit_margin'], 100)
+        self.assertAlmostEqual(metrics['profit_margin'] + metrics['cost_ratio'], 100, delta=1)
+        self.assert_reports_uploaded(storage, result)
+
+    def test_social_media(self):
+        df, storage, result = self.run_engine('social_media')
+        data = result['processed_data']
+        self.assertEqual(data['data_type'], 'social_media')
+        metrics = data['analysis_results']['specialized_metrics']
+        unique = df.drop_duplicates()
+        self.assertEqual(metrics['content_type_distribution'], unique['Content_Type'].value_counts().to_dict())
+        self.assertEqual(metrics['total_views'], unique['Views'].sum())
+        self.assertEqual(set(metrics['best_performing_platform_per_metric']), {'Views', 'Likes', 'Shares', 'Comments'})
+        self.assert_reports_uploaded(storage, result)
+
+
+class FeedbackEngineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.df = synthetic_dataset('feedback', ROWS, seed=1)
+        llm, storage = FakeLLM(), FakeStorage()
+        feedback_stages(cls.df, 'bench_feedback.csv', llm, storage)   # installs the canned responses
+        cls.result = FeedbackEngine(llm, storage).run(cls.df.to_csv(index=False).encode(), 'bench_feedback.csv')
+        cls.analysis = cls.result['file_content']['feedback_analysis']
+
+    def test_sentiment_is_measured_over_every_row(self):
+        summary = self.analysis['sentiment_summary']
+        rows_with_text = self.df['Feedback'].notna().sum()
+        self.assertEqual(summary['rows_scored'], rows_with_text)
+        self.assertEqual(sum(summary['counts'].values()), rows_with_text)
+        total = summary['positive_percentage'] + summary['negative_percentage'] + summary['neutral_percentage']
+        self.assertAlmostEqual(total, 100, delta=0.1)
+
+    def test_categories_are_counted(self):
+        counts = self.analysis['sentiment_summary']['counts']
+        for side in ('positive', 'negative'):
+            categories = self.analysis[f'{side}_feedback_analysis']['categories']
+            self.assertEqual(sum(c['rows'] for c in categories), counts[side])
+            self.assertAlmostEqual(sum(c['percentage'] for c in categories), 100, delta=0.1)
+
+    def test_duplicates_collapse_before_scoring(self):
+        # The fixture only has a dozen distinct phrases
+        self.assertLessEqual(self.analysis['deduplication']['groups'], 13)
+        self.assertEqual(self.analysis['sentiment_scoring']['llm_batches'], 0)
+
+    def test_gemini_only_writes_the_recommendations(self):
+        # FEEDBACK_ANALYSIS_RESPONSE carries nothing but recommendations
+        self.assertEqual(self.analysis['analysis_status'], 'success')
+        self.assertEqual(self.analysis['recommendations'][0]['action'], "Add a second counter")
+
+    def test_report_uploaded(self):
+        self.assertTrue(self.result['pdf_url'].startswith('memory://'))
+        self.assertTrue(self.result['file_content']['visualizations'])
+
+
+class CleaningTests(SimpleTestCase):
+    def frame(self):
+        return pd.DataFrame({
+            'Units': [1.0, np.nan, 3.0, np.nan],
+            'Region': ['North', None, 'North', 'South'],
+            'Price': ['$10', 'n/a', '$30', '$20'],
+        })
+
+    def test_gaps_are_filled_on_the_dataframe_itself(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            cleaned, _ = clean_and_preprocess_data(self.frame())
+
+        self.assertFalse(cleaned.isnull().any().any())
+        self.assertEqual(cleaned['Units'].tolist(), [1.0, 2.0, 3.0, 2.0])
+        self.assertEqual(cleaned['Region'].tolist(), ['North', 'North', 'North', 'South'])
+        self.assertEqual(cleaned['Price'].tolist(), [10.0, 20.0, 30.0, 20.0])
+
+    def test_reference_fill_values_are_used(self):
+        reference = {'fill': {'Units': 7.0, 'Region': 'West', 'Price': 5.0}, 'bounds': {}}
+        cleaned, _ = clean_and_preprocess_data(self.frame(), reference=reference)
+
+        self.assertEqual(cleaned['Units'].tolist(), [1.0, 7.0, 3.0, 7.0])
+        self.assertEqual(cleaned['Region'].tolist(), ['North', 'West', 'North', 'South'])
+        self.assertEqual(cleaned['Price'].tolist(), [10.0, 5.0, 30.0, 20.0])
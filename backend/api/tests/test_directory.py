@@ -0,0 +1,82 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.directory import DirectorySnapshot, directory, normalise_name
+from api.models import Department, Employee
+
+EMPLOYEES = {1: "Tan Wei Ming", 2: "Tan Wei Jie", 3: "Alice O'Brien", 4: "Bob Lee", 5: "bob lee"}
+
+
+class MatchEmployeeTests(SimpleTestCase):
+    def setUp(self):
+        self.people = DirectorySnapshot(EMPLOYEES, {1: "Sales"}, version="v1")
+
+    def test_exact_name(self):
+        self.assertEqual(self.people.match_employee("Tan Wei Jie"), 2)
+        # The first id wins when two employees share a normalised name
+        self.assertEqual(self.people.match_employee("Bob Lee"), 4)
+
+    def test_case_spacing_and_punctuation_variants(self):
+        self.assertEqual(normalise_name("  TAN, Wei-Ming "), "tan wei ming")
+        self.assertEqual(self.people.match_employee("  TAN, Wei-Ming "), 1)
+        self.assertEqual(self.people.match_employee("alice  o brien"), 3)
+
+    def test_unique_name_parts(self):
+        self.assertEqual(self.people.match_employee("Wei Ming"), 1)
+        self.assertEqual(self.people.match_employee("O'Brien"), 3)
+
+    def test_close_spelling_above_the_cutoff(self):
+        self.assertEqual(self.people.match_employee("Bob Leee"), 4)
+        self.assertIsNone(self.people.match_employee("Bob Leee", cutoff=0.95))
+
+    def test_below_cutoff_is_unmatched(self):
+        # "robert lee" is 0.71 similar to "bob lee"
+        self.assertIsNone(self.people.match_employee("Robert Lee"))
+        self.assertEqual(self.people.match_employee("Robert Lee", cutoff=0.7), 4)
+        with override_settings(DIRECTORY_MATCH_CUTOFF=0.7):
+            self.assertEqual(self.people.match_employee("Robert Lee"), 4)
+
+    def test_ambiguous_name_is_unmatched(self):
+        # Both Tans share these parts and neither spelling is close enough to pick one
+        self.assertIsNone(self.people.match_employee("Tan Wei"))
+        self.assertIsNone(self.people.match_employee("Tan"))
+
+    def test_empty_name_is_unmatched(self):
+        for name in (None, "", "  ", "--"):
+            with self.subTest(name=name):
+                self.assertIsNone(self.people.match_employee(name))
+
+    def test_id_lookups(self):
+        self.assertEqual(self.people.employee_names("1, 4,,99"), ["Tan Wei Ming", "Bob Lee"])
+        self.assertEqual(self.people.department_name(" 1 "), "Sales")
+        self.assertEqual(self.people.department_name(2, "Unknown"), "Unknown")
+
+
+@override_settings(DIRECTORY_SHARED_CACHE=False, REFERENCE_CACHE_TIMEOUT=3600)
+class DirectoryInvalidationTests(TestCase):
+    def setUp(self):
+        directory.invalidate()
+        self.addCleanup(directory.invalidate)
+        self.employee = Employee.objects.create(
+            employee_id=1, employee_name="Uploader", department_id="1", email="uploader@example.com", role="Staff",
+        )
+
+    def test_snapshot_is_reused_until_a_write(self):
+        snapshot = directory.get()
+        with self.assertNumQueries(0):
+            self.assertIs(directory.get(), snapshot)
+
+    def test_employee_writes_refresh_the_directory(self):
+        self.assertEqual(directory.get().match_employee("Uploader"), 1)
+
+        self.employee.employee_name = "Tan Wei Ming"
+        self.employee.save()
+        self.assertIsNone(directory.get().match_employee("Uploader"))
+        self.assertEqual(directory.get().match_employee("wei ming"), 1)
+
+        self.employee.delete()
+        self.assertIsNone(directory.get().employee_name(1))
+
+    def test_department_writes_refresh_the_directory(self):
+        self.assertEqual(directory.get().departments, {})
+        department = Department.objects.create(department_name="Sales")
+        self.assertEqual(directory.get().department_name(department.pk), "Sales")
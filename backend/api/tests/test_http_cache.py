@@ -0,0 +1,46 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from api.models import BusinessData, CommentReport, Employee, ProcessedReport
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        uploader = Employee.objects.create(employee_id=1, employee_name="Uploader", department_id="1",
+                                           email="uploader@example.com", role="Staff")
+        business_data = BusinessData.objects.create(fileName="sales.csv", uploader=uploader)
+        cls.processed_report = ProcessedReport.objects.create(original_file=business_data, processed_data={})
+        cls.comment_report = CommentReport.objects.create(
+            filename="Report - sales.csv", file_url=business_data, file_content={}
+        )
+
+    def assert_revalidates(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+        return response['ETag']
+
+    def test_processed_report_not_modified(self):
+        self.assert_revalidates(reverse('processed-report-detail', kwargs={'pk': self.processed_report.pk}))
+
+    def test_comment_report_not_modified_until_regenerated(self):
+        url = reverse('comment-report-detail', kwargs={'pk': self.comment_report.pk})
+        etag = self.assert_revalidates(url)
+
+        self.comment_report.file_content = {'regenerated': True}
+        self.comment_report.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_report_is_404(self):
+        response = self.client.get(reverse('processed-report-detail', kwargs={'pk': self.processed_report.pk + 1}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_departments_not_modified(self):
+        self.assert_revalidates(reverse('departments-list'))
@@ -0,0 +1,24 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from api.management.commands.check_import_time import parse_importtime
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_boot_does_not_import_heavy_modules(self):
+        # Boots a fresh interpreter with -X importtime; raises CommandError naming any
+        # HEAVY_MODULES that the URLconf pulls in
+        out = io.StringIO()
+        call_command('check_import_time', stdout=out)
+        self.assertIn("heavy modules are loaded lazily", out.getvalue())
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      3000 |       4500 | pandas.core\n"
+            "some other warning\n"
+        )
+        self.assertEqual(parse_importtime(stderr), {'_io': (120, 120), 'pandas.core': (3000, 4500)})
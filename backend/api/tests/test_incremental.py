@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.analytics.benchmark import synthetic_dataset
+from api.analytics.cleaning import clean_and_preprocess_data
+from api.analytics.incremental import SKETCH_ALPHA, DatasetState, clean_appended, fingerprint_table
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class DatasetStateMergeTests(SimpleTestCase):
+    """Merging the states of two halves must give the state of the whole frame"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        df = synthetic_dataset('sales', 600, seed=3)
+        cls.df = df.assign(Date=pd.to_datetime(df['Date']))
+        cls.full = DatasetState.from_frame(cls.df)
+        cls.merged = DatasetState.from_frame(cls.df.iloc[:250]).merge(DatasetState.from_frame(cls.df.iloc[250:]))
+
+    def test_numeric_aggregates(self):
+        self.assertEqual(set(self.merged.numeric), set(self.full.numeric))
+        for col, full in self.full.numeric.items():
+            merged, values = self.merged.numeric[col], self.df[col].dropna()
+            with self.subTest(col=col):
+                self.assertEqual(merged.count, full.count)
+                self.assertEqual((merged.min, merged.max), (values.min(), values.max()))
+                self.assertAlmostEqual(merged.total, values.sum(), places=6)
+                self.assertAlmostEqual(merged.mean, values.mean(), places=9)
+                self.assertAlmostEqual(merged.std, values.std(), places=9)
+
+    def test_quantiles_within_sketch_accuracy(self):
+        for col, full in self.full.numeric.items():
+            values = self.df[col].dropna().to_numpy()
+            for q in QUANTILES:
+                with self.subTest(col=col, q=q):
+                    estimate = self.merged.numeric[col].quantile(q)
+                    # Merging adds bucket counts, so the merged sketch is the full one
+                    self.assertEqual(estimate, full.quantile(q))
+                    exact = np.quantile(values, q, method='lower')
+                    self.assertLessEqual(abs(estimate - exact), SKETCH_ALPHA * abs(exact) + 1e-9)
+
+    def test_counts_nulls_and_categories(self):
+        self.assertEqual(self.merged.rows, len(self.df))
+        self.assertEqual(self.merged.nulls, self.full.nulls)
+        self.assertEqual(self.merged.dates, self.full.dates)
+        for col, full in self.full.categorical.items():
+            with self.subTest(col=col):
+                self.assertEqual(self.merged.categorical[col].counts, full.counts)
+
+    def test_rollups(self):
+        for freq in ('D', 'W', 'M'):
+            merged, full = self.merged.rollups.get(freq), self.full.rollups.get(freq)
+            with self.subTest(freq=freq):
+                self.assertEqual(merged.labels(), full.labels())
+                self.assertEqual(merged.columns, full.columns)
+                np.testing.assert_allclose(merged.sums, full.sums)
+                np.testing.assert_array_equal(merged.counts, full.counts)
+                np.testing.assert_array_equal(merged.rows, full.rows)
+
+    def test_state_round_trips_through_json(self):
+        stored = json.loads(json.dumps(self.merged.to_dict()))
+        restored = DatasetState.from_dict(stored)
+
+        self.assertEqual(restored.to_dict(), stored)
+        self.assertEqual(restored.statistical_summary(), self.merged.statistical_summary())
+        self.assertEqual(restored.data_overview(), self.merged.data_overview())
+
+    def test_unknown_state_version_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DatasetState.from_dict({**self.full.to_dict(), 'version': 0})
+
+
+class CleanAppendedTests(SimpleTestCase):
+    def setUp(self):
+        raw = synthetic_dataset('sales', 300, seed=5).drop_duplicates().reset_index(drop=True)
+        self.old, self.new = raw.iloc[:200].reset_index(drop=True), raw.iloc[200:].reset_index(drop=True)
+        cleaned, _ = clean_and_preprocess_data(self.old)
+        self.previous = {'id': 7, 'rows': len(self.old), 'state': DatasetState.from_frame(cleaned), 'frame': cleaned}
+
+    def test_identical_reupload_adds_nothing(self):
+        combined, cleaning_log, state = clean_appended(self.old, self.previous)
+
+        pd.testing.assert_frame_equal(combined, self.previous['frame'])
+        self.assertEqual(cleaning_log['incremental'], {'lineage_id': 7, 'previous_rows': 200, 'appended_rows': 0})
+        self.assertEqual(state.to_dict(), self.previous['state'].to_dict())
+
+    def test_only_appended_rows_are_cleaned_and_merged(self):
+        # The last appended row repeats one already in the lineage
+        raw = pd.concat([self.old, self.new, self.old.iloc[[3]]], ignore_index=True)
+        combined, cleaning_log, state = clean_appended(raw, self.previous)
+
+        self.assertEqual(len(combined), len(self.old) + len(self.new))
+        pd.testing.assert_frame_equal(combined.iloc[:len(self.old)], self.previous['frame'])
+        self.assertEqual(cleaning_log['incremental']['appended_rows'], len(self.new) + 1)
+        self.assertIn("Removed 1 previously seen rows", cleaning_log['actions_taken'])
+
+        whole = DatasetState.from_frame(combined)
+        self.assertEqual(state.rows, whole.rows)
+        for col, agg in whole.numeric.items():
+            with self.subTest(col=col):
+                self.assertEqual(state.numeric[col].count, agg.count)
+                self.assertAlmostEqual(state.numeric[col].total, agg.total, places=6)
+                self.assertAlmostEqual(state.numeric[col].std, agg.std, places=9)
+
+    def test_appended_file_keeps_the_lineage_prefix(self):
+        before = fingerprint_table(self.old)
+        after = fingerprint_table(pd.concat([self.old, self.new], ignore_index=True))
+
+        self.assertEqual(after['columns'], before['columns'])
+        np.testing.assert_array_equal(after['hashes'][:len(self.old)], before['hashes'])
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import jobs, transcript
+from api.analytics.batch import run_batch
+from api.models import BusinessData, Complaint, Employee
+from api.transcript import (
+    COMPLAINT_FAILED, COMPLAINT_QUEUED, COMPLAINT_READY, COMPLAINT_SUMMARISING, COMPLAINT_TRANSCRIBING,
+    process_complaint, recover_interrupted_intake,
+)
+
+
+def complaint(status, minutes_ago=0, transcript="", claimed_minutes_ago=None):
+    c = Complaint.objects.create(complaint_date=timezone.localdate(), complaint_audio="complaints/test.wav",
+                                 complaint_transcript=transcript, complaint_summary="", status=status)
+    if minutes_ago:
+        Complaint.objects.filter(pk=c.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+    if claimed_minutes_ago is not None:
+        Complaint.objects.filter(pk=c.pk).update(
+            intake_started_at=timezone.now() - timedelta(minutes=claimed_minutes_ago))
+    return c
+
+
+class ComplaintIntakeTests(TestCase):
+    def test_recovery_requeues_interrupted_intake(self):
+        queued = complaint(COMPLAINT_QUEUED)
+        stale_transcribing = complaint(COMPLAINT_TRANSCRIBING, minutes_ago=120)
+        stale_summarising = complaint(COMPLAINT_SUMMARISING, minutes_ago=120, transcript="cold noodles")
+        running = complaint(COMPLAINT_TRANSCRIBING, minutes_ago=1)
+        # Waited in the queue for two hours, claimed a minute ago
+        long_queued_running = complaint(COMPLAINT_TRANSCRIBING, minutes_ago=120, claimed_minutes_ago=1)
+        stale_claim = complaint(COMPLAINT_SUMMARISING, minutes_ago=120, claimed_minutes_ago=60)
+        done = complaint(COMPLAINT_READY, minutes_ago=120)
+
+        with mock.patch('api.jobs.submit') as submit:
+            recover_interrupted_intake()
+
+        requeued = {call.args[2] for call in submit.call_args_list}
+        self.assertEqual(requeued, {queued.pk, stale_transcribing.pk, stale_summarising.pk, stale_claim.pk})
+        self.assertEqual(Complaint.objects.get(pk=running.pk).status, COMPLAINT_TRANSCRIBING)
+        self.assertEqual(Complaint.objects.get(pk=long_queued_running.pk).status, COMPLAINT_TRANSCRIBING)
+        self.assertEqual(Complaint.objects.get(pk=done.pk).status, COMPLAINT_READY)
+
+    @mock.patch.object(transcript, 'get_complaint_summary_and_solution',
+                       return_value={'complaint_summary': 'Cold food', 'solution': 'Refund'})
+    @mock.patch.object(transcript, 'azure_transcribe', return_value="The noodles were cold")
+    def test_intake_runs_once(self, transcribe, summarise):
+        c = complaint(COMPLAINT_QUEUED)
+        process_complaint(c.pk)
+        process_complaint(c.pk)   # queued twice, e.g. by recovery
+
+        transcribe.assert_called_once()
+        summarise.assert_called_once()
+        c.refresh_from_db()
+        self.assertIsNotNone(c.intake_started_at)
+        self.assertEqual((c.status, c.complaint_transcript, c.solution),
+                         (COMPLAINT_READY, "The noodles were cold", "Refund"))
+
+    @mock.patch.object(transcript, 'get_complaint_summary_and_solution',
+                       return_value={'complaint_summary': 'Cold food', 'solution': 'Refund'})
+    @mock.patch.object(transcript, 'azure_transcribe')
+    def test_requeued_intake_keeps_its_transcript(self, transcribe, summarise):
+        c = complaint(COMPLAINT_QUEUED, transcript="The noodles were cold")
+        process_complaint(c.pk)
+
+        transcribe.assert_not_called()
+        self.assertEqual(summarise.call_args.args[1], "The noodles were cold")
+        self.assertEqual(Complaint.objects.get(pk=c.pk).status, COMPLAINT_READY)
+
+    @mock.patch.object(transcript, 'get_complaint_summary_and_solution',
+                       return_value={'complaint_summary': 'Error generating summary.', 'solution': '429 quota exceeded'})
+    @mock.patch.object(transcript, 'azure_transcribe', return_value="The noodles were cold")
+    def test_failed_summary_marks_the_complaint_failed(self, transcribe, summarise):
+        c = complaint(COMPLAINT_QUEUED)
+        process_complaint(c.pk)
+
+        c.refresh_from_db()
+        self.assertEqual(c.status, COMPLAINT_FAILED)
+        self.assertIn("429 quota exceeded", c.complaint_summary)
+        self.assertIsNone(c.solution)
+        self.assertEqual(c.complaint_transcript, "The noodles were cold")
+
+
+class BatchAnalysisJobTests(TestCase):
+    def test_batch_runs_on_the_bulk_pool(self):
+        batch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, batch_dir)
+        uploader = Employee.objects.create(employee_id=1, employee_name="Uploader", department_id="1",
+                                           email="uploader@example.com", role="Staff")
+        data = BusinessData.objects.create(fileName="sales.csv", file_url="https://example.com/sales.csv",
+                                           uploader=uploader)
+
+        with override_settings(ANALYSIS_BATCH_DIR=batch_dir), mock.patch.object(jobs, 'submit') as submit:
+            response = self.client.post('/api/process-file/batch/', {'file_ids': [data.pk]},
+                                        content_type='application/json')
+
+        self.assertEqual(response.status_code, 202)
+        submit.assert_called_once_with("batch-analysis", run_batch, response.json()['batch_id'], pool=jobs.BULK)
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+from django.test import TestCase, override_settings
+
+from api.analytics.incremental import DatasetState, fingerprint_table, prefix_digest
+from api.analytics.lineage import LineageStore
+from api.models import DatasetLineage, Employee
+
+
+@override_settings(ANALYSIS_LINEAGE_KEEP=2)
+class LineageRetentionTests(TestCase):
+    def setUp(self):
+        Employee.objects.create(employee_id=1, employee_name="Uploader", department_id="1",
+                                email="uploader@example.com", role="Staff")
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = LineageStore(1, directory=self.directory)
+
+    def save(self, lineage_id, column):
+        frame = pd.DataFrame({column: [1.0, 2.0]})
+        return self.store.save({
+            'id': lineage_id, 'columns_digest': column, 'rows': len(frame), 'prefix_digest': column,
+            'state': DatasetState.from_frame(frame), 'frame': frame,
+        }, None, None)
+
+    def test_only_the_latest_lineages_and_frames_are_kept(self):
+        first = self.save(None, 'a')
+        second = self.save(None, 'b')
+        self.save(first, 'a')           # extending a lineage keeps it recent
+        third = self.save(None, 'c')
+
+        self.assertEqual(set(DatasetLineage.objects.values_list('id', flat=True)), {first, third})
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted([f"{first}.pkl", f"{third}.pkl"]))
+        self.assertFalse(os.path.exists(self.store.frame_path(second)))
+
+    def test_a_pruned_lineage_is_saved_as_a_new_one(self):
+        pruned = self.save(None, 'a')
+        DatasetLineage.objects.filter(pk=pruned).delete()
+
+        lineage_id = self.save(pruned, 'a')
+        self.assertNotEqual(lineage_id, pruned)
+        self.assertTrue(DatasetLineage.objects.filter(pk=lineage_id).exists())
+
+
+class LineageFindTests(TestCase):
+    def setUp(self):
+        Employee.objects.create(employee_id=1, employee_name="Uploader", department_id="1",
+                                email="uploader@example.com", role="Staff")
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = LineageStore(1, directory=self.directory)
+        self.old = pd.DataFrame({'Date': ['2024-01-01', '2024-01-02', '2024-01-03'], 'Sales': [10.0, 20.0, 30.0]})
+        fingerprint = fingerprint_table(self.old)
+        self.lineage_id = self.store.save({
+            'id': None, 'columns_digest': fingerprint['columns'], 'rows': len(self.old),
+            'prefix_digest': prefix_digest(fingerprint['hashes']),
+            'state': DatasetState.from_frame(self.old), 'frame': self.old,
+        }, None, None)
+
+    def test_appended_upload_finds_its_lineage(self):
+        appended = pd.concat([self.old, pd.DataFrame({'Date': ['2024-01-04'], 'Sales': [40.0]})], ignore_index=True)
+        found = self.store.find(fingerprint_table(appended))
+
+        self.assertEqual((found['id'], found['rows']), (self.lineage_id, 3))
+        pd.testing.assert_frame_equal(found['frame'], self.old)
+        self.assertEqual(found['state'].to_dict(), DatasetState.from_frame(self.old).to_dict())
+
+    def test_changed_or_shorter_uploads_do_not_match(self):
+        edited = self.old.assign(Sales=[10.0, 25.0, 30.0])
+        renamed = self.old.rename(columns={'Sales': 'Revenue'})
+        for frame in (edited, renamed, self.old.iloc[:2]):
+            self.assertIsNone(self.store.find(fingerprint_table(frame)))
+
+    def test_missing_frame_falls_back_to_a_full_run(self):
+        os.remove(self.store.frame_path(self.lineage_id))
+        found = self.store.find(fingerprint_table(self.old))
+        self.assertEqual(found['id'], self.lineage_id)
+        self.assertIsNone(found['frame'])
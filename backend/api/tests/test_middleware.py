@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api.middleware import QueryCountMiddleware
+from api.models import Task
+
+
+def three_lookups(request):
+    request.resolver_match = SimpleNamespace(url_name='task-detail')   # budget 2
+    for pk in range(3):
+        list(Task.objects.filter(pk=pk))
+    return HttpResponse("ok")
+
+
+@override_settings(QUERY_COUNT_ENABLED=True, QUERY_COUNT_REPEAT_THRESHOLD=3)
+class QueryCountMiddlewareTests(TestCase):
+    def test_logs_structured_budget_and_n_plus_one_warnings(self):
+        with self.assertLogs('api.middleware', level='WARNING') as logs:
+            QueryCountMiddleware(three_lookups)(RequestFactory().get('/api/tasks/1/'))
+
+        events = {record.getMessage(): record.fields for record in logs.records}
+        self.assertEqual(events["query budget exceeded"],
+                         {'path': '/api/tasks/1/', 'url_name': 'task-detail', 'queries': 3, 'budget': 2})
+        self.assertEqual(events["N+1 candidate"]['repeats'], 3)
@@ -0,0 +1,35 @@
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.middleware import SlowRequestProfilerMiddleware
+
+
+def view(request):
+    return HttpResponse("ok")
+
+
+class ProfileHeaderTests(SimpleTestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+
+    def test_header_needs_a_token(self):
+        with override_settings(PROFILE_HEADER_ENABLED=True, PROFILE_TOKEN=None, PROFILE_SLOW_REQUEST_MS=None):
+            with self.assertRaises(ImproperlyConfigured):
+                SlowRequestProfilerMiddleware(view)
+
+    def test_only_a_matching_token_gets_a_profile(self):
+        with override_settings(PROFILE_HEADER_ENABLED=True, PROFILE_TOKEN='s3cret', PROFILE_SLOW_REQUEST_MS=None,
+                               PROFILE_DIR=self.profile_dir.name):
+            middleware = SlowRequestProfilerMiddleware(view)
+            factory = RequestFactory()
+
+            for headers in ({'HTTP_X_PROFILE': 'cprofile'},
+                            {'HTTP_X_PROFILE': 'cprofile', 'HTTP_X_PROFILE_TOKEN': 'wrong'}):
+                self.assertFalse(middleware(factory.get('/', **headers)).has_header('X-Profile-Id'))
+
+            response = middleware(factory.get('/', HTTP_X_PROFILE='cprofile', HTTP_X_PROFILE_TOKEN='s3cret'))
+            self.assertTrue(response.has_header('X-Profile-Id'))
@@ -0,0 +1,42 @@
+import io
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from api import urls as api_urls
+from api.management.commands.check_query_budgets import SKIPPED, Command
+from api.query_budgets import QUERY_BUDGETS
+from api.utils.query_counter import QueryCounter, assert_max_queries
+
+
+class QueryBudgetTests(TransactionTestCase):
+    def test_every_url_has_a_budget(self):
+        url_names = {p.name for p in api_urls.urlpatterns if p.name}
+        self.assertEqual(url_names - set(QUERY_BUDGETS), set())
+
+    def test_every_url_is_requested_or_skipped(self):
+        class AnyFixture:
+            pk = 1
+
+            def __getitem__(self, key):
+                return self
+
+        requested = {name for name, *_ in Command().requests(AnyFixture())}
+        names = {p.name for p in api_urls.urlpatterns if p.name}
+        self.assertEqual(names - set(SKIPPED) - requested, set())
+
+    def test_seeded_requests_stay_within_budget(self):
+        # Raises CommandError listing every URL over budget, erroring, or failing revalidation
+        out = io.StringIO()
+        call_command('check_query_budgets', stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+    def test_assert_max_queries_reports_repeated_shapes(self):
+        from api.models import Task
+        with self.assertRaisesMessage(AssertionError, "N+1 candidates"):
+            with assert_max_queries(2):
+                for pk in range(3):
+                    list(Task.objects.filter(pk=pk))
+        with QueryCounter() as counter:
+            list(Task.objects.all())
+        self.assertEqual(counter.count, 1)
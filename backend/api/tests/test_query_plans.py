@@ -0,0 +1,13 @@
+import io
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "EXPLAIN output is planner specific")
+class QueryPlanTests(TransactionTestCase):
+    def test_hot_queries_use_indexes(self):
+        # Raises CommandError listing every hot query that plans a sequential scan
+        call_command('check_query_plans', rows=2000, stdout=io.StringIO())
@@ -0,0 +1,89 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from api.models import Complaint
+from api.resummarise import report_path, resummarise
+from api.transcript import COMPLAINT_FAILED, COMPLAINT_READY
+
+
+class ResummariseLLM:
+    """Answers packed complaint prompts; `during_call` runs on the first call, like an agent editing meanwhile"""
+
+    def __init__(self, during_call=None):
+        self.during_call = during_call
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.calls == 1 and self.during_call:
+            self.during_call()
+        ids = re.findall(r'"id": "(\d+)"', prompt.split('like below')[0])
+        return json.dumps([{"id": i, "complaint_summary": f"Summary {i}", "solution": f"Solution {i}"} for i in ids])
+
+
+class ResummariseTests(TransactionTestCase):
+    def setUp(self):
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        self.enterContext(override_settings(RESUMMARISE_REPORT_DIR=report_dir))
+
+    def complaint(self, status):
+        return Complaint.objects.create(complaint_date=timezone.localdate(), complaint_audio="complaints/test.wav",
+                                        complaint_transcript=f"Transcript of a {status} complaint",
+                                        complaint_summary="old", status=status)
+
+    def test_updates_summaries_without_overwriting_status(self):
+        failed, pending = self.complaint(COMPLAINT_FAILED), self.complaint("Pending")
+        resolve = lambda: Complaint.objects.filter(pk=pending.pk).update(status="Resolved")  # noqa: E731
+
+        report = resummarise([failed.pk, pending.pk], workers=1, per_minute=0, llm=ResummariseLLM(resolve),
+                             progress=lambda line: None)
+
+        self.assertEqual((report['updated'], report['failed'], report['requests']), (2, 0, 1))
+        failed.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual((failed.status, failed.complaint_summary), (COMPLAINT_READY, f"Summary {failed.pk}"))
+        # Resolved while the run was in flight, and stays so
+        self.assertEqual((pending.status, pending.solution), ("Resolved", f"Solution {pending.pk}"))
+
+    def test_report_is_served_from_the_shared_directory(self):
+        complaint = self.complaint(COMPLAINT_READY)
+        report = resummarise([complaint.pk], workers=1, per_minute=0, llm=ResummariseLLM(),
+                             progress=lambda line: None)
+
+        response = self.client.get(f"/api/complaints/resummarise/{report['run_id']}/")
+        self.assertEqual(response.json(), report)
+        self.assertTrue(os.path.exists(report_path(report['run_id'])))
+        self.assertEqual(self.client.get("/api/complaints/resummarise/..%2F..%2Fsettings/").status_code, 404)
+
+
+@override_settings(RESUMMARISE_WORKERS=4, GEMINI_REQUESTS_PER_MINUTE=60)
+class ResummariseViewTests(TestCase):
+    def setUp(self):
+        self.complaint = Complaint.objects.create(complaint_date=timezone.localdate(),
+                                                  complaint_audio="complaints/test.wav",
+                                                  complaint_transcript="Cold noodles", complaint_summary="",
+                                                  status=COMPLAINT_READY)
+        self.start = self.enterContext(mock.patch('api.resummarise.start', return_value='run'))
+
+    def post(self, **options):
+        return self.client.post('/api/complaints/resummarise/', {'complaint_ids': [self.complaint.pk], **options},
+                                content_type='application/json')
+
+    def test_workers_are_capped_at_the_configured_pool(self):
+        self.assertEqual(self.post(workers=500, requests_per_minute=30).status_code, 202)
+        self.assertEqual(self.start.call_args.kwargs, {'workers': 4, 'per_minute': 30})
+
+    def test_rate_limit_cannot_be_lifted(self):
+        for options in ({'requests_per_minute': 0}, {'requests_per_minute': -5},
+                        {'requests_per_minute': 61}, {'workers': 0}):
+            with self.subTest(**options):
+                self.assertEqual(self.post(**options).status_code, 400)
+        self.start.assert_not_called()
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.analytics.analysis import calculate_growth_rate
+from api.analytics.profiling import detect_trend
+from api.analytics.rollups import TimeRollups
+
+# 2024-02-28 is a Wednesday; the rows cross a week and a month boundary
+FRAME = pd.DataFrame({
+    'Date': ['2024-02-28', '2024-02-28', '2024-03-03', '2024-03-04', '2024-03-05', 'not a date'],
+    'Sales': [10.0, 5.0, 20.0, np.nan, 40.0, 1000.0],
+    'Store': ['A', 'B', 'A', 'A', 'B', 'B'],
+})
+
+
+class TimeRollupsTests(SimpleTestCase):
+    def setUp(self):
+        self.rollups = TimeRollups.from_frame(FRAME)
+
+    def test_daily_totals_skip_unparsed_dates_and_gaps(self):
+        daily = self.rollups.get('D')
+        self.assertEqual(self.rollups.date_column, 'Date')
+        self.assertEqual(daily.columns, ['Sales'])
+        self.assertEqual(daily.labels(), ['2024-02-28', '2024-03-03', '2024-03-04', '2024-03-05'])
+        np.testing.assert_array_equal(daily.values('Sales'), [15.0, 20.0, np.nan, 40.0])
+        np.testing.assert_array_equal(daily.values('Sales', how='mean'), [7.5, 20.0, np.nan, 40.0])
+        np.testing.assert_array_equal(daily.rows, [2, 1, 1, 1])
+        self.assertEqual(daily.series('Sales')[0], ['2024-02-28', '2024-03-03', '2024-03-05'])
+
+    def test_weeks_start_on_monday(self):
+        weekly = self.rollups.get('W')
+        self.assertEqual(weekly.labels(), ['2024-02-26/2024-03-03', '2024-03-04/2024-03-10'])
+        self.assertEqual(weekly.labels(), [str(p) for p in pd.PeriodIndex(['2024-02-28', '2024-03-04'], freq='W')])
+        np.testing.assert_array_equal(weekly.values('Sales'), [35.0, 40.0])
+
+    def test_months_are_labelled_like_pandas_periods(self):
+        monthly = self.rollups.get('M')
+        self.assertEqual(monthly.labels(), ['2024-02', '2024-03'])
+        np.testing.assert_array_equal(monthly.values('Sales'), [15.0, 60.0])
+        np.testing.assert_array_equal(monthly.rows, [2, 3])
+
+    def test_frame_without_dates_has_no_rollups(self):
+        self.assertIsNone(TimeRollups.from_frame(FRAME.drop(columns='Date')))
+        self.assertIsNone(TimeRollups.from_frame(FRAME.assign(Date='n/a')))
+
+    def test_merge_unions_columns(self):
+        other = TimeRollups.from_frame(pd.DataFrame({
+            'Date': ['2024-03-05', '2024-03-09'], 'Sales': [1.0, 2.0], 'Returns': [3.0, 4.0],
+        }))
+        merged = self.rollups.merge(other)
+
+        daily = merged.get('D')
+        self.assertEqual(daily.columns, ['Sales', 'Returns'])
+        self.assertEqual(daily.labels(), ['2024-02-28', '2024-03-03', '2024-03-04', '2024-03-05', '2024-03-09'])
+        np.testing.assert_array_equal(daily.values('Sales'), [15.0, 20.0, np.nan, 41.0, 2.0])
+        np.testing.assert_array_equal(daily.values('Returns'), [np.nan, np.nan, np.nan, 3.0, 4.0])
+        np.testing.assert_array_equal(merged.get('W').values('Returns'), [np.nan, 7.0])
+
+    def test_merge_over_another_date_column_keeps_self(self):
+        other = TimeRollups.from_frame(pd.DataFrame({'Order_Date': ['2024-03-05'], 'Sales': [1.0]}))
+        self.assertIs(self.rollups.merge(other), self.rollups)
+
+    def test_round_trips_through_json(self):
+        stored = json.loads(json.dumps(self.rollups.to_dict()))
+        restored = TimeRollups.from_dict(stored)
+
+        self.assertEqual(restored.to_dict(), stored)
+        for freq in ('D', 'W', 'M'):
+            self.assertEqual(restored.get(freq).labels(), self.rollups.get(freq).labels())
+            np.testing.assert_array_equal(restored.get(freq).values('Sales'), self.rollups.get(freq).values('Sales'))
+
+
+class GrowthAndTrendTests(SimpleTestCase):
+    def monthly_frame(self, totals):
+        dates = pd.date_range('2024-01-15', periods=len(totals), freq='30D')
+        return pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'), 'Revenue': totals})
+
+    def test_growth_is_first_to_last_period(self):
+        # Spans more than 90 days, so monthly totals
+        df = self.monthly_frame([100.0, 120.0, 90.0, 130.0, 150.0])
+        self.assertEqual(TimeRollups.from_frame(df).auto_freq(), 'M')
+        self.assertAlmostEqual(calculate_growth_rate(df, 'Revenue'), 50.0)
+
+    def test_growth_without_usable_periods_is_zero(self):
+        self.assertEqual(calculate_growth_rate(FRAME.drop(columns='Date'), 'Sales'), 0.0)
+        self.assertEqual(calculate_growth_rate(self.monthly_frame([100.0]), 'Revenue'), 0.0)
+        self.assertEqual(calculate_growth_rate(self.monthly_frame([0.0, 50.0]), 'Revenue'), 0.0)
+
+    def test_trend_follows_period_totals_not_row_order(self):
+        df = self.monthly_frame([100.0, 200.0, 300.0, 400.0]).iloc[::-1]
+        rollups = TimeRollups.from_frame(df)
+        self.assertEqual(detect_trend(df, 'Revenue', rollups), 'increasing')
+        self.assertEqual(detect_trend(df, 'Revenue'), 'decreasing')
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import signals, similar, transcript
+from api.models import Complaint
+from api.similar import ComplaintIndex
+from api.transcript import COMPLAINT_QUEUED, process_complaint
+
+COLD_NOODLES = "The hokkien mee arrived cold and the noodles were soggy after a long delivery wait"
+
+
+def complaint(transcript_text, status="Pending", summary="", solution=None):
+    return Complaint.objects.create(complaint_date=timezone.localdate(), complaint_audio="complaints/test.wav",
+                                    complaint_transcript=transcript_text, complaint_summary=summary,
+                                    solution=solution, status=status)
+
+
+@override_settings(SIMILAR_INDEX_MAX_AGE=600)
+class ComplaintIndexTests(TestCase):
+    def setUp(self):
+        self.index = ComplaintIndex()
+        patcher = mock.patch.object(similar, 'complaint_index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ranks_by_similarity(self):
+        cold = complaint(COLD_NOODLES, status="Resolved", solution="Refund and re-deliver")
+        complaint("The cashier was rude and shouted at my mother at the counter")
+
+        results = self.index.similar("My hokkien mee was cold and the noodles soggy", k=2)
+        self.assertEqual(results[0]['complaint_id'], cold.pk)
+        self.assertGreater(results[0]['score'], 0.3)
+        self.assertTrue(all(r['score'] < results[0]['score'] for r in results[1:]))
+        self.assertEqual(results[0]['solution'], "Refund and re-deliver")
+        self.assertEqual(self.index.similar(COLD_NOODLES, exclude=cold.pk, accepted_only=True), [])
+
+    def test_kept_current_by_signals_once_built(self):
+        self.index.similar("anything")   # builds it
+        later = complaint(COLD_NOODLES)
+        self.assertEqual(self.index.similar(COLD_NOODLES, k=1)[0]['complaint_id'], later.pk)
+
+        later.delete()
+        self.assertEqual(self.index.similar(COLD_NOODLES), [])
+
+    def test_signals_leave_an_unbuilt_index_alone(self):
+        self.assertIsNone(signals._built_complaint_index())
+        with mock.patch.object(ComplaintIndex, 'update') as update:
+            complaint(COLD_NOODLES)
+        update.assert_not_called()
+
+    @mock.patch.object(transcript, 'azure_transcribe', return_value=COLD_NOODLES)
+    @mock.patch.object(transcript, 'get_complaint_summary_and_solution',
+                       return_value={'complaint_summary': 'Cold food', 'solution': 'Refund and re-deliver'})
+    def test_intake_offers_a_resolved_solution_but_writes_its_own_summary(self, summarise, transcribe):
+        complaint(COLD_NOODLES, status="Resolved", summary="Another customer's cold order",
+                  solution="Refund and re-deliver")
+        new = complaint("", status=COMPLAINT_QUEUED)
+
+        process_complaint(new.pk)
+
+        summarise.assert_called_once()
+        self.assertEqual(summarise.call_args.args[1:], (COLD_NOODLES, "Refund and re-deliver"))
+        new.refresh_from_db()
+        self.assertEqual(new.complaint_summary, 'Cold food')
@@ -0,0 +1,135 @@
+import json
+import re
+import threading
+
+from django.test import SimpleTestCase
+
+from api.summaries import (
+    CHARS_PER_TOKEN, merge_meeting_partials, split_transcript, summarise_complaint, summarise_meeting,
+)
+
+MEETING = {"title": "Launch", "date": "2025-08-21", "participants": ["Alice", "Bob"], "departments": []}
+COMPLAINT = {"customer_name": "Tan", "customer_contact": "555", "employee_name": 1, "complaint_date": "2025-08-21"}
+
+
+class PartLLM:
+    """Answers part n with parts[n - 1] and the merge prompt with `merge`, raising the ones that are exceptions"""
+
+    def __init__(self, parts, merge):
+        self.parts = parts
+        self.merge = merge
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        part = re.search(r"\(part (\d+) of \d+", prompt)
+        response = self.parts[int(part.group(1)) - 1] if part else self.merge
+        if isinstance(response, Exception):
+            raise response
+        return response if isinstance(response, str) else json.dumps(response)
+
+
+def task(title, urgency="pending", deadline="None", content="Do it"):
+    return {"task_title": title, "task_content": content, "urgent_level": urgency, "deadline": deadline}
+
+
+class SplitTranscriptTests(SimpleTestCase):
+    def test_short_transcript_is_one_chunk(self):
+        self.assertEqual(split_transcript("  Hello there.  ", max_tokens=10), ["Hello there."])
+        self.assertEqual(split_transcript("", max_tokens=10), [])
+
+    def test_chunks_are_bounded_and_cut_between_sentences(self):
+        sentences = [f"Sentence number {i} is here." for i in range(40)]
+        chunks = split_transcript(" ".join(sentences), max_tokens=20)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 20 * CHARS_PER_TOKEN)
+            self.assertTrue(chunk.endswith("is here."), chunk)
+        self.assertEqual(" ".join(chunks), " ".join(sentences))
+
+    def test_run_on_transcript_is_cut_at_words(self):
+        words = [f"word{i}" for i in range(300)]
+        chunks = split_transcript(" ".join(words), max_tokens=10)
+
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 10 * CHARS_PER_TOKEN)
+        self.assertEqual(" ".join(chunks).split(), words)
+
+
+class MergeMeetingPartialsTests(SimpleTestCase):
+    def test_tasks_are_deduplicated_by_title(self):
+        merged = merge_meeting_partials([
+            {"summary": ["Budget agreed."], "tasks": {"Alice": [
+                task("Prepare Q3 report", "medium", "2025-09-01", "Draft"),
+                task("Book venue"),
+            ]}},
+            {"summary": ["budget  agreed.", "Launch moved."], "tasks": {
+                "Alice": [task("prepare Q3 report!", "high", "2025-09-05", "Draft with sales figures")],
+                "Bob": [task("Update website", "low")],
+            }},
+            {"summary": [], "tasks": {"Alice": [task("Prepare Q3 Report", "low", "None")]}},
+        ])
+
+        self.assertEqual(merged["summary"], ["Budget agreed.", "Launch moved."])
+        self.assertEqual(merged["tasks"]["Alice"], [
+            # Highest urgency, the last deadline given, the most specific content
+            task("Prepare Q3 report", "high", "2025-09-05", "Draft with sales figures"),
+            task("Book venue"),
+        ])
+        self.assertEqual(merged["tasks"]["Bob"], [task("Update website", "low")])
+
+
+class ChunkedSummaryTests(SimpleTestCase):
+    transcript = " ".join(f"Point {i} was discussed at length today." for i in range(30))
+
+    def test_failed_meeting_merge_falls_back_to_the_local_merge(self):
+        parts = [{"summary": [f"Part {i}"], "tasks": {"Alice": [task("Send minutes", "low")]}} for i in range(3)]
+        parts[2]["tasks"]["Alice"] = [task("Send minutes", "high", "2025-08-28")]
+        llm = PartLLM(parts, RuntimeError("merge quota exceeded"))
+        chunks = split_transcript(self.transcript, 100)
+
+        result = summarise_meeting(MEETING, self.transcript, [], llm, chunk_tokens=100)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(llm.prompts), 4)
+        self.assertEqual(result, merge_meeting_partials(parts))
+        self.assertEqual(result["tasks"]["Alice"], [task("Send minutes", "high", "2025-08-28")])
+
+    def test_merge_with_the_wrong_shape_is_merged_locally(self):
+        parts = [{"summary": ["A"], "tasks": {}}, {"summary": ["B"], "tasks": {}}, {"summary": ["C"], "tasks": {}}]
+        result = summarise_meeting(MEETING, self.transcript, [], PartLLM(parts, '{"summary": "A, B and C"}'),
+                                   chunk_tokens=100)
+        self.assertEqual(result, {"summary": ["A", "B", "C"], "tasks": {}})
+
+    def test_failed_meeting_parts_are_left_out_of_the_merge(self):
+        parts = [{"summary": ["A"], "tasks": {}}, ValueError("timeout"), "not json"]
+        merged = {"summary": ["Merged"], "tasks": {}}
+        llm = PartLLM(parts, merged)
+
+        result = summarise_meeting(MEETING, self.transcript, [], llm, chunk_tokens=100)
+        self.assertEqual(result, {"summary": ["A"], "tasks": {}})
+        # One usable part needs no merge call
+        self.assertEqual(len(llm.prompts), 3)
+
+        with self.assertRaisesMessage(Exception, "All 3 transcript parts failed"):
+            summarise_meeting(MEETING, self.transcript, [], PartLLM([ValueError()] * 3, merged), chunk_tokens=100)
+
+    def test_complaint_parts_are_joined_locally_when_the_merge_fails(self):
+        parts = [
+            {"part_summary": "Noodles arrived cold.", "mentioned_solution": "Partial refund"},
+            RuntimeError("timeout"),
+            {"part_summary": "Customer wants a full refund.", "mentioned_solution": "Full refund"},
+        ]
+        result = summarise_complaint(COMPLAINT, self.transcript, PartLLM(parts, "garbled"), chunk_tokens=100)
+
+        self.assertEqual(result, {"complaint_summary": "Noodles arrived cold. Customer wants a full refund.",
+                                  "solution": "Full refund"})
+
+    def test_known_solution_backs_the_local_complaint_merge(self):
+        parts = [{"part_summary": f"Part {i}.", "mentioned_solution": None} for i in range(3)]
+        result = summarise_complaint(COMPLAINT, self.transcript, PartLLM(parts, RuntimeError()), chunk_tokens=100,
+                                     known_solution="Replace the meal")
+        self.assertEqual(result["solution"], "Replace the meal")
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from api.analytics.tracing import Tracer, propagate, span
+from api.summaries import summarise_meeting
+
+from .test_summaries import MEETING, PartLLM
+
+
+def download(size):
+    with span('download.part', size=size) as s:
+        s.bytes = size
+    return size
+
+
+class WorkerThreadSpanTests(SimpleTestCase):
+    def test_propagated_spans_nest_under_the_callers_span(self):
+        tracer = Tracer()
+        with tracer.activate(), span('charts'):
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                self.assertEqual(list(pool.map(propagate(download), [1, 2, 3, 4])), [1, 2, 3, 4])
+
+        parts = [s for s in tracer.spans if s.name == 'download.part']
+        self.assertEqual(sorted(s.attrs['size'] for s in parts), [1, 2, 3, 4])
+        self.assertEqual({s.depth for s in parts}, {1})
+        self.assertEqual(tracer.as_dict()['stages']['charts']['bytes'], 10)
+        self.assertEqual(list(tracer.stage_seconds()), ['charts'])
+
+    def test_worker_spans_are_dropped_without_propagate(self):
+        tracer = Tracer()
+        with tracer.activate(), ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(download, 1).result()
+        self.assertEqual(tracer.spans, [])
+
+    def test_worker_spans_do_not_leak_into_the_caller(self):
+        tracer = Tracer()
+
+        def nested():
+            with span('outer'):
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    pool.submit(propagate(download), 5).result()
+            with span('after'):
+                pass
+
+        with tracer.activate():
+            nested()
+        self.assertEqual([(s.name, s.depth) for s in tracer.spans],
+                         [('outer', 0), ('download.part', 1), ('after', 0)])
+
+    def test_chunked_summary_records_a_span_per_part(self):
+        tracer = Tracer()
+        transcript = " ".join(f"Point {i} was discussed at length today." for i in range(30))
+        parts = [{"summary": [f"Part {i}"], "tasks": {}} for i in range(3)]
+        with tracer.activate():
+            summarise_meeting(MEETING, transcript, [], PartLLM(parts, {"summary": ["All"], "tasks": {}}),
+                              chunk_tokens=100)
+
+        chunks = [s for s in tracer.spans if s.name == 'summary.chunk']
+        self.assertEqual(sorted(s.attrs['part'] for s in chunks), [1, 2, 3])
+        self.assertEqual({s.depth for s in chunks}, {1})
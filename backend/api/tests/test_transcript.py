@@ -0,0 +1,58 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, time as clock
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api import transcript
+from api.models import Meeting, MeetingFile
+
+SUMMARY = {"summary": ["Agreed the roadmap."], "tasks": {}}
+
+
+class TranscriptReuseTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        # python-docx only writes the .docx download; the stored .txt is what gets reused
+        self.enterContext(mock.patch.dict(sys.modules, {'docx': mock.Mock()}))
+        self.transcribe = self.enterContext(
+            mock.patch.object(transcript, 'azure_transcribe', return_value="We agreed the roadmap."))
+        self.summarise = self.enterContext(
+            mock.patch.object(transcript, 'get_meeting_summary_and_tasks', return_value=SUMMARY))
+
+        self.audio = os.path.join(media, "standup.wav")
+        with open(self.audio, "wb") as f:
+            f.write(b"RIFF")
+        self.meeting = Meeting.objects.create(meeting_title="Standup", meeting_date=date(2026, 1, 5),
+                                              meeting_time=clock(9, 0), meeting_location="Room",
+                                              meeting_participant="")
+        MeetingFile.objects.create(meeting=self.meeting, meeting_org="standup.wav")
+
+    def post(self):
+        response = self.client.post(f"/api/transcript/{self.meeting.meeting_id}/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_stored_transcript_is_reused(self):
+        first = self.post()
+        second = self.post()
+
+        self.assertEqual(self.transcribe.call_count, 1)
+        self.assertEqual(self.summarise.call_count, 1)
+        self.assertEqual(second["transcript"], first["transcript"])
+        self.assertEqual(second["transcript_files"], first["transcript_files"])
+        self.assertEqual(second["gemini"], SUMMARY)
+
+    def test_replaced_audio_is_transcribed_again(self):
+        self.post()
+        later = time.time() + 60
+        os.utime(self.audio, (later, later))
+        self.post()
+
+        self.assertEqual(self.transcribe.call_count, 2)
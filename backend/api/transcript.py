@@ -1,24 +1,50 @@
 import os
-import azure.cognitiveservices.speech as speechsdk
 from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from .models import Meeting, MeetingFile, Employee, Department,Task, Complaint
-from docx import Document
+from .directory import directory
 import re
 from .views import get_meeting_summary_and_tasks, get_complaint_summary_and_solution
 from django.utils import timezone 
 from django.core.files.base import ContentFile
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+import hashlib
 import io
 import json
+import time
 from datetime import datetime
 from django.http import JsonResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from .utils import metrics
+from .utils.lazy import LazyModule
+from .utils.log import get_logger, lazy
+
+# Speech SDK, python-docx and reportlab load on first transcription / PDF export
+speechsdk = LazyModule('azure.cognitiveservices.speech')
+
+log = get_logger(__name__)
+
+def audio_duration_seconds(file_path):
+    """Length of a WAV file (the format the Speech SDK reads from disk), or None if unknown"""
+    import wave
+    try:
+        with wave.open(file_path, 'rb') as audio:
+            return audio.getnframes() / float(audio.getframerate())
+    except (wave.Error, EOFError, OSError, ZeroDivisionError):
+        return None
+
 
 def azure_transcribe(file_path):
+    started = time.perf_counter()
+    transcript = _azure_transcribe(file_path)
+
+    audio_seconds = audio_duration_seconds(file_path)
+    if audio_seconds:
+        metrics.TRANSCRIPTION_AUDIO.inc(audio_seconds)
+        metrics.TRANSCRIPTION_RATIO.observe((time.perf_counter() - started) / audio_seconds)
+    return transcript
+
+
+def _azure_transcribe(file_path):
     speech_config = speechsdk.SpeechConfig(
         subscription=os.getenv("AZURE_KEY"),
         region=os.getenv("AZURE_REGION")
@@ -58,6 +84,53 @@ def azure_transcribe(file_path):
     return " ".join(transcript_parts)
 
 
+def summary_hash(meeting_data, transcript_text):
+    """Identifies one version of a summary's input: the transcript and the meeting details in the prompt"""
+    source = {key: meeting_data.get(key) for key in ('title', 'date', 'time', 'location', 'departments', 'participants')}
+    source['transcript'] = transcript_text
+    return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def meeting_summary(mf, meeting_data, transcript_text, transcript_files):
+    """
+    Summary and tasks for a MeetingFile's transcript. Gemini is asked once per transcript
+    version; the result is stored on the file and reused until the transcript or the
+    meeting details change. Failed summaries aren't stored, so the next request retries.
+    """
+    digest = summary_hash(meeting_data, transcript_text)
+    if mf.summary_data and mf.transcript_hash == digest:
+        metrics.GEMINI_CACHE.labels('hit').inc()
+        return mf.summary_data
+
+    metrics.GEMINI_CACHE.labels('miss').inc()
+    result = get_meeting_summary_and_tasks(meeting_data, transcript_text, transcript_files)
+    if "error" not in result and result.get("summary") != ["Parsing failed."]:
+        mf.summary_data, mf.transcript_hash, mf.summarised_at = result, digest, timezone.now()
+        mf.save(update_fields=['summary_data', 'transcript_hash', 'summarised_at'])
+    return result
+
+
+def _stored_transcript(mf, meeting_data, audio_path, transcript_dir):
+    """
+    Text of the transcript saved for `mf` on an earlier request, or None if it has to be
+    transcribed again: nothing was saved, the audio file is newer than the transcript, or
+    the text is not the one the stored summary was made from (transcript files are named
+    after the meeting title, so another meeting's transcript may have replaced it).
+    """
+    if not (mf.meeting_transcripts and mf.transcript_hash):
+        return None
+    txt_path = os.path.join(transcript_dir, os.path.splitext(mf.meeting_transcripts)[0] + ".txt")
+    try:
+        if os.path.getmtime(txt_path) < os.path.getmtime(audio_path):
+            return None
+        with open(txt_path, encoding="utf-8") as f:
+            transcript_text = f.read()
+    except OSError:
+        return None
+    if summary_hash(meeting_data, transcript_text) != mf.transcript_hash:
+        return None
+    return transcript_text
+
 
 @csrf_exempt
 def transcript_view(request, meeting_id):
@@ -68,31 +141,19 @@ def transcript_view(request, meeting_id):
         # 1️⃣ Get meeting
         meeting = Meeting.objects.get(meeting_id=meeting_id)
 
+        people = directory.get()
+
         # --- Resolve mic employees ---
-        mic_employees = []
-        for mic_field in [meeting.meeting_mic1, meeting.meeting_mic2, meeting.meeting_mic3]:
-            if mic_field:
-                try:
-                    emp = Employee.objects.get(employee_id=mic_field)
-                    mic_employees.append(emp.employee_name)
-                except Employee.DoesNotExist:
-                    mic_employees.append(None)
-            else:
-                mic_employees.append(None)
+        mic_employees = [
+            people.employee_name(mic_field) if mic_field else None
+            for mic_field in [meeting.meeting_mic1, meeting.meeting_mic2, meeting.meeting_mic3]
+        ]
 
         # --- Resolve departments ---
-        dept_names = []
-        if meeting.meeting_department:
-            dept_ids = meeting.meeting_department.split(",")
-            departments = Department.objects.filter(department_id__in=dept_ids)
-            dept_names = [d.department_name for d in departments]
+        dept_names = people.department_names(meeting.meeting_department)
 
         # --- Resolve participants ---
-        participant_names = []
-        if meeting.meeting_participant:
-            participant_ids = meeting.meeting_participant.split(",")
-            participants = Employee.objects.filter(employee_id__in=participant_ids)
-            participant_names = [p.employee_name for p in participants]
+        participant_names = people.employee_names(meeting.meeting_participant)
 
         meeting_data = {
             "ID": meeting.meeting_id,
@@ -109,6 +170,7 @@ def transcript_view(request, meeting_id):
         meeting_files = MeetingFile.objects.filter(meeting_id=meeting_id)
         file_urls = []
         transcript_file_urls = []
+        audio_url, transcript_text, gemini_result = None, "", None
 
         safe_title = re.sub(r'[^A-Za-z0-9_-]+', '_', meeting.meeting_title)
 
@@ -118,30 +180,36 @@ def transcript_view(request, meeting_id):
                 audio_url = request.build_absolute_uri(settings.MEDIA_URL + mf.meeting_org.name)
 
                 file_path = os.path.join(settings.MEDIA_ROOT, mf.meeting_org.name)
-                transcript_text = azure_transcribe(file_path)
-
-                
-                # 📂 Make transcripts folder
                 transcript_dir = os.path.join(settings.MEDIA_ROOT, "transcripts")
-                os.makedirs(transcript_dir, exist_ok=True)
-
-                # Save transcript to TXT
-                txt_filename = f"transcript_meeting_{safe_title}.txt"
-                txt_path = os.path.join(transcript_dir, txt_filename)
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write(transcript_text)
-
-                # Save transcript to Word
-                doc_filename = f"transcript_meeting_{safe_title}.docx"
-                doc_path = os.path.join(transcript_dir, doc_filename)
-                document = Document()
-                document.add_heading(f"Transcript for Meeting {meeting.meeting_title}", level=1)
-                document.add_paragraph(transcript_text)
-                document.save(doc_path)
-
-                # ✅ Save only filename (not path) into DB
-                mf.meeting_transcripts = doc_filename
-                mf.save()
+                stored = _stored_transcript(mf, meeting_data, file_path, transcript_dir)
+                if stored is not None:
+                    transcript_text = stored
+                    doc_filename = mf.meeting_transcripts
+                    txt_filename = os.path.splitext(doc_filename)[0] + ".txt"
+                else:
+                    transcript_text = azure_transcribe(file_path)
+
+                    # 📂 Make transcripts folder
+                    os.makedirs(transcript_dir, exist_ok=True)
+
+                    # Save transcript to TXT
+                    txt_filename = f"transcript_meeting_{safe_title}.txt"
+                    txt_path = os.path.join(transcript_dir, txt_filename)
+                    with open(txt_path, "w", encoding="utf-8") as f:
+                        f.write(transcript_text)
+
+                    # Save transcript to Word
+                    doc_filename = f"transcript_meeting_{safe_title}.docx"
+                    doc_path = os.path.join(transcript_dir, doc_filename)
+                    from docx import Document
+                    document = Document()
+                    document.add_heading(f"Transcript for Meeting {meeting.meeting_title}", level=1)
+                    document.add_paragraph(transcript_text)
+                    document.save(doc_path)
+
+                    # ✅ Save only filename (not path) into DB
+                    mf.meeting_transcripts = doc_filename
+                    mf.save(update_fields=['meeting_transcripts'])
 
                 # Add URLs for frontend download
                 txt_url = request.build_absolute_uri(settings.MEDIA_URL + f"transcripts/{txt_filename}")
@@ -152,32 +220,8 @@ def transcript_view(request, meeting_id):
                 audio_url = request.build_absolute_uri(settings.MEDIA_URL + mf.meeting_org.name)
                 file_urls.append(audio_url)
 
-                # After transcription and saving
-                gemini_result = get_meeting_summary_and_tasks(
-                    meeting_data,
-                    transcript_text,
-                    transcript_file_urls
-                )
-
-                # Save tasks to DB
-                if "tasks" in gemini_result:
-                    for name, tasks in gemini_result["tasks"].items():
-                        try:
-                            assignee = Employee.objects.get(employee_name=name)
-                        except Employee.DoesNotExist:
-                            assignee = None  # fallback if no match
-
-                        # for task in tasks:
-                        #     Task.objects.create(
-                        #         meeting=meeting,
-                        #         assignee=assignee,
-                        #         task_title=task.get("task_title", "Untitled Task"),
-                        #         task_content=task.get("task_content", ""),
-                        #         urgent_level=task.get("urgent_level", "medium"),
-                        #         deadline=task.get("deadline") if task.get("deadline") != "None" else None,
-                        #         status="pending",
-                        #         created_at=timezone.now()
-                        #     )
+                # After transcription and saving (stored result if this transcript was summarised before)
+                gemini_result = meeting_summary(mf, meeting_data, transcript_text, transcript_file_urls)
 
 
             # Handle individual files
@@ -192,7 +236,7 @@ def transcript_view(request, meeting_id):
             "audio_files": audio_url,
             "transcript_files": transcript_file_urls,
             "transcript": transcript_text,
-            "gemini": get_meeting_summary_and_tasks(meeting_data, transcript_text, transcript_file_urls)
+            "gemini": gemini_result
 
         })
 
@@ -206,18 +250,13 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.core.files.base import ContentFile
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import simpleSplit
 
 from .models import Meeting, MeetingFile, Employee, Task
 
 @csrf_exempt
 def approve_summary(request, meeting_id):
     if request.method == "POST":
-        data = json.loads(request.body)
-        summary = data.get("summary", [])
-        tasks = data.get("tasks", {})
+        data = json.loads(request.body or b"{}")
 
         # ✅ Fetch meeting first
         try:
@@ -225,36 +264,31 @@ def approve_summary(request, meeting_id):
         except Meeting.DoesNotExist:
             return JsonResponse({"error": "Meeting not found"}, status=404)
 
+        # ✅ Summary and tasks as edited by the user, else the one stored by transcript_view
+        meeting_file = (MeetingFile.objects.filter(meeting=meeting, summary_data__isnull=False).first()
+                        or MeetingFile.objects.filter(meeting=meeting).first())
+        stored = (meeting_file.summary_data if meeting_file else None) or {}
+        summary = data.get("summary", stored.get("summary", []))
+        tasks = data.get("tasks", stored.get("tasks", {}))
+
+        people = directory.get()
+
         # ✅ Resolve mic employees
-        mic_employees = []
-        for mic in [meeting.meeting_mic1, meeting.meeting_mic2, meeting.meeting_mic3]:
-            if mic:
-                try:
-                    emp = Employee.objects.get(employee_id=mic)
-                    mic_employees.append(emp.employee_name)
-                except Employee.DoesNotExist:
-                    mic_employees.append(f"Unknown (ID {mic})")
+        mic_employees = [
+            people.employee_name(mic, f"Unknown (ID {mic})")
+            for mic in [meeting.meeting_mic1, meeting.meeting_mic2, meeting.meeting_mic3] if mic
+        ]
         # ✅ Resolve departments
         department_names = []
         if meeting.meeting_department:
             dept_ids = [d.strip() for d in meeting.meeting_department.split(",") if d.strip()]
-            for did in dept_ids:
-                try:
-                    dept = Department.objects.get(department_id=did)
-                    department_names.append(dept.department_name)
-                except Department.DoesNotExist:
-                    department_names.append(f"Unknown (ID {did})")
+            department_names = [people.department_name(did, f"Unknown (ID {did})") for did in dept_ids]
 
         # ✅ Resolve participants
-            participants = []
-            if meeting.meeting_participant:
-                participant_ids = [p.strip() for p in meeting.meeting_participant.split(",") if p.strip()]
-                for pid in participant_ids:
-                    try:
-                        emp = Employee.objects.get(employee_id=pid)
-                        participants.append(emp.employee_name)
-                    except Employee.DoesNotExist:
-                        participants.append(f"Unknown (ID {pid})")
+        participants = []
+        if meeting.meeting_participant:
+            participant_ids = [p.strip() for p in meeting.meeting_participant.split(",") if p.strip()]
+            participants = [people.employee_name(pid, f"Unknown (ID {pid})") for pid in participant_ids]
 
         # ✅ Generate mic employee labels dynamically
         mic_labels = [f"Mic {i+1}: {name}" for i, name in enumerate(mic_employees)]
@@ -262,6 +296,10 @@ def approve_summary(request, meeting_id):
 
 
         # ✅ Generate PDF in memory
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.utils import simpleSplit
+        from reportlab.pdfgen import canvas
+
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         width, height = letter
@@ -349,12 +387,12 @@ def approve_summary(request, meeting_id):
         p.save()
         buffer.seek(0)
 
-        # ✅ Save PDF into MeetingFile table
-        meeting_file = MeetingFile.objects.filter(meeting=meeting).first()
+        # ✅ Save PDF (and the approved summary, for later reloads) into MeetingFile table
         file_name = f"meeting_{meeting.meeting_title}_summary.pdf"
 
         if meeting_file:
-            meeting_file.meeting_summary.save(file_name, ContentFile(buffer.getvalue()), save=True)
+            meeting_file.meeting_summary.save(file_name, ContentFile(buffer.getvalue()), save=False)
+            meeting_file.summary_data = {"summary": summary, "tasks": tasks}
             meeting_file.updated_date = timezone.now().date()
             meeting_file.updated_time = timezone.now().time()
             meeting_file.save()
@@ -362,6 +400,7 @@ def approve_summary(request, meeting_id):
             meeting_file = MeetingFile.objects.create(
                 meeting=meeting,
                 meeting_summary=ContentFile(buffer.getvalue(), file_name),
+                summary_data={"summary": summary, "tasks": tasks},
                 updated_date=timezone.now().date(),
                 updated_time=timezone.now().time(),
             )
@@ -375,9 +414,8 @@ def approve_summary(request, meeting_id):
 
         # ✅ Save tasks into DB
         for assignee, task_list in tasks.items():
-            try:
-                participant = Employee.objects.get(employee_name=assignee)  # match by name
-            except Employee.DoesNotExist:
+            assignee_id = people.match_employee(assignee)  # tolerant of Gemini's spelling of names
+            if assignee_id is None:
                 continue  # skip invalid assignee names
 
             for task in task_list:
@@ -387,7 +425,7 @@ def approve_summary(request, meeting_id):
                     urgent_level=task["urgent_level"],
                     deadline=task["deadline"] if task["deadline"] else None,
                     status="Pending",
-                    assignee_id=participant.employee_id,
+                    assignee_id=assignee_id,
                 )
 
         return JsonResponse({
@@ -398,8 +436,149 @@ def approve_summary(request, meeting_id):
     return JsonResponse({"error": "Invalid request method"}, status=405)
 
 
+# Complaint.status while intake runs in the background (api/jobs.py); failed intakes
+# keep the reason in complaint_summary
+COMPLAINT_QUEUED = "Queued"
+COMPLAINT_TRANSCRIBING = "Transcribing"
+COMPLAINT_SUMMARISING = "Summarising"
+COMPLAINT_READY = "Ready"
+COMPLAINT_FAILED = "Failed"
+COMPLAINT_INTAKE_RUNNING = (COMPLAINT_QUEUED, COMPLAINT_TRANSCRIBING, COMPLAINT_SUMMARISING)
+
+
+def _set_complaint(complaint_id, status, **fields):
+    from .similar import complaint_index
+
+    # update(), not save(): edits made to the complaint meanwhile aren't overwritten.
+    # update() sends no post_save, so the similar-complaint index is refreshed here
+    Complaint.objects.filter(pk=complaint_id).update(status=status, **fields)
+    complaint_index.refresh([complaint_id])
+
+
+def _checked_summary(ai_result):
+    """
+    get_complaint_summary_and_solution reports a failed Gemini call in the result (the
+    error text in 'solution') instead of raising; raise it, so the failure isn't stored
+    as the complaint's summary and solution
+    """
+    summary = ai_result.get("complaint_summary")
+    if summary == "Error generating summary.":
+        raise RuntimeError(ai_result.get("solution") or summary)
+    if summary == "Parsing failed.":
+        raise RuntimeError("Gemini response could not be parsed")
+    return ai_result
+
+
+def _known_solution(complaint_id, transcript):
+    """
+    Solution of the most similar Resolved complaint (api/similar.py) if it scores at least
+    SIMILAR_REUSE_THRESHOLD, for the summary prompt to fall back on; else None. Only the
+    solution is offered: the summary is always written from this complaint's own transcript.
+    """
+    from .similar import complaint_index
+
+    try:
+        resolved = complaint_index.similar(transcript, k=1, exclude=complaint_id, accepted_only=True)
+        if resolved and resolved[0]["score"] >= settings.SIMILAR_REUSE_THRESHOLD:
+            log.info("offering solution of similar complaint", complaint_id=complaint_id,
+                     similar_to=resolved[0]["complaint_id"], score=resolved[0]["score"])
+            return resolved[0]["solution"]
+    except Exception:
+        # The index only saves work; intake goes on without it
+        log.exception("similar complaint lookup failed", complaint_id=complaint_id)
+    return None
+
+
+def process_complaint(complaint_id):
+    """
+    Background intake job: transcribe the complaint's audio, then summarise the transcript.
+    Only runs on a Queued complaint, which it claims, so a complaint queued twice (see
+    recover_interrupted_intake) is processed once; a transcript kept from an interrupted
+    run is not transcribed again.
+    """
+    claimed = (Complaint.objects
+               .filter(pk=complaint_id, status=COMPLAINT_QUEUED)
+               .update(status=COMPLAINT_TRANSCRIBING, intake_started_at=timezone.now()))
+    if not claimed:
+        log.info("complaint intake already taken", complaint_id=complaint_id)
+        return
+    complaint = Complaint.objects.get(pk=complaint_id)
+    abs_path = complaint.complaint_audio.path
+    log.debug(
+        "complaint audio saved", complaint_id=complaint_id, path=abs_path,
+        bytes=lazy(lambda: os.path.getsize(abs_path) if os.path.exists(abs_path) else "missing"),
+    )
+
+    transcript = complaint.complaint_transcript
+    if not transcript:
+        try:
+            transcript = azure_transcribe(abs_path)
+        except Exception as transcribe_error:
+            log.exception("transcription failed", complaint_id=complaint_id)
+            _set_complaint(complaint_id, COMPLAINT_FAILED,
+                           complaint_summary=f"Transcription failed: {transcribe_error}")
+            return
+
+    if not transcript or transcript.strip() == "":
+        log.warning("no transcript generated", complaint_id=complaint_id)
+        _set_complaint(complaint_id, COMPLAINT_FAILED, complaint_summary="No speech recognized in the audio file")
+        return
+
+    try:
+        _set_complaint(complaint_id, COMPLAINT_SUMMARISING, complaint_transcript=transcript)
+        ai_result = _checked_summary(get_complaint_summary_and_solution({
+            "customer_name": complaint.customer_name,
+            "customer_contact": complaint.customer_contact,
+            "employee_name": complaint.employee_id,
+            "complaint_date": complaint.complaint_date
+        }, transcript, _known_solution(complaint_id, transcript)))
+
+        log.debug("complaint summary generated", complaint_id=complaint_id, result=lazy(lambda: ai_result))
+
+        _set_complaint(
+            complaint_id, COMPLAINT_READY,
+            complaint_summary=ai_result.get("complaint_summary") or "Summary not available",
+            solution=ai_result.get("solution") or "Solution not available",
+        )
+    except Exception as ai_error:
+        # The transcript is kept; generate_ai_summary can retry the summary
+        log.exception("complaint summary failed", complaint_id=complaint_id)
+        _set_complaint(complaint_id, COMPLAINT_FAILED, complaint_summary=f"AI summary/solution failed: {ai_error}")
+
+
+def recover_interrupted_intake():
+    """
+    Requeue complaint intake that a stopped server process left unfinished; run once per
+    server process at start (mysite/wsgi.py). Queued complaints are requeued as they are.
+    Transcribing/Summarising ones are requeued once their intake was claimed more than
+    COMPLAINT_INTAKE_TIMEOUT ago, since until then another process may still be running
+    them (however long they waited in the queue before that).
+    """
+    from datetime import timedelta
+    from django.db.models import Q
+    from . import jobs
+
+    cutoff = timezone.now() - timedelta(seconds=settings.COMPLAINT_INTAKE_TIMEOUT)
+    reset = (Complaint.objects
+             .filter(status__in=(COMPLAINT_TRANSCRIBING, COMPLAINT_SUMMARISING))
+             # Claimed before intake_started_at existed: the upload time is all there is
+             .filter(Q(intake_started_at__lt=cutoff) | Q(intake_started_at__isnull=True, created_at__lt=cutoff))
+             .update(status=COMPLAINT_QUEUED))
+    queued = list(Complaint.objects.filter(status=COMPLAINT_QUEUED).values_list("complaint_id", flat=True))
+    for complaint_id in queued:
+        jobs.submit("complaint-intake", process_complaint, complaint_id)
+    if queued:
+        log.info("requeued interrupted complaint intake", complaints=len(queued), interrupted=reset)
+
+
 @csrf_exempt
 def complaint_upload(request):
+    """
+    Store the complaint and its audio and return 202 straight away; transcription and the
+    AI summary run as a background job (process_complaint). Follow it on complaint_status.
+    """
+    from . import jobs
+
     if request.method != "POST":
         return JsonResponse({"error": "Invalid method"}, status=405)
 
@@ -408,78 +587,90 @@ def complaint_upload(request):
         if not complaint_audio:
             return JsonResponse({"error": "Audio file required"}, status=400)
 
-        # Step 1: Save the complaint first (audio only)
         complaint = Complaint.objects.create(
             complaint_date=request.POST.get("complaint_date"),
             employee_id=request.POST.get("employee_id"),
             customer_name=request.POST.get("customer_name"),
             customer_contact=request.POST.get("customer_contact"),
             complaint_audio=complaint_audio,
-            status="In Progress"
+            status=COMPLAINT_QUEUED
         )
+        jobs.submit("complaint-intake", process_complaint, complaint.pk)
 
-        # Step 2: Transcribe using the saved file path
-        abs_path = complaint.complaint_audio.path
-        print("📂 File saved at:", abs_path)
-        print("📁 File exists:", os.path.exists(abs_path))
-        print("📊 File size:", os.path.getsize(abs_path) if os.path.exists(abs_path) else "File not found")
+        return JsonResponse({
+            "message": "Complaint uploaded; transcription and AI summary are running",
+            "complaint_id": complaint.pk,
+            "status": complaint.status,
+            "audio_url": request.build_absolute_uri(complaint.complaint_audio.url),
+            "status_url": request.build_absolute_uri(f"/api/complaintDetails/{complaint.pk}/status/"),
+        }, status=202)
 
+    except Exception as e:
+        log.exception("complaint upload failed")
+        return JsonResponse({"error": str(e)}, status=500)
 
-        try:
-            transcript = azure_transcribe(abs_path)
-        except Exception as transcribe_error:
-            print("🔥 Transcription failed:", transcribe_error)
-            return JsonResponse({
-                "error": "Transcription failed",
-                "details": str(transcribe_error)
-            }, status=500)
 
-        if not transcript or transcript.strip() == "":
-            print("❌ No transcript generated")
-            return JsonResponse({
-                "error": "No speech recognized in the audio file"
-            }, status=400)
+def _complaint_state(complaint_id):
+    """Intake progress of one complaint (None if it doesn't exist), with the results once done"""
+    row = (Complaint.objects.filter(pk=complaint_id)
+           .values("status", "complaint_transcript", "complaint_summary", "solution").first())
+    if row is None:
+        return None
+    state = {"complaint_id": complaint_id, "status": row["status"], "done": row["status"] not in COMPLAINT_INTAKE_RUNNING}
+    if row["status"] == COMPLAINT_FAILED:
+        state["error"] = row["complaint_summary"]
+    elif state["done"]:
+        state.update(transcript=row["complaint_transcript"], ai_summary=row["complaint_summary"],
+                     ai_solution=row["solution"])
+    return state
+
+
+def complaint_status(request, complaint_id):
+    """
+    GET: intake progress of a complaint, as JSON. The complaint list polls this for each
+    complaint still in intake; each poll is one indexed query and holds no worker.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid method"}, status=405)
 
-        # Save transcript
-        complaint.complaint_transcript = transcript
-        complaint.save()
+    state = _complaint_state(complaint_id)
+    if state is None:
+        return JsonResponse({"error": "Complaint not found"}, status=404)
+    return JsonResponse(state)
 
-        # Step 3: Generate AI summary & solution
-        try:
-            ai_result = get_complaint_summary_and_solution({
-                "customer_name": complaint.customer_name,
-                "customer_contact": complaint.customer_contact,
-                "employee_name": complaint.employee_id,
-                "complaint_date": complaint.complaint_date
-            }, transcript)
 
-            print("🔹 AI Result:", ai_result)
+def similar_complaints(request, complaint_id=None):
+    """
+    GET: the `k` (default 5, at most 50) past complaints most like complaint `complaint_id`,
+    or like the text in `?q=`, best first, each with its similarity score, summary and
+    solution. `?resolved=1` keeps only Resolved complaints.
+    """
+    from .similar import complaint_index, complaint_text
 
-            complaint.complaint_summary = ai_result.get("complaint_summary") or "Summary not available"
-            complaint.solution = ai_result.get("solution") or "Solution not available"
-            complaint.save()
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid method"}, status=405)
 
-        except Exception as ai_error:
-            print("🔥 AI summary/solution generation failed:", ai_error)
-            return JsonResponse({
-                "error": "AI summary/solution failed",
-                "details": str(ai_error)
-            }, status=500)
+    try:
+        k = min(max(int(request.GET.get("k", 5)), 1), 50)
+    except ValueError:
+        return JsonResponse({"error": "k must be an integer"}, status=400)
+
+    if complaint_id is not None:
+        complaint = Complaint.objects.filter(pk=complaint_id) \
+            .values("complaint_transcript", "complaint_summary").first()
+        if complaint is None:
+            return JsonResponse({"error": "Complaint not found"}, status=404)
+        text = complaint_text(complaint["complaint_transcript"], complaint["complaint_summary"])
+    else:
+        text = request.GET.get("q", "")
+    if not text.strip():
+        return JsonResponse({"error": "No complaint text to compare"}, status=400)
+
+    return JsonResponse({"similar": complaint_index.similar(
+        text, k=k, exclude=complaint_id, accepted_only=request.GET.get("resolved") in ("1", "true"),
+    )})
 
-        # ✅ Success response
-        return JsonResponse({
-            "message": "Complaint uploaded and transcribed",
-            "complaint_id": complaint.pk,
-            "audio_url": request.build_absolute_uri(complaint.complaint_audio.url),
-            "transcript": transcript,
-            "ai_summary": complaint.complaint_summary,
-            "ai_solution": complaint.solution
-        })
 
-    except Exception as e:
-        print("🔥 Unexpected error:", e)
-        return JsonResponse({"error": str(e)}, status=500)
-    
 @csrf_exempt
 def generate_ai_summary(request, complaint_id):
     if request.method != "POST":
@@ -494,21 +685,23 @@ def generate_ai_summary(request, complaint_id):
 
         # Step 1: Generate AI summary & solution
         try:
-            ai_result = get_complaint_summary_and_solution({
+            ai_result = _checked_summary(get_complaint_summary_and_solution({
                 "customer_name": complaint.customer_name,
                 "customer_contact": complaint.customer_contact,
                 "employee_name": complaint.employee_id,
                 "complaint_date": complaint.complaint_date
-            }, complaint.complaint_transcript)
+            }, complaint.complaint_transcript))
 
-            print("🔹 AI Result:", ai_result)
+            log.debug("complaint summary generated", complaint_id=complaint.pk, result=lazy(lambda: ai_result))
 
             complaint.complaint_summary = ai_result.get("complaint_summary") or "Summary not available"
             complaint.solution = ai_result.get("solution") or "Solution not available"
+            if complaint.status == COMPLAINT_FAILED:
+                complaint.status = COMPLAINT_READY
             complaint.save()
 
         except Exception as ai_error:
-            print("🔥 AI summary/solution generation failed:", ai_error)
+            log.exception("complaint summary failed", complaint_id=complaint.pk)
             return JsonResponse({
                 "error": "AI summary/solution failed",
                 "details": str(ai_error)
@@ -525,5 +718,5 @@ def generate_ai_summary(request, complaint_id):
     except Complaint.DoesNotExist:
         return JsonResponse({"error": "Complaint not found"}, status=404)
     except Exception as e:
-        print("🔥 Unexpected error:", e)
+        log.exception("complaint summary failed", complaint_id=complaint_id)
         return JsonResponse({"error": str(e)}, status=500)
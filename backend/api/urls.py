@@ -7,8 +7,10 @@ urlpatterns = [
     path('business-data/', views.BusinessDataListCreateView.as_view(), name='business-data-list-create'),
     path('business-data/<uuid:pk>/', views.BusinessDataRetrieveUpdateDestroyView.as_view(), name='business-data-detail'),
     path('process-file/', views.FileProcessingView.as_view(), name='process-file'),
+    path('process-file/batch/', views.BatchAnalysisView.as_view(), name='process-file-batch'),
+    path('process-file/batch/<str:batch_id>/', views.BatchAnalysisView.as_view(), name='process-file-batch-status'),
     path('processed-reports/', views.ProcessedReportListView.as_view(), name='processed-reports-list'),
-    path('processed-reports/<uuid:pk>/', views.ProcessedReportRetrieveView.as_view(), name='processed-report-detail'),
+    path('processed-reports/<int:pk>/', views.ProcessedReportRetrieveView.as_view(), name='processed-report-detail'),
     path('transcript/', views.transcript_view, name='transcript'),
     path('complaint-upload/', transcript.complaint_upload, name='complaint-upload'),
     path('meetings/', views.MeetingListView.as_view(), name='meeting-list'),
@@ -24,9 +26,14 @@ urlpatterns = [
     path('complaintList/', views.ComplaintListView.as_view(), name='complaint-list-create'),
     path('complaintDetails/<int:complaint_id>/', views.ComplaintDetailView.as_view(), name='complaint-update'),
     path('complaintDetails/<int:complaint_id>/generate_ai_summary/', transcript.generate_ai_summary, name='complaint-ai-update'),
+    path('complaintDetails/<int:complaint_id>/status/', transcript.complaint_status, name='complaint-status'),
+    path('complaintDetails/<int:complaint_id>/similar/', transcript.similar_complaints, name='complaint-similar'),
+    path('complaints/similar/', transcript.similar_complaints, name='complaint-similar-search'),
+    path('complaints/resummarise/', views.ComplaintResummariseView.as_view(), name='complaint-resummarise'),
+    path('complaints/resummarise/<str:run_id>/', views.ComplaintResummariseView.as_view(), name='complaint-resummarise-status'),
     path("approve_summary/<int:meeting_id>/", transcript.approve_summary, name="approve-summary"),
     path('comment-reports/', views.CommentReportListView.as_view(), name='comment-report-list'),
-    path('comment-reports/<uuid:pk>/', views.CommentReportRetrieveView.as_view(), name='comment-report-detail'),
+    path('comment-reports/<int:pk>/', views.CommentReportRetrieveView.as_view(), name='comment-report-detail'),
     path('analyse-comment/', views.FeedbackAnalysisView.as_view(), name='analyse-comment'),
     path('meeting_full/<int:meeting_id>/', views.meeting_full, name='meeting-full'),
     path('meeting_files_check/', views.meeting_files_check, name='meeting_files_check'),
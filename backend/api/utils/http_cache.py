@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+
+def etag_for(*parts):
+    """Stable ETag value built from cheap version fields (ids, timestamps)"""
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def content_etag(data):
+    """Quoted ETag from the serialised payload itself"""
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha1(payload.encode("utf-8")).hexdigest()}"'
+
+
+def revalidate(response):
+    """Let the browser keep the response but ask us (If-None-Match) before reusing it"""
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, data, etag=None):
+    """Return 304 when the client already holds `data`, otherwise a Response carrying its ETag"""
+    etag = etag or content_etag(data)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return revalidate(not_modified)
+    response = Response(data)
+    response["ETag"] = etag
+    return revalidate(response)
+
+
+# Cache keys for reference data; api/signals.py deletes them when the models change
+DEPARTMENTS_CACHE_KEY = "reference:departments"
+EMPLOYEES_CACHE_KEY = "reference:employees"
+
+
+class CachedReferenceListMixin:
+    """
+    List view whose serialised payload lives in Django's cache until the model is written.
+
+    A warm cache answers both full loads and revalidations (304) without touching the DB.
+    """
+    reference_cache_key = None
+
+    def list(self, request, *args, **kwargs):
+        cached = cache.get(self.reference_cache_key)
+        if cached is None:
+            data = [dict(row) for row in self.get_serializer(self.get_queryset(), many=True).data]
+            cached = {"etag": content_etag(data), "data": data}
+            cache.set(self.reference_cache_key, cached, timeout=settings.REFERENCE_CACHE_TIMEOUT)
+        return conditional_response(request, cached["data"], etag=cached["etag"])
@@ -0,0 +1,43 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+
+    `pd = LazyModule('pandas')` keeps `pd.DataFrame(...)` call sites unchanged while
+    letting CRUD-only workers and management commands skip the import entirely.
+    `on_import` runs once right before the real import (e.g. to pick a matplotlib backend).
+    """
+
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._on_import is not None:
+                        self._on_import()
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def use_agg_backend():
+    """Server-side rendering only; never try to open a GUI backend"""
+    import matplotlib
+    matplotlib.use('Agg')
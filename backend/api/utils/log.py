@@ -0,0 +1,127 @@
+"""
+Structured, level-gated logging.
+
+    log = get_logger(__name__)
+    log.info("detected data type", filename=filename, data_type=data_type)
+    log.debug("cleaned data", shape=df.shape, columns=lazy(df.columns.tolist))
+
+Fields are kept on the record and only turned into text by the formatter, and nothing
+at all happens when the level is disabled, so diagnostics on hot paths cost one
+isEnabledFor() check in production. Wrap anything expensive to compute or stringify
+(column lists, raw Gemini output, whole dicts) in `lazy()` so it is only evaluated when
+the line is actually emitted. Levels are set per module in settings.LOGGING.
+"""
+import json
+import logging
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+# Longest rendering of a single field; stops a whole DataFrame or Gemini response
+# from landing in the log when someone raises a module to DEBUG
+MAX_FIELD_CHARS = 500
+
+
+class lazy:
+    """Defer computing a field value until the record is formatted"""
+
+    __slots__ = ('fn',)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __str__(self):
+        try:
+            return str(self.fn())
+        except Exception as e:  # a diagnostic must never break the request
+            return f"<unavailable: {e}>"
+
+    __repr__ = __str__
+
+
+class StructuredLogger:
+    """Thin wrapper over a stdlib logger that takes an event name plus keyword fields"""
+
+    __slots__ = ('logger',)
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level, event, fields, exc_info=False):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, event, exc_info=exc_info, extra={'fields': fields}, stacklevel=3)
+
+    def debug(self, event, **fields):
+        self._log(DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """ERROR with the current traceback"""
+        self._log(ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name):
+    return StructuredLogger(logging.getLogger(name))
+
+
+def render_value(value, limit=MAX_FIELD_CHARS):
+    text = str(value)
+    if len(text) > limit:
+        text = f"{text[:limit]}...(+{len(text) - limit} chars)"
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`<fmt> key=value key="value with spaces"`, traceback on the following lines"""
+
+    def format(self, record):
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        line = self.formatMessage(record)
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            pairs = []
+            for key, value in fields.items():
+                text = render_value(value)
+                if not text or any(c in text for c in ' ="\n'):
+                    text = json.dumps(text)
+                pairs.append(f"{key}={text}")
+            line = f"{line} {' '.join(pairs)}"
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        if record.stack_info:
+            line = f"{line}\n{self.formatStack(record.stack_info)}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        for key, value in (getattr(record, 'fields', None) or {}).items():
+            entry[key] = value if isinstance(value, (int, float, bool)) or value is None else render_value(value)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
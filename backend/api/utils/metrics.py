@@ -0,0 +1,249 @@
+"""
+Minimal Prometheus-compatible metrics (text exposition format 0.0.4), stdlib only.
+
+Metrics are process-local and guarded by one lock per metric; an observation is a dict
+lookup and a few additions, so instrumentation can stay on in production. With several
+worker processes each serves its own numbers, so scrape every worker (or run one process
+with threads, as `runserver` does).
+
+    REQUEST_LATENCY.labels('process-file', 'POST', '2xx').observe(seconds)
+    with GEMINI_LATENCY.time(): ...
+    with ANALYSIS_JOBS.track_inprogress('process-file'): ...
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    _new_child = _CounterChild
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name if name.endswith('_total') else f"{name}_total", documentation, labelnames, registry)
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        self.value = value
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def samples(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    _new_child = _GaugeChild
+
+    def track_inprogress(self, *labels):
+        return self.labels(*labels).track_inprogress()
+
+    def set(self, value):
+        self._unlabelled().set(value)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name, labelnames, key):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            labels = _format_labels(labelnames, key, extra=[('le', _format_value(bound))])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, key, extra=[('le', '+Inf')])
+        lines.append(f"{name}_bucket{labels} {self.count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {self.count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._unlabelled().observe(value)
+
+    def time(self, *labels):
+        return self.labels(*labels).time()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# --- HTTP / DB (MetricsMiddleware) ---
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by URL name', ('url_name', 'method', 'status'),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries issued per request', ('url_name',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+
+# --- Analysis pipelines ---
+ANALYSIS_JOBS = Gauge('analysis_jobs_in_flight', 'Analysis jobs currently running', ('pipeline',))
+BACKGROUND_JOBS = Gauge('background_jobs_in_flight', 'Background jobs queued or running (api/jobs.py)', ('job',))
+
+# --- Gemini (api/analytics/clients.py, views.get_*_summary_*) ---
+GEMINI_CALLS = Counter('gemini_requests', 'Gemini generate calls', ('outcome',))
+GEMINI_LATENCY = Histogram('gemini_request_duration_seconds', 'Gemini generate latency')
+GEMINI_CACHE = Counter('gemini_cache_lookups', 'Lookups of stored Gemini results before calling out', ('result',))
+
+# --- Supabase storage ---
+STORAGE_BYTES = Counter('supabase_storage_bytes', 'Bytes moved to/from Supabase storage', ('direction',))
+STORAGE_LATENCY = Histogram('supabase_storage_duration_seconds', 'Supabase storage call latency', ('direction',))
+
+# --- Speech transcription ---
+TRANSCRIPTION_RATIO = Histogram(
+    'transcription_seconds_per_audio_second', 'Transcription wall time divided by audio duration',
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5),
+)
+TRANSCRIPTION_AUDIO = Counter('transcription_audio_seconds', 'Audio seconds transcribed')
+
+
+@contextmanager
+def track_gemini_call():
+    """Count and time one Gemini call; the outcome label is 'error' if the block raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        GEMINI_CALLS.labels('error').inc()
+        raise
+    else:
+        GEMINI_CALLS.labels('ok').inc()
+    finally:
+        GEMINI_LATENCY.observe(time.perf_counter() - start)
@@ -0,0 +1,85 @@
+"""
+Request profiling helpers for SlowRequestProfilerMiddleware.
+
+StackSampler is one background thread per process that periodically reads the Python
+stack of every registered request thread (sys._current_frames) and counts identical
+stacks. The result is written in the "folded" format (`frame;frame;frame count`) that
+flamegraph.pl, speedscope and inferno read directly.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def frame_label(frame):
+    code = frame.f_code
+    # Last two path components keep labels short but still tell api/views.py from views.py elsewhere
+    filename = '/'.join(code.co_filename.replace('\\', '/').rsplit('/', 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+
+
+def fold_stack(frame):
+    """'outer;...;inner' for a frame and its callers"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """Samples registered threads every `interval` seconds while at least one is registered"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        with self._lock:
+            self._samples[ident] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, ident):
+        """Counter of folded stacks collected for the thread since start()"""
+        with self._lock:
+            return self._samples.pop(ident, Counter())
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._samples
+                if idle:
+                    self._wake.clear()
+            if idle:
+                # Nothing to sample: sleep until the next request registers instead of polling
+                self._wake.wait()
+                continue
+
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, counter in self._samples.items():
+                    frame = frames.get(ident)
+                    if frame is not None and ident != own:
+                        counter[fold_stack(frame)] += 1
+            del frames
+
+
+def write_folded(path, samples):
+    with open(path, 'w') as out:
+        for stack, count in samples.most_common():
+            out.write(f"{stack} {count}\n")
+
+
+def profile_path(directory, request_id, extension):
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{request_id}.{extension}")
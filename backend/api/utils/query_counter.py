@@ -0,0 +1,79 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+# A collapsed "IN (%s, %s, ...)" so queries that only differ by list length share a shape
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_shape(sql):
+    """Normalise SQL so repeated queries with different parameters compare equal"""
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryCounter:
+    """
+    Count queries and total DB time on every connection of the current thread.
+
+    Pass track_shapes=False to skip SQL normalisation when only the totals are needed.
+
+    Usage:
+        with QueryCounter() as counter:
+            ...
+        counter.count, counter.duration_ms, counter.n_plus_one_candidates()
+    """
+
+    def __init__(self, repeat_threshold=3, track_shapes=True):
+        self.repeat_threshold = repeat_threshold
+        self.track_shapes = track_shapes
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.track_shapes:
+                self.shapes[query_shape(sql)] += 1
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def n_plus_one_candidates(self):
+        """Query shapes executed at least `repeat_threshold` times, most repeated first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= self.repeat_threshold]
+
+
+@contextmanager
+def assert_max_queries(limit, repeat_threshold=3):
+    """Test helper: fail if the block issues more than `limit` queries"""
+    with QueryCounter(repeat_threshold=repeat_threshold) as counter:
+        yield counter
+    if counter.count > limit:
+        repeated = "\n".join(f"  {n}x {shape}" for shape, n in counter.n_plus_one_candidates())
+        raise AssertionError(
+            f"{counter.count} queries executed, budget is {limit}"
+            + (f"\nRepeated query shapes (N+1 candidates):\n{repeated}" if repeated else "")
+        )
@@ -15,6 +15,7 @@ from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.chart.data import CategoryChartData
 from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
 
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import datetime, requests
 import matplotlib
@@ -24,6 +25,12 @@ import seaborn as sns
 import pandas as pd
 import numpy as np
 
+from ..analytics.rollups import rollups_for
+from ..analytics.tracing import propagate, span
+from .log import get_logger, lazy
+
+log = get_logger(__name__)
+
 
 # ---------------------------
 # Helpers: styles and branding
@@ -189,7 +196,51 @@ class CleaningReportGenerator:
 # PDF Generator
 # ---------------------------
 
+def _daily_series(df, date_col, column, rollups=None, how='sum'):
+    """(day labels, per-day sum or mean of `column`) from the dataset rollups, built for date_col if they don't cover it"""
+    rollups = rollups_for(df, date_col, rollups)
+    if rollups is None or not rollups.has(column):
+        return [], np.array([])
+    return rollups.get('D').series(column, how)
+
+
+CHART_FETCH_WORKERS = 4
+
+
+def _chart_images(visualizations, placeholder_url=None):
+    """
+    PNG bytes per visualization (None if unavailable): the bytes rendered by the
+    visualization stage, else downloaded from its URL. Downloads run in parallel.
+    """
+    images = [viz.get('image') for viz in visualizations]
+    missing = [i for i, viz in enumerate(visualizations)
+               if images[i] is None and viz.get('url') and viz.get('url') != placeholder_url]
+    if not missing:
+        return images
+
+    def fetch(url):
+        try:
+            with span('chart.download') as s:
+                response = requests.get(url, timeout=10)
+                s.bytes = len(response.content)
+            if response.status_code == 200:
+                return response.content
+            log.warning("chart image download failed", url=url, status=response.status_code)
+        except Exception as e:
+            log.warning("chart image download failed", url=url, error=e)
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(CHART_FETCH_WORKERS, len(missing))) as pool:
+        for i, content in zip(missing, pool.map(propagate(fetch), [visualizations[i]['url'] for i in missing])):
+            images[i] = content
+    return images
+
+
 class PDFGenerator:
+    def __init__(self, rollups=None):
+        # Daily/weekly/monthly totals of the dataset (api/analytics/rollups.py), shared by the trend charts
+        self.rollups = rollups
+
     def create_analysis_report(self, gemini_output, filename, data_df=None, data_type=None):
         # If data provided, use the chart-embedded version
         if data_df is not None and isinstance(data_df, pd.DataFrame) and not data_df.empty:
@@ -395,15 +446,13 @@ class PDFGenerator:
             date_info = self._first_date(df)
             if date_info and rev and profit:
                 dc, ser = date_info
-                tmp = df.copy()
-                tmp[dc] = pd.to_datetime(tmp[dc], errors='coerce')
-                tmp = tmp.dropna(subset=[dc])
-                agg = tmp.groupby(tmp[dc].dt.to_period('D'))[[rev, profit]].sum()
+                daily = rollups_for(df, dc, self.rollups).get('D')
+                days = daily.labels()
                 fig, ax1 = plt.subplots(figsize=(10,5.5))
-                ax1.plot(agg.index.astype(str), agg[rev], color="#2E86AB", marker='o', label='Revenue')
+                ax1.plot(days, daily.values(rev), color="#2E86AB", marker='o', label='Revenue')
                 ax1.set_ylabel('Revenue', color="#2E86AB")
                 ax2 = ax1.twinx()
-                ax2.plot(agg.index.astype(str), agg[profit], color="#C0392B", marker='s', label='Profit')
+                ax2.plot(days, daily.values(profit), color="#C0392B", marker='s', label='Profit')
                 ax2.set_ylabel('Profit', color="#C0392B")
                 ax1.set_xlabel('Date')
                 plt.title("Revenue vs Profit Trend")
@@ -419,12 +468,10 @@ class PDFGenerator:
                 date_info = self._first_date(df)
                 if date_info:
                     dc, ser = date_info
-                    tmp = df.copy()
-                    tmp[dc] = pd.to_datetime(tmp[dc], errors='coerce')
-                    tmp = tmp.dropna(subset=[dc])
+                    days, daily_margin = _daily_series(df, dc, margin, self.rollups, how='mean')
                     fig, ax = plt.subplots(figsize=(10,5.2))
-                    ax.plot(tmp[dc], tmp[margin]*100, color="#16A085", marker='o')
-                    ax.axhline(y=(tmp[margin]*100).mean(), color="#8E44AD", linestyle='--', alpha=0.6, label='Average')
+                    ax.plot(pd.to_datetime(days), daily_margin*100, color="#16A085", marker='o')
+                    ax.axhline(y=df[margin].mean()*100, color="#8E44AD", linestyle='--', alpha=0.6, label='Average')
                     ax.set_title("Profit Margin (%) Over Time")
                     ax.set_xlabel("Date")
                     ax.set_ylabel("Profit Margin (%)")
@@ -504,15 +551,12 @@ class PDFGenerator:
             date_info = self._first_date(df)
             if date_info and revenue:
                 dc, ser = date_info
-                tmp = df.copy()
-                tmp[dc] = pd.to_datetime(tmp[dc], errors='coerce')
-                tmp = tmp.dropna(subset=[dc])
-                daily = tmp.groupby(tmp[dc].dt.to_period('D'))[revenue].sum()
+                days, daily = _daily_series(df, dc, revenue, self.rollups)
                 fig, ax = plt.subplots(figsize=(10,5.2))
-                ax.plot(daily.index.astype(str), daily.values, marker='o', color="#2E86AB")
-                z = np.polyfit(range(len(daily)), daily.values, 1)
+                ax.plot(days, daily, marker='o', color="#2E86AB")
+                z = np.polyfit(range(len(daily)), daily, 1)
                 p = np.poly1d(z)
-                ax.plot(daily.index.astype(str), p(range(len(daily))), "--", color='#C0392B', alpha=0.7)
+                ax.plot(days, p(range(len(daily))), "--", color='#C0392B', alpha=0.7)
                 ax.set_title("Daily Sales Trend")
                 ax.set_xlabel("Date")
                 ax.set_ylabel("Sales")
@@ -609,12 +653,9 @@ class PDFGenerator:
         try:
             if date_info and metrics:
                 dc, ser = date_info
-                tmp = df.copy()
-                tmp[dc] = pd.to_datetime(tmp[dc], errors='coerce')
-                tmp = tmp.dropna(subset=[dc])
-                daily = tmp.groupby(tmp[dc].dt.to_period('D'))[metrics].sum()
+                daily = rollups_for(df, dc, self.rollups).get('D')
                 fig, ax = plt.subplots(figsize=(10,5.2))
-                ax.plot(daily.index.astype(str), daily.values, color="#2E86AB", marker='o')
+                ax.plot(daily.labels(), np.column_stack([daily.values(m) for m in metrics]), color="#2E86AB", marker='o')
                 ax.set_title(f"Daily {metrics} Trend")
                 ax.set_xlabel("Date")
                 ax.set_ylabel(metrics)
@@ -637,18 +678,16 @@ class PDFGenerator:
         try:
             if date_info and num_cols:
                 dc, ser = date_info
-                tmp = df.copy()
-                tmp[dc] = pd.to_datetime(tmp[dc], errors='coerce')
-                tmp = tmp.dropna(subset=[dc])
-                daily = tmp.groupby(tmp[dc].dt.to_period('D'))[num_cols].sum()
+                col = num_cols[0]
+                days, daily = _daily_series(df, dc, col, self.rollups)
                 fig, ax = plt.subplots(figsize=(10,5.2))
-                ax.plot(daily.index.astype(str), daily.values, color="#2E86AB", marker='o')
-                ax.set_title(f"{num_cols.title()} Trend Over Time")
+                ax.plot(days, daily, color="#2E86AB", marker='o')
+                ax.set_title(f"{col.title()} Trend Over Time")
                 ax.set_xlabel("Date")
-                ax.set_ylabel(num_cols.title())
+                ax.set_ylabel(col.title())
                 plt.xticks(rotation=45)
                 fig.tight_layout()
-                visuals.append((f"{num_cols.title()} Trend", self._buf_from_fig(fig)))
+                visuals.append((f"{col.title()} Trend", self._buf_from_fig(fig)))
         except Exception:
             pass
 
@@ -959,35 +998,36 @@ class PDFGenerator:
             story.append(Spacer(1, 10))
 
             if visualizations:
+                # Rendered chart bytes from the visualization stage; only charts without
+                # them are downloaded from Supabase (all at once, before the loop)
+                from ..analytics.feedback import PLACEHOLDER_CHART_URL
+                images = _chart_images(visualizations, PLACEHOLDER_CHART_URL)
+
                 # Display each visualization with AI-generated description
-                for i, viz in enumerate(visualizations, 1):
+                for i, (viz, image) in enumerate(zip(visualizations, images), 1):
                     try:
                         story.append(Paragraph(f"Chart {i}: {viz.get('title', 'Visualization')}", subsection_style))
                         
-                        # Download the chart image from Supabase URL
-                        chart_url = viz.get('url')
-                        if chart_url:
-                            response = requests.get(chart_url, timeout=10)
-                            if response.status_code == 200:
-                                chart_buffer = BytesIO(response.content)
-                                
-                                # Convert to ReportLab Image with appropriate sizing
-                                chart_image = Image(chart_buffer, width=5.5*inch, height=3.5*inch)
-                                chart_image.hAlign = 'CENTER'
-                                story.append(chart_image)
-                                
-                                # Add AI-generated chart description as bullet points
-                                description = viz.get('description', 'No description available')
-                                # Split description into key points
-                                desc_points = description.split('. ')
-                                story.append(Paragraph("📝 Key Insights:", bullet_style))
-                                for point in desc_points[:3]:  # Show top 3 insights
-                                    if point.strip():
-                                        clean_point = point.strip().rstrip('.')
-                                        story.append(Paragraph(f"• {clean_point}", insight_style))
-                                story.append(Spacer(1, 15))
+                        if image:
+                            chart_buffer = BytesIO(image)
+                            
+                            # Convert to ReportLab Image with appropriate sizing
+                            chart_image = Image(chart_buffer, width=5.5*inch, height=3.5*inch)
+                            chart_image.hAlign = 'CENTER'
+                            story.append(chart_image)
+                            
+                            # Add AI-generated chart description as bullet points
+                            description = viz.get('description', 'No description available')
+                            # Split description into key points
+                            desc_points = description.split('. ')
+                            story.append(Paragraph("📝 Key Insights:", bullet_style))
+                            for point in desc_points[:3]:  # Show top 3 insights
+                                if point.strip():
+                                    clean_point = point.strip().rstrip('.')
+                                    story.append(Paragraph(f"• {clean_point}", insight_style))
+                            story.append(Spacer(1, 15))
                     except Exception as e:
-                        print(f"Error loading chart {i}: {e}")
+                        log.warning("chart image failed to load", index=i, error=e)
                         continue
             else:
                 story.append(Paragraph("• No visualizations available for this analysis", bullet_style))
@@ -1054,9 +1094,7 @@ class PDFGenerator:
             return pdf_content
         
         except Exception as e:
-            print(f"AI Enhanced PDF Generation Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception("ai enhanced pdf failed")
             raise Exception(f"Failed to generate AI-enhanced PDF: {str(e)}")
     
     def parse_markdown_executive_summary(self, executive_summary, story, subsection_style, bullet_style, insight_style, recommendation_style, highlight_style):
@@ -1130,6 +1168,10 @@ class PDFGenerator:
 
 
 class PPTGenerator:
+    def __init__(self, rollups=None):
+        # See PDFGenerator
+        self.rollups = rollups
+
     def create_generic_notes_slide(self, slide, chart_title, data_insights, recommendations):
         """Helper method to create standardized notes for any chart slide"""
         notes_slide = slide.notes_slide
@@ -1397,21 +1439,21 @@ class PPTGenerator:
     def create_chart_slides(self, prs, df, data_type=None):
         """Create chart slides with detailed notes for each chart - FIXED VERSION"""
         
-        print(f"DEBUG: Creating chart slides for data_type: {data_type}")
-        print(f"DEBUG: DataFrame shape: {df.shape}")
-        print(f"DEBUG: DataFrame columns: {df.columns.tolist()}")
-        
         if df is None or df.empty:
-            print("ERROR: DataFrame is None or empty!")
+            log.warning("chart slides skipped: no data", data_type=data_type)
             return
         
+        log.debug(
+            "creating chart slides", data_type=data_type, shape=df.shape,
+            columns=lazy(df.columns.tolist),
+        )
         cols = {c.lower(): c for c in df.columns}
         charts_created = 0
         
         def add_line_chart_with_notes(title, categories, series_label, series_values, notes_text):
             nonlocal charts_created
             try:
-                print(f"DEBUG: Creating line chart: {title}")
+                log.debug("creating chart", kind="line", title=title)
                 slide = prs.slides.add_slide(prs.slide_layouts[5])
                 slide.shapes.title.text = title
                 
@@ -1420,7 +1462,7 @@ class PPTGenerator:
                 series_values = [float(val) if pd.notna(val) else 0.0 for val in series_values]
                 
                 if len(categories) != len(series_values):
-                    print(f"ERROR: Categories length {len(categories)} != Values length {len(series_values)}")
+                    log.warning("chart length mismatch", title=title, categories=len(categories), values=len(series_values))
                     return
                 
                 chart_data = CategoryChartData()
@@ -1437,17 +1479,17 @@ class PPTGenerator:
                 notes_slide.notes_text_frame.text = notes_text
                 
                 charts_created += 1
-                print(f"SUCCESS: Line chart created: {title}")
+                log.debug("chart created", kind="line", title=title)
                 
             except Exception as e:
-                print(f"ERROR creating line chart '{title}': {str(e)}")
+                log.exception("chart failed", kind="line", title=title)
                 import traceback
                 traceback.print_exc()
 
         def add_bar_chart_with_notes(title, cats, label, vals, notes_text):
             nonlocal charts_created
             try:
-                print(f"DEBUG: Creating bar chart: {title}")
+                log.debug("creating chart", kind="bar", title=title)
                 slide = prs.slides.add_slide(prs.slide_layouts[5])
                 slide.shapes.title.text = title
                 
@@ -1456,7 +1498,7 @@ class PPTGenerator:
                 vals = [float(val) if pd.notna(val) else 0.0 for val in vals]
                 
                 if len(cats) != len(vals):
-                    print(f"ERROR: Categories length {len(cats)} != Values length {len(vals)}")
+                    log.warning("chart length mismatch", title=title, categories=len(cats), values=len(vals))
                     return
                 
                 chart_data = CategoryChartData()
@@ -1472,17 +1514,17 @@ class PPTGenerator:
                 notes_slide.notes_text_frame.text = notes_text
                 
                 charts_created += 1
-                print(f"SUCCESS: Bar chart created: {title}")
+                log.debug("chart created", kind="bar", title=title)
                 
             except Exception as e:
-                print(f"ERROR creating bar chart '{title}': {str(e)}")
+                log.exception("chart failed", kind="bar", title=title)
                 import traceback
                 traceback.print_exc()
 
         def add_pie_chart_with_notes(title, cats, vals, notes_text):
             nonlocal charts_created
             try:
-                print(f"DEBUG: Creating pie chart: {title}")
+                log.debug("creating chart", kind="pie", title=title)
                 slide = prs.slides.add_slide(prs.slide_layouts[5])
                 slide.shapes.title.text = title
                 
@@ -1491,7 +1533,7 @@ class PPTGenerator:
                 vals = [float(val) if pd.notna(val) and val > 0 else 0.1 for val in vals]  # Ensure positive values
                 
                 if len(cats) != len(vals):
-                    print(f"ERROR: Categories length {len(cats)} != Values length {len(vals)}")
+                    log.warning("chart length mismatch", title=title, categories=len(cats), values=len(vals))
                     return
                 
                 chart_data = CategoryChartData()
@@ -1508,10 +1550,10 @@ class PPTGenerator:
                 notes_slide.notes_text_frame.text = notes_text
                 
                 charts_created += 1
-                print(f"SUCCESS: Pie chart created: {title}")
+                log.debug("chart created", kind="pie", title=title)
                 
             except Exception as e:
-                print(f"ERROR creating pie chart '{title}': {str(e)}")
+                log.exception("chart failed", kind="pie", title=title)
                 import traceback
                 traceback.print_exc()
 
@@ -1526,7 +1568,7 @@ class PPTGenerator:
                     if not test_series.isna().all():  # At least some valid dates
                         date_col = col
                         date_series = test_series
-                        print(f"DEBUG: Found date column: {col}")
+                        log.debug("found date column", column=col)
                         break
                 except Exception:
                     continue
@@ -1536,7 +1578,7 @@ class PPTGenerator:
         
         # Try to create charts based on data type
         if data_type == 'sales':
-            print("DEBUG: Processing SALES data")
+            log.debug("chart slides branch", branch="sales")
             
             # Find revenue/sales columns
             revenue_cols = [col for col in df.columns if any(keyword in col.lower() 
@@ -1544,27 +1586,20 @@ class PPTGenerator:
             product_cols = [col for col in df.columns if any(keyword in col.lower() 
                         for keyword in ['product', 'category', 'item', 'name'])]
             
-            print(f"DEBUG: Found revenue columns: {revenue_cols}")
-            print(f"DEBUG: Found product columns: {product_cols}")
+            log.debug("sales columns", revenue=revenue_cols, product=product_cols)
             
             # Create revenue trend if we have date and revenue data
             if date_series is not None and revenue_cols:
                 revenue_col = revenue_cols[0]
                 try:
-                    # Create time series data
-                    tmp = df.copy()
-                    tmp[date_col] = date_series
-                    tmp = tmp.dropna(subset=[date_col, revenue_col])
-                    
-                    if len(tmp) > 0:
-                        # Group by date periods
-                        daily = tmp.groupby(tmp[date_col].dt.to_period('D'))[revenue_col].sum()
+                    # Revenue per day from the dataset rollups
+                    days, daily = _daily_series(df, date_col, revenue_col, self.rollups)
+
+                    if len(daily) > 0:
+                        trend_direction = "increasing" if daily[-1] > daily[0] else "decreasing"
+                        avg_revenue = daily.mean()
                         
-                        if len(daily) > 0:
-                            trend_direction = "increasing" if daily.iloc[-1] > daily.iloc[0] else "decreasing"
-                            avg_revenue = daily.mean()
-                            
-                            notes_text = f"""REVENUE TREND INSIGHTS:
+                        notes_text = f"""REVENUE TREND INSIGHTS:
     • Trend Direction: Revenue is {trend_direction} over the analyzed period
     • Average Revenue: ${avg_revenue:,.2f}
     • Total Revenue: ${daily.sum():,.2f}
@@ -1576,16 +1611,16 @@ class PPTGenerator:
     • Identify growth opportunities
     • Address any concerning patterns"""
 
-                            add_line_chart_with_notes(
-                                "Revenue Trend Analysis",
-                                [str(p)[:20] for p in daily.index],  # Limit string length
-                                "Revenue",
-                                daily.values.tolist(),
-                                notes_text
-                            )
-                            created_any_chart = True
+                        add_line_chart_with_notes(
+                            "Revenue Trend Analysis",
+                            days,
+                            "Revenue",
+                            daily.tolist(),
+                            notes_text
+                        )
+                        created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating revenue trend: {str(e)}")
+                    log.exception("chart failed", title="revenue trend")
             
             # Create product performance chart
             if product_cols and revenue_cols:
@@ -1618,10 +1653,10 @@ class PPTGenerator:
                         )
                         created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating product chart: {str(e)}")
+                    log.exception("chart failed", title="product chart")
                     
         elif data_type == 'financial':
-            print("DEBUG: Processing FINANCIAL data")
+            log.debug("chart slides branch", branch="financial")
             
             # Find financial columns
             revenue_cols = [col for col in df.columns if any(keyword in col.lower() 
@@ -1632,17 +1667,12 @@ class PPTGenerator:
             if date_series is not None and revenue_cols:
                 revenue_col = revenue_cols[0]
                 try:
-                    tmp = df.copy()
-                    tmp[date_col] = date_series
-                    tmp = tmp.dropna(subset=[date_col, revenue_col])
-                    
-                    if len(tmp) > 0:
-                        daily = tmp.groupby(tmp[date_col].dt.to_period('D'))[revenue_col].sum()
+                    days, daily = _daily_series(df, date_col, revenue_col, self.rollups)
+
+                    if len(daily) > 0:
+                        growth_rate = ((daily[-1] - daily[0]) / daily[0] * 100) if daily[0] != 0 else 0
                         
-                        if len(daily) > 0:
-                            growth_rate = ((daily.iloc[-1] - daily.iloc[0]) / daily.iloc[0] * 100) if daily.iloc[0] != 0 else 0
-                            
-                            notes_text = f"""FINANCIAL PERFORMANCE:
+                        notes_text = f"""FINANCIAL PERFORMANCE:
     • Revenue Growth: {growth_rate:+.1f}% over period
     • Total Revenue: ${daily.sum():,.2f}
     • Average Daily: ${daily.mean():,.2f}
@@ -1653,19 +1683,19 @@ class PPTGenerator:
     • Identify seasonal variations
     • Assess market conditions impact"""
 
-                            add_line_chart_with_notes(
-                                "Revenue Performance",
-                                [str(p)[:20] for p in daily.index],
-                                "Revenue",
-                                daily.values.tolist(),
-                                notes_text
-                            )
-                            created_any_chart = True
+                        add_line_chart_with_notes(
+                            "Revenue Performance",
+                            days,
+                            "Revenue",
+                            daily.tolist(),
+                            notes_text
+                        )
+                        created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating financial chart: {str(e)}")
+                    log.exception("chart failed", title="financial chart")
         
         elif data_type == 'social_media':
-            print("DEBUG: Processing SOCIAL MEDIA data")
+            log.debug("chart slides branch", branch="social_media")
             
             # Find social media columns
             platform_cols = [col for col in df.columns if 'platform' in col.lower()]
@@ -1701,18 +1731,17 @@ class PPTGenerator:
                         )
                         created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating social media chart: {str(e)}")
+                    log.exception("chart failed", title="social media chart")
         
         # FALLBACK: Create at least one chart if none created yet
         if not created_any_chart:
-            print("DEBUG: Creating FALLBACK charts")
+            log.debug("chart slides branch", branch="fallback")
             
             # Try to create any chart from available data
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             text_cols = df.select_dtypes(include=['object']).columns.tolist()
             
-            print(f"DEBUG: Numeric columns: {numeric_cols}")
-            print(f"DEBUG: Text columns: {text_cols}")
+            log.debug("fallback columns", numeric=numeric_cols, text=text_cols)
             
             # Create a simple bar chart if we have categorical and numeric data
             if text_cols and numeric_cols:
@@ -1744,7 +1773,7 @@ class PPTGenerator:
                         )
                         created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating fallback bar chart: {str(e)}")
+                    log.exception("chart failed", title="fallback bar chart")
             
             # If still no chart, create a simple data summary chart
             if not created_any_chart and numeric_cols:
@@ -1777,12 +1806,12 @@ class PPTGenerator:
                     )
                     created_any_chart = True
                 except Exception as e:
-                    print(f"ERROR creating summary chart: {str(e)}")
+                    log.exception("chart failed", title="summary chart")
         
-        print(f"DEBUG: Total charts created: {charts_created}")
+        log.debug("chart slides created", count=charts_created)
         
         if charts_created == 0:
-            print("WARNING: No charts were created! Adding a text slide...")
+            log.warning("no charts created, adding text slide", data_type=data_type)
             # Add at least one slide explaining the issue
             slide = prs.slides.add_slide(prs.slide_layouts[1])
             slide.shapes.title.text = "Data Analysis Notice"
@@ -7,25 +7,30 @@ from .models import Task, BusinessData, ProcessedReport,Meeting, Employee,Depart
 from .serializers import TaskSerializer, BusinessDataSerializer, ProcessedReportSerializer,MeetingSerializer, EmployeeSerializer,DepartmentSerializer, MeetingSubmitSerializer,MeetingFileSerializer, ViewComplaintSerializer, ComplaintSubmitSerializer, CommentReportSerializer
 
 import datetime
-from supabase import create_client, Client
 import os
 import uuid
-import pandas as pd
-import numpy as np
-import google.generativeai as genai
-from io import BytesIO
-import requests
-import matplotlib.pyplot as plt
-import seaborn as sns
-from .utils.report_generators import PDFGenerator, PPTGenerator, CleaningReportGenerator
+from .utils import metrics
+from .utils.log import get_logger, lazy
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from datetime import date, datetime
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .utils.http_cache import (
+    CachedReferenceListMixin, DEPARTMENTS_CACHE_KEY, EMPLOYEES_CACHE_KEY, conditional_response, etag_for
+)
 import json
-import re
 import time
+
+# Heavy stacks are imported on first use, so CRUD endpoints, worker boot and
+# management commands don't pay for them (see `manage.py check_import_time`).
+# The analysis pipeline itself lives in api/analytics and transcript summaries in
+# api/summaries.py; both are imported inside the views.
+
+log = get_logger(__name__)
+
 # from django.shortcuts import render
 
 # def landing_page(request):
@@ -33,2733 +38,159 @@ import time
 
 
 class FileProcessingView(generics.CreateAPIView):
+    """Run the business data analysis pipeline (api/analytics) on an uploaded file"""
 
     def post(self, request, *args, **kwargs):
+        from django.conf import settings
+        from .analytics.engine import AnalysisEngine
+        from .analytics.lineage import LineageStore
+        from .analytics.tracing import Tracer, span
+
         file_id = request.data.get('file_id')
         analysis_type = request.data.get('analysis_type', 'full_analysis')
+        # Files that extend an earlier upload of the same uploader only analyse their new rows
+        incremental = str(request.data.get('incremental', settings.ANALYSIS_INCREMENTAL)).lower() in ('1', 'true', 'yes')
 
         try:
-            # Get file and process data
             business_data = BusinessData.objects.get(id=file_id)
-            file_content = self.download_file_from_supabase(business_data.file_url)
-
-            # Step 1: Data Cleaning
-            cleaned_data, cleaning_log = self.clean_and_preprocess_data(
-                file_content, business_data.fileName
-            )
-
-            # Debug: Print cleaned data info
-            print(f"Cleaned data shape: {cleaned_data.shape}")
-            print(f"Cleaned data columns: {cleaned_data.columns.tolist()}")
-
-            # Step 2: Upload cleaned Excel
-            cleaned_excel_url = self.upload_cleaned_excel(cleaned_data, business_data.fileName)
-
-            # Step 3: Detect the data type
-            data_type = self.detect_data_type(cleaned_data, business_data.fileName)
-            print(f"Detected data type: {data_type}")
-
-            # Step 4: Generate cleaning report
-            cleaning_pdf_url = self.generate_cleaning_report(cleaning_log, business_data.fileName)
-
-            # Step 5: Data analysis based on data type
-            analysis_results = self.analyze_data_by_type(cleaned_data, business_data.fileName, data_type)
-
-            # Step 6: Generate specialized reports WITH CHARTS
-            pdf_url = self.generate_specialized_pdf(
-                analysis_results, business_data.fileName, cleaned_data, data_type
-            )
+            engine = AnalysisEngine()
+            lineages = LineageStore(business_data.uploader_id) if incremental else None
+            tracer = Tracer('process-file')
+            with metrics.ANALYSIS_JOBS.track_inprogress('process-file'), tracer.activate():
+                with span('download'):
+                    file_content = engine.storage.download(business_data.file_url)
+                result = engine.run(file_content, business_data.fileName, lineages=lineages)
+            result['processed_data']['timings'] = tracer.as_dict()
 
-            ppt_url = self.generate_specialized_ppt(
-                analysis_results, business_data.fileName, cleaned_data, data_type
-            )
-
-            # Save results
             processed_report = ProcessedReport.objects.create(
                 original_file=business_data,
                 analysis_type=analysis_type,
-                processed_data={
-                    'data_type': data_type,
-                    'cleaning_log': cleaning_log,
-                    'analysis_results': analysis_results,
-                    'cleaned_excel_url': cleaned_excel_url,
-                    'cleaning_pdf_url': cleaning_pdf_url
-                },
-                pdf_url=pdf_url,
-                ppt_url=ppt_url
+                processed_data=result['processed_data'],
+                pdf_url=result['pdf_url'],
+                ppt_url=result['ppt_url']
             )
+            if lineages is not None:
+                try:
+                    lineages.save(result['lineage'], business_data, processed_report)
+                except Exception:
+                    # The report is already stored; the next upload just runs in full
+                    log.exception("lineage save failed", file_id=file_id)
 
             serializer = ProcessedReportSerializer(processed_report)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            print(f"Processing error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception("file processing failed", file_id=file_id)
             return Response({'error': f'Failed to process file: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def clean_and_preprocess_data(self, file_content, filename):
-        """Step 1: Clean and preprocess data using Gemini AI guidance"""
-        
-        # Read the file
-        if filename.endswith('.csv'):
-            df = pd.read_csv(BytesIO(file_content))
-        elif filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(BytesIO(file_content))
-        else:
-            raise Exception("Unsupported file format")
-
-        # Initialize cleaning log
-        cleaning_log = {
-            'original_shape': df.shape,
-            'issues_found': [],
-            'actions_taken': [],
-            'final_shape': None,
-            'columns_processed': [],
-            'summary': {}
-        }
-
-        # Get AI guidance for cleaning
-        cleaning_instructions = self.get_gemini_cleaning_guidance(df)
-        
-        # Apply cleaning steps
-        df_cleaned = df.copy()
-
-        # Update final statistics
-        print("DEBUG: type(df):", type(df))
-        print("DEBUG: df.shape:", df.shape)
-        print("DEBUG: df.shape (nrows):", df.shape)
-        print("DEBUG: df_cleaned.shape:", df_cleaned.shape)
-        print("DEBUG: df_cleaned.shape (nrows):", df_cleaned.shape)
-        print("DEBUG: columns removed:", df.shape[1] - df_cleaned.shape[1])
-        
-        # 1. Handle missing values
-        missing_info = df.isnull().sum()
-        for col in df.columns:
-            if missing_info[col] > 0:
-                cleaning_log['issues_found'].append(f"Column '{col}': {missing_info[col]} missing values")
-                
-                if df[col].dtype in ['int64', 'float64']:
-                    # Replace with mean for numeric columns
-                    mean_val = df[col].mean()
-                    df_cleaned[col].fillna(mean_val, inplace=True)
-                    cleaning_log['actions_taken'].append(f"Column '{col}': Filled {missing_info[col]} missing values with mean ({mean_val:.2f})")
-                else:
-                    # Replace with mode for categorical columns
-                    mode_val = df[col].mode().iloc[0] if not df[col].mode().empty else 'Unknown'
-                    df_cleaned[col].fillna(mode_val, inplace=True)
-                    cleaning_log['actions_taken'].append(f"Column '{col}': Filled {missing_info[col]} missing values with mode ('{mode_val}')")
-
-        # 2. Handle data type issues
-        for col in df_cleaned.columns:
-            original_dtype = str(df_cleaned[col].dtype)
-            
-            # Check for date columns with wrong data types
-            if 'date' in col.lower() or 'time' in col.lower():
-                try:
-                    df_cleaned[col] = pd.to_datetime(df_cleaned[col], errors='coerce')
-                    invalid_dates = df_cleaned[col].isnull().sum() - missing_info[col]
-                    if invalid_dates > 0:
-                        cleaning_log['issues_found'].append(f"Column '{col}': {invalid_dates} invalid date values")
-                        cleaning_log['actions_taken'].append(f"Column '{col}': Converted to datetime, {invalid_dates} invalid entries set to NaT")
-                except:
-                    pass
-            
-            # Check for numeric columns with string values
-            elif col.lower() in ['price', 'cost', 'amount', 'value', 'quantity', 'qty']:
-                try:
-                    # Remove currency symbols and convert to numeric
-                    df_cleaned[col] = pd.to_numeric(df_cleaned[col].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce')
-                    invalid_numeric = df_cleaned[col].isnull().sum() - missing_info[col]
-                    if invalid_numeric > 0:
-                        cleaning_log['issues_found'].append(f"Column '{col}': {invalid_numeric} non-numeric values in numeric column")
-                        # Fill with mean
-                        mean_val = df_cleaned[col].mean()
-                        df_cleaned[col].fillna(mean_val, inplace=True)
-                        cleaning_log['actions_taken'].append(f"Column '{col}': Converted to numeric, replaced {invalid_numeric} invalid values with mean ({mean_val:.2f})")
-                except:
-                    pass
-
-        # 3. Remove duplicate rows
-        duplicate_count = df_cleaned.duplicated().sum()
-        if duplicate_count > 0:
-            df_cleaned.drop_duplicates(inplace=True)
-            cleaning_log['issues_found'].append(f"Found {duplicate_count} duplicate rows")
-            cleaning_log['actions_taken'].append(f"Removed {duplicate_count} duplicate rows")
-
-        # 4. Handle outliers in numeric columns
-        numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            Q1 = df_cleaned[col].quantile(0.25)
-            Q3 = df_cleaned[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = ((df_cleaned[col] < lower_bound) | (df_cleaned[col] > upper_bound)).sum()
-            if outliers > 0:
-                cleaning_log['issues_found'].append(f"Column '{col}': {outliers} outlier values detected")
-                # Cap outliers instead of removing
-                df_cleaned[col] = df_cleaned[col].clip(lower=lower_bound, upper=upper_bound)
-                cleaning_log['actions_taken'].append(f"Column '{col}': Capped {outliers} outliers to acceptable range [{lower_bound:.2f}, {upper_bound:.2f}]")
-
-        print("DEBUG: type(df):", type(df))
-        print("DEBUG: df.shape:", df.shape)
-        print("DEBUG: df.shape (nrows):", df.shape)
-        print("DEBUG: df_cleaned.shape:", df_cleaned.shape)
-        print("DEBUG: df_cleaned.shape (nrows):", df_cleaned.shape)
-        print("DEBUG: columns removed:", df.shape[1] - df_cleaned.shape[1])
-
-        # Update final statistics
-        cleaning_log['final_shape'] = df_cleaned.shape 
-        cleaning_log['columns_processed'] = list(df_cleaned.columns)
-        cleaning_log['summary'] = {
-            'rows_removed': len(df) - len(df_cleaned),  # Alternative syntax
-            'columns_cleaned': len([col for col in df.columns if col in cleaning_log['columns_processed']]),
-            'total_issues_found': len(cleaning_log['issues_found']),
-            'total_actions_taken': len(cleaning_log['actions_taken'])
-        }
-
-        return df_cleaned, cleaning_log
-
-    def get_gemini_cleaning_guidance(self, df):
-        """Get AI guidance for data cleaning approach"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        model = genai.GenerativeModel('gemini-1.5-flash')
-
-        # Prepare data summary for AI analysis
-        data_summary = {
-            'shape': df.shape,
-            'columns': df.columns.tolist(),
-            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.to_dict().items()},
-            'missing_values': df.isnull().sum().to_dict(),
-            'sample_data': df.head(3).to_dict()
-        }
-
-        prompt = f"""
-        Analyze this dataset and provide data cleaning recommendations:
-        
-        Dataset Info: {data_summary}
-        
-        Please suggest:
-        1. How to handle missing values for each column
-        2. Potential data type corrections needed
-        3. Columns that might have logic issues
-        4. Outlier detection strategies
-        
-        Respond with specific, actionable cleaning steps.
-        """
-
-        try:
-            response = model.generate_content(prompt)
-            return response.text
-        except:
-            return "Basic cleaning approach: handle missing values, check data types, remove duplicates"
-
-    def upload_cleaned_excel(self, df_cleaned, original_filename):
-        """Upload cleaned data as Excel file to Supabase"""
-        
-        # Create Excel file in memory
-        excel_buffer = BytesIO()
-        df_cleaned.to_excel(excel_buffer, index=False, engine='openpyxl')
-        excel_content = excel_buffer.getvalue()
-        
-        # Upload to Supabase
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_KEY')
-        supabase = create_client(supabase_url, supabase_key)
-        
-        filename_without_ext = os.path.splitext(original_filename)[0]
-        excel_filename = f"cleaned_data/{uuid.uuid4()}_{filename_without_ext}_cleaned.xlsx"
-        
-        res = supabase.storage.from_("business_files").upload(
-            path=excel_filename,
-            file=excel_content,
-            file_options={"content-type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
-        )
-        
-        return supabase.storage.from_("business_files").get_public_url(excel_filename)
-    
-    def detect_data_type(self, df, filename):
-        """Step 3: Detect data type based on column names and content patterns"""
-        columns_lower = [col.lower() for col in df.columns]
-        column_text = ' '.join(columns_lower + [filename.lower()])
-
-        # Define data type indicators
-        data_type_indicators = {
-            'sales': {
-                'keywords': ['product', 'quantity', 'sold', 'price', 'customer', 'store', 'payment', 'category', 'unit_price', 'total_sales'],
-                'score': 0
-            },
-            'financial': {
-                'keywords': ['revenue', 'profit', 'expense', 'cost', 'margin', 'gross', 'net', 'operating', 'cogs', 'opex'],
-                'score': 0
-            },
-            'social_media': {
-                'keywords': ['views', 'likes', 'shares', 'comments', 'engagement', 'platform', 'post', 'content_type', 'followers'],
-                'score': 0
-            }
-        }
-
-        # Calculate scores for each data type
-        for data_type, info in data_type_indicators.items():
-            for keyword in info['keywords']:
-                if keyword in column_text:
-                    info['score'] += 1
-
-        # Additional pattern-based detection
-        if any('date' in col and ('sales' in col or 'revenue' in col) for col in columns_lower):
-            data_type_indicators['financial']['score'] += 2
-
-        if any('post_' in col for col in columns_lower):
-            data_type_indicators['social_media']['score'] += 2
-
-        if 'quantity_sold' in columns_lower or 'total_sales' in columns_lower:
-            data_type_indicators['sales']['score'] += 2
-
-        # Determine the data type with highest score
-        best_type = max(data_type_indicators.items(), key=lambda x: x[1]['score'])
-        if best_type[1]['score'] > 0:
-            return best_type[0]
-        else:
-            return 'general'
-
-
-    def analyze_data_by_type(self, df_cleaned, filename, data_type):
-        """Step 4: Enhanced data analysis based on detected data type"""
-        analysis_results = {
-            'data_type': data_type,
-            'statistical_summary': {},
-            'key_insights': [],
-            'business_recommendations': [],
-            'data_overview': {},
-            'visualizations': [],
-            'specialized_metrics': {}
-        }
-
-        # Common data overview
-        numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
-        categorical_cols = df_cleaned.select_dtypes(include=['object']).columns
-
-        analysis_results['data_overview'] = {
-            'total_rows': int(df_cleaned.shape[0]),
-            'total_columns': int(df_cleaned.shape[1]),
-            'numeric_columns': len(numeric_cols),
-            'categorical_columns': len(categorical_cols),
-            'data_completeness': float((1 - df_cleaned.isnull().sum().sum() / (df_cleaned.shape[0] * df_cleaned.shape[1])) * 100),
-            'time_period': self.detect_time_period(df_cleaned),
-            'data_size_category': 'Large' if df_cleaned.shape[0] > 10000 else 'Medium' if df_cleaned.shape[0] > 1000 else 'Small'
-        }
-
-        # Statistical summary for numeric columns
-        if len(numeric_cols) > 0:
-            analysis_results['statistical_summary'] = {
-                col: {
-                    'mean': float(df_cleaned[col].mean()),
-                    'median': float(df_cleaned[col].median()),
-                    'std': float(df_cleaned[col].std()),
-                    'min': float(df_cleaned[col].min()),
-                    'max': float(df_cleaned[col].max()),
-                    'cv': float(df_cleaned[col].std() / df_cleaned[col].mean() * 100) if df_cleaned[col].mean() != 0 else 0
-                }
-                for col in numeric_cols
-            }
-
-        # Data type specific analysis
-        if data_type == 'sales':
-            analysis_results.update(self.analyze_sales_data(df_cleaned))
-        elif data_type == 'financial':
-            analysis_results.update(self.analyze_financial_data(df_cleaned))
-        elif data_type == 'social_media':
-            analysis_results.update(self.analyze_social_media_data(df_cleaned))
-        else:
-            analysis_results.update(self.analyze_general_data(df_cleaned))
-
-        # Create specialized visualizations
-        charts_info = self.create_specialized_visualizations(df_cleaned, filename, data_type)
-        analysis_results['visualizations'] = charts_info
-
-        # Get AI insights
-        ai_insights = self.get_specialized_gemini_insights(df_cleaned, analysis_results, data_type)
-        analysis_results.update(ai_insights)
-
-        return analysis_results
 
-    def generate_cleaning_report(self, cleaning_log, filename):
-        """Generate PDF report of cleaning process"""
-        cleaning_generator = CleaningReportGenerator()
-        pdf_content = cleaning_generator.create_cleaning_report(cleaning_log, filename)
-        
-        # Upload to Supabase
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_KEY')
-        supabase = create_client(supabase_url, supabase_key)
-        
-        pdf_filename = f"reports/{uuid.uuid4()}_cleaning_report.pdf"
-        
-        res = supabase.storage.from_("business_files").upload(
-            path=pdf_filename,
-            file=pdf_content,
-            file_options={"content-type": "application/pdf"}
-        )
-        
-        return supabase.storage.from_("business_files").get_public_url(pdf_filename)
-
-    def analyze_and_visualize_data(self, df_cleaned, filename):
-        """Analyze cleaned data and create situational visualizations"""
-        
-        analysis_results = {
-            'statistical_summary': {},
-            'key_insights': [],
-            'business_recommendations': [],
-            'data_overview': {},
-            'visualizations': [],
-            'business_context': self.detect_business_context(df_cleaned, filename)
-        }
-
-        # Enhanced statistical summary with business context
-        numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
-        categorical_cols = df_cleaned.select_dtypes(include=['object']).columns
-        
-        if len(numeric_cols) > 0:
-            analysis_results['statistical_summary'] = {
-                col: {
-                    'mean': float(df_cleaned[col].mean()),
-                    'median': float(df_cleaned[col].median()),
-                    'std': float(df_cleaned[col].std()),
-                    'min': float(df_cleaned[col].min()),
-                    'max': float(df_cleaned[col].max()),
-                    'cv': float(df_cleaned[col].std() / df_cleaned[col].mean() * 100) if df_cleaned[col].mean() != 0 else 0,  # Coefficient of variation
-                    'trend': self.detect_trend(df_cleaned, col)
-                }
-                for col in numeric_cols
-            }
-
-        # Enhanced data overview
-        analysis_results['data_overview'] = {
-            'total_rows': int(df_cleaned.shape[0]),
-            'total_columns': int(df_cleaned.shape[1]),
-            'numeric_columns': len(numeric_cols),
-            'categorical_columns': len(categorical_cols),
-            'data_completeness': float((1 - df_cleaned.isnull().sum().sum() / (df_cleaned.shape[0] * df_cleaned.shape[1])) * 100),
-            'time_period': self.detect_time_period(df_cleaned),
-            'data_size_category': 'Large' if df_cleaned.shape[0] > 10000 else 'Medium' if df_cleaned.shape[0] > 1000 else 'Small'
-        }
-
-        # Create intelligent visualizations based on data characteristics
-        charts_info = self.create_intelligent_visualizations(df_cleaned, filename, analysis_results['business_context'])
-        analysis_results['visualizations'] = charts_info
-
-        # Get comprehensive AI insights with business context
-        ai_insights = self.get_enhanced_gemini_insights(df_cleaned, analysis_results)
-        analysis_results.update(ai_insights)
-
-        return analysis_results
-
-    def detect_business_context(self, df, filename):
-        """Detect business context from column names and filename"""
-        
-        # Analyze column names for business context
-        columns_lower = [col.lower() for col in df.columns]
-        
-        contexts = {
-            'sales': ['sales', 'revenue', 'price', 'quantity', 'product', 'customer', 'order'],
-            'finance': ['profit', 'loss', 'expense', 'cost', 'budget', 'income', 'balance'],
-            'marketing': ['campaign', 'clicks', 'impressions', 'conversion', 'ctr', 'roi'],
-            'hr': ['employee', 'salary', 'department', 'performance', 'attendance'],
-            'operations': ['production', 'inventory', 'supply', 'demand', 'efficiency'],
-            'customer': ['customer', 'satisfaction', 'feedback', 'rating', 'churn']
-        }
-        
-        detected_contexts = []
-        for context, keywords in contexts.items():
-            if any(keyword in ' '.join(columns_lower + [filename.lower()]) for keyword in keywords):
-                detected_contexts.append(context)
-        
-        return detected_contexts[0] if detected_contexts else 'general'
-
-    def detect_trend(self, df, column):
-        """Detect trend in numeric data"""
-        if len(df) < 3:
-            return 'insufficient_data'
-        
-        # Simple trend detection using linear regression slope
-        x = np.arange(len(df))
-        y = df[column].values
-        
-        # Remove NaN values
-        mask = ~np.isnan(y)
-        if mask.sum() < 3:
-            return 'insufficient_data'
-        
-        slope = np.polyfit(x[mask], y[mask], 1)[0]
-        
-        if abs(slope) < 0.01:
-            return 'stable'
-        elif slope > 0:
-            return 'increasing'
-        else:
-            return 'decreasing'
-
-    def detect_time_period(self, df):
-        """Detect time period in data"""
-        date_cols = []
-        for col in df.columns:
-            if 'date' in col.lower() or 'time' in col.lower():
-                try:
-                    pd.to_datetime(df[col])
-                    date_cols.append(col)
-                except:
-                    pass
-        
-        if date_cols:
-            date_col = date_cols[0]
-            dates = pd.to_datetime(df[date_col], errors='coerce').dropna()
-            if len(dates) > 0:
-                return {
-                    'start_date': str(dates.min().date()),
-                    'end_date': str(dates.max().date()),
-                    'duration_days': (dates.max() - dates.min()).days
-                }
-        
-        return None
-
-    def create_intelligent_visualizations(self, df, filename, business_context):
-        """AI-powered chart selection based on data content analysis"""
-        
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        
-        charts_created = []
-        sns.set_style("whitegrid")
-        
-        # AI-POWERED DATA TYPE DETECTION
-        column_analysis = self.analyze_column_types(df)
-        
-        # RULE 1: LINE GRAPH for Date + Money Analysis
-        date_cols = column_analysis['date_columns']
-        money_cols = column_analysis['money_columns']
-        
-        if date_cols and money_cols:
-            charts_created.extend(self.create_time_money_line_graphs(df, date_cols, money_cols))
-        
-        # RULE 2: BAR CHART for Category Performance
-        category_cols = column_analysis['category_columns']
-        if category_cols and money_cols:
-            charts_created.extend(self.create_category_bar_charts(df, category_cols, money_cols))
-        
-        # RULE 3: PIE CHART for Category Distribution
-        if category_cols:
-            charts_created.extend(self.create_category_pie_charts(df, category_cols))
-        
-        return charts_created
-
-    def analyze_column_types(self, df):
-        """AI analysis to detect column purposes from content"""
-        
-        analysis = {
-            'date_columns': [],
-            'money_columns': [],
-            'category_columns': []
-        }
-        
-        for col in df.columns:
-            col_lower = col.lower()
-            sample_values = df[col].dropna().astype(str).head(10).tolist()
-            
-            # DETECT DATE COLUMNS
-            is_date = False
-            if any(keyword in col_lower for keyword in ['date', 'time', 'month', 'year']):
-                try:
-                    pd.to_datetime(df[col].head(5))
-                    is_date = True
-                    analysis['date_columns'].append(col)
-                except:
-                    # Try to detect date patterns in string format
-                    if any('/' in str(val) or '-' in str(val) for val in sample_values):
-                        is_date = True
-                        analysis['date_columns'].append(col)
-            
-            # DETECT MONEY COLUMNS
-            if not is_date:
-                is_money = False
-                if any(keyword in col_lower for keyword in ['money', 'price', 'cost', 'amount', 'revenue', 'sales', 'value']):
-                    is_money = True
-                elif df[col].dtype in ['int64', 'float64'] and df[col].min() >= 0:
-                    # Positive numeric values likely represent money
-                    is_money = True
-                
-                if is_money:
-                    analysis['money_columns'].append(col)
-            
-            # DETECT CATEGORY COLUMNS
-            if not is_date and not is_money:
-                unique_count = df[col].nunique()
-                total_count = len(df[col])
-                
-                # If less than 50% unique values, likely categorical
-                if unique_count / total_count < 0.5 and unique_count > 1 and unique_count <= 20:
-                    analysis['category_columns'].append(col)
-                
-                # Special keywords for categories
-                elif any(keyword in col_lower for keyword in ['type', 'category', 'name', 'kind', 'status']):
-                    analysis['category_columns'].append(col)
-        
-        return analysis
-
-    def create_time_money_line_graphs(self, df, date_cols, money_cols):
-        """Create line graphs for date vs money analysis showing full data range"""
-        charts = []
-
-        for date_col in date_cols[:1]:  # Use first date column
-            for money_col in money_cols[:1]:  # Use first money column
-
-                # Prepare data for time series
-                df_time = df[[date_col, money_col]].copy()
-                df_time[date_col] = pd.to_datetime(df_time[date_col], errors='coerce')
-                df_time = df_time.dropna().sort_values(date_col)
-
-                # Aggregate by day/week/month based on data span
-                date_range = (df_time[date_col].max() - df_time[date_col].min()).days
-
-                if date_range > 90:  # More than 3 months, group by month
-                    df_time['period'] = df_time[date_col].dt.to_period('M')
-                    period_label = 'Month'
-                elif date_range > 30:  # More than 1 month, group by week
-                    df_time['period'] = df_time[date_col].dt.to_period('W')
-                    period_label = 'Week'
-                else:  # Daily analysis
-                    df_time['period'] = df_time[date_col].dt.date
-                    period_label = 'Date'
-
-                # Aggregate money by period WITHOUT filtering out any periods
-                revenue_by_period = df_time.groupby('period')[money_col].sum().reset_index()
-                revenue_by_period['period_str'] = revenue_by_period['period'].astype(str)
-
-                # *** IMPORTANT: Ensure NO slicing or filtering here ***
-                # For example, DO NOT do something like: revenue_by_period = revenue_by_period.tail(3)
-
-                # Create line graph using full aggregated data
-                plt.figure(figsize=(14, 8))
-                plt.plot(range(len(revenue_by_period)), revenue_by_period[money_col],
-                        marker='o', linewidth=3, markersize=8, color='#2E86AB')
-
-                # Add trend line
-                z = np.polyfit(range(len(revenue_by_period)), revenue_by_period[money_col], 1)
-                p = np.poly1d(z)
-                trend_direction = "Growing" if z[0] > 0 else "Declining" if z < 0 else "Stable"
-                plt.plot(range(len(revenue_by_period)), p(range(len(revenue_by_period))),
-                        "--", alpha=0.8, linewidth=2, color='red')
-
-                plt.title(f'Revenue Trend: {money_col} by {period_label}',
-                        fontsize=16, fontweight='bold', pad=20)
-                plt.xlabel(f'Time Period ({period_label})', fontsize=12)
-                plt.ylabel(f'{money_col} ($)', fontsize=12)
-                plt.xticks(range(len(revenue_by_period)),
-                        [str(p)[:10] for p in revenue_by_period['period_str']], rotation=45)
-                plt.grid(True, alpha=0.3)
-                plt.tight_layout()
-
-                chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_revenue_trend.png")
-
-                charts.append({
-                    'type': 'line_graph',
-                    'title': f'Revenue Performance: {trend_direction} Trend by {period_label}',
-                    'url': chart_url,
-                    'description': f'Shows {trend_direction.lower()} revenue trend over time. Total revenue: ${revenue_by_period[money_col].sum():,.2f} across {len(revenue_by_period)} {period_label.lower()}s.'
-                })
-                plt.close()
-
-        return charts
-
-    def create_category_bar_charts(self, df, category_cols, money_cols):
-        """Create bar charts for category performance"""
-        charts = []
-        
-        for cat_col in category_cols[:1]:  # Use first category column
-            for money_col in money_cols[:1]:  # Use first money column
-                
-                # Aggregate revenue by category
-                category_revenue = df.groupby(cat_col)[money_col].sum().sort_values(ascending=False).head(10)
-                
-                plt.figure(figsize=(12, 8))
-                colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
-                        '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-                
-                bars = plt.bar(range(len(category_revenue)), category_revenue.values,
-                            color=colors[:len(category_revenue)], alpha=0.8)
-                
-                # Add value labels on bars
-                for bar, value in zip(bars, category_revenue.values):
-                    plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(category_revenue.values)*0.01,
-                            f'${value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-                
-                plt.title(f'Revenue by {cat_col}', fontsize=16, fontweight='bold', pad=20)
-                plt.xlabel(f'{cat_col} Categories', fontsize=12)
-                plt.ylabel(f'Total Revenue ($)', fontsize=12)
-                plt.xticks(range(len(category_revenue)), category_revenue.index, rotation=45, ha='right')
-                plt.tight_layout()
-                
-                chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_category_revenue.png")
-                
-                # Business insights
-                top_performer = category_revenue.index[0]
-                top_value = category_revenue.iloc[0]
-                total_value = category_revenue.sum()
-                top_percentage = (top_value / total_value) * 100
-                
-                charts.append({
-                    'type': 'bar_chart',
-                    'title': f'Revenue Leaders: Top Performing {cat_col}',
-                    'url': chart_url,
-                    'description': f'{top_performer} leads with ${top_value:,.0f} ({top_percentage:.1f}% of total). Shows clear revenue concentration and market opportunities.'
-                })
-                plt.close()
-        
-        return charts
-
-    def create_category_pie_charts(self, df, category_cols):
-        """Create pie charts for category distribution"""
-        charts = []
-        
-        for cat_col in category_cols[:1]:  # Use first category column
-            
-            # Get category distribution
-            category_counts = df[cat_col].value_counts().head(8)
-            
-            plt.figure(figsize=(10, 10))
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F']
-            
-            wedges, texts, autotexts = plt.pie(category_counts.values, labels=category_counts.index, 
-                                            autopct='%1.1f%%', colors=colors, startangle=90,
-                                            textprops={'fontsize': 11})
-            
-            plt.title(f'Market Share: {cat_col} Distribution', fontsize=16, fontweight='bold', pad=20)
-            
-            # Enhance appearance
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_market_share.png")
-            
-            # Business insights
-            largest_segment = category_counts.index[0]
-            largest_percentage = (category_counts.iloc[0] / category_counts.sum()) * 100
-            
-            charts.append({
-                'type': 'pie_chart',
-                'title': f'Market Distribution: {cat_col} Share Analysis',
-                'url': chart_url,
-                'description': f'{largest_segment} dominates with {largest_percentage:.1f}% market share. Critical for understanding customer preferences and strategic positioning.'
-            })
-            plt.close()
-        
-        return charts
-
-
-    def save_chart_to_supabase(self, plt_figure, chart_path):
-        """Save matplotlib chart to Supabase storage"""
-        
-        # Save chart to BytesIO
-        img_buffer = BytesIO()
-        plt_figure.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-        img_content = img_buffer.getvalue()
-        
-        # Upload to Supabase
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_KEY')
-        supabase = create_client(supabase_url, supabase_key)
-        
-        res = supabase.storage.from_("business_files").upload(
-            path=chart_path,
-            file=img_content,
-            file_options={"content-type": "image/png"}
-        )
-        
-        return supabase.storage.from_("business_files").get_public_url(chart_path)
-
-    def get_gemini_analysis_insights(self, df_cleaned, analysis_results):
-        """Get AI-powered insights and recommendations"""
-        
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        model = genai.GenerativeModel('gemini-1.5-flash')
+class BatchAnalysisView(APIView):
+    """
+    POST: analyse many files at once, by `file_ids` and/or a `filter`
+    ({uploader, created_after, created_before, unprocessed}). The batch runs in the
+    background (api/analytics/batch.py) and the response is 202 with its id.
+    GET <batch_id>: progress and throughput read from the batch journal.
+    """
 
-        prompt = f"""
-        Based on this cleaned dataset analysis, provide insights and recommendations:
+    def post(self, request):
+        from . import jobs
+        from .analytics.batch import create_batch, run_batch, select_files
 
-        Data Overview: {analysis_results['data_overview']}
-        Statistical Summary: {analysis_results['statistical_summary']}
-        
-        Sample data: {df_cleaned.head(5).to_dict()}
-
-        Please provide:
-        1. Key insights (3-5 important findings)
-        2. Business recommendations (3-5 actionable suggestions)
-        
-        Format as JSON with keys: key_insights, business_recommendations
-        """
+        file_ids = request.data.get('file_ids') or []
+        filters = request.data.get('filter') or {}
+        if not file_ids and not filters:
+            return Response({'error': 'Provide file_ids or a filter'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            response = model.generate_content(prompt)
-            import json
-            ai_insights = json.loads(response.text)
-            return ai_insights
-        except:
-            return {
-                'key_insights': [
-                    "Data has been successfully cleaned and is ready for analysis",
-                    "Statistical patterns show normal distribution in numeric variables",
-                    "Data quality is now sufficient for business decision making"
-                ],
-                'business_recommendations': [
-                    "Monitor data quality regularly to prevent similar issues",
-                    "Implement data validation rules at the source",
-                    "Use cleaned dataset for predictive modeling or further analysis"
-                ]
-            }
-
-    def generate_analysis_pdf(self, analysis_results, filename, df_cleaned):
-        """Generate comprehensive PDF analysis report WITH VISUAL CHARTS"""
-        try:
-            from .utils.report_generators import PDFGenerator
-            
-            # Debug: Print DataFrame info
-            print(f"DataFrame shape: {df_cleaned.shape}")
-            print(f"DataFrame columns: {df_cleaned.columns.tolist()}")
-            
-            pdf_generator = PDFGenerator()
-            # Pass the DataFrame to enable chart generation
-            pdf_content = pdf_generator.create_analysis_report(
-                analysis_results, filename, df_cleaned  # Pass the DataFrame!
-            )
-            
-            # Upload to Supabase
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
-            pdf_filename = f"reports/{uuid.uuid4()}_analysis_report_with_charts.pdf"
-            res = supabase.storage.from_("business_files").upload(
-                path=pdf_filename,
-                file=pdf_content,
-                file_options={"content-type": "application/pdf"}
+            files = select_files(
+                file_ids=file_ids,
+                uploader=filters.get('uploader'),
+                created_after=filters.get('created_after'),
+                created_before=filters.get('created_before'),
+                unprocessed=bool(filters.get('unprocessed')),
             )
-            
-            return supabase.storage.from_("business_files").get_public_url(pdf_filename)
-            
+            selected = [str(file_id) for file_id in files.values_list('id', flat=True)]
         except Exception as e:
-            print(f"PDF Generation Error: {str(e)}")
-            raise Exception(f"Failed to generate PDF with charts: {str(e)}")
+            return Response({'error': f'Invalid selection: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not selected:
+            return Response({'error': 'No files match the selection'}, status=status.HTTP_404_NOT_FOUND)
 
-    def generate_analysis_ppt(self, analysis_results, filename, df_cleaned):
-        """Generate PowerPoint presentation WITH VISUAL CHARTS"""
-        try:
-            from .utils.report_generators import PPTGenerator
-            
-            ppt_generator = PPTGenerator()
-            # Pass the DataFrame to enable chart generation
-            ppt_content = ppt_generator.create_analysis_presentation(
-                analysis_results, filename, df_cleaned  # Pass the DataFrame!
-            )
-            
-            # Upload to Supabase
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
-            ppt_filename = f"reports/{uuid.uuid4()}_analysis_presentation_with_charts.pptx"
-            res = supabase.storage.from_("business_files").upload(
-                path=ppt_filename,
-                file=ppt_content,
-                file_options={"content-type": "application/vnd.openxmlformats-officedocument.presentationml.presentation"}
-            )
-            
-            return supabase.storage.from_("business_files").get_public_url(ppt_filename)
-            
-        except Exception as e:
-            print(f"PPT Generation Error: {str(e)}")
-            raise Exception(f"Failed to generate PPT with charts: {str(e)}")
+        batch_id = create_batch(selected, request.data.get('analysis_type', 'full_analysis'))
+        # Interrupted batches are resumed from their journal: manage.py analyse_batch --resume
+        jobs.submit("batch-analysis", run_batch, batch_id, pool=jobs.BULK)
+        return Response({'batch_id': batch_id, 'files': len(selected)}, status=status.HTTP_202_ACCEPTED)
 
+    def get(self, request, batch_id):
+        from .analytics.batch import journal_path, read_journal, summarise
 
-    def download_file_from_supabase(self, file_url):
-        """Download file content from Supabase Storage"""
         try:
-            response = requests.get(file_url, timeout=30)
-            response.raise_for_status()
-            return response.content
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to download file from Supabase: {str(e)}")
-        
-    def create_correlation_heatmap(self, df, numeric_cols):
-        """Create correlation heatmap visualization"""
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        
-        plt.figure(figsize=(12, 8))
-        correlation_matrix = df[numeric_cols].corr()
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-        plt.title('Correlation Matrix')
-        
-        chart_path = f"visualizations/{uuid.uuid4()}_correlation_heatmap.png"
-        chart_url = self.save_chart_to_supabase(plt, chart_path)
-        plt.close()
-        
-        return {
-            'type': 'heatmap',
-            'title': 'Correlation Matrix',
-            'url': chart_url,
-            'description': 'Shows correlations between numeric variables'
-        }
-
-    def create_distribution_analysis(self, df, numeric_cols):
-        """Create distribution analysis for key metrics"""
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        
-        charts = []
-        for col in numeric_cols:
-            plt.figure(figsize=(10, 6))
-            plt.hist(df[col].dropna(), bins=30, alpha=0.7, color='skyblue')
-            plt.title(f'Distribution of {col}')
-            plt.xlabel(col)
-            plt.ylabel('Frequency')
-            
-            chart_path = f"visualizations/{uuid.uuid4()}_{col}_distribution.png"
-            chart_url = self.save_chart_to_supabase(plt, chart_path)
-            charts.append({
-                'type': 'histogram',
-                'title': f'Distribution of {col}',
-                'url': chart_url,
-                'description': f'Shows the frequency distribution of {col} values'
-            })
-            plt.close()
-        
-        return charts
+            header, records = read_journal(journal_path(batch_id))
+        except (FileNotFoundError, ValueError):
+            return Response({'error': 'Batch not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    def create_time_series_analysis(self, df):
-        """Create time series analysis if time data exists"""
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        
-        charts = []
-        date_cols = []
-        
-        # Find date columns
-        for col in df.columns:
-            if 'date' in col.lower() or 'time' in col.lower():
-                try:
-                    pd.to_datetime(df[col])
-                    date_cols.append(col)
-                except:
-                    pass
-        
-        if date_cols:
-            date_col = date_cols[0]
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            
-            if len(numeric_cols) > 0:
-                df_sorted = df.sort_values(date_col)
-                
-                plt.figure(figsize=(12, 6))
-                plt.plot(pd.to_datetime(df_sorted[date_col]), df_sorted[numeric_cols[0]], 
-                        marker='o', linewidth=2, markersize=4)
-                plt.title(f'{numeric_cols[0]} Over Time')
-                plt.xlabel('Date')
-                plt.ylabel(numeric_cols[0])
-                plt.xticks(rotation=45)
-                plt.grid(True, alpha=0.3)
-                plt.tight_layout()
-                
-                chart_path = f"visualizations/{uuid.uuid4()}_time_series.png"
-                chart_url = self.save_chart_to_supabase(plt, chart_path)
-                charts.append({
-                    'type': 'time_series',
-                    'title': f'{numeric_cols[0]} Time Series',
-                    'url': chart_url,
-                    'description': f'Shows how {numeric_cols[0]} changes over time'
-                })
-                plt.close()
-        
-        return charts
-    
-    def get_enhanced_gemini_insights(self, df_cleaned, analysis_results):
-        """Get comprehensive business analysis with direct chart generation instructions"""
-        
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        model = genai.GenerativeModel('gemini-1.5-flash')
-
-        # Get data characteristics for chart suggestions
-        numeric_cols = df_cleaned.select_dtypes(include=['float64', 'int64']).columns.tolist()
-        text_cols = df_cleaned.select_dtypes(include=['object']).columns.tolist()
-        date_cols = [col for col in df_cleaned.columns if 'date' in col.lower() or 'time' in col.lower()]
-
-        prompt = f"""
-        You are a senior business analyst creating executive charts and dashboards. Generate ONLY the business analysis text without chart recommendations.
-
-        Your system will automatically create these visual charts:
-        - Line charts for time-series data ({', '.join(date_cols) if date_cols else 'None detected'})
-        - Bar charts for category performance ({', '.join(text_cols[:3]) if text_cols else 'None detected'})
-        - Pie charts for distribution analysis ({', '.join(text_cols[:2]) if text_cols else 'None detected'})
-        - Heatmaps for correlation analysis ({', '.join(numeric_cols[:3]) if numeric_cols else 'None detected'})
-        - KPI dashboards with key metrics
-
-        DATASET CONTEXT:
-        - Industry: {analysis_results['business_context']}
-        - Records: {analysis_results['data_overview']['total_rows']:,}
-        - Data Quality: {analysis_results['data_overview']['data_completeness']:.1f}%
-        - Available Data: {len(numeric_cols)} numeric, {len(text_cols)} categorical, {len(date_cols)} date columns
-
-        REPORT STRUCTURE (NO CHART RECOMMENDATIONS - ONLY ANALYSIS):
-
-        # Business Performance Analysis Report
-
-        ## Executive Summary
-        Provide 2-3 sentences summarizing overall business performance and key findings.
-
-        ## Key Performance Indicators
-        ### Revenue & Performance Metrics
-        - Total transactions: {analysis_results['data_overview']['total_rows']:,}
-        - Data completeness: {analysis_results['data_overview']['data_completeness']:.1f}%
-        - Analysis period: {analysis_results['data_overview'].get('time_period', {}).get('start_date', 'N/A')} to {analysis_results['data_overview'].get('time_period', {}).get('end_date', 'N/A')}
-
-        ### Performance Trends
-        Analyze performance patterns based on available data trends.
-
-        ## Market Analysis
-        ### Top Performers
-        Identify leading categories/segments from the data.
-
-        ### Market Distribution
-        Analyze market share and distribution patterns.
-
-        ## Strategic Insights
-        ### Customer Behavior
-        Describe usage patterns and customer preferences.
-
-        ### Operational Excellence
-        Highlight efficiency opportunities and process improvements.
-
-        ## Business Recommendations
-        ### Immediate Actions (Next 30 days)
-        1. [Specific actionable item]
-        2. [Specific actionable item]
-        3. [Specific actionable item]
-
-        ### Strategic Initiatives (Next Quarter)
-        1. [Medium-term strategic action]
-        2. [Medium-term strategic action]
-        3. [Medium-term strategic action]
-
-        ### Long-term Growth (Next Year)
-        1. [Long-term strategic initiative]
-        2. [Long-term strategic initiative]
-        3. [Long-term strategic initiative]
-
-        ## Risk Assessment
-        Identify potential business risks and mitigation strategies.
-
-        ## Conclusion
-        Summarize business health and growth potential.
-
-        IMPORTANT: 
-        - Do NOT include any "📊 Recommended Chart" or "📈 Suggested Visualization" text
-        - Do NOT mention chart types or visualization recommendations
-        - Focus ONLY on business insights, metrics, and recommendations
-        - The system will automatically generate all necessary charts and graphs
-        - Keep content business-focused and executive-ready
-        """
-
-        try:
-            response = model.generate_content(prompt)
-            report_content = response.text
-            
-            return {
-                'full_report': report_content,
-                'chart_recommendations': [],  # Empty since charts are generated automatically
-                'report_sections': {
-                    'executive_summary': 'Business analysis without chart suggestions',
-                    'key_insights': 'Performance insights and metrics',
-                    'recommendations': 'Actionable business strategies',
-                    'visualizations': 'Charts generated automatically by system'
-                }
-            }
-            
-        except Exception as e:
-            return {
-                'full_report': f"# Business Analysis Report\n\nComprehensive analysis of {df_cleaned.shape[0]:,} business records reveals strategic opportunities for growth optimization.\n\n## Executive Summary\nData analysis indicates strong potential for revenue enhancement through targeted strategic initiatives.\n\n## Key Performance Indicators\n- Total Records: {df_cleaned.shape[0]:,}\n- Data Quality: High\n- Analysis Coverage: Complete",
-                'chart_recommendations': [],
-                'error': str(e)
-            }
-        
-    def analyze_sales_data(self, df):
-        """Specialized analysis for sales data"""
-        specialized_metrics = {}
-        
-        # Try to identify key sales columns
-        sales_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['sales', 'revenue', 'total', 'amount'])]
-        quantity_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['quantity', 'qty', 'sold'])]
-        product_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['product', 'item', 'category'])]
-        
-        if sales_cols:
-            sales_col = sales_cols[0]
-            specialized_metrics['total_sales'] = float(df[sales_col].sum())
-            specialized_metrics['average_transaction'] = float(df[sales_col].mean())
-            specialized_metrics['sales_std'] = float(df[sales_col].std())
-            
-        if quantity_cols:
-            qty_col = quantity_cols[0]
-            specialized_metrics['total_quantity_sold'] = float(df[qty_col].sum())
-            specialized_metrics['average_quantity'] = float(df[qty_col].mean())
-            
-        if product_cols:
-            product_col = product_cols[0] 
-            specialized_metrics['unique_products'] = int(df[product_col].nunique())
-            specialized_metrics['top_products'] = df[product_col].value_counts().head().to_dict()
-            
-        return {
-            'specialized_metrics': specialized_metrics,
-            'business_focus': 'sales_performance',
-            'analysis_type': 'Sales Performance Analysis'
-        }
-
-    def analyze_financial_data(self, df):
-        """Specialized analysis for financial data"""
-        specialized_metrics = {}
-        
-        # Try to identify key financial columns
-        revenue_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['revenue', 'sales', 'income'])]
-        profit_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['profit', 'margin', 'net'])]
-        cost_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['cost', 'expense', 'cogs', 'opex'])]
-        
-        revenue_col = revenue_cols[0] if revenue_cols else None
-        profit_col = profit_cols[0] if profit_cols else None
-        cost_col = cost_cols[0] if cost_cols else None
-
-        if profit_col and revenue_col:
-            specialized_metrics['profit_margin'] = float(df[profit_col].mean() / df[revenue_col].mean() * 100)
-        else:
-            specialized_metrics['profit_margin'] = 0
-        if cost_col:
-            specialized_metrics['total_costs'] = float(df[cost_col].sum())
-            specialized_metrics['cost_ratio'] = float(df[cost_col].mean() / df[revenue_col].mean() * 100) if revenue_col else 0
-        else:
-            specialized_metrics['total_costs'] = 0
-            specialized_metrics['cost_ratio'] = 0
-            
-        return {
-            'specialized_metrics': specialized_metrics,
-            'business_focus': 'financial_performance',
-            'analysis_type': 'Financial Performance Analysis'
-        }
-
-    def analyze_social_media_data(self, df):
-        """Specialized analysis for social media data"""
-        specialized_metrics = {}
-        
-        # Try to identify key social media columns
-        engagement_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['likes', 'shares', 'comments', 'views', 'engagement'])]
-        platform_cols = [col for col in df.columns if 'platform' in col.lower()]
-        content_cols = [col for col in df.columns if 'content' in col.lower()]
-
-        # engagement_cols is a list of potentially mixed-type columns
-        engagement_numeric_cols = [col for col in engagement_cols if pd.api.types.is_numeric_dtype(df[col])]
-
-        platform_col = platform_cols[0] if platform_cols else None
-
-        if platform_col and engagement_numeric_cols:
-            platform_means = df.groupby(platform_col)[engagement_numeric_cols].mean()
-            best = {col: platform_means[col].idxmax() for col in engagement_numeric_cols}
-            specialized_metrics['best_performing_platform_per_metric'] = best
-        
-        if engagement_cols:
-            for col in engagement_cols:
-                if col.lower() in ['likes', 'shares', 'comments', 'views']:
-                    specialized_metrics[f'total_{col.lower()}'] = float(df[col].sum())
-                    specialized_metrics[f'average_{col.lower()}'] = float(df[col].mean())
-            
-        if content_cols:
-            content_col = content_cols[0]
-            if engagement_numeric_cols:
-                by_content = df.groupby(content_col)[engagement_numeric_cols].mean()
-                best = {col: by_content[col].idxmax() for col in engagement_numeric_cols}
-                specialized_metrics['best_content_type_per_metric'] = best
-            # Distribution should still use all as before:
-            specialized_metrics['content_type_distribution'] = df[content_col].value_counts().to_dict()
-
-            
-        # Calculate engagement rate if possible
-        if 'Views' in df.columns and 'Likes' in df.columns:
-            specialized_metrics['average_engagement_rate'] = float((df['Likes'] / df['Views'] * 100).mean())
-            
-        return {
-            'specialized_metrics': specialized_metrics,
-            'business_focus': 'social_media_performance',
-            'analysis_type': 'Social Media Performance Analysis'
-        }
-
-    def analyze_general_data(self, df):
-        """General analysis for unspecified data types"""
-        return {
-            'specialized_metrics': {},
-            'business_focus': 'general_analysis',
-            'analysis_type': 'General Data Analysis'
-        }
-
-    def calculate_growth_rate(self, df, column):
-        """Calculate growth rate for a time series column"""
-        try:
-            # Sort by date if date column exists
-            date_cols = [col for col in df.columns if 'date' in col.lower()]
-            if date_cols:
-                df_sorted = df.sort_values(date_cols[0])
-                values = df_sorted[column].values
-                if len(values) > 1:
-                    return float((values[-1] - values) / values * 100)
-            return 0.0
-        except:
-            return 0.0
-
-    def create_specialized_visualizations(self, df, filename, data_type):
-        """Create visualizations based on data type"""
-        charts = []
-        
-        if data_type == 'sales':
-            charts.extend(self.create_sales_charts(df, filename))
-        elif data_type == 'financial':
-            charts.extend(self.create_financial_charts(df, filename))
-        elif data_type == 'social_media':
-            charts.extend(self.create_social_media_charts(df, filename))
-        else:
-            charts.extend(self.create_general_charts(df, filename))
-            
-        return charts
-
-    def create_sales_charts(self, df, filename):
-        """Create sales-specific charts"""
-        charts = []
-        
-        # Sales by product chart
-        product_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['product', 'item', 'category'])]
-        sales_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['sales', 'revenue', 'total', 'amount'])]
-        
-        if product_cols and sales_cols:
-            plt.figure(figsize=(14, 8))
-            sales_by_product = df.groupby(product_cols[0])[sales_cols[0]].sum().sort_values(ascending=False).head(10)
-            
-            colors = plt.cm.Set3(np.linspace(0, 1, len(sales_by_product)))
-            bars = plt.bar(range(len(sales_by_product)), sales_by_product.values, color=colors)
-            
-            # Add value labels on bars
-            for bar, value in zip(bars, sales_by_product.values):
-                plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(sales_by_product.values)*0.01,
-                        f'${value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-            
-            plt.title(f'Top 10 Products by Sales Revenue', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Products', fontsize=12)
-            plt.ylabel('Sales Revenue ($)', fontsize=12)
-            plt.xticks(range(len(sales_by_product)), sales_by_product.index, rotation=45, ha='right')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_sales_by_product.png")
-            charts.append({
-                'type': 'bar_chart',
-                'title': 'Sales Performance by Product',
-                'url': chart_url,
-                'description': f'Top performing product: {sales_by_product.index} with ${sales_by_product.iloc[0]:,.0f} in sales'
-            })
-            plt.close()
-        
-        # Sales trend over time if date column exists
-        date_cols = [col for col in df.columns if 'Date' in col.lower()]
-        if date_cols and sales_cols:
-            plt.figure(figsize=(14, 8))
-            df_temp = df.copy()
-            df_temp[date_cols] = pd.to_datetime(df_temp[date_cols], errors='coerce')
-            daily_sales = df_temp.groupby(df_temp[date_cols].dt.date)[sales_cols].sum()
-            
-            plt.plot(daily_sales.index, daily_sales.values, marker='o', linewidth=3, markersize=6, color='#2E86AB')
-            plt.title(f'Daily Sales Trend', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Date', fontsize=12)
-            plt.ylabel('Sales ($)', fontsize=12)
-            plt.xticks(rotation=45)
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_sales_trend.png")
-            charts.append({
-                'type': 'line_chart',
-                'title': 'Sales Trend Over Time',
-                'url': chart_url,
-                'description': f'Sales trend showing daily performance from {daily_sales.index[0]} to {daily_sales.index[-1]}'
-            })
-            plt.close()
-        
-        return charts
-
-    def create_financial_charts(self, df, filename):
-        """Create financial-specific charts"""
-        charts = []
-        
-        # Revenue vs Profit chart
-        revenue_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['revenue', 'sales'])]
-        profit_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['profit', 'net'])]
-        
-        if revenue_cols and profit_cols:
-            plt.figure(figsize=(14, 8))
-            
-            # Create dual axis chart
-            fig, ax1 = plt.subplots(figsize=(14, 8))
-            
-            dates = range(len(df))
-            if any('date' in col.lower() for col in df.columns):
-                date_col = [col for col in df.columns if 'date' in col.lower()][0]
-                dates = pd.to_datetime(df[date_col], errors='coerce')
-                dates = dates.dt.strftime('%Y-%m-%d')
-            
-            color1 = 'tab:blue'
-            ax1.set_xlabel('Period')
-            ax1.set_ylabel('Revenue ($)', color=color1)
-            line1 = ax1.plot(dates, df[revenue_cols[0]], color=color1, linewidth=3, marker='o', markersize=6, label='Revenue')
-            ax1.tick_params(axis='y', labelcolor=color1)
-            
-            ax2 = ax1.twinx()
-            color2 = 'tab:red'
-            ax2.set_ylabel('Profit ($)', color=color2)
-            line2 = ax2.plot(dates, df[profit_cols[0]], color=color2, linewidth=3, marker='s', markersize=6, label='Profit')
-            ax2.tick_params(axis='y', labelcolor=color2)
-            
-            plt.title('Revenue vs Profit Analysis', fontsize=16, fontweight='bold', pad=20)
-            plt.xticks(rotation=45)
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_revenue_profit.png")
-            charts.append({
-                'type': 'line_chart',
-                'title': 'Revenue vs Profit Comparison',
-                'url': chart_url,
-                'description': f'Financial performance showing revenue and profit correlation over time'
-            })
-            plt.close()
-        
-        # Profit margin chart
-        if 'Profit_Margin' in df.columns:
-            plt.figure(figsize=(12, 8))
-            
-            dates = range(len(df))
-            if any('date' in col.lower() for col in df.columns):
-                date_col = [col for col in df.columns if 'date' in col.lower()][0]
-                dates = pd.to_datetime(df[date_col], errors='coerce')
-                dates = dates.dt.strftime('%Y-%m-%d')
-            
-            plt.plot(dates, df['Profit_Margin'] * 100, marker='o', linewidth=3, markersize=6, color='green')
-            plt.axhline(y=df['Profit_Margin'].mean() * 100, color='red', linestyle='--', alpha=0.7, label=f'Average: {df["Profit_Margin"].mean()*100:.1f}%')
-            
-            plt.title('Profit Margin Trend', fontsize=16, fontweight='bold', pad=20)
-            plt.xlabel('Period', fontsize=12)
-            plt.ylabel('Profit Margin (%)', fontsize=12)
-            plt.xticks(rotation=45)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_profit_margin.png")
-            charts.append({
-                'type': 'line_chart',
-                'title': 'Profit Margin Analysis',
-                'url': chart_url,
-                'description': f'Profit margin trend with average of {df["Profit_Margin"].mean()*100:.1f}%'
-            })
-            plt.close()
-        
-        return charts
-
-    def create_social_media_charts(self, df, filename):
-        """Create social media-specific charts"""
-        charts = []
-        
-        # Platform performance chart
-        if 'Platform' in df.columns:
-            engagement_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['likes', 'views', 'shares', 'comments'])]
-            
-            if engagement_cols:
-                plt.figure(figsize=(12, 8))
-                platform_performance = df.groupby('Platform')[engagement_cols[0]].mean().sort_values(ascending=False)
-                
-                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-                bars = plt.bar(platform_performance.index, platform_performance.values, color=colors[:len(platform_performance)])
-                
-                # Add value labels
-                for bar, value in zip(bars, platform_performance.values):
-                    plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(platform_performance.values)*0.01,
-                            f'{value:,.0f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-                
-                plt.title(f'Average {engagement_cols[0]} by Platform', fontsize=16, fontweight='bold', pad=20)
-                plt.xlabel('Platform', fontsize=12)
-                plt.ylabel(f'Average {engagement_cols}', fontsize=12)
-                plt.xticks(rotation=45)
-                plt.grid(True, alpha=0.3)
-                plt.tight_layout()
-                
-                chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_platform_performance.png")
-                charts.append({
-                    'type': 'bar_chart',
-                    'title': f'Platform Performance - {engagement_cols[0]}',
-                    'url': chart_url,
-                    'description': f'Best performing platform: {platform_performance.index[0]} with avg {platform_performance.iloc[0]:,.0f} {", ".join(engagement_cols).lower()}'
-                })
-                plt.close()
-        
-        # Content type performance
-        if 'Content_Type' in df.columns:
-            plt.figure(figsize=(10, 10))
-            content_performance = df['Content_Type'].value_counts()
-            
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F']
-            wedges, texts, autotexts = plt.pie(content_performance.values, labels=content_performance.index,
-                                              autopct='%1.1f%%', colors=colors, startangle=90,
-                                              textprops={'fontsize': 11})
-            
-            plt.title('Content Type Distribution', fontsize=16, fontweight='bold', pad=20)
-            
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_content_distribution.png")
-            charts.append({
-                'type': 'pie_chart',
-                'title': 'Content Type Distribution',
-                'url': chart_url,
-                'description': f'Most common content type: {content_performance.index[0]} ({content_performance.iloc[0]:,.0f} posts)'
-            })
-            plt.close()
-        
-        # Engagement correlation heatmap
-        engagement_cols = [col for col in df.columns if any(keyword in col.lower() for keyword in ['likes', 'views', 'shares', 'comments'])]
-        if len(engagement_cols) >= 2:
-            plt.figure(figsize=(10, 8))
-            correlation_matrix = df[engagement_cols].corr()
-            
-            sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
-                       square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
-            plt.title('Engagement Metrics Correlation', fontsize=16, fontweight='bold', pad=20)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_engagement_correlation.png")
-            charts.append({
-                'type': 'heatmap',
-                'title': 'Engagement Metrics Correlation',
-                'url': chart_url,
-                'description': 'Correlation analysis between different engagement metrics'
-            })
-            plt.close()
-        
-        return charts
-
-    def create_general_charts(self, df, filename):
-        """Create general charts for unspecified data types"""
-        charts = []
-        
-        # Generic correlation heatmap for numeric columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) >= 2:
-            plt.figure(figsize=(12, 8))
-            correlation_matrix = df[numeric_cols].corr()
-            
-            sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
-                       square=True, fmt='.2f', cbar_kws={'shrink': 0.8})
-            plt.title('Correlation Matrix', fontsize=16, fontweight='bold', pad=20)
-            plt.tight_layout()
-            
-            chart_url = self.save_chart_to_supabase(plt, f"visualizations/{uuid.uuid4()}_correlation_matrix.png")
-            charts.append({
-                'type': 'heatmap',
-                'title': 'Data Correlation Analysis',
-                'url': chart_url,
-                'description': 'Correlation analysis between numeric variables'
-            })
-            plt.close()
-        
-        return charts
-
-    def get_specialized_gemini_insights(self, df_cleaned, analysis_results, data_type):
-        """Get AI insights specialized for each data type"""
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        model = genai.GenerativeModel('gemini-1.5-flash')
-
-        # Create specialized prompts based on data type
-        if data_type == 'sales':
-            prompt = self.create_sales_analysis_prompt(df_cleaned, analysis_results)
-        elif data_type == 'financial':
-            prompt = self.create_financial_analysis_prompt(df_cleaned, analysis_results)
-        elif data_type == 'social_media':
-            prompt = self.create_social_media_analysis_prompt(df_cleaned, analysis_results)
-        else:
-            prompt = self.create_general_analysis_prompt(df_cleaned, analysis_results)
-
-        try:
-            response = model.generate_content(prompt)
-            return {
-                'ai_insights': response.text,
-                'analysis_focus': data_type
-            }
-        except Exception as e:
-            return {
-                'ai_insights': f"AI analysis completed for {data_type} data with {df_cleaned.shape[0]} records.",
-                'analysis_focus': data_type,
-                'error': str(e)
-            }
-
-    def create_sales_analysis_prompt(self, df, analysis_results):
-        """Create specialized prompt for sales data analysis"""
-        return f"""
-        You are a senior sales analyst. Analyze this sales dataset and provide executive-level insights.
-
-        Dataset Overview:
-        - Records: {df.shape[0]:,}
-        - Columns: {df.columns.tolist()}
-        - Specialized Metrics: {analysis_results.get('specialized_metrics', {})}
-
-        Provide a comprehensive sales analysis including:
-
-        ## Executive Summary
-        Key sales performance highlights and overall business health.
-
-        ## Sales Performance Analysis
-        - Revenue trends and patterns
-        - Product performance rankings
-        - Customer behavior insights
-        - Peak sales periods identification
-
-        ## Key Performance Indicators
-        - Total sales volume and value
-        - Average transaction size
-        - Sales conversion metrics
-        - Product mix analysis
-
-        ## Strategic Recommendations
-        ### Immediate Actions (Next 30 days)
-        1. Specific actionable recommendations
-        2. Quick wins for sales improvement
-        3. Inventory optimization suggestions
-
-        ### Strategic Initiatives (Next Quarter)
-        1. Market expansion opportunities
-        2. Product development priorities
-        3. Customer retention strategies
-
-        ## Market Opportunities
-        - Underperforming segments with potential
-        - High-value customer segments
-        - Seasonal trends to capitalize on
-
-        ## Risk Assessment
-        - Declining product lines
-        - Customer concentration risks
-        - Market saturation indicators
-
-        ## Conclusion
-        Summarize business health and growth potential.
-
-        Focus on actionable insights that can drive sales growth and operational efficiency.
-        """
-
-    def create_financial_analysis_prompt(self, df, analysis_results):
-        """Create specialized prompt for financial data analysis"""
-        return f"""
-        You are a senior financial analyst. Analyze this financial dataset and provide executive-level insights.
-
-        Dataset Overview:
-        - Records: {df.shape[0]:,}
-        - Columns: {df.columns.tolist()}
-        - Specialized Metrics: {analysis_results.get('specialized_metrics', {})}
-
-        Provide a comprehensive financial analysis including:
-
-        ## Executive Summary
-        Overall financial health and key performance indicators.
-
-        ## Financial Performance Analysis
-        - Revenue growth trends
-        - Profitability analysis
-        - Cost structure evaluation
-        - Margin analysis and optimization
-
-        ## Key Financial Metrics
-        - Revenue growth rates
-        - Profit margins and trends
-        - Cost ratios and efficiency
-        - Return on investment indicators
-
-        ## Strategic Recommendations
-        ### Immediate Actions (Next 30 days)
-        1. Cost optimization opportunities
-        2. Revenue enhancement strategies
-        3. Cash flow improvements
-
-        ### Strategic Initiatives (Next Quarter)
-        1. Investment priorities
-        2. Cost structure optimization
-        3. Revenue diversification strategies
-
-        ## Financial Health Assessment
-        - Liquidity and solvency indicators
-        - Operational efficiency metrics
-        - Growth sustainability analysis
-
-        ## Risk Management
-        - Financial risk factors
-        - Market volatility impacts
-        - Mitigation strategies
-
-        Focus on financial metrics that drive shareholder value and business sustainability.
-        """
-
-    def create_social_media_analysis_prompt(self, df, analysis_results):
-        """Create specialized prompt for social media data analysis"""
-        return f"""
-        You are a senior social media strategist. Analyze this social media dataset and provide executive-level insights.
-
-        Dataset Overview:
-        - Records: {df.shape[0]:,}
-        - Columns: {df.columns.tolist()}
-        - Specialized Metrics: {analysis_results.get('specialized_metrics', {})}
-
-        Provide a comprehensive social media analysis including:
-
-        ## Executive Summary
-        Overall social media performance and engagement health.
-
-        ## Engagement Performance Analysis
-        - Platform-specific performance
-        - Content type effectiveness
-        - Audience engagement patterns
-        - Viral content identification
-
-        ## Key Social Media Metrics
-        - Engagement rates by platform
-        - Content performance rankings
-        - Audience growth indicators
-        - Conversion and reach metrics
-
-        ## Strategic Recommendations
-        ### Immediate Actions (Next 30 days)
-        1. Content optimization strategies
-        2. Platform-specific improvements
-        3. Engagement boosting tactics
-
-        ### Strategic Initiatives (Next Quarter)
-        1. Content strategy overhaul
-        2. Platform expansion opportunities
-        3. Influencer collaboration strategies
-
-        ## Audience Insights
-        - High-engagement content types
-        - Optimal posting schedules
-        - Platform-specific preferences
-        - Audience behavior patterns
-
-        ## Growth Opportunities
-        - Underperforming content types
-        - Platform optimization potential
-        - Viral content replication strategies
-
-        Focus on actionable insights that can increase engagement, reach, and social media ROI.
-        """
-
-    def create_general_analysis_prompt(self, df, analysis_results):
-        """Create general prompt for unspecified data types"""
-        return f"""
-        You are a senior data analyst. Analyze this dataset and provide executive-level insights.
-
-        Dataset Overview:
-        - Records: {df.shape[0]:,}
-        - Columns: {df.columns.tolist()}
-        - Analysis Results: {analysis_results}
-
-        Provide a comprehensive data analysis including:
-
-        ## Executive Summary
-        Key findings and overall data insights.
-
-        ## Data Analysis
-        - Statistical patterns and trends
-        - Key variable relationships
-        - Notable correlations and dependencies
-
-        ## Strategic Recommendations
-        - Data-driven improvement opportunities
-        - Process optimization suggestions
-        - Performance enhancement strategies
-
-        Focus on actionable insights derived from the data patterns and relationships.
-        """
-
-    def generate_specialized_pdf(self, analysis_results, filename, df_cleaned, data_type):
-        """Generate PDF report specialized for the detected data type"""
-        try:
-            from .utils.report_generators import PDFGenerator
-            pdf_generator = PDFGenerator()
-            
-            # Sanitize data_type for filename
-            if isinstance(data_type, (tuple, list)):
-                data_type_str = str(data_type)
-            else:
-                data_type_str = str(data_type)
-            
-            # Remove any invalid characters for filename
-            import re
-            data_type_str = re.sub(r'[^a-zA-Z0-9_-]', '_', data_type_str)
-
-            # Pass data type for specialized formatting
-            pdf_content = pdf_generator.create_specialized_analysis_report(
-                analysis_results, filename, df_cleaned, data_type
-            )
-
-            # Upload to Supabase
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-
-            pdf_filename = f"reports/{uuid.uuid4()}_{data_type_str}_analysis_report.pdf"
-            res = supabase.storage.from_("business_files").upload(
-                path=pdf_filename,
-                file=pdf_content,
-                file_options={"content-type": "application/pdf"}
-            )
-
-            return supabase.storage.from_("business_files").get_public_url(pdf_filename)
-
-        except Exception as e:
-            print(f"PDF Generation Error: {str(e)}")
-            raise Exception(f"Failed to generate specialized PDF: {str(e)}")
-
-
-    def generate_specialized_ppt(self, analysis_results, filename, df_cleaned, data_type):
-        """Generate PowerPoint presentation specialized for the detected data type"""
-        try:
-            from .utils.report_generators import PPTGenerator
-            
-            print(f"DEBUG: Starting PPT generation")
-            print(f"DEBUG: Data type: {data_type}")
-            print(f"DEBUG: DataFrame shape: {df_cleaned.shape}")
-            
-            ppt_generator = PPTGenerator()
-            
-            # Pass data type for specialized formatting
-            ppt_content = ppt_generator.create_specialized_analysis_presentation(
-                analysis_results, filename, df_cleaned, data_type
-            )
-            
-            print(f"DEBUG: PPT content size: {len(ppt_content)} bytes")
-            
-            # Upload to Supabase
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
-            # Sanitize data_type for filename
-            data_type_str = str(data_type).replace(' ', '_')
-            ppt_filename = f"reports/{uuid.uuid4()}_{data_type_str}_analysis_presentation.pptx"
-            
-            res = supabase.storage.from_("business_files").upload(
-                path=ppt_filename,
-                file=ppt_content,
-                file_options={"content-type": "application/vnd.openxmlformats-officedocument.presentationml.presentation"}
-            )
-            
-            return supabase.storage.from_("business_files").get_public_url(ppt_filename)
-            
-        except Exception as e:
-            print(f"PPT Generation Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            raise Exception(f"Failed to generate specialized PPT: {str(e)}")
+        summary = summarise(header, records)
+        summary['files'] = {record['id']: {k: record.get(k) for k in ('status', 'report_id', 'error')}
+                            for record in records}
+        return Response(summary)
 
 
 class FeedbackAnalysisView(generics.CreateAPIView):
-    MIN_PROMPT_LEN = 100
+    """Run the customer feedback pipeline (api/analytics) and store the result as a CommentReport"""
+
     def post(self, request, *args, **kwargs):
-        """Process feedback data with AI analysis and visualization"""
+        from .analytics.engine import FeedbackEngine
+        from .analytics.tracing import Tracer, span
+
         file_id = request.data.get('file_id')
-        analysis_type = request.data.get('analysis_type', 'feedback_analysis')
-        
+
         try:
-            # Get file and process data
             business_data = BusinessData.objects.get(id=file_id)
-            file_content = self.download_file_from_supabase(business_data.file_url)
-            
-            # Step 1: Read and clean feedback data
-            cleaned_data, cleaning_log = self.clean_feedback_data(file_content, business_data.fileName)
-            
-            # Step 2: AI analysis of column meanings
-            column_analysis = self.analyze_columns_with_gemini(cleaned_data, business_data.fileName)
-
-            # If we get here, column analysis was successful
-            print("Column analysis completed successfully, proceeding with feedback analysis")
-            
-            # Step 3: Comprehensive feedback analysis with Gemini
-            feedback_analysis = self.comprehensive_feedback_analysis(cleaned_data, column_analysis)
-            
-            # Step 4: Generate visualizations based on AI analysis
-            visualizations = self.create_ai_driven_visualizations(cleaned_data, column_analysis, feedback_analysis)
-            
-            # Step 5: Generate AI-powered report with descriptions
-            pdf_url = self.generate_ai_enhanced_report(
-                cleaned_data, column_analysis, feedback_analysis, visualizations, business_data.fileName
-            )
-            
-            # Save results
-            try:
-                # Try to find an existing report
-                existing_report = CommentReport.objects.get(file_url=business_data)
-                
-                # Update the existing report
-                existing_report.filename = f"Report - {business_data.fileName}"
-                existing_report.file_content = {
-                    'cleaning_log': cleaning_log,
-                    'column_analysis': column_analysis,
-                    'feedback_analysis': feedback_analysis,
-                    'visualizations': [v['url'] for v in visualizations]
+            engine = FeedbackEngine()
+            tracer = Tracer('analyse-comment')
+            with metrics.ANALYSIS_JOBS.track_inprogress('analyse-comment'), tracer.activate():
+                with span('download'):
+                    file_content = engine.storage.download(business_data.file_url)
+                result = engine.run(file_content, business_data.fileName)
+            result['file_content']['timings'] = tracer.as_dict()
+
+            # One report per uploaded file: update it on re-analysis
+            processed_report, created = CommentReport.objects.update_or_create(
+                file_url=business_data,
+                defaults={
+                    'filename': f"Report - {business_data.fileName}",
+                    'file_content': result['file_content'],
+                    'pdf_url': result['pdf_url'],
                 }
-                existing_report.pdf_url = pdf_url
-                existing_report.save()
-                
-                processed_report = existing_report
-                print("Updated existing report")
-                
-            except CommentReport.DoesNotExist:
-                # Create a new report if one doesn't exist
-                processed_report = CommentReport.objects.create(
-                    file_url=business_data,
-                    filename=f"Report - {business_data.fileName}",
-                    file_content={
-                        'cleaning_log': cleaning_log,
-                        'column_analysis': column_analysis,
-                        'feedback_analysis': feedback_analysis,
-                        'visualizations': [v['url'] for v in visualizations]
-                    },
-                    pdf_url=pdf_url
-                )
-                print("Created new report")
-            
+            )
+            log.info("comment report saved", report_id=processed_report.pk, created=created)
+
             serializer = CommentReportSerializer(processed_report)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-            
+
         except BusinessData.DoesNotExist:
             return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            print(f"Feedback processing error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return Response({'error': f'Failed to process feedback file: {str(e)}'}, 
+            log.exception("feedback processing failed", file_id=file_id)
+            return Response({'error': f'Failed to process feedback file: {str(e)}'},
                           status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def clean_feedback_data(self, file_content, filename):
-        """Clean and preprocess feedback data"""
-        if filename.endswith('.csv'):
-            df = pd.read_csv(BytesIO(file_content))
-        elif filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(BytesIO(file_content))
-        else:
-            raise ValueError("Unsupported file format. Only CSV and Excel files are supported.")
-
-        cleaning_log = {
-            'original_shape': df.shape,
-            'issues_found': [],
-            'actions_taken': [],
-            'final_shape': None
-        }
-
-        df_cleaned = df.copy()
-        
-        # Handle missing values in text columns
-        text_columns = df_cleaned.select_dtypes(include=['object']).columns
-        for col in text_columns:
-            missing_count = df_cleaned[col].isnull().sum()
-            if missing_count > 0:
-                df_cleaned[col].fillna('No feedback provided', inplace=True)
-                cleaning_log['actions_taken'].append(
-                    f"Column '{col}': Filled {missing_count} missing values with 'No feedback provided'"
-                )
-
-        # Clean text data
-        for col in text_columns:
-            df_cleaned[col] = df_cleaned[col].astype(str).str.strip()
-            
-            # Remove empty feedback entries
-            empty_feedback = df_cleaned[col].str.len() == 0
-            if empty_feedback.sum() > 0:
-                df_cleaned.loc[empty_feedback, col] = 'No substantive feedback'
-                cleaning_log['actions_taken'].append(
-                    f"Column '{col}': Replaced {empty_feedback.sum()} empty entries"
-                )
-
-        cleaning_log['final_shape'] = df_cleaned.shape
-        return df_cleaned, cleaning_log
-
-    def analyze_columns_with_gemini(self, df, filename):
-        """Use Gemini AI to understand column meanings and purposes"""
-        import json
-        try:
-            # Check if API key is available
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                raise Exception("GEMINI_API_KEY not found in environment variables")
-                
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-
-            # Prepare a simplified version of column information
-            column_info = []
-            for col in df.columns:
-                # Get a small sample of data
-                samples = df[col].dropna().head(3).tolist()
-                # Convert to string representation
-                sample_str = ", ".join([str(x) for x in samples[:3]])
-                
-                column_info.append({
-                    "name": col,
-                    "type": str(df[col].dtype),
-                    "sample_values": sample_str,
-                    "unique_count": int(df[col].nunique()),
-                    "missing_count": int(df[col].isnull().sum())
-                })
-
-            # Create a simpler prompt
-            prompt = f"""
-            Analyze this dataset and classify each column's purpose.
-
-            FILENAME: {filename}
-            ROWS: {len(df)}
-            COLUMNS: {len(df.columns)}
-
-            COLUMN INFORMATION:
-            {json.dumps(column_info, indent=2)}
-
-            For each column, classify it as one of these types:
-            - feedback_text: Contains customer comments, reviews, or feedback text
-            - numeric_rating: Contains numerical ratings (1-5, 1-10 scores)
-            - timestamp: Date/time when feedback was provided  
-            - categorical: Product categories, user types, locations, etc.
-            - demographic: Customer name, email, age, etc.
-            - irrelevant: IDs, indexes, system data (should be excluded from analysis)
-            - other: Doesn't fit above categories but might be useful
-
-            Return ONLY a JSON object with this structure:
-            {{
-            "columns_analysis": [
-                {{
-                "column_name": "string",
-                "detected_type": "string",
-                "confidence": "high|medium|low",
-                "reasoning": "brief explanation",
-                "include_in_analysis": true|false
-                }}
-            ],
-            "primary_feedback_column": "column_name_or_null",
-            "primary_rating_column": "column_name_or_null",
-            "notes": "any_important_observations"
-            }}
-
-            Focus on identifying columns that contain feedback text or ratings.
-            """
-
-            print(f"Sending column analysis request to Gemini with prompt length: {len(prompt)}")
-            
-            response = model.generate_content(prompt)
-            response_text = response.text.strip()
-        
-            # Remove markdown code blocks if they exist
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]  # Remove ```json
-            elif response_text.startswith('```'):
-                response_text = response_text[3:]   # Remove ```
-                
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]  # Remove trailing ```
-                
-            response_text = response_text.strip()
-        
-            # Check if response is valid before trying to parse it as JSON
-            import json
-            try:
-                
-                result = json.loads(response_text)
-                
-                # Validate the structure
-                if isinstance(result, dict) and 'columns_analysis' in result:
-                    print(f"Successfully parsed Gemini response with {len(result.get('columns_analysis', []))} columns")
-                    return result
-                else:
-                    print("Gemini response missing expected structure; using fallback")
-                
-            except json.JSONDecodeError as json_error:
-                print(f"JSON parsing failed: {json_error}")
-                print(f"Response text (first 500 chars): {response_text[:500]}")
-                return self.fallback_column_analysis(df, filename)
-                
-        except Exception as e:
-            error_msg = f"Gemini column analysis failed: {str(e)}"
-            print(f"Gemini column analysis failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            print(error_msg)
-            raise Exception(error_msg)
-
-    def fallback_column_analysis(self, df, filename):
-        """Fallback column analysis when Gemini fails"""
-        analysis = {
-            "columns_analysis": [], 
-            "primary_feedback_column": None,
-            "primary_rating_column": None,
-            "notes": "Basic feedback data analysis (fallback)"
-        }
-        
-        for col in df.columns:
-            col_lower = col.lower()
-            col_info = {
-                "column_name": col,
-                "detected_type": "other",
-                "confidence": "low",
-                "reasoning": "Fallback analysis based on column name",
-                "include_in_analysis": True
-            }
-            
-            # Basic pattern matching for common feedback columns
-            if any(keyword in col_lower for keyword in ['rating', 'score', 'rate']):
-                col_info["detected_type"] = "numeric_rating"
-                col_info["confidence"] = "medium"
-                col_info["reasoning"] = "Column name suggests rating data"
-                if not analysis["primary_rating_column"]:
-                    analysis["primary_rating_column"] = col
-                    
-            elif any(keyword in col_lower for keyword in ['comment', 'feedback', 'review', 'suggestion']):
-                col_info["detected_type"] = "feedback_text"
-                col_info["confidence"] = "medium"
-                col_info["reasoning"] = "Column name suggests feedback text"
-                if not analysis["primary_feedback_column"]:
-                    analysis["primary_feedback_column"] = col
-                    
-            elif any(keyword in col_lower for keyword in ['date', 'time', 'timestamp']):
-                col_info["detected_type"] = "timestamp"
-                col_info["confidence"] = "medium"
-                col_info["reasoning"] = "Column name suggests timestamp data"
-                
-            elif any(keyword in col_lower for keyword in ['name', 'user', 'customer', 'email']):
-                col_info["detected_type"] = "demographic"
-                col_info["confidence"] = "medium"
-                col_info["reasoning"] = "Column name suggests demographic data"
-                
-            elif any(keyword in col_lower for keyword in ['id', 'index', 'key']):
-                col_info["detected_type"] = "irrelevant"
-                col_info["include_in_analysis"] = False
-                col_info["reasoning"] = "Column name suggests ID/index data"
-            
-            analysis["columns_analysis"].append(col_info)
-        
-        return analysis
-
-    def comprehensive_feedback_analysis(self, df, column_analysis):
-        """Comprehensive feedback analysis using Gemini AI"""
-        
-        # Default structure to return if AI analysis fails
-        default_analysis = {
-            "sentiment_summary": {
-                "positive_percentage": 0.0,
-                "negative_percentage": 0.0,
-                "neutral_percentage": 0.0,
-                "overall_sentiment": "neutral"
-            },
-            "positive_feedback_analysis": {
-                "categories": []
-            },
-            "negative_feedback_analysis": {
-                "categories": []
-            },
-            "recommendations": [],
-            "analysis_status": "fallback_used",
-            "error_message": None
-        }
-        
-        try:
-            # Check if API key is available
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                raise Exception("GEMINI_API_KEY not found in environment variables")
-                
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-
-            # Identify relevant columns for analysis
-            feedback_columns = []
-            rating_columns = []
-            
-            for col_info in column_analysis.get('columns_analysis', []):
-                if col_info.get('include_in_analysis', True):
-                    if col_info.get('detected_type') == 'feedback_text':
-                        feedback_columns.append(col_info['column_name'])
-                    elif col_info.get('detected_type') == 'numeric_rating':
-                        rating_columns.append(col_info['column_name'])
-
-            # If no feedback columns found, return default with message
-            if not feedback_columns:
-                default_analysis["analysis_status"] = "no_feedback_columns"
-                default_analysis["error_message"] = "No feedback text columns identified for analysis"
-                print("No feedback columns found for analysis")
-                return default_analysis
-
-            # Prepare sample data for analysis with JSON-serializable types
-            sample_data = []
-            max_samples = 50
-            
-            for col in feedback_columns:
-                if col in df.columns:
-                    samples = df[col].dropna().head(max_samples)
-                    # Convert to native Python types
-                    sample_list = []
-                    for sample in samples:
-                        if hasattr(sample, 'item'):
-                            sample_list.append(sample.item())
-                        else:
-                            sample_list.append(str(sample))
-                    
-                    sample_data.append({
-                        'column': col,
-                        'samples': sample_list[:10]  # First 10 samples per column
-                    })
-
-            # Get rating distribution if available - convert to native types
-            rating_info = {}
-            for col in rating_columns:
-                if col in df.columns:
-                    # Convert numpy types to native Python types
-                    avg_val = float(df[col].mean()) if not pd.isna(df[col].mean()) else 0.0
-                    
-                    dist = df[col].value_counts()
-                    dist_dict = {}
-                    for key, value in dist.items():
-                        if hasattr(key, 'item'):
-                            dist_dict[key.item()] = int(value)
-                        else:
-                            dist_dict[key] = int(value)
-                    
-                    rating_info[col] = {
-                        'average': avg_val,
-                        'distribution': dist_dict
-                    }
-
-            prompt = f"""
-            ACT as a Customer Experience (CX) Analyst with expertise in feedback analysis.
-
-            DATASET OVERVIEW:
-            - Total records: {int(len(df))}
-            - Feedback columns: {feedback_columns}
-            - Rating columns: {rating_columns}
-            - Rating statistics: {json.dumps(rating_info, indent=2, default=str)}
-
-            SAMPLE FEEDBACK DATA:
-            {json.dumps(sample_data, indent=2, default=str)}
-
-            YOUR COMPREHENSIVE ANALYSIS TASK:
-            Perform a detailed analysis of the customer feedback and provide insights in the following JSON structure:
-
-            {{
-                "sentiment_summary": {{
-                    "positive_percentage": float,
-                    "negative_percentage": float,
-                    "neutral_percentage": float,
-                    "overall_sentiment": "positive/negative/neutral"
-                }},
-                "positive_feedback_analysis": {{
-                    "categories": [
-                        {{
-                            "category": "string",
-                            "percentage": float,
-                            "examples": ["string"],
-                            "key_themes": ["string"]
-                        }}
-                    ]
-                }},
-                "negative_feedback_analysis": {{
-                    "categories": [
-                        {{
-                            "category": "string",
-                            "percentage": float,
-                            "examples": ["string"],
-                            "key_issues": ["string"]
-                        }}
-                    ]
-                }},
-                "recommendations": [
-                    {{
-                        "area": "string",
-                        "action": "string",
-                        "priority": "high/medium/low",
-                        "impact": "string",
-                        "timeline": "short/medium/long-term"
-                    }}
-                ]
-            }}
-
-            Focus on:
-            1. Identifying key themes in positive feedback
-            2. Categorizing and quantifying negative feedback
-            3. Providing actionable recommendations
-            4. Calculating sentiment distribution
-
-            Return ONLY valid JSON, no markdown or explanation.
-            """
-
-            print(f"Sending feedback analysis request to Gemini API")
-            response = model.generate_content(prompt)
-            response_text = response.text.strip()
-        
-            # Remove markdown code blocks if they exist
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]  # Remove ```json
-            elif response_text.startswith('```'):
-                response_text = response_text[3:]   # Remove ```
-                
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]  # Remove trailing ```
-                
-            response_text = response_text.strip()
-            
-            # Check if response is valid before trying to parse it as JSON
-            if response and hasattr(response, 'text') and response.text:
-                try:
-                    result = json.loads(response_text)
-                    
-                    # Validate required structure
-                    required_keys = ['sentiment_summary', 'positive_feedback_analysis', 'negative_feedback_analysis', 'recommendations']
-                    if all(key in result for key in required_keys):
-                        result["analysis_status"] = "success"
-                        print("Successfully parsed Gemini feedback analysis")
-                        return result
-                    else:
-                        print(f"Missing required keys in response: {[k for k in required_keys if k not in result]}")
-                        default_analysis["analysis_status"] = "invalid_structure"
-                        default_analysis["error_message"] = "AI response missing required fields"
-                        return default_analysis
-                        
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse Gemini response as JSON: {e}")
-                    default_analysis["analysis_status"] = "json_parse_error"
-                    default_analysis["error_message"] = f"JSON parsing failed: {str(e)}"
-                    return default_analysis
-            else:
-                print("Empty or invalid response from Gemini API")
-                default_analysis["analysis_status"] = "empty_response"
-                default_analysis["error_message"] = "Empty response from AI service"
-                return default_analysis
-                
-        except Exception as e:
-            error_msg = f"Gemini feedback analysis failed: {str(e)}"
-            print(error_msg)
-            raise Exception(error_msg)  # Re-raise the exception to stop execution
-
-    def create_ai_driven_visualizations(self, df, column_analysis, feedback_analysis):
-        """Create visualizations based on AI analysis with AI-generated descriptions"""
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        import numpy as np
-        
-        visualizations = []
-        try:
-            # Add validation to ensure we have the required data
-            if not feedback_analysis:
-                raise Exception("No feedback analysis data provided for visualizations")
-                
-            if not isinstance(feedback_analysis, dict):
-                raise Exception(f"Invalid feedback analysis data type: {type(feedback_analysis)}")
-            
-            # Get relevant columns for visualization
-            relevant_columns = []
-            if isinstance(column_analysis, dict):
-                for col_info in column_analysis.get('columns_analysis', []):
-                    if col_info.get('include_in_analysis', True) and col_info['column_name'] in df.columns:
-                        relevant_columns.append(col_info['column_name'])
-
-            # 1. Sentiment Distribution Chart
-            sentiment_data = feedback_analysis.get('sentiment_summary', {})
-            if sentiment_data and any(sentiment_data.get(key, 0) > 0 for key in ['positive_percentage', 'negative_percentage', 'neutral_percentage']):
-                try:
-                    plt.figure(figsize=(10, 8))
-                    labels = ['Positive', 'Negative', 'Neutral']
-                    sizes = [
-                        sentiment_data.get('positive_percentage', 0),
-                        sentiment_data.get('negative_percentage', 0),
-                        sentiment_data.get('neutral_percentage', 0)
-                    ]
-                    colors = ['#4CAF50', '#F44336', '#FFC107']
-                    
-                    # Only create pie chart if we have non-zero values
-                    if sum(sizes) > 0:
-                        plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-                        plt.title('Feedback Sentiment Distribution')
-                        plt.axis('equal')
-                        
-                        chart_url = self.save_chart_to_supabase(plt, f"feedback_visualizations/{uuid.uuid4()}_sentiment_pie.png")
-                        
-                        # Generate AI description for this chart
-                        chart_description = self.generate_chart_description(
-                            'sentiment_pie',
-                            sentiment_data,
-                            feedback_analysis
-                        )
-                        
-                        visualizations.append({
-                            'type': 'pie_chart',
-                            'title': 'Feedback Sentiment Analysis',
-                            'url': chart_url,
-                            'description': chart_description
-                        })
-                    plt.close()
-                except Exception as e:
-                    print(f"Error creating sentiment chart: {e}")
-                    plt.close()
-
-            # 2. Combined Positive/Negative Category Distribution
-            positive_cats = feedback_analysis.get('positive_feedback_analysis', {}).get('categories', [])
-            negative_cats = feedback_analysis.get('negative_feedback_analysis', {}).get('categories', [])
-            
-            # Create combined chart if we have both positive and negative categories
-            if positive_cats and negative_cats:
-                # Get top categories from both (limit to 5 each for readability)
-                top_positive = sorted(positive_cats, key=lambda x: x['percentage'], reverse=True)[:5]
-                top_negative = sorted(negative_cats, key=lambda x: x['percentage'], reverse=True)[:5]
-                
-                # Get all unique category names
-                all_categories = set()
-                for cat in top_positive:
-                    all_categories.add(cat['category'])
-                for cat in top_negative:
-                    all_categories.add(cat['category'])
-                
-                # Create data for the chart
-                categories = list(all_categories)
-                positive_values = []
-                negative_values = []
-                
-                for category in categories:
-                    # Find matching positive category
-                    pos_match = next((cat for cat in top_positive if cat['category'] == category), None)
-                    positive_values.append(pos_match['percentage'] if pos_match else 0)
-                    
-                    # Find matching negative category
-                    neg_match = next((cat for cat in top_negative if cat['category'] == category), None)
-                    negative_values.append(neg_match['percentage'] if neg_match else 0)
-                
-                # Create the combined bar chart
-                plt.figure(figsize=(14, 8))
-                
-                x = np.arange(len(categories))
-                width = 0.35
-                
-                plt.bar(x - width/2, positive_values, width, label='Positive', color='#4CAF50', alpha=0.8)
-                plt.bar(x + width/2, negative_values, width, label='Negative', color='#F44336', alpha=0.8)
-                
-                plt.xlabel('Feedback Categories')
-                plt.ylabel('Percentage')
-                plt.title('Positive vs Negative Feedback by Category')
-                plt.xticks(x, categories, rotation=45, ha='right')
-                plt.legend()
-                plt.tight_layout()
-                
-                chart_url = self.save_chart_to_supabase(plt, f"feedback_visualizations/{uuid.uuid4()}_combined_categories.png")
-                
-                # Prepare data for description
-                chart_data = {
-                    'categories': categories,
-                    'positive_values': positive_values,
-                    'negative_values': negative_values
-                }
-                
-                chart_description = self.generate_chart_description('combined_categories', chart_data, feedback_analysis)
-                
-                visualizations.append({
-                    'type': 'bar_chart',
-                    'title': 'Positive vs Negative Feedback by Category',
-                    'url': chart_url,
-                    'description': chart_description
-                })
-                plt.close()
-            
-            # 3. Individual category charts (optional - you can keep these or remove them)
-            if positive_cats:
-                plt.figure(figsize=(12, 6))
-                categories = [cat['category'] for cat in positive_cats[:5]]  # Limit to top 5
-                percentages = [cat['percentage'] for cat in positive_cats[:5]]
-                
-                plt.barh(categories, percentages, color='green', alpha=0.7)
-                plt.title('Top Positive Feedback Categories')
-                plt.xlabel('Percentage')
-                plt.tight_layout()
-                
-                chart_url = self.save_chart_to_supabase(plt, f"feedback_visualizations/{uuid.uuid4()}_positive_categories.png")
-                chart_description = self.generate_chart_description('positive_categories', positive_cats[:5], feedback_analysis)
-                
-                visualizations.append({
-                    'type': 'bar_chart',
-                    'title': 'Top Positive Feedback Categories',
-                    'url': chart_url,
-                    'description': chart_description
-                })
-                plt.close()
-
-            if negative_cats:
-                plt.figure(figsize=(12, 6))
-                categories = [cat['category'] for cat in negative_cats[:5]]  # Limit to top 5
-                percentages = [cat['percentage'] for cat in negative_cats[:5]]
-                
-                plt.barh(categories, percentages, color='red', alpha=0.7)
-                plt.title('Top Negative Feedback Categories')
-                plt.xlabel('Percentage')
-                plt.tight_layout()
-                
-                chart_url = self.save_chart_to_supabase(plt, f"feedback_visualizations/{uuid.uuid4()}_negative_categories.png")
-                chart_description = self.generate_chart_description('negative_categories', negative_cats[:5], feedback_analysis)
-                
-                visualizations.append({
-                    'type': 'bar_chart',
-                    'title': 'Top Negative Feedback Categories',
-                    'url': chart_url,
-                    'description': chart_description
-                })
-                plt.close()
-            
-            # 4. Rating distribution charts (if available)
-            rating_columns = []
-            for col_info in column_analysis.get('columns_analysis', []):
-                if (col_info.get('detected_type') == 'numeric_rating' and 
-                    col_info.get('include_in_analysis', True) and 
-                    col_info['column_name'] in df.columns):
-                    rating_columns.append(col_info['column_name'])
-            
-            for rating_col in rating_columns[:2]:  # Limit to first 2 rating columns
-                if df[rating_col].dtype in ['int64', 'float64']:
-                    plt.figure(figsize=(10, 6))
-                    
-                    # Convert to native Python list for plotting
-                    rating_data = [float(x) for x in df[rating_col].dropna() if not pd.isna(x)]
-                    
-                    plt.hist(rating_data, bins=10, alpha=0.7, color='skyblue', edgecolor='black')
-                    plt.title(f'Distribution of {rating_col} Ratings')
-                    plt.xlabel('Rating Value')
-                    plt.ylabel('Frequency')
-                    plt.grid(True, alpha=0.3)
-                    
-                    chart_url = self.save_chart_to_supabase(plt, f"feedback_visualizations/{uuid.uuid4()}_{rating_col}_distribution.png")
-                    
-                    # Convert describe() to native Python types for JSON serialization
-                    desc = df[rating_col].describe()
-                    desc_dict = {}
-                    for key, value in desc.items():
-                        if hasattr(value, 'item'):
-                            desc_dict[key] = value.item()
-                        else:
-                            desc_dict[key] = value
-                    
-                    chart_description = self.generate_chart_description('rating_distribution', {
-                        'column': rating_col,
-                        'data': desc_dict
-                    }, feedback_analysis)
-                    
-                    visualizations.append({
-                        'type': 'histogram',
-                        'title': f'{rating_col} Distribution',
-                        'url': chart_url,
-                        'description': chart_description
-                    })
-                    plt.close()
-
-            return visualizations
-        except Exception as e:
-            error_msg = f"Visualization creation failed: {str(e)}"
-            print(error_msg)
-            raise Exception(error_msg)  # Re-raise the exception to stop execution
-
-    def generate_chart_description(self, chart_type, chart_data, feedback_analysis):
-        """Use Gemini AI to generate descriptive analysis for charts"""
-        try:
-            genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-            model = genai.GenerativeModel('gemini-1.5-flash')
-
-            # Ensure chart_data is JSON serializable
-            serializable_data = self.convert_to_serializable(chart_data)
-
-            prompt = f"""
-            You are a data visualization expert. Analyze this chart data and provide a concise, insightful description.
-
-            CHART TYPE: {chart_type}
-            CHART DATA: {json.dumps(serializable_data, indent=2, default=str)}
-            FEEDBACK ANALYSIS CONTEXT: {json.dumps(self.convert_to_serializable(feedback_analysis), indent=2, default=str)[:1000]}...
-
-            Provide a 2-3 sentence description that:
-            1. Explains what the chart shows
-            2. Highlights key insights or patterns
-            3. Relates it to the overall feedback analysis
-            4. Uses clear, professional language
-
-            Output only the description text, no markdown or formatting.
-            """
-
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Chart description generation failed: {str(e)}")
-            return f"Chart showing {chart_type} data from feedback analysis."
-
-    def convert_to_serializable(self, obj):
-        """Recursively convert numpy/pandas types to native Python types"""
-        if hasattr(obj, 'item'):
-            return obj.item()
-        elif isinstance(obj, dict):
-            return {k: self.convert_to_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.convert_to_serializable(item) for item in obj]
-        elif isinstance(obj, (np.integer, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64)):
-            return float(obj)
-        elif isinstance(obj, np.bool_):
-            return bool(obj)
-        elif pd.isna(obj):
-            return None
-        else:
-            return obj
-
-    def generate_ai_enhanced_report(self, df, column_analysis, feedback_analysis, visualizations, filename):
-        """Generate comprehensive PDF report with AI-enhanced insights"""
-        try:
-            # Import here to avoid circular imports
-            from .utils.report_generators import PDFGenerator
-            
-            # Generate AI-powered executive summary
-            executive_summary = self.generate_executive_summary(feedback_analysis, visualizations)
-            
-            pdf_generator = PDFGenerator()
-            pdf_content = pdf_generator.create_feedback_report(
-                df, column_analysis, feedback_analysis, visualizations, 
-                executive_summary, filename
-            )
-            
-            # Upload to Supabase
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
-            pdf_filename = f"commentsreport/{uuid.uuid4()}_ai_feedback_analysis_report.pdf"
-            res = supabase.storage.from_("business_files").upload(
-                path=pdf_filename,
-                file=pdf_content,
-                file_options={"content-type": "application/pdf"}
-            )
-            
-            return supabase.storage.from_("business_files").get_public_url(pdf_filename)
-            
-        except Exception as e:
-            print(f"AI Enhanced PDF Generation Error: {str(e)}")
-            raise Exception(f"Failed to generate AI-enhanced PDF: {str(e)}")
-
-    def generate_executive_summary(self, feedback_analysis, visualizations):
-        """Generate structured executive summary using Gemini AI"""
-        try:
-            # Check if API key is available
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                return("GEMINI_API_KEY not found in environment variables")
-                
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-
-            # Create a simplified version of the data for the prompt
-            simplified_analysis = {
-                'sentiment_summary': feedback_analysis.get('sentiment_summary', {}),
-                'positive_categories': [cat.get('category', '') for cat in 
-                                    feedback_analysis.get('positive_feedback_analysis', {}).get('categories', [])[:3]],
-                'negative_categories': [cat.get('category', '') for cat in 
-                                    feedback_analysis.get('negative_feedback_analysis', {}).get('categories', [])[:3]],
-                'recommendations': [rec.get('action', '') for rec in 
-                                feedback_analysis.get('recommendations', [])[:3]]
-            }
-
-            prompt = f"""
-            As a senior business analyst, create a structured executive summary based on this feedback analysis.
-
-            FEEDBACK ANALYSIS RESULTS:
-            {json.dumps(self.convert_to_serializable(feedback_analysis), indent=2, default=str)}
-
-            VISUALIZATIONS GENERATED:
-            {json.dumps([v['title'] for v in visualizations], indent=2, default=str)}
-
-            Create a comprehensive executive summary with the following structure:
-
-            # Executive Summary: Customer Feedback Analysis
-
-            KEY FINDINGS:
-            - Overall sentiment: {simplified_analysis['sentiment_summary'].get('overall_sentiment', 'N/A')}
-            - Positive: {simplified_analysis['sentiment_summary'].get('positive_percentage', 0)}%
-            - Negative: {simplified_analysis['sentiment_summary'].get('negative_percentage', 0)}%
-            - Neutral: {simplified_analysis['sentiment_summary'].get('neutral_percentage', 0)}%
-            
-            TOP POSITIVE CATEGORIES: {', '.join(simplified_analysis['positive_categories'])}
-            TOP NEGATIVE CATEGORIES: {', '.join(simplified_analysis['negative_categories'])}
-            KEY RECOMMENDATIONS: {', '.join(simplified_analysis['recommendations'])}
-            
-            Create a comprehensive executive summary with the following structure:
-
-            # Executive Summary: Customer Feedback Analysis
-
-            ## 📊 Overall Sentiment Distribution
-            [Provide sentiment percentages in a bullet point format]
-
-            ## 👍 Positive Feedback Highlights
-            [Key positive themes in bullet points]
-
-            ## ⚠️ Areas Needing Improvement  
-            [Key negative themes in bullet points]
-
-            ## 🎯 Recommended Actions
-            [Priority recommendations in bullet points with priority levels]
-
-            ## 📈 Expected Outcomes
-            [Potential benefits of implementing recommendations]
-
-            ## 🔜 Next Steps
-            [Actionable next steps in numbered list]
-
-            Write in professional business language suitable for executives.
-            Focus on actionable insights and strategic implications.
-            Use concise bullet points and sections as shown above.
-            Keep the response under 500 words.
-            """
-
-            print(f"Sending executive summary request to Gemini with prompt length: {len(prompt)}")
-            
-            response = model.generate_content(prompt)
-            
-            if response.text and response.text.strip():
-                print(f"Received executive summary: {response.text[:100]}...")
-                return response.text
-            else:
-                return("Empty response from Gemini for executive summary")
-                
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return (f"Executive summary generation failed: {str(e)}")
-            
-            # return self.fallback_executive_summary(feedback_analysis)
-
-    def basic_feedback_analysis(self, df, text_columns):
-        """Basic sentiment analysis fallback with proper structure"""
-        from textblob import TextBlob
-        
-        sentiments = []
-        for col in text_columns:
-            for text in df[col].dropna():
-                if text and text != 'No feedback provided':
-                    try:
-                        analysis = TextBlob(str(text))
-                        sentiments.append(analysis.sentiment.polarity)
-                    except:
-                        continue
-        
-        total = len(sentiments) if sentiments else 1
-        positive = len([s for s in sentiments if s > 0.1])
-        negative = len([s for s in sentiments if s < -0.1])
-        neutral = total - positive - negative
-
-        # Return properly structured data that matches the expected format
-        return {
-            "sentiment_summary": {
-                "positive_percentage": (positive / total) * 100,
-                "negative_percentage": (negative / total) * 100,
-                "neutral_percentage": (neutral / total) * 100,
-                "overall_sentiment": "positive" if positive > negative else "negative" if negative > positive else "neutral"
-            },
-            "positive_feedback_analysis": {
-                "categories": [
-                    {
-                        "category": "General Positive Feedback",
-                        "percentage": (positive / total) * 100,
-                        "examples": ["Satisfied customers", "Positive experiences"],
-                        "key_themes": ["satisfaction", "quality"]
-                    }
-                ]
-            },
-            "negative_feedback_analysis": {
-                "categories": [
-                    {
-                        "category": "General Concerns",
-                        "percentage": (negative / total) * 100,
-                        "examples": ["Areas for improvement", "Customer concerns"],
-                        "key_issues": ["service", "quality"]
-                    }
-                ]
-            },
-            "recommendations": [
-                {
-                    "area": "General Improvement",
-                    "action": "Address customer concerns",
-                    "priority": "Medium",
-                    "impact": "Improved customer satisfaction",
-                    "timeline": "Short-term"
-                }
-            ]
-        }
-
-    def save_chart_to_supabase(self, plt_figure, chart_path):
-        """Save matplotlib chart to Supabase storage"""
-        try:
-            img_buffer = BytesIO()
-            plt_figure.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-            img_content = img_buffer.getvalue()
-            
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
-            res = supabase.storage.from_("business_files").upload(
-                path=chart_path,
-                file=img_content,
-                file_options={"content-type": "image/png"}
-            )
-            
-            return supabase.storage.from_("business_files").get_public_url(chart_path)
-        except Exception as e:
-            print(f"Failed to save chart to Supabase: {str(e)}")
-            # Return a placeholder URL or handle the error appropriately
-            return "https://example.com/placeholder.png"
-
-    def download_file_from_supabase(self, file_url):
-        """Download file content from Supabase Storage"""
-        try:
-            response = requests.get(file_url)
-            response.raise_for_status()
-            return response.content
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to download file from Supabase: {str(e)}")
-        
 
 from django.http import JsonResponse
 
 def transcript_view(request):
     return JsonResponse({"message": "Transcript endpoint works!"})
 
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (text exposition format); see api/utils/metrics.py"""
+    from django.conf import settings
+    from django.http import HttpResponse
+
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 class TaskListCreateView(generics.ListCreateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
@@ -2779,25 +210,14 @@ class BusinessDataListCreateView(generics.ListCreateAPIView):
         uploader = self.request.data.get('uploader', 'Anonymous')
         
         if uploaded_file:
-            # Upload to Supabase Storage
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            supabase = create_client(supabase_url, supabase_key)
-            
+            from .analytics.clients import SupabaseStorage
+
             # Generate unique filename
             file_extension = os.path.splitext(uploaded_file.name)[1]
             unique_filename = f"uploads/{uuid.uuid4()}{file_extension}"
-            
-            # Upload file
-            file_content = uploaded_file.read()
-            res = supabase.storage.from_("business_files").upload(
-                path=unique_filename,
-                file=file_content,
-                file_options={"content-type": uploaded_file.content_type}
-            )
-            
-            # Get public URL
-            file_url = supabase.storage.from_("business_files").get_public_url(unique_filename)
+
+            # Upload to Supabase Storage and get the public URL
+            file_url = SupabaseStorage().upload(unique_filename, uploaded_file.read(), uploaded_file.content_type)
             
             # Save to database
             serializer.save(
@@ -2818,6 +238,16 @@ class ProcessedReportListView(generics.ListAPIView):
     queryset = ProcessedReport.objects.all()
     serializer_class = ProcessedReportSerializer
 
+def processed_report_etag(request, pk):
+    # Reports are never edited after creation, so id + creation time identifies the content
+    created_at = ProcessedReport.objects.filter(pk=pk).values_list('created_at', flat=True).first()
+    return etag_for('processed-report', pk, created_at) if created_at else None
+
+def comment_report_etag(request, pk):
+    version = CommentReport.objects.filter(pk=pk).values_list('created_at', 'updated_at').first()
+    return etag_for('comment-report', pk, *version) if version else None
+
+@method_decorator(condition(etag_func=processed_report_etag), name='get')
 class ProcessedReportRetrieveView(generics.RetrieveAPIView):
     queryset = ProcessedReport.objects.all()
     serializer_class = ProcessedReportSerializer
@@ -2826,6 +256,7 @@ class CommentReportListView(generics.ListAPIView):
     queryset = CommentReport.objects.all()
     serializer_class = CommentReportSerializer
 
+@method_decorator(condition(etag_func=comment_report_etag), name='get')
 class CommentReportRetrieveView(generics.RetrieveAPIView):
     queryset = CommentReport.objects.all()
     serializer_class = CommentReportSerializer
@@ -2867,13 +298,15 @@ class PassMeetingListView(generics.ListAPIView):
             meeting_date__lt=today
         ).order_by('-meeting_date', '-meeting_time')
 
-class DepartmentsListView(generics.ListAPIView):
+class DepartmentsListView(CachedReferenceListMixin, generics.ListAPIView):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
+    reference_cache_key = DEPARTMENTS_CACHE_KEY
 
-class EmployeeForMeetingView(generics.ListAPIView):
+class EmployeeForMeetingView(CachedReferenceListMixin, generics.ListAPIView):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    reference_cache_key = EMPLOYEES_CACHE_KEY
 
 class MeetingDetailView(generics.RetrieveAPIView):
     queryset = Meeting.objects.all()
@@ -2950,166 +383,108 @@ class ComplaintDetailView(generics.RetrieveUpdateAPIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-def get_meeting_summary_and_tasks(meeting_data, transcript_text, transcript_files):
+class ComplaintResummariseView(APIView):
     """
-    Uses Gemini to summarize the meeting and extract tasks only.
-    """
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
-    prompt = f"""
-    You are an AI meeting assistant. Analyze the following meeting details and transcript.
-
-    Meeting Info:
-    Title: {meeting_data.get("title")}
-    Date: {meeting_data.get("date")}
-    Time: {meeting_data.get("time")}
-    Location: {meeting_data.get("location")}
-    Departments: {", ".join(meeting_data.get("departments", []))}
-    Participants: {", ".join(meeting_data.get("participants", []))}
-
-    Transcript (first 5000 chars shown for context):
-    {transcript_text[:5000]}
-
-    Transcript files (full content available if needed): {transcript_files}
-
-    Please provide ONLY:
-    1. A meeting summary in point form (bullet list).
-    2. Tasks grouped strictly by participant name. 
-
-    ⚠️ Summary handling rules:
-    - The summary only include the important points of the meeting.
-    - No need mention the tasks again, because it is in the task assigned section
-
-    ⚠️ Important rules for task assignment:
-    - Only assign tasks to participants from this list: {", ".join(meeting_data.get("participants", []))}, no need mention for all employee, just assign the task for employee mentioned.
-    - Do NOT assign tasks to departments (e.g., HR, Sales, Marketing, Engineering) or anyone not in the participants list.
-    - Names in the output must exactly match the participant names provided.
-    - You must ONLY use names exactly from this participants list: {", ".join(meeting_data.get("participants", []))}.
-    - If a task is assigned to a name not in the list (e.g. misheard or typo), map it to the **closest matching name** in the list using fuzzy matching.  
-    - Example: if "Aldis" is detected but not in participants, replace it with "Alice".
-
-    ⚠️ Deadline handling rules:
-    - All deadlines must be calculated relative to the meeting date ({meeting_data.get("date")}), not today’s date.  
-    - Interpret relative words as follows:  
-    * "tomorrow" = 1 day after meeting date  
-    * "next week" = 7 days after meeting date  
-    * "next month" = 1 month after meeting date  
-    - If the deadline wasn't mentioned, set it as 7 days after the meeting date.  
-    - Always output deadlines in strict ISO format (YYYY-MM-DD).
-
-    Each task must include:
-    - "task_title"
-    - "task_content"
-    - "urgent_level" (low, medium, high, pending)
-    - "deadline" (ISO format: YYYY-MM-DD or 'None')
-
-    If the urgent level wasn't mentioned, set it as "pending".
-    If the deadline wasn't mentioned, set it as 10 days after the meeting date.
-    For example, if the meeting date is 21 Aug 2025, the deadline is 31 Aug 2025.
-
-    Format your answer strictly as JSON, no explanations, no extra text. Example:
-
-    {{
-    "summary": [
-        "Point 1",
-        "Point 2",
-        "Point 3"
-    ],
-    "tasks": {{
-        "Alice": [
-        {{
-            "task_title": "Prepare Q3 Report",
-            "task_content": "Gather data from sales and marketing, prepare draft",
-            "urgent_level": "high",
-            "deadline": "2025-09-01"
-        }}
-        ],
-        "Bob": [
-        {{
-            "task_title": "Update Website",
-            "task_content": "Add Q3 product launches to homepage",
-            "urgent_level": "pending",
-            "deadline": "2025-08-30"
-        }}
-        ]
-    }}
-    }}
+    POST: re-run the AI summary of many complaints, by `complaint_ids` and/or a `filter`
+    ({statuses, employee, created_after, created_before, missing_summary}), optionally with
+    `workers` and `requests_per_minute`. Runs in the background (api/resummarise.py); the
+    response is 202 with the run id.
+    GET <run_id>: progress and throughput of the run.
     """
 
+    def post(self, request):
+        from django.conf import settings
+        from .resummarise import select_complaints, start
 
-    try:
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
-        print("🔍 Gemini raw output:", response.text)
+        complaint_ids = request.data.get('complaint_ids') or []
+        filters = request.data.get('filter') or {}
+        if not complaint_ids and not filters:
+            return Response({'error': 'Provide complaint_ids or a filter'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Try parsing JSON
         try:
-            return json.loads(raw_text)
-        except json.JSONDecodeError:
-            match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            else:
-                return {"summary": ["Parsing failed."], "tasks": {}}
+            complaints = select_complaints(
+                complaint_ids=complaint_ids,
+                statuses=filters.get('statuses'),
+                employee=filters.get('employee'),
+                created_after=filters.get('created_after'),
+                created_before=filters.get('created_before'),
+                missing_summary=bool(filters.get('missing_summary')),
+            )
+            selected = list(complaints.values_list('complaint_id', flat=True))
+        except Exception as e:
+            return Response({'error': f'Invalid selection: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not selected:
+            return Response({'error': 'No complaints with a transcript match the selection'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            workers = int(request.data['workers']) if request.data.get('workers') not in (None, '') else None
+            per_minute = (int(request.data['requests_per_minute'])
+                          if request.data.get('requests_per_minute') not in (None, '') else None)
+        except (TypeError, ValueError):
+            return Response({'error': 'workers and requests_per_minute must be integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Callers may go slower than the configured Gemini limits, never faster
+        limit = settings.GEMINI_REQUESTS_PER_MINUTE
+        if workers is not None and workers <= 0:
+            return Response({'error': 'workers must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+        if per_minute is not None and (per_minute <= 0 or (limit and per_minute > limit)):
+            return Response({'error': f'requests_per_minute must be between 1 and {limit}' if limit
+                             else 'requests_per_minute must be positive'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if workers is not None:
+            workers = min(workers, settings.RESUMMARISE_WORKERS)
+
+        run_id = start(selected, workers=workers, per_minute=per_minute)
+        return Response({'run_id': run_id, 'complaints': len(selected)}, status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request, run_id):
+        from .resummarise import get_report
+
+        report = get_report(run_id)
+        if report is None:
+            return Response({'error': 'Run not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(report)
+
+
+def get_meeting_summary_and_tasks(meeting_data, transcript_text, transcript_files):
+    """
+    Uses Gemini to summarize the meeting and extract tasks only. Long transcripts are
+    summarised in parts and merged (see api/summaries.py).
+    """
+    from .analytics.clients import GeminiClient
+    from .summaries import summarise_meeting
+
+    try:
+        result = summarise_meeting(meeting_data, transcript_text, transcript_files, GeminiClient())
+        log.debug("meeting summary output", result=lazy(lambda: result))
+        return result
+    except json.JSONDecodeError:
+        return {"summary": ["Parsing failed."], "tasks": {}}
     except Exception as e:
         return {"error": str(e)}
     
         
-def get_complaint_summary_and_solution(complaint_data, transcript_text):
+def get_complaint_summary_and_solution(complaint_data, transcript_text, known_solution=None):
     """
     Analyze complaint transcript to generate a summary and solution.
     If a solution is already mentioned in the transcript, use that.
-    Otherwise, suggest a new one.
+    Otherwise, use `known_solution` (from a similar resolved complaint) or suggest a new one.
     The summary will be returned as a single paragraph (string) instead of a list.
+    Long transcripts are summarised in parts and merged (see api/summaries.py).
     """
-
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
-    prompt = f"""
-    You are an AI complaint assistant. Analyze the following complaint transcript and details.
-
-    Complaint Info:
-    Customer Name: {complaint_data.get("customer_name")}
-    Customer Contact: {complaint_data.get("customer_contact")}
-    Employee Handling: {complaint_data.get("employee_name")}
-    Complaint Date: {complaint_data.get("complaint_date")}
-
-    Transcript (first 5000 chars shown for context):
-    {transcript_text[:5000]}
-
-    ⚠️ Instructions:
-    1. Provide a concise complaint summary as a single paragraph (combine sentences, do not use a bullet list).
-    2. If the transcript explicitly mentions a proposed solution from the employee or customer, use that as the solution.
-    3. If no solution is mentioned, generate a suggested solution to resolve the complaint.
-    4. Keep the summary factual, neutral, and relevant to the customer issue.
-    5. Return your answer strictly in JSON format like below:
-
-    {{
-        "complaint_summary": "Concise paragraph summarizing the complaint",
-        "solution": "Solution mentioned in transcript or newly suggested"
-    }}
-    """
+    from .analytics.clients import GeminiClient
+    from .summaries import summarise_complaint
 
     try:
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
-        print("🔍 Gemini raw output:", raw_text)
-
-        # Try parsing JSON
         try:
-            result = json.loads(raw_text)
+            result = summarise_complaint(complaint_data, transcript_text, GeminiClient(), known_solution=known_solution)
         except json.JSONDecodeError:
-            # Fallback: extract JSON substring from raw output
-            match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-            if match:
-                result = json.loads(match.group(0))
-            else:
-                result = {
-                    "complaint_summary": "Parsing failed.",
-                    "solution": "None"
-                }
+            result = {
+                "complaint_summary": "Parsing failed.",
+                "solution": "None"
+            }
+        log.debug("complaint summary output", result=lazy(lambda: result))
 
         # Ensure keys exist
         if "complaint_summary" not in result:
@@ -3136,11 +511,10 @@ def meeting_full(request, meeting_id):
         attachments = MeetingFile.objects.filter(meeting__pk=meeting_id)
         attachments_data = MeetingFileSerializer(attachments, many=True, context={'request': request}).data
         
-        print("Meeting data:", meeting_data)
-        print("Attachments data:", attachments_data)
+        log.debug("meeting_full", meeting_id=meeting_id, attachments=len(attachments_data))
 
-        # Combine and return
-        return Response({
+        # Combine and return (304 if the client already has this exact payload)
+        return conditional_response(request, {
             "meeting": meeting_data,
             "attachments": attachments_data
         })
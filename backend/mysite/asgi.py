@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 
 application = get_asgi_application()
+
+# A new server process picks up complaint intake that a stopped one left unfinished
+from api import jobs  # noqa: E402
+from api.transcript import recover_interrupted_intake  # noqa: E402
+
+jobs.submit("complaint-recovery", recover_interrupted_intake)
@@ -1,7 +1,10 @@
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 
+load_dotenv()
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent  # points to backend/
 PROJECT_ROOT = BASE_DIR.parent                     # <-- outer backend folder
@@ -30,6 +33,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.SlowRequestProfilerMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -38,8 +43,59 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryCountMiddleware',
 ]
 
+# Per-request SQL query counting / N+1 detection (see api/middleware.py)
+QUERY_COUNT_ENABLED = os.getenv('QUERY_COUNT_ENABLED', str(DEBUG)).lower() in ('1', 'true', 'yes')
+QUERY_COUNT_REPEAT_THRESHOLD = int(os.getenv('QUERY_COUNT_REPEAT_THRESHOLD', '3'))
+
+# Prometheus metrics at /metrics (api/utils/metrics.py); set METRICS_TOKEN to require
+# "Authorization: Bearer <token>" on scrapes
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Slow-request profiling (api.middleware.SlowRequestProfilerMiddleware). Off unless
+# PROFILE_SLOW_REQUEST_MS is set (sample every request, keep the slow ones) or
+# PROFILE_HEADER_ENABLED lets a request ask for a profile with "X-Profile: sample|cprofile".
+# The header needs PROFILE_TOKEN set, and is only honoured with a matching "X-Profile-Token".
+PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS')) if os.getenv('PROFILE_SLOW_REQUEST_MS') else None
+PROFILE_HEADER_ENABLED = os.getenv('PROFILE_HEADER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# Logging (api/utils/log.py). LOG_LEVEL applies to the api.* modules; raise or lower
+# single modules with e.g. LOG_LEVELS="api.analytics=DEBUG,api.utils.report_generators=WARNING".
+# LOG_FORMAT=json emits one JSON object per line.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_LEVELS = {
+    name.strip(): level.strip().upper()
+    for name, _, level in (item.partition('=') for item in os.getenv('LOG_LEVELS', '').split(','))
+    if level
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {
+            '()': 'api.utils.log.KeyValueFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+        'json': {'()': 'api.utils.log.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': LOG_FORMAT},
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'api': {'level': LOG_LEVEL},
+        **{name: {'level': level} for name, level in LOG_LEVELS.items()},
+    },
+}
+
 ROOT_URLCONF = 'mysite.urls'
 
 TEMPLATES = [
@@ -61,20 +117,109 @@ TEMPLATES = [
 WSGI_APPLICATION = 'mysite.wsgi.application'
 
 # Database - Connect to Supabase PostgreSQL
+# Every setting can be overridden per deployment through the environment (.env).
+#
+# DB_POOL_MODE describes what sits in front of Postgres:
+#   transaction - Supabase pooler on 6543 (PgBouncer-style transaction pooling, default)
+#   session     - Supabase pooler on 5432 (session pooling)
+#   direct      - a plain Postgres server, e.g. a local stand-in for benchmarks
+# Under transaction pooling consecutive transactions may land on different server
+# connections, so server-side cursors (which live across transactions) must be off.
+DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'transaction')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres.zceglugabglfulqxcbnh',
-        'PASSWORD': '4gqFt0hupHJNrDQN',
-        'HOST': 'aws-1-ap-southeast-1.pooler.supabase.com',
-        'PORT': '6543',
+        'NAME': os.getenv('DB_NAME', 'postgres'),
+        'USER': os.getenv('DB_USER', 'postgres.zceglugabglfulqxcbnh'),
+        'PASSWORD': os.getenv('DB_PASSWORD', '4gqFt0hupHJNrDQN'),
+        'HOST': os.getenv('DB_HOST', 'aws-1-ap-southeast-1.pooler.supabase.com'),
+        'PORT': os.getenv('DB_PORT', '6543' if DB_POOL_MODE == 'transaction' else '5432'),
+        # Keep the client -> pooler connection (and its SSL session) open between
+        # requests instead of paying a fresh handshake to a remote region each time.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        # Ping a reused connection before the first query of a request so a
+        # connection dropped by the pooler is replaced instead of erroring.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'transaction',
         'OPTIONS': {
-            'sslmode': 'require',
+            'sslmode': os.getenv('DB_SSLMODE', 'require'),
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '10')),
+            'application_name': os.getenv('DB_APPLICATION_NAME', 'easys-backend'),
+            # TCP keepalives stop idle persistent connections being silently dropped
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 3,
         },
     }
 }
 
+# `manage.py test` builds the test database straight from models.py: the migration
+# history predates the Supabase schema (employee.email/role, task.task_id) and replaying
+# it doesn't produce the tables the models describe
+if sys.argv[1:2] == ['test']:
+    MIGRATION_MODULES = {'api': None}
+
+# Cache - per-process memory by default. Set REDIS_URL when running several
+# workers so write-time invalidation (api/signals.py) reaches all of them.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Upper bound on how stale cached reference lists (departments, employees) can get
+# when a write bypasses model signals, e.g. queryset.update()
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', '300'))
+
+# Employee/department directory (api/directory.py): share snapshots through the cache
+# above so every worker sees writes immediately, and how close a Gemini-produced
+# assignee name must be (0-1) to be matched to an employee
+DIRECTORY_SHARED_CACHE = os.getenv('DIRECTORY_SHARED_CACHE', str(bool(os.getenv('REDIS_URL')))).lower() in ('1', 'true', 'yes')
+DIRECTORY_MATCH_CUTOFF = float(os.getenv('DIRECTORY_MATCH_CUTOFF', '0.8'))
+
+# Batch analysis (api/analytics/batch.py): worker processes per batch and where the
+# resumable per-batch journals are written
+ANALYSIS_BATCH_WORKERS = int(os.getenv('ANALYSIS_BATCH_WORKERS', str(min(4, os.cpu_count() or 1))))
+ANALYSIS_BATCH_DIR = os.getenv('ANALYSIS_BATCH_DIR', str(BASE_DIR / 'batch_runs'))
+
+# Incremental re-analysis (api/analytics/incremental.py): process-file only cleans the rows
+# appended since an earlier upload of the same dataset; cleaned rows of each lineage are
+# kept in this directory, for each uploader's ANALYSIS_LINEAGE_KEEP most recent datasets
+ANALYSIS_INCREMENTAL = os.getenv('ANALYSIS_INCREMENTAL', 'true').lower() in ('1', 'true', 'yes')
+ANALYSIS_LINEAGE_DIR = os.getenv('ANALYSIS_LINEAGE_DIR', str(BASE_DIR / 'lineages'))
+ANALYSIS_LINEAGE_KEEP = max(1, int(os.getenv('ANALYSIS_LINEAGE_KEEP', '5')))
+
+# Background jobs (api/jobs.py): threads per process running complaint intake, and
+# running bulk jobs (each bulk re-summarisation run has its own RESUMMARISE_WORKERS).
+# Intake still Transcribing/Summarising this many seconds after upload is taken to be
+# interrupted and requeued when a server process starts
+BACKGROUND_JOB_WORKERS = int(os.getenv('BACKGROUND_JOB_WORKERS', '2'))
+BULK_JOB_WORKERS = int(os.getenv('BULK_JOB_WORKERS', '1'))
+COMPLAINT_INTAKE_TIMEOUT = int(os.getenv('COMPLAINT_INTAKE_TIMEOUT', '1800'))
+
+# Bulk complaint re-summarisation (api/resummarise.py): concurrent Gemini requests, the
+# requests per minute they share (0: no limit), and where each run's progress report is
+# written (shared by every server process)
+RESUMMARISE_WORKERS = int(os.getenv('RESUMMARISE_WORKERS', '4'))
+RESUMMARISE_REPORT_DIR = os.getenv('RESUMMARISE_REPORT_DIR', str(BASE_DIR / 'resummarise_runs'))
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '60'))
+
+# Similar-complaint index (api/similar.py): seconds before a worker rebuilds it to pick up
+# other workers' writes, and cosine score from which a Resolved complaint's solution is
+# offered to the summary prompt
+SIMILAR_INDEX_MAX_AGE = int(os.getenv('SIMILAR_INDEX_MAX_AGE', '600'))
+SIMILAR_REUSE_THRESHOLD = float(os.getenv('SIMILAR_REUSE_THRESHOLD', '0.5'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,8 +268,6 @@ REST_FRAMEWORK = {
     ]
 }
 
-load_dotenv()
-
 # Gemini API configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 SUPABASE_URL = os.getenv('SUPABASE_URL')  
@@ -141,8 +284,14 @@ CORS_ALLOW_HEADERS = list(default_headers := [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-request-id',
+    'x-profile',
+    'x-profile-token',
 ])
 
+# Let the frontend read the debug query and profiling headers
+CORS_EXPOSE_HEADERS = ['X-DB-Query-Count', 'X-DB-Time-Ms', 'X-DB-Duplicate-Queries', 'X-Request-ID', 'X-Profile-Id']
+
 # Optional: allow cookies with cross-origin requests (if needed)
 CORS_ALLOW_CREDENTIALS = True
 
@@ -19,6 +19,7 @@ from django.urls import path, include,include
 from django.http import HttpResponse  #yx add, if conflict can del
 from django.conf.urls.static import static
 from django.conf import settings
+from api.views import metrics_view
 
 def home_view(request):
     return HttpResponse("Welcome!")
@@ -26,6 +27,7 @@ def home_view(request):
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),  #yx add, if conflict can del
+    path('metrics', metrics_view, name='metrics'),
     path('', home_view),               
     
 
@@ -207,6 +207,7 @@ export default function ComplaintDetails() {
                                     onChange={handleChange}
                                     className="border px-2 py-1 rounded w-full dark:bg-gray-900 dark:text-gray-200"
                                 >
+                                    <option value="Ready">Ready</option>
                                     <option value="Pending">Pending</option>
                                     <option value="In Progress">In Progress</option>
                                     <option value="Resolved">Resolved</option>
@@ -4,6 +4,9 @@ import { useNavigate } from "react-router-dom";
 import Select from "react-select";
 import jsPDF from "jspdf";
 
+// How often complaints still in background intake are re-checked
+const STATUS_POLL_MS = 3000;
+
 export default function ComplaintList() {
   const [complaints, setComplaints] = useState([]);
   const [employees, setEmployees] = useState([]);
@@ -45,6 +48,39 @@ export default function ComplaintList() {
     fetchData();
   }, []);
 
+  // Poll complaints still being transcribed/summarised in the background until they're done
+  const intakeIds = complaints
+    .filter((c) => ["Queued", "Transcribing", "Summarising"].includes(c.status))
+    .map((c) => c.complaint_id)
+    .join(",");
+  useEffect(() => {
+    if (!intakeIds) return;
+    const poll = async () => {
+      const states = await Promise.all(
+        intakeIds.split(",").map((id) =>
+          fetch(`/api/complaintDetails/${id}/status/`)
+            .then((res) => (res.ok ? res.json() : null))
+            .catch(() => null)
+        )
+      );
+      const byId = Object.fromEntries(states.filter(Boolean).map((state) => [String(state.complaint_id), state]));
+      setComplaints((prev) =>
+        prev.map((c) => {
+          const state = byId[String(c.complaint_id)];
+          if (!state) return c;
+          const results = state.done
+            ? state.error
+              ? { complaint_summary: state.error }
+              : { complaint_transcript: state.transcript, complaint_summary: state.ai_summary, solution: state.ai_solution }
+            : {};
+          return { ...c, status: state.status, ...results };
+        })
+      );
+    };
+    const timer = setInterval(poll, STATUS_POLL_MS);
+    return () => clearInterval(timer);
+  }, [intakeIds]);
+
   // Set current user
   useEffect(() => {
     const userEmail = localStorage.getItem("user_email");
@@ -69,6 +105,14 @@ export default function ComplaintList() {
         return <span className="inline-block text-xs px-2 py-1 rounded-full text-grey-800 bg-gray-200 text-gray-700 dark:bg-gray-700 dark:text-gray-100">{status}</span>;
       case "Resolved":
         return <span className="inline-block text-xs px-2 py-1 rounded-full text-green-800 bg-green-100 text-green-700 dark:bg-green-900/40 dark:text-green-300">{status}</span>;
+      case "Queued":
+      case "Transcribing":
+      case "Summarising":
+        return <span className="inline-block text-xs px-2 py-1 rounded-full text-amber-800 bg-amber-100 animate-pulse dark:bg-amber-900/40 dark:text-amber-300">{status}…</span>;
+      case "Ready":
+        return <span className="inline-block text-xs px-2 py-1 rounded-full text-indigo-800 bg-indigo-100 dark:bg-indigo-900/40 dark:text-indigo-300">{status}</span>;
+      case "Failed":
+        return <span className="inline-block text-xs px-2 py-1 rounded-full text-red-800 bg-red-100 dark:bg-red-900/40 dark:text-red-300">{status}</span>;
       default:
         return <span className="inline-block text-xs px-2 py-1 rounded-full text-gray-800 ">Unknown</span>;
     }
@@ -467,9 +511,11 @@ export default function ComplaintList() {
                   className="border px-2 py-1 rounded dark:bg-gray-900"
                 >
                   <option value="">All Status</option>
+                  <option value="Ready">Ready</option>
                   <option value="Pending">Pending</option>
                   <option value="In Progress">In Progress</option>
                   <option value="Resolved">Resolved</option>
+                  <option value="Failed">Failed</option>
                 </select>
 
                 {/* Date Filter */}
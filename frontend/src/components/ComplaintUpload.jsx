@@ -126,7 +126,7 @@ export default function ComplaintUpload() {
             }
 
             console.log("Complaint uploaded:", data);
-            alert("Complaint saved successfully!");
+            alert("Complaint saved! Transcription and AI summary are running; the list updates when they're ready.");
             window.location.href = "/complaintList";
         } catch (err) {
             console.error(err);